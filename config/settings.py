@@ -12,6 +12,7 @@ if not BB_USERNAME or not BB_PASSWORD:
     raise RuntimeError("BB_USERNAME or BB_PASSWORD not set")
 
 # ---------- Rate limiting ----------
+# request pacing: src/utils/rate_limit.py (DOMAIN_LIMITS)
 DAILY_DETAIL_PAGE_BUDGET = 25
 
 # ---------- Paths ----------
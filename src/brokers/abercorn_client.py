@@ -1,24 +1,22 @@
 # src/brokers/abercorn_client.py
 
-import time
-import random
 import re
-from playwright.sync_api import sync_playwright
+
+from playwright.sync_api import TimeoutError as PlaywrightTimeout
+
+from src.extraction.dom_snapshot import dom_fragments, first, inner_text
+from src.utils.browser_pool import get_browser_pool
+from src.utils.rate_limit import polite_goto
 
 ABERCORN_BASE = "https://abercornbusinesssales.com"
 INDEX_URL = f"{ABERCORN_BASE}/businesses-for-sale-sector/ECA"
 
-BASE_SLEEP = 1.0
-JITTER = 0.6
-
 
 class AbercornClient:
     def __init__(self, headless: bool = True):
         self.headless = headless
-        self.browser = None
         self.context = None
         self.page = None
-        self._playwright = None
 
     # ------------------------------------------------------------------
     # LIFECYCLE
@@ -26,22 +24,17 @@ class AbercornClient:
 
     def start(self):
         print("🚀 Starting Abercorn client (headless =", self.headless, ")")
-        self._playwright = sync_playwright().start()
-        self.browser = self._playwright.chromium.launch(headless=self.headless)
-        self.context = self.browser.new_context()
+        self.context = get_browser_pool().new_context(
+            "Abercorn",
+            headless=self.headless,
+        )
         self.page = self.context.new_page()
 
     def stop(self):
         print("🛑 Stopping Abercorn client")
-        try:
-            if self.browser:
-                self.browser.close()
-        finally:
-            if self._playwright:
-                self._playwright.stop()
-
-    def _human_sleep(self, extra: float = 0.0):
-        time.sleep(BASE_SLEEP + extra + random.random() * JITTER)
+        if self.context:
+            get_browser_pool().release(self.context)
+            self.context = None
 
     # ------------------------------------------------------------------
     # INDEX SCRAPE (SINGLE PASS)
@@ -52,24 +45,25 @@ class AbercornClient:
             raise RuntimeError("Client not started")
 
         print(f"🌐 Fetching Abercorn index: {INDEX_URL}")
-        self.page.goto(INDEX_URL, wait_until="domcontentloaded", timeout=30_000)
-        self._human_sleep(1.0)
+        polite_goto(self.page, INDEX_URL, wait_until="domcontentloaded", timeout=30_000)
+        try:
+            self.page.wait_for_selector("div.row.listing-row", timeout=10_000)
+        except PlaywrightTimeout:
+            pass
 
-        cards = self.page.locator("div.row.listing-row")
-        count = cards.count()
+        # all cards in one round-trip, parsed with lxml
+        cards = dom_fragments(self.page, "div.row.listing-row")
 
-        print(f"🔎 Found {count} cards")
+        print(f"🔎 Found {len(cards)} cards")
 
         rows: dict[str, dict] = {}
 
-        for i in range(count):
-            card = cards.nth(i)
-
+        for card in cards:
             try:
-                link = card.locator("a").first
-                href = link.get_attribute("href")
-                title = card.locator("h2").inner_text().strip()
-                ref_text = card.locator("h3").inner_text()
+                link = first(card, ".//a")
+                href = link.get("href") if link is not None else None
+                title = inner_text(first(card, ".//h2"))
+                ref_text = inner_text(first(card, ".//h3"))
 
                 if not href or not title:
                     continue
@@ -1,22 +1,25 @@
-import time
 import os
-import random
 import re
 from pathlib import Path
-from playwright.sync_api import sync_playwright
+from src.extraction.dom_snapshot import dom_fragments, first, has_class, html_elements, inner_text
+from src.utils.browser_pool import get_browser_pool
+from src.utils.hybrid_fetch import HybridFetcher
+from src.utils.rate_limit import get_rate_limiter, polite_goto
+from src.utils.resource_policy import PDF_POLICY, apply_resource_policy
+from src.utils.xhr_capture import capture_endpoint, response_html
 from bs4 import BeautifulSoup
 
+CARD_XPATH = f".//*[{has_class('cz_grid_item')} and @data-id]"
+
 
 class AxisPartnershipClient:
     BASE_URL = "https://www.axispartnership.co.uk/buying/"
     HEADLESS = os.getenv("PLAYWRIGHT_HEADLESS", "0") == "1"
-    BASE_SLEEP = 1.5
-    JITTER = 1.0
 
     def __init__(self):
-        self.browser = None
+        self.context = None
         self.page = None
-        self._playwright = None
+        self.http = None
 
     # ------------------------------------------------------------------
     # LIFECYCLE
@@ -24,19 +27,23 @@ class AxisPartnershipClient:
 
     def start(self):
         print("🚀 Starting Axis Partnership client")
-        self._playwright = sync_playwright().start()
-        self.browser = self._playwright.chromium.launch(headless=self.HEADLESS)
-        self.page = self.browser.new_page()
+        self.context = get_browser_pool().new_context(
+            "AxisPartnership",
+            headless=self.HEADLESS,
+        )
+        self.page = self.context.new_page()
+        # Load More endpoint is paged over HTTP with the page's cookies
+        self.http = HybridFetcher(self.context)
 
     def stop(self):
         print("🛑 Stopping Axis Partnership client")
-        if self.browser:
-            self.browser.close()
-        if self._playwright:
-            self._playwright.stop()
+        if self.context:
+            get_browser_pool().release(self.context)
+            self.context = None
 
-    def _human_sleep(self, extra=0.0):
-        time.sleep(self.BASE_SLEEP + extra + random.random() * self.JITTER)
+    def _throttle(self):
+        # pacing + backoff live in rate_limit.py (DOMAIN_LIMITS)
+        get_rate_limiter().acquire(self.BASE_URL)
 
     # ------------------------------------------------------------------
     # INDEX SCRAPE — ALL GRIDS, ALL LOAD MORE
@@ -47,9 +54,8 @@ class AxisPartnershipClient:
             raise RuntimeError("Client not started")
 
         print("📄 Loading Axis buying page")
-        self.page.goto(self.BASE_URL, timeout=30_000)
+        polite_goto(self.page, self.BASE_URL, timeout=30_000)
         self.page.wait_for_load_state("domcontentloaded")
-        self._human_sleep(1.0)
 
         rows = {}
 
@@ -58,63 +64,97 @@ class AxisPartnershipClient:
         print(f"🔎 Found {grid_count} category grids")
 
         for grid_idx in range(grid_count):
-            grid = grids.nth(grid_idx)
+            label = f"Axis grid {grid_idx + 1}"
             print(f"\n📦 Exhausting grid {grid_idx + 1}")
+            endpoint = self._exhaust_grid(grids.nth(grid_idx), label)
 
-            # ---- HARD exhaust Load More for this grid ----
-            # ---- Exhaust Load More for this grid (Codevz-compatible) ----
-            while True:
-                pager = grid.locator(
-                    "xpath=following-sibling::div[contains(@class,'cz_ajax')]//a"
-                )
-
-                if pager.count() == 0:
-                    break
-
-                text = pager.first.inner_text().strip().lower()
-                if "not found more posts" in text:
-                    break
-
-                print("➡️ Clicking Load More")
-                try:
-                    pager.first.click(force=True, timeout=5_000)
-                    self._human_sleep(1.5)
-                except Exception:
-                    break
-
-            cards = grid.locator(".cz_grid_item[data-id]")
-            card_count = cards.count()
-            print(f"🔍 Found {card_count} cards in grid {grid_idx + 1}")
-
-            for i in range(card_count):
-                card = cards.nth(i)
-
-                link = card.locator("a.cz_grid_link")
-                href = link.get_attribute("href")
-                title = card.locator("h3").inner_text().strip()
-
-                if not href or not title:
-                    continue
-
-                m = re.search(r"(\d{4})$", title)
-                if not m:
-                    continue
+            # grid as rendered (incl. the captured Load More), one round-trip
+            cards = dom_fragments(self.page, "div.cz_grid")[grid_idx].xpath(CARD_XPATH)
+            if endpoint:
+                cards += self._endpoint_cards(endpoint, {c.get("data-id") for c in cards})
+            print(f"🔍 Found {len(cards)} cards in grid {grid_idx + 1}")
 
-                listing_id = m.group(1)
-
-                rows[listing_id] = {
-                    "source": "AxisPartnership",
-                    "source_listing_id": listing_id,
-                    "source_url": href,
-                    "title": title,
-                    "sector_raw": "Healthcare",
-                }
-
-                print(f"✅ DEAL {listing_id} | {title}")
+            for card in cards:
+                row = self._parse_card(card)
+                if row:
+                    rows[row["source_listing_id"]] = row
+                    print(f"✅ DEAL {row['source_listing_id']} | {row['title']}")
 
         print(f"\n🏁 Axis index scrape complete — {len(rows)} deals")
         return list(rows.values())
 
+    def _exhaust_grid(self, grid, label: str):
+        """
+        Load every card of a grid (Codevz "Load More"). The first click
+        is captured: if its request is pageable, the PagedEndpoint is
+        returned and the remaining pages come from it; otherwise keep
+        clicking until "not found more posts". Returns the endpoint or None.
+        """
+        clicks = 0
+        while True:
+            pager = grid.locator(
+                "xpath=following-sibling::div[contains(@class,'cz_ajax')]//a"
+            )
+
+            if pager.count() == 0:
+                return None
+
+            text = pager.first.inner_text().strip().lower()
+            if "not found more posts" in text:
+                return None
+
+            def click():
+                self._throttle()
+                pager.first.click(force=True, timeout=5_000)
+
+            print("➡️ Clicking Load More")
+            try:
+                if clicks == 0:
+                    endpoint = capture_endpoint(self.page, click, fetcher=self.http, page_number=2, label=label)
+                    if endpoint:
+                        return endpoint
+                else:
+                    click()
+                    self.page.wait_for_load_state("networkidle")
+            except Exception:
+                return None
+            clicks += 1
+
+    def _endpoint_cards(self, endpoint, seen_ids: set) -> list:
+        """
+        Cards of pages 3, 4, ... straight from the Load More endpoint,
+        until a page brings no card we have not seen.
+        """
+        cards = []
+        for n, body in endpoint.pages(start=3):
+            html = response_html(body)
+            new = [c for c in html_elements(html, CARD_XPATH) if c.get("data-id") not in seen_ids]
+            if not new:
+                break
+            seen_ids.update(c.get("data-id") for c in new)
+            cards += new
+        return cards
+
+    def _parse_card(self, card) -> dict | None:
+        link = first(card, f".//a[{has_class('cz_grid_link')}]")
+        href = link.get("href") if link is not None else None
+        title = inner_text(first(card, ".//h3"))
+
+        if not href or not title:
+            return None
+
+        m = re.search(r"(\d{4})$", title)
+        if not m:
+            return None
+
+        return {
+            "source": "AxisPartnership",
+            "source_listing_id": m.group(1),
+            "source_url": href,
+            "title": title,
+            "sector_raw": "Healthcare",
+        }
+
     # ------------------------------------------------------------------
     # DETAIL + PDF
     # ------------------------------------------------------------------
@@ -124,9 +164,9 @@ class AxisPartnershipClient:
             raise RuntimeError("Client not started")
 
         print(f"\n➡️ Fetching Axis detail page\n{url}")
-        self.page.goto(url, timeout=30_000)
+        apply_resource_policy(self.page, PDF_POLICY)  # printed below
+        polite_goto(self.page, url, timeout=30_000)
         self.page.wait_for_load_state("networkidle")
-        self._human_sleep(1.0)
 
         html = self.page.content()
 
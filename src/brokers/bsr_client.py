@@ -2,6 +2,8 @@
 
 import requests
 
+from src.utils.http_cache import CachedResponse, get_http_cache
+
 BASE_URL = "https://www.business-sale.com"
 
 
@@ -34,9 +36,9 @@ class BusinessSaleReportClient:
     # Index pages
     # --------------------------------------------------
 
-    def list_page(self, page: int = 1) -> str:
+    def list_url(self, page: int = 1) -> str:
         """
-        Fetch paginated companies-for-sale index.
+        Paginated companies-for-sale index.
 
         Observed patterns:
         - /companies-for-sale?page=1
@@ -44,11 +46,11 @@ class BusinessSaleReportClient:
         """
 
         if page <= 1:
-            url = f"{BASE_URL}/companies-for-sale"
-        else:
-            url = f"{BASE_URL}/companies-for-sale?page={page}"
+            return f"{BASE_URL}/companies-for-sale"
+        return f"{BASE_URL}/companies-for-sale?page={page}"
 
-        return self.fetch(url)
+    def list_page(self, page: int = 1) -> str:
+        return self.fetch(self.list_url(page))
 
     # --------------------------------------------------
     # Detail pages (best-effort, often gated)
@@ -61,14 +63,21 @@ class BusinessSaleReportClient:
     # Core fetch
     # --------------------------------------------------
 
-    def fetch(self, url: str) -> str:
+    def get(self, url: str) -> CachedResponse:
+        """
+        Cached, conditional GET (http_cache.py).
+        """
         print(f"[BSR FETCH] {url}")
 
-        resp = self.session.get(
+        resp = get_http_cache().get(
+            self.session,
             url,
             timeout=self.timeout,
             allow_redirects=True,
         )
 
         resp.raise_for_status()
-        return resp.text
\ No newline at end of file
+        return resp
+
+    def fetch(self, url: str) -> str:
+        return self.get(url).text
@@ -1,12 +1,20 @@
 from pathlib import Path
 from datetime import datetime
 import os
+import time
 
-from playwright.sync_api import sync_playwright
 from playwright.sync_api import TimeoutError as PlaywrightTimeoutError
 
 from src.brokers.base import BrokerClient
+from src.extraction.dom_snapshot import dom_attributes, html_elements
 from src.persistence.repository import SQLiteRepository
+from src.utils.browser_pool import ContextHealth, get_browser_pool
+from src.utils.hybrid_fetch import HybridFetcher
+from src.utils.incremental_crawl import IncrementalCrawl
+from src.utils.resource_policy import PDF_POLICY, apply_resource_policy
+from src.utils.xhr_capture import capture_endpoint, response_html
+
+LISTING_LINK_XPATH = ".//a[contains(@href, '/business/')]"
 
 class BusinessBuyersClient(BrokerClient):
     BASE_URL = "https://businessbuyers.co.uk"
@@ -17,10 +25,14 @@ class BusinessBuyersClient(BrokerClient):
         self.password = password
         self.click_budget = click_budget
         self.headless = os.getenv("PLAYWRIGHT_HEADLESS", "0") == "1"
-        self.browser = None
         self.page = None
         self.auth_context = None
         self.anon_context = None
+        # HTTP-first detail fetchers (session cookies copied from the contexts)
+        self.http = None
+        self.anon_http = None
+        # anon detail context is recycled on memory / error rate
+        self.anon_health = ContextHealth("BusinessBuyers")
 
         self.repo = SQLiteRepository(Path("db/deals.sqlite"))
 
@@ -29,18 +41,41 @@ class BusinessBuyersClient(BrokerClient):
     # ------------------------------------------------------------------
 
     def login(self):
-        p = sync_playwright().start()
-
-        self.browser = p.chromium.launch(
+        pool = get_browser_pool()
+        self.auth_context = pool.new_context(
+            "BusinessBuyers",
             headless=self.headless, #False,
-            slow_mo=400,
+            storage_state=True,  # saved WordPress session
         )
+        self.auth_context.grant_permissions([], origin=self.BASE_URL)
+
+        self.page = self.auth_context.new_page()
+
+        if self.session_valid():
+            print("🔐 BusinessBuyers session still valid — login skipped")
+            self.page.goto(self.BASE_URL)
+            self.page.wait_for_load_state("domcontentloaded")
+            self.ensure_cookies_cleared()
+        else:
+            self._login_form()
+            # persist now: an interrupted run still reuses it
+            pool.save_state(self.auth_context)
 
-        context = self.browser.new_context()
-        context.grant_permissions([], origin=self.BASE_URL)
+        self.http = HybridFetcher(self.auth_context)
 
-        self.page = context.new_page()
+    def session_valid(self) -> bool:
+        """
+        Saved session still usable: unexpired WordPress login cookie.
+        Local check, no request.
+        """
+        now = time.time()
+        return any(
+            c["name"].startswith("wordpress_logged_in_")
+            and (c["expires"] == -1 or c["expires"] > now + 3600)
+            for c in self.auth_context.cookies(self.BASE_URL)
+        )
 
+    def _login_form(self):
         self.page.goto(f"{self.BASE_URL}/login")
         self.page.wait_for_load_state("domcontentloaded")
 
@@ -103,21 +138,26 @@ class BusinessBuyersClient(BrokerClient):
         )
 
         page_num = 1
-        total = 0
         seen = set()
+        records = []
+        counts = {"inserted": 0, "updated": 0, "unchanged": 0}
+        crawl = IncrementalCrawl(self.repo, "BusinessBuyers", self.selected_sector)
+
+        # every listing href in one round-trip
+        hrefs = dom_attributes(self.page, "a[href*='/business/']", "href")
+        # once the "Next" request is learned: pages straight over HTTP
+        pages = None
 
         while True:
             print(f"Scraping page {page_num}")
 
-            cards = self.page.locator("a[href*='/business/']")
-            count = cards.count()
-
-            if count == 0:
+            if not hrefs:
                 print("⚠️ No listing links found, stopping pagination")
                 break
 
-            for i in range(count):
-                href = cards.nth(i).get_attribute("href")
+            page_start = len(records)
+
+            for href in hrefs:
                 if not href:
                     continue
 
@@ -132,14 +172,39 @@ class BusinessBuyersClient(BrokerClient):
                 seen.add(listing_id)
                 sector_raw = f"BusinessBuyers:{self.selected_sector}"
 
-                self.repo.upsert_index_only(
-                    source="BusinessBuyers",
-                    source_listing_id=listing_id,
-                    source_url=href,
-                    sector_raw=sector_raw,  # broker-known, allowed
-                )
+                records.append({
+                    "source": "BusinessBuyers",
+                    "source_listing_id": listing_id,
+                    "source_url": href,
+                    "sector_raw": sector_raw,  # broker-known, allowed
+                })
 
-                total += 1
+            # one batch per page: a crash / block mid-crawl keeps earlier pages
+            page_counts = self.repo.upsert_index_only_many(records[page_start:])
+            for key in counts:
+                counts[key] += page_counts[key]
+
+            if pages is not None and len(records) == page_start:
+                print("No new listings from endpoint, stopping")
+                break
+
+            # known listings only (incremental run) → stop paging
+            if crawl.page_seen(
+                [r["source_listing_id"] for r in records[page_start:]]
+            ):
+                break
+
+            if pages is not None:
+                nxt = next(pages, None)
+                if nxt is None:
+                    print("No more endpoint pages, stopping")
+                    break
+                page_num, body = nxt
+                hrefs = [
+                    a.get("href")
+                    for a in html_elements(response_html(body), LISTING_LINK_XPATH)
+                ]
+                continue
 
             # ✅ pagination: ONLY real pagination next
             next_link = self.page.locator(
@@ -152,7 +217,18 @@ class BusinessBuyersClient(BrokerClient):
 
             current_url = self.page.url
 
-            next_link.first.click()
+            endpoint = None
+            if page_num == 1:
+                # the first "Next" is captured; later pages skip the browser
+                endpoint = capture_endpoint(
+                    self.page,
+                    next_link.first.click,
+                    fetcher=self.http,
+                    page_number=2,
+                    label="BusinessBuyers",
+                )
+            else:
+                next_link.first.click()
             self.page.wait_for_load_state("domcontentloaded")
             self.page.wait_for_timeout(800)
             self.ensure_cookies_cleared()
@@ -162,8 +238,13 @@ class BusinessBuyersClient(BrokerClient):
                 break
 
             page_num += 1
+            hrefs = dom_attributes(self.page, "a[href*='/business/']", "href")
+            if endpoint:
+                pages = endpoint.pages(start=page_num + 1)
 
-        print(f"Indexed {total} unique listings")
+        crawl.finish()
+
+        print(f"Indexed {len(records)} unique listings | {counts}")
 
     # ------------------------------------------------------------------
     # DETAIL
@@ -173,10 +254,7 @@ class BusinessBuyersClient(BrokerClient):
         if self.click_budget is not None:
             self.click_budget.consume()
 
-        self.page.goto(listing["source_url"])
-        self.page.wait_for_load_state("networkidle")
-
-        return self.page.content()
+        return self.http.fetch_html(listing["source_url"], page=self.page)
 
     # ------------------------------------------------------------------
     # UTIL
@@ -202,15 +280,36 @@ class BusinessBuyersClient(BrokerClient):
         except PlaywrightTimeoutError:
             pass
 
+    def close(self):
+        pool = get_browser_pool()
+        if self.auth_context is not None:
+            # keep the (refreshed) session cookies for the next run
+            pool.release(self.auth_context, save_state=True)
+        if self.anon_context is not None:
+            pool.release(self.anon_context)
+        self.auth_context = None
+        self.anon_context = None
+        self.http = None
+        self.anon_http = None
+        self.page = None
+
+    def _ensure_anon_context(self):
+        if self.anon_context is None:
+            self.anon_context = get_browser_pool().new_context(
+                "BusinessBuyers",
+                headless=self.headless,
+            )
+            self.anon_http = HybridFetcher(self.anon_context)
+
+    def _recycle_anon_context(self):
+        get_browser_pool().release(self.anon_context)
+        self.anon_context = None
+        self.anon_http = None
+        self.anon_health.reset()
+
     def fetch_detail_anon(self, url: str) -> str:
-        with sync_playwright() as p:
-            browser = p.chromium.launch(headless=self.headless) #True)
-            page = browser.new_page()
-            page.goto(url, timeout=30000)
-            page.wait_for_load_state("domcontentloaded")
-            html = page.content()
-            browser.close()
-            return html
+        self._ensure_anon_context()
+        return self.anon_http.fetch_html(url)
 
     def fetch_detail_anon_with_pdf(self, url: str, pdf_path: Path) -> str:
         """
@@ -225,20 +324,17 @@ class BusinessBuyersClient(BrokerClient):
         # -------------------------------------------------
         # Ensure anon browser + context
         # -------------------------------------------------
-        if self.anon_context is None:
-            if self.browser is None:
-                self._playwright = sync_playwright().start()
-                self.browser = self._playwright.chromium.launch(headless=self.headless) #True)
-
-            self.anon_context = self.browser.new_context()
+        self._ensure_anon_context()
 
         page = self.anon_context.new_page()
+        apply_resource_policy(page, PDF_POLICY)  # printed below
+        self.anon_health.tick()
 
         try:
             # -------------------------------------------------
             # Navigate
             # -------------------------------------------------
-            page.goto(url, wait_until="networkidle")
+            self.anon_http.goto(page, url, wait_until="networkidle")
 
             # -------------------------------------------------
             # Cookie consent (BEST EFFORT)
@@ -301,8 +397,15 @@ class BusinessBuyersClient(BrokerClient):
 
             return html
 
+        except Exception:
+            self.anon_health.failed()
+            raise
+
         finally:
+            recycle = self.anon_health.should_recycle(page)
             page.close()
+            if recycle:
+                self._recycle_anon_context()
 
     def accept_cookies_if_present(self):
         page = self.page
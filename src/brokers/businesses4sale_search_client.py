@@ -5,7 +5,13 @@ from pathlib import Path
 from typing import Dict
 
 from bs4 import BeautifulSoup
-from playwright.sync_api import sync_playwright, TimeoutError
+from playwright.sync_api import TimeoutError
+
+from src.utils.browser_pool import (
+    DEFAULT_USER_AGENT,
+    DEFAULT_VIEWPORT,
+    get_browser_pool,
+)
 
 BASE_URL = "https://uk.businessesforsale.com/uk/search/businesses-for-sale"
 STORAGE_STATE = Path(".playwright/businesses4sale_search_state.json")
@@ -31,12 +37,11 @@ class BusinessesForSaleSearchClient:
         listings: Dict[str, dict] = {}
         page_num = 1
 
-        with sync_playwright() as p:
-            browser = p.chromium.launch(headless=self.headless)
-
-            context = self._create_context(browser)
-            page = context.new_page()
+        pool = get_browser_pool()
+        context = self._create_context(pool)
+        page = context.new_page()
 
+        try:
             while True:
                 url = (
                     BASE_URL
@@ -81,8 +86,9 @@ class BusinessesForSaleSearchClient:
                 page_num += 1
                 time.sleep(self.sleep_between_pages + random.random() * 2)
 
-            context.storage_state(path=STORAGE_STATE)
-            browser.close()
+        finally:
+            # warm cookies / Cloudflare clearance for the next run
+            pool.release(context, save_state=True)
 
         print(f"\n✅ Total unique listings: {len(listings)}")
         return list(listings.values())
@@ -114,19 +120,16 @@ class BusinessesForSaleSearchClient:
     # Context
     # =================================================
 
-    def _create_context(self, browser):
-        if STORAGE_STATE.exists():
-            print("🔐 Reusing Cloudflare session (search)")
-            return browser.new_context(storage_state=STORAGE_STATE)
-
-        print("🧠 New browser context (search)")
-        return browser.new_context(
-            viewport={"width": 1280, "height": 900},
-            user_agent=(
-                "Mozilla/5.0 (Macintosh; Intel Mac OS X 10_15_7) "
-                "AppleWebKit/537.36 (KHTML, like Gecko) "
-                "Chrome/120.0.0.0 Safari/537.36"
-            ),
+    def _create_context(self, pool):
+        if not STORAGE_STATE.exists():
+            print("🧠 New browser context (search)")
+
+        return pool.new_context(
+            "BusinessesForSaleSearch",
+            headless=self.headless,
+            storage_state=STORAGE_STATE,
+            viewport=DEFAULT_VIEWPORT,
+            user_agent=DEFAULT_USER_AGENT,
         )
 
     # =================================================
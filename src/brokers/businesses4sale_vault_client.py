@@ -1,17 +1,28 @@
 # src/brokers/businesses4sale_vault_client.py
 
+import json
 import os
 import time
-import random
 from pathlib import Path
 from typing import List, Dict
 
 from bs4 import BeautifulSoup
-from playwright.sync_api import sync_playwright, TimeoutError
+from playwright.sync_api import TimeoutError
+
+from src.utils.browser_pool import (
+    DEFAULT_USER_AGENT,
+    DEFAULT_VIEWPORT,
+    get_browser_pool,
+)
+from src.utils.rate_limit import polite_goto
 
 BASE_URL = "https://uk.businessesforsale.com/uk/m-and-a-vault"
 STORAGE_STATE = Path(".playwright/businesses4sale_state.json")
 
+# resume point for an interrupted index crawl
+CURSOR_FILE = Path(".playwright/businesses4sale_index_cursor.json")
+CURSOR_MAX_AGE = 24 * 3600  # seconds; older cursors restart from page 1
+
 
 class BusinessesForSaleClient:
     def __init__(
@@ -20,75 +31,59 @@ class BusinessesForSaleClient:
         headless: bool = False,
         slow_mo_ms: int = 0,
         max_pages: int | None = None,
-        sleep_between_pages: float = 3.0,
+        resume: bool = True,
     ):
         # self.headless = headless
         self.headless = os.getenv("PLAYWRIGHT_HEADLESS", "0") == "1"
         self.slow_mo_ms = slow_mo_ms
         self.max_pages = max_pages
-        self.sleep_between_pages = sleep_between_pages
+        self.resume = resume
 
     # =================================================
     # Public API
     # =================================================
 
     def open_session(self):
-        p = sync_playwright().start()
-        browser = p.chromium.launch(
-            headless=self.headless,
-            slow_mo=self.slow_mo_ms,
-        )
-        context = self._create_context(browser)
+        context = self._create_context(get_browser_pool())
         page = context.new_page()
 
         return {
-            "playwright": p,
-            "browser": browser,
             "context": context,
             "page": page,
         }
 
     def close_session(self, session):
-        session["context"].storage_state(path=STORAGE_STATE)
-        session["browser"].close()
-        session["playwright"].stop()
+        get_browser_pool().release(session["context"], save_state=True)
 
     def fetch_index(self) -> list[dict]:
-        listings: dict[str, dict] = {}
-
-        page_num = 1
-
-        while True:
-            if page_num == 1:
-                url = BASE_URL
-            else:
-                url = f"{BASE_URL}-{page_num}"
-
-            print(f"\n🔍 PAGE {page_num}: {url}")
+        """
+        Crawl the vault index in one session: one context, warm cookies
+        across pages. Progress is checkpointed after every page, so an
+        interrupted (or blocked) crawl resumes where it stopped.
+        """
+        listings, page_num = self._load_cursor()
 
-            with sync_playwright() as p:
-                browser = p.chromium.launch(
-                    headless=self.headless,
-                    slow_mo=self.slow_mo_ms,
-                )
+        session = self.open_session()
+        page = session["page"]
 
-                context = browser.new_context(
-                    viewport={"width": 1280, "height": 900},
-                    user_agent=(
-                        "Mozilla/5.0 (Macintosh; Intel Mac OS X 10_15_7) "
-                        "AppleWebKit/537.36 (KHTML, like Gecko) "
-                        "Chrome/120.0.0.0 Safari/537.36"
-                    ),
-                )
+        try:
+            while True:
+                if page_num == 1:
+                    url = BASE_URL
+                else:
+                    url = f"{BASE_URL}-{page_num}"
 
-                page = context.new_page()
-                page.goto(url, timeout=60_000)
+                print(f"\n🔍 PAGE {page_num}: {url}")
+                # paced by the businessesforsale.com limiter, archived
+                polite_goto(page, url, timeout=60_000)
 
                 try:
                     page.wait_for_selector("div.mv-results", timeout=15_000)
                 except TimeoutError:
-                    print("🛑 Page blocked or empty — stopping crawl")
-                    browser.close()
+                    if "Verify you are human" in page.content():
+                        print(f"🛑 Blocked on page {page_num} — cursor kept for next run")
+                        return list(listings.values())
+                    print("🛑 Page empty — stopping crawl")
                     break
 
                 soup = BeautifulSoup(page.content(), "html.parser")
@@ -107,22 +102,60 @@ class BusinessesForSaleClient:
                         added += 1
 
                 print(f"➕ New listings on page: {added}")
-                browser.close()
 
-            if added == 0:
-                print("⛔ No new listings — pagination exhausted")
-                break
+                if added == 0:
+                    print("⛔ No new listings — pagination exhausted")
+                    break
+
+                if self.max_pages and page_num >= self.max_pages:
+                    print("🛑 Max pages reached — stopping")
+                    break
+
+                page_num += 1
+                self._save_cursor(listings, page_num)
 
-            if self.max_pages and page_num >= self.max_pages:
-                print("🛑 Max pages reached — stopping")
-                break
+        finally:
+            self.close_session(session)
 
-            page_num += 1
-            time.sleep(self.sleep_between_pages + random.random() * 3)
+        # finished cleanly: next run starts from page 1
+        CURSOR_FILE.unlink(missing_ok=True)
 
         print(f"\n✅ Total unique listings extracted: {len(listings)}")
         return list(listings.values())
 
+    # =================================================
+    # Crawl cursor
+    # =================================================
+
+    def _load_cursor(self) -> tuple[dict[str, dict], int]:
+        if not self.resume or not CURSOR_FILE.exists():
+            return {}, 1
+
+        try:
+            cursor = json.loads(CURSOR_FILE.read_text())
+        except (OSError, ValueError) as e:
+            print(f"⚠️ Ignoring unreadable crawl cursor: {e}")
+            return {}, 1
+
+        if time.time() - cursor.get("saved_at", 0) > CURSOR_MAX_AGE:
+            print("🧹 Crawl cursor is stale — starting from page 1")
+            return {}, 1
+
+        listings = cursor.get("listings", {})
+        page_num = cursor.get("next_page", 1)
+        print(f"⏯️ Resuming crawl at page {page_num} ({len(listings)} listings so far)")
+        return listings, page_num
+
+    def _save_cursor(self, listings: dict[str, dict], next_page: int):
+        CURSOR_FILE.parent.mkdir(parents=True, exist_ok=True)
+        tmp = CURSOR_FILE.with_suffix(".tmp")
+        tmp.write_text(json.dumps({
+            "next_page": next_page,
+            "saved_at": time.time(),
+            "listings": listings,
+        }))
+        tmp.replace(CURSOR_FILE)
+
     # =================================================
     # Cloudflare handling
     # =================================================
@@ -173,19 +206,17 @@ class BusinessesForSaleClient:
     # Browser context
     # =================================================
 
-    def _create_context(self, browser):
-        if STORAGE_STATE.exists():
-            print("🔐 Reusing saved Cloudflare session")
-            return browser.new_context(storage_state=STORAGE_STATE)
-
-        print("🧠 No session found — new context")
-        return browser.new_context(
-            viewport={"width": 1280, "height": 900},
-            user_agent=(
-                "Mozilla/5.0 (Macintosh; Intel Mac OS X 10_15_7) "
-                "AppleWebKit/537.36 (KHTML, like Gecko) "
-                "Chrome/120.0.0.0 Safari/537.36"
-            ),
+    def _create_context(self, pool):
+        if not STORAGE_STATE.exists():
+            print("🧠 No session found — new context")
+
+        return pool.new_context(
+            "BusinessesForSale",
+            headless=self.headless,
+            slow_mo=self.slow_mo_ms,
+            storage_state=STORAGE_STATE,
+            viewport=DEFAULT_VIEWPORT,
+            user_agent=DEFAULT_USER_AGENT,
         )
 
     # =================================================
@@ -2,6 +2,8 @@
 
 import requests
 
+from src.utils.http_cache import CachedResponse, get_http_cache
+
 BASE_URL = "https://www.daltonsbusiness.com"
 
 class DaltonsClient:
@@ -16,19 +18,25 @@ class DaltonsClient:
             )
         })
 
+    def list_url(self, page: int) -> str:
+        return f"{BASE_URL}/listing-businesses-for-sale/page/{page}/"
+
     def list_page(self, page: int) -> str:
-        url = f"{BASE_URL}/listing-businesses-for-sale/page/{page}/"
-        return self.fetch(url)
+        return self.fetch(self.list_url(page))
 
     def detail_page(self, url: str) -> str:
         return self.fetch(url)
 
-    def fetch(self, url: str) -> str:
+    def get(self, url: str) -> CachedResponse:
         print(f"[DALTONS FETCH] {url}")
-        resp = self.session.get(
+        resp = get_http_cache().get(
+            self.session,
             url,
             timeout=self.timeout,
             allow_redirects=True,
         )
         resp.raise_for_status()
-        return resp.text
\ No newline at end of file
+        return resp
+
+    def fetch(self, url: str) -> str:
+        return self.get(url).text
@@ -1,10 +1,16 @@
-import time
 import os
-import random
-from playwright.sync_api import sync_playwright
 from playwright._impl._errors import Error as PlaywrightError
 from pathlib import Path
 
+from src.extraction.dom_snapshot import dom_fragments, first, has_class, html_elements, inner_text
+from src.utils.browser_pool import get_browser_pool
+from src.utils.hybrid_fetch import HybridFetcher
+from src.utils.rate_limit import get_rate_limiter, polite_goto
+from src.utils.resource_policy import PDF_POLICY, apply_resource_policy
+from src.utils.xhr_capture import capture_endpoint, response_html
+
+CARD_XPATH = f".//ul[{has_class('clearfix')}]/li"
+
 class DealOpportunitiesClient:
     # =========================
     # CONFIG
@@ -15,70 +21,99 @@ class DealOpportunitiesClient:
     # HEADLESS = False
     HEADLESS = 0 #os.getenv("PLAYWRIGHT_HEADLESS", "0") == "1"
     MAX_PAGES_PER_RUN = 50
-    BASE_SLEEP = 8
-    JITTER = 6
 
     # =========================
     # LIFECYCLE
     # =========================
 
     def __init__(self):
-        self.browser = None
+        self.context = None
         self.page = None
-        self._playwright = None
+        self.http = None
         self.HEADLESS = os.getenv("PLAYWRIGHT_HEADLESS", "0") == "1"
 
     def _cooldown(self):
-        time.sleep(10 + random.random() * 6)
+        # explicit backoff: halves the domain's rate (rate_limit.py)
+        get_rate_limiter().pushback(self.BASE_URL, "cooldown")
 
     def start(self):
         print("🚀 Starting DealOpportunities client")
-        self._playwright = sync_playwright().start()
-        self.browser = self._playwright.chromium.launch(
-            headless=self.HEADLESS
+        self.context = get_browser_pool().new_context(
+            "DealOpportunities",
+            headless=self.HEADLESS,
         )
-        self.page = self.browser.new_page()
+        self.page = self.context.new_page()
+        self.http = HybridFetcher(self.context)
 
     def stop(self):
         print("🛑 Stopping DealOpportunities client")
-        if self.browser:
-            self.browser.close()
-        if self._playwright:
-            self._playwright.stop()
+        if self.context:
+            get_browser_pool().release(self.context)
+            self.context = None
 
     # =========================
     # HELPERS
     # =========================
 
-    def _human_sleep(self):
-        time.sleep(self.BASE_SLEEP + random.random() * self.JITTER)
+    def _throttle(self):
+        # pacing + backoff live in rate_limit.py (DOMAIN_LIMITS)
+        get_rate_limiter().acquire(self.BASE_URL)
 
 
     def _extract_dl_map(self, li):
+        """
+        li: lxml card from dom_fragments (parsed in-process, no IPC).
+        """
         data = {}
 
-        dts = li.query_selector_all("dl dt")
-        for dt in dts:
-            label = dt.inner_text().strip().lower()
-            dd = dt.evaluate_handle("el => el.nextElementSibling")
-            value = dd.inner_text().strip() if dd else None
+        for dt in li.xpath(".//dl//dt"):
+            label = inner_text(dt).lower()
+            dd = dt.getnext()
+            value = inner_text(dd) if dd is not None else None
 
             if "sector" in label:
                 data["sectors"] = value
             elif "region" in label:
                 data["regions"] = value
             elif "turnover" in label:
-                data["turnover"] = value.replace("\xa0", " ").strip()
+                data["turnover"] = value.replace("\xa0", " ").strip() if value else value
             elif "offers required" in label:
                 data["deadline"] = value
 
         return data
 
+    def _parse_card(self, li) -> dict | None:
+        title_el = first(li, ".//h2//a")
+        if title_el is None:
+            return None
+
+        ref_el = first(li, f".//span[{has_class('ref')}]")
+        ref = inner_text(ref_el).strip("()") if ref_el is not None else None
+
+        meta = self._extract_dl_map(li)
+
+        return {
+            "source": "DealOpportunities",
+            "source_listing_id": ref,
+            "source_url": title_el.get("href"),
+            "title": inner_text(title_el),
+
+            # raw broker facts (LOSSLESS)
+            "sectors_multi": meta.get("sectors"),
+            "location": meta.get("regions"),
+            "turnover_range": meta.get('turnover'),
+            "deadline": meta.get("deadline"),
+        }
+
     # =========================
     # INDEX SCRAPE
     # =========================
 
-    def fetch_index(self, max_pages: int = None) -> list[dict]:
+    def fetch_index(self, max_pages: int = None, crawl=None) -> list[dict]:
+        """
+        crawl: optional IncrementalCrawl — stops paging once pages only
+        show known listings.
+        """
         if not self.page:
             raise RuntimeError("Client not started. Call start().")
 
@@ -86,7 +121,8 @@ class DealOpportunitiesClient:
         max_pages = max_pages or self.MAX_PAGES_PER_RUN
 
         print(f"📄 Loading DealOpportunities search page")
-        self.page.goto(
+        polite_goto(
+            self.page,
             self.BASE_URL,
             timeout=30_000,
             wait_until="domcontentloaded",
@@ -99,7 +135,7 @@ class DealOpportunitiesClient:
         except Exception:
             pass
 
-        self._human_sleep()
+        self._throttle()
 
         print("🔎 Submitting advanced search")
         self.page.evaluate("document.querySelector('form').submit();")
@@ -107,60 +143,73 @@ class DealOpportunitiesClient:
 
         page_num = 1
         total = 0
+        seen_refs = set()
+        # all cards in one round-trip, parsed with lxml
+        items = dom_fragments(self.page, "ul.clearfix > li")
+        # once the "Next" request is learned: pages straight from the endpoint
+        pages = None
 
         while True:
             print(f"\n📄 Scraping page {page_num}")
-
-            items = self.page.query_selector_all("ul.clearfix > li")
             print(f"🔍 Found {len(items)} listings")
 
-            for li in items:
-                title_el = li.query_selector("h2 a")
-                if not title_el:
-                    continue
-
-                ref_el = li.query_selector("span.ref")
-                ref = ref_el.inner_text().strip("()") if ref_el else None
-
-                meta = self._extract_dl_map(li)
+            page_rows = [r for r in map(self._parse_card, items) if r]
+            page_refs = [r["source_listing_id"] for r in page_rows]
 
-                rows.append({
-                    "source": "DealOpportunities",
-                    "source_listing_id": ref,
-                    "source_url": title_el.get_attribute("href"),
-                    "title": title_el.inner_text().strip(),
-
-                    # raw broker facts (LOSSLESS)
-                    "sectors_multi": meta.get("sectors"),
-                    "location": meta.get("regions"),
-                    "turnover_range": meta.get('turnover'),
-                    "deadline": meta.get("deadline"),
-                })
-
-                total += 1
+            if pages is not None and seen_refs.issuperset(page_refs):
+                print("🏁 No new listings from endpoint — stopping")
+                break
+            seen_refs.update(page_refs)
 
+            rows.extend(page_rows)
+            total += len(page_rows)
             print(f"📊 Total collected so far: {total}")
 
+            if crawl and crawl.page_seen(page_refs):
+                break
+
             if page_num >= max_pages:
                 print("🛑 Page limit reached")
                 break
 
+            if pages is not None:
+                nxt = next(pages, None)
+                if nxt is None:
+                    print("🏁 No next page — stopping")
+                    break
+                page_num, body = nxt
+                items = html_elements(response_html(body), CARD_XPATH)
+                continue
+
             next_btn = self.page.query_selector("a.page-next")
             if not next_btn:
                 print("🏁 No next page — stopping")
                 break
 
             next_btn.scroll_into_view_if_needed()
-            self._human_sleep()
-            next_btn.click()
+
+            def click():
+                self._throttle()
+                next_btn.click()
+
+            endpoint = None
+            if page_num == 1:
+                # the first "Next" is captured; later pages skip the browser
+                endpoint = capture_endpoint(
+                    self.page, click, fetcher=self.http, page_number=2, label="DealOpportunities"
+                )
+            else:
+                click()
 
             self.page.wait_for_selector(
                 "ul.clearfix > li h2 a",
                 timeout=20_000
             )
-            self._human_sleep()
 
             page_num += 1
+            items = dom_fragments(self.page, "ul.clearfix > li")
+            if endpoint:
+                pages = endpoint.pages(start=page_num + 1, max_pages=max_pages)
 
         print(f"\n✅ Index scrape complete — {total} listings collected")
         return rows
@@ -174,10 +223,8 @@ class DealOpportunitiesClient:
             raise RuntimeError("Client not started. Call start().")
 
         print(f"➡️ Fetching detail page:\n   {url}")
-        self.page.goto(url, timeout=30_000)
-        self.page.wait_for_load_state("networkidle")
-
-        html = self.page.content()
+        # server-rendered: plain HTTP unless it looks like a challenge / shell
+        html = self.http.fetch_html(url, page=self.page)
         print("✅ Detail HTML captured")
 
         return html
@@ -185,15 +232,16 @@ class DealOpportunitiesClient:
     def fetch_listing_detail_and_pdf(self, url: str, pdf_path: Path, retries=2) -> str:
         print("➡️ Fetching detail page and generating pdf:")
         print(f"   {url}")
-        page = self.browser.new_page()
+        page = self.context.new_page()
+        apply_resource_policy(page, PDF_POLICY)  # printed below
         for attempt in range(retries + 1):
             try:
-                page.goto(url, timeout=60_000)
+                self.http.goto(page, url, timeout=60_000)
                 break
             except PlaywrightError:
                 if attempt == retries:
                     raise
-                time.sleep(3)
+                self._cooldown()
         # 🔑 MUST come before content extraction or PDF
         self.accept_cookies_if_present(page)
 
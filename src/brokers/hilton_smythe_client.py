@@ -3,6 +3,8 @@
 import requests
 from urllib.parse import quote_plus
 
+from src.utils.http_cache import CachedResponse, get_http_cache
+
 BASE_URL = "https://hiltonsmythe.com"
 
 class HiltonSmytheClient:
@@ -24,12 +26,16 @@ class HiltonSmytheClient:
             f"?business-sector={sector_q}&page={page}"
         )
 
-    def fetch(self, url: str) -> str:
+    def get(self, url: str) -> CachedResponse:
         print(f"[HS FETCH] {url}")
-        resp = self.session.get(
+        resp = get_http_cache().get(
+            self.session,
             url,
             timeout=self.timeout,
             allow_redirects=True,
         )
         resp.raise_for_status()
-        return resp.text
\ No newline at end of file
+        return resp
+
+    def fetch(self, url: str) -> str:
+        return self.get(url).text
@@ -1,12 +1,23 @@
-import time
-import random
 import re
 import os
-from playwright.sync_api import sync_playwright
+from playwright.sync_api import TimeoutError as PlaywrightTimeout
+from src.extraction.dom_snapshot import first, has_class, html_elements, inner_text
+from src.utils.browser_pool import get_browser_pool
+from src.utils.hybrid_fetch import HybridFetcher
+from src.utils.partitioned_crawl import PartitionedCrawlSpec, run_partitioned_crawl
+from src.utils.rate_limit import get_rate_limiter, polite_goto
 from src.config import KB_USERNAME, KB_PASSWORD
 
 KNIGHTSBRIDGE_BASE = "https://www.knightsbridgeplc.com"
 LOGIN_BASE = "https://portal.knightsbridgeplc.com/login/"
+PORTAL_BASE = "https://portal.knightsbridgeplc.com/"
+
+CONSENT_COOKIE = {
+    "name": "CookieConsent",
+    "value": "{stamp:'accepted',necessary:true,preferences:true,statistics:true,marketing:true}",
+    "domain": "www.knightsbridgeplc.com",
+    "path": "/",
+}
 
 class KnightsbridgeClient:
     BASE_URL = "https://www.knightsbridgeplc.com/buy-a-business/search-our-listings/"
@@ -36,57 +47,74 @@ class KnightsbridgeClient:
         "Technology": "19",
         "Transport/Logistics/Storage": "18",
     }
-    BASE_SLEEP = 1.2
-    JITTER = 0.8
-
-    RESTART_EVERY = 50
-    BASE_SLEEP = 1.2
-    JITTER = 0.8
-
 
     # Proven sector values
     def __init__(self):
-        self.browser = None
+        self.context = None
         self.page = None
-        self._playwright = None
+        self.http = None     # HybridFetcher, available after login()
+        self.logged_in = False
         self.HEADLESS = True # os.getenv("PLAYWRIGHT_HEADLESS", "0") == "1"
     # ------------------------------------------------------------------
     # LIFECYCLE
     # ------------------------------------------------------------------
 
     def _pre_accept_cookies(self):
-        self.context.add_cookies([
-            {
-                "name": "CookieConsent",
-                "value": "{stamp:'accepted',necessary:true,preferences:true,statistics:true,marketing:true}",
-                "domain": "www.knightsbridgeplc.com",
-                "path": "/",
-            }
-        ])
+        self.context.add_cookies([CONSENT_COOKIE])
 
 
     def start(self):
         print("🚀 Starting Knightsbridge client (headless =", self.HEADLESS, ")")
-        self._playwright = sync_playwright().start()
-        self.browser = self._playwright.chromium.launch(
+        self.context = get_browser_pool().new_context(
+            "Knightsbridge",
             headless=self.HEADLESS,
-            slow_mo=100  # optional, highly recommended for observing Cookiebot
+            slow_mo=100,  # optional, highly recommended for observing Cookiebot
+            storage_state=True,  # saved login session, see login()
         )
-        self.context = self.browser.new_context()
         self._pre_accept_cookies()
         self.page = self.context.new_page()
 
     def stop(self):
         print("🛑 Stopping Knightsbridge client")
-        if self.browser:
-            self.browser.close()
-        if self._playwright:
-            self._playwright.stop()
+        if self.context:
+            # keep the (refreshed) session cookies for the next run / recycle
+            get_browser_pool().release(self.context, save_state=self.logged_in)
+            self.context = None
+            self.logged_in = False
+
+    def session_valid(self) -> bool:
+        """
+        Cheap check of the saved session: one HTTP request with the
+        context's cookies, no rendering. Logged out → portal redirects
+        to the login page.
+        """
+        if not self.context.cookies(PORTAL_BASE):
+            return False
+        try:
+            get_rate_limiter().acquire(PORTAL_BASE)
+            resp = self.context.request.get(PORTAL_BASE, timeout=15_000)
+        except Exception as e:
+            print(f"⚠️ Knightsbridge session check failed: {e}")
+            return False
+        return resp.ok and "login" not in resp.url.lower()
 
     def login(self):
+        if self.session_valid():
+            print("🔐 Knightsbridge session still valid — login skipped")
+        else:
+            self._login_form()
+            # persist now: an interrupted run still reuses it
+            get_browser_pool().save_state(self.context)
+
+        self.logged_in = True
+        # detail pages are server-rendered: fetch them with the session cookies
+        self.http = HybridFetcher(self.context, required_marker='id="BusinessDetails"')
+
+    def _login_form(self):
         print("🔐 Logging into Knightsbridge")
 
-        self.page.goto(
+        polite_goto(
+            self.page,
             LOGIN_BASE,
             wait_until="networkidle",
             timeout=30_000,
@@ -111,9 +139,12 @@ class KnightsbridgeClient:
         # Submit via the actual onclick handler
         self.page.evaluate("LoginUser('#ContentPlaceHolder1_ctl08')")
 
-        # Wait for post-login navigation
-        self.page.wait_for_load_state("networkidle")
-        self.page.wait_for_timeout(1500)
+        # Wait for post-login navigation (off the login page)
+        try:
+            self.page.wait_for_url(lambda url: "login" not in url.lower(), timeout=30_000)
+        except PlaywrightTimeout:
+            pass  # asserted below
+        self.page.wait_for_load_state("domcontentloaded")
 
         # Login success assertion (robust)
         if (
@@ -138,80 +169,55 @@ class KnightsbridgeClient:
         except Exception:
             pass
 
-    def _human_sleep(self, min_extra=0.0):
-        time.sleep(self.BASE_SLEEP + min_extra + random.random() * self.JITTER)
-
     # ------------------------------------------------------------------
     # INDEX SCRAPE (VISIBLE CARDS ONLY)
     # ------------------------------------------------------------------
 
-    def fetch_index(self) -> list[dict]:
-        if not self.page:
-            raise RuntimeError("Client not started")
-
-        all_rows: dict[str, dict] = {}
-
-        for sector_name, sector_value in self.SECTORS.items():
-            print(f"\n🧭 Sector: {sector_name}")
-
-            page_no = 1
-
-            while True:
-                url = (
-                    f"{self.BASE_URL}"
-                    f"?sector={sector_value}"
-                    f"&PageNumber={page_no}"
-                )
-
-                self.page.goto(url, wait_until="domcontentloaded", timeout=30_000)
-                self._human_sleep(0.8)
-
-                cards = self.page.locator("div.wp-block-post.unb-business-listing")
-                card_count = cards.count()
-
-                if card_count == 0:
-                    break
+    CARD_XPATH = (
+        f"//div[{has_class('wp-block-post')} and {has_class('unb-business-listing')}]"
+    )
+
+    @classmethod
+    def _index_url(cls, sector_value: str, page_no: int) -> str:
+        return f"{cls.BASE_URL}?sector={sector_value}&PageNumber={page_no}"
+
+    @classmethod
+    def _parse_index_page(cls, sector_name: str, html: str) -> list[dict]:
+        rows = []
+        for card in html_elements(html, cls.CARD_XPATH):
+            ref_text = inner_text(first(card, f".//p[{has_class('reference')}]"))
+            m = re.search(r"Ref:\s*(\d+)", ref_text)
+            if not m:
+                continue
+
+            link = first(card, f".//a[{has_class('wp-block-read-more')}]")
+            href = link.get("href") if link is not None else None
+            if not href:
+                continue
+
+            rows.append({
+                "source": "Knightsbridge",
+                "source_listing_id": m.group(1),
+                "source_url": href,
+                "title": inner_text(first(card, f".//h4[{has_class('wp-block-post-title')}]")).strip(),
+                "sector_raw": sector_name,
+            })
+        return rows
 
-                new_rows = 0
-
-                for i in range(card_count):
-                    card = cards.nth(i)
-
-                    ref_text = card.locator("p.reference").inner_text()
-                    m = re.search(r"Ref:\s*(\d+)", ref_text)
-                    if not m:
-                        continue
-
-                    listing_id = m.group(1)
-                    if listing_id in all_rows:
-                        continue
-
-                    title = (
-                        card.locator("h4.wp-block-post-title")
-                        .inner_text()
-                        .strip()
-                    )
-
-                    href = card.locator("a.wp-block-read-more").get_attribute("href")
-                    if not href:
-                        continue
-
-                    all_rows[listing_id] = {
-                        "source": "Knightsbridge",
-                        "source_listing_id": listing_id,
-                        "source_url": href,
-                        "title": title,
-                        "sector_raw": sector_name,
-                    }
-
-                    new_rows += 1
-                    print(f"✅ DEAL {listing_id} | {title}")
-
-                if new_rows == 0:
-                    break
-
-                page_no += 1
-                self._human_sleep(0.6)
-
-        print(f"\n🏁 Knightsbridge index scrape complete — {len(all_rows)} deals")
-        return list(all_rows.values())
\ No newline at end of file
+    def fetch_index(self) -> list[dict]:
+        """
+        Every sector in its own browser context, PARTITION_LIMITS
+        ["Knightsbridge"] at once. The index is public: no start() /
+        login() needed. A listing in several sectors keeps the first.
+        """
+        return run_partitioned_crawl(
+            PartitionedCrawlSpec(
+                broker="Knightsbridge",
+                partitions=self.SECTORS,
+                page_url=self._index_url,
+                parse=self._parse_index_page,
+                cookies=(CONSENT_COOKIE,),
+                goto_timeout=30_000,
+            ),
+            headless=self.HEADLESS,
+        )
@@ -3,6 +3,8 @@
 import requests
 from urllib.parse import urljoin
 
+from src.utils.http_cache import CachedResponse, get_http_cache
+
 
 class TransworldUKClient:
     BASE_URL = "https://tworldba.co.uk"
@@ -12,14 +14,18 @@ class TransworldUKClient:
         self.session = requests.Session()
         self.timeout = timeout
 
-    def fetch_page(self, url: str) -> str | None:
+    def get_page(self, url: str) -> CachedResponse | None:
         try:
-            r = self.session.get(url, timeout=self.timeout)
+            r = get_http_cache().get(self.session, url, timeout=self.timeout)
             r.raise_for_status()
-            return r.text
+            return r
         except Exception:
             return None
 
+    def fetch_page(self, url: str) -> str | None:
+        r = self.get_page(url)
+        return r.text if r else None
+
     def fetch_index_page(self, url: str) -> str | None:
         return self.fetch_page(url)
 
@@ -101,4 +101,22 @@ def sqlite_select_columns() -> list[str]:
             continue
         cols.append(c.name)
 
-    return cols
\ No newline at end of file
+    return cols
+
+# Columns enrichers read from fetch_deals_for_enrichment rows.
+ENRICHMENT_COLUMNS = [
+    "id",
+    "source",
+    "source_listing_id",
+    "source_url",
+    "title",
+    "industry",
+    "sector",
+    "sector_raw",
+    "status",
+    "content_hash",
+    "drive_folder_id",
+    "needs_detail_refresh",
+    "detail_fetched_at",
+    "next_refresh_at",
+]
@@ -0,0 +1,330 @@
+# src/enrichment/async_runner.py
+"""
+Concurrent detail-page enrichment (async Playwright).
+
+The enrich_* scripts visit one detail page at a time. This runner keeps
+N pages in flight in one shared context per broker; every navigation
+still goes through the domain's rate limiter (rate_limit.py), so N only
+helps while the broker's token bucket allows it.
+
+The broker logic stays in the script, as plain sync functions:
+
+- extract(deal, html) -> fields | None    parse the detail HTML
+                                          (None = nothing to persist)
+- pdf_path(deal, fields) -> Path | None   where to print the page
+                                          (None = no PDF)
+- persist(deal, fields, pdf_path)         Drive upload + DB writes
+
+Optional per broker:
+
+- downloads(deal, fields) -> [(url, path)]  extra files fetched with the
+                                            page's cookies (e.g. an IM)
+- on_error(deal, exc)                       navigation failed after
+                                            `retries` (park / mark lost)
+
+extract, persist and on_error run in worker threads, so they must write
+through repo.writer (write_queue.py), not a shared connection.
+
+A failed navigation (timeout, net::ERR_*) goes to on_error, or skips
+the deal when there is none (as the sequential scripts do); any other
+exception stops the run and is re-raised. With max_runtime, deals not
+started by then are left for the next run.
+
+Every detail page is archived (html_archive.py). In replay mode no
+browser is started: extract and persist run over the archived HTML,
+with pdf_path None.
+"""
+
+import asyncio
+import time
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Callable
+
+from playwright.async_api import Error as PlaywrightError
+from playwright.async_api import async_playwright
+
+from src.utils.browser_pool import (
+    DEFAULT_USER_AGENT,
+    DEFAULT_VIEWPORT,
+    default_headless,
+    state_path,
+)
+from src.utils.html_archive import NotArchived, get_html_archive, replay_enabled
+from src.utils.rate_limit import get_rate_limiter
+from src.utils.resource_policy import (
+    PDF_POLICY,
+    ResourcePolicy,
+    apply_resource_policy_async,
+)
+
+
+@dataclass(frozen=True)
+class BrokerLimits:
+    # detail pages in flight at once (request pacing: rate_limit.DOMAIN_LIMITS)
+    concurrency: int = 2
+
+
+DEFAULT_LIMITS = BrokerLimits()
+
+# keyed by the broker name used for the browser pool
+BROKER_LIMITS = {
+    "Daltons": BrokerLimits(concurrency=4),
+    "Knightsbridge": BrokerLimits(concurrency=3),
+    "Abercorn": BrokerLimits(concurrency=2),
+    "BusinessBuyers": BrokerLimits(concurrency=2),
+    "DealOpportunities": BrokerLimits(concurrency=2),
+}
+
+
+def limits_for(broker: str) -> BrokerLimits:
+    return BROKER_LIMITS.get(broker, DEFAULT_LIMITS)
+
+
+@dataclass(frozen=True)
+class EnrichmentSpec:
+    broker: str
+    extract: Callable[[dict, str], dict | None]
+    persist: Callable[[dict, dict, Path | None], None]
+    pdf_path: Callable[[dict, dict], Path | None] | None = None
+    downloads: Callable[[dict, dict], list[tuple[str, Path]]] | None = None
+    on_error: Callable[[dict, Exception], None] | None = None
+    wait_until: str = "load"
+    wait_selector: str = "body"
+    # added to the context before the first page (e.g. consent cookies)
+    cookies: tuple[dict, ...] = ()
+    # injected before printing (hide headers, banners, ...)
+    print_css: str | None = None
+    pdf_margin: dict | None = None
+    goto_timeout: int = 60_000
+    wait_timeout: int = 20_000
+    # extra navigation attempts before on_error / skip
+    retries: int = 0
+
+
+def _new_stats() -> dict:
+    return {"enriched": 0, "skipped": 0, "failed": 0, "pushbacks": 0, "deferred": 0}
+
+
+async def _navigate(spec, page, limiter, url):
+    """
+    goto + wait_selector, retried spec.retries times (each attempt paced
+    by the limiter). Returns (response, None) or (None, last error).
+    """
+    for attempt in range(spec.retries + 1):
+        if attempt:
+            await asyncio.sleep(limiter.reserve(url))
+        try:
+            response = await page.goto(url, wait_until=spec.wait_until, timeout=spec.goto_timeout)
+            await page.wait_for_selector(spec.wait_selector, timeout=spec.wait_timeout)
+            return response, None
+        except PlaywrightError as e:
+            error = e
+    return None, error
+
+
+async def _download(context, limiter, url: str, path: Path, timeout: int) -> bool:
+    await asyncio.sleep(limiter.reserve(url))
+    try:
+        response = await context.request.get(url, timeout=timeout)
+    except PlaywrightError as e:
+        print(f"⚠️ Download failed ({e.__class__.__name__}): {url}")
+        return False
+    limiter.observe(url, status=response.status)
+    if not response.ok:
+        print(f"⚠️ Download failed ({response.status}): {url}")
+        return False
+    path.parent.mkdir(parents=True, exist_ok=True)
+    path.write_bytes(await response.body())
+    return True
+
+
+async def _enrich_one(spec, context, limiter, slots, workers, deal, stats, deadline):
+    listing_id = deal["source_listing_id"]
+    url = deal["source_url"]
+    loop = asyncio.get_running_loop()
+
+    async with slots:
+        if deadline is not None and time.monotonic() > deadline:
+            stats["deferred"] += 1
+            return
+
+        await asyncio.sleep(limiter.reserve(url))
+        print(f"➡️ {spec.broker} {listing_id}")
+
+        page = await context.new_page()
+        try:
+            response, error = await _navigate(spec, page, limiter, url)
+            if error is not None:
+                stats["failed"] += 1
+                if spec.on_error is None:
+                    print(f"⚠️ {error.__class__.__name__}: {listing_id}")
+                    return
+            else:
+                html = await page.content()
+                status = response.status if response else None
+                if limiter.observe(url, status=status, html=html):
+                    stats["pushbacks"] += 1
+                get_html_archive().put(url, html, status=status)
+                fields = await loop.run_in_executor(workers, spec.extract, deal, html)
+                if fields is None:
+                    stats["skipped"] += 1
+                    return
+
+                pdf_path = spec.pdf_path(deal, fields) if spec.pdf_path else None
+                if pdf_path is not None:
+                    if spec.print_css:
+                        await page.add_style_tag(content=spec.print_css)
+                        await page.wait_for_timeout(500)
+                    await page.emulate_media(media="print")
+                    pdf_path.parent.mkdir(parents=True, exist_ok=True)
+                    await page.pdf(
+                        path=str(pdf_path),
+                        format="A4",
+                        print_background=True,
+                        margin=spec.pdf_margin,
+                    )
+
+                for dl_url, dl_path in spec.downloads(deal, fields) if spec.downloads else ():
+                    await _download(context, limiter, dl_url, dl_path, spec.goto_timeout)
+        finally:
+            await page.close()
+
+    # Drive / DB work does not hold a page slot
+    if error is not None:
+        await loop.run_in_executor(workers, spec.on_error, deal, error)
+        return
+
+    await loop.run_in_executor(workers, spec.persist, deal, fields, pdf_path)
+    stats["enriched"] += 1
+
+
+async def _run(spec, deals, *, headless, limits, resource_policy, storage_state, max_runtime):
+    stats = _new_stats()
+    deadline = time.monotonic() + max_runtime if max_runtime else None
+
+    async with async_playwright() as p:
+        browser = await p.chromium.launch(headless=headless)
+
+        context_options = {
+            "viewport": DEFAULT_VIEWPORT,
+            "user_agent": DEFAULT_USER_AGENT,
+        }
+        state_file = state_path(spec.broker)
+        if storage_state and state_file.exists():
+            context_options["storage_state"] = str(state_file)
+
+        context = await browser.new_context(**context_options)
+        if spec.cookies:
+            await context.add_cookies(list(spec.cookies))
+        if resource_policy:
+            await apply_resource_policy_async(context, resource_policy)
+
+        limiter = get_rate_limiter()
+        slots = asyncio.Semaphore(limits.concurrency)
+        # extract / persist threads, owned here so they can be drained;
+        # persist (Drive upload) does not hold a page slot, hence 2x
+        workers = ThreadPoolExecutor(max_workers=2 * limits.concurrency)
+
+        tasks = [
+            asyncio.create_task(_enrich_one(spec, context, limiter, slots, workers, deal, stats, deadline))
+            for deal in deals
+        ]
+
+        try:
+            done, pending = await asyncio.wait(tasks, return_when=asyncio.FIRST_EXCEPTION)
+            for task in pending:
+                task.cancel()
+            await asyncio.gather(*pending, return_exceptions=True)
+            for task in done:
+                if task.exception() is not None:
+                    raise task.exception()
+        finally:
+            # a cancelled task does not stop its thread: let a persist()
+            # already running finish before returning
+            await asyncio.to_thread(workers.shutdown, wait=True, cancel_futures=True)
+            await context.close()
+            await browser.close()
+
+    return stats
+
+
+def _replay(spec, deals):
+    stats = _new_stats()
+    archive = get_html_archive()
+
+    for deal in deals:
+        try:
+            _, html = archive.snapshot(deal["source_url"])
+        except NotArchived:
+            stats["skipped"] += 1
+            continue
+
+        fields = spec.extract(deal, html)
+        if fields is None:
+            stats["skipped"] += 1
+            continue
+
+        spec.persist(deal, fields, None)
+        stats["enriched"] += 1
+
+    return stats
+
+
+def run_enrichment(
+    spec: EnrichmentSpec,
+    deals: list[dict],
+    *,
+    headless: bool | None = None,
+    limits: BrokerLimits | None = None,
+    resource_policy: ResourcePolicy | None = PDF_POLICY,
+    storage_state: bool = False,
+    max_runtime: float | None = None,
+) -> dict:
+    """
+    Enrich deals concurrently.
+    storage_state: start from the broker's saved session (browser_pool.py)
+    max_runtime:   seconds; deals not started by then are "deferred"
+    Returns {"enriched", "skipped", "failed", "pushbacks", "deferred"}.
+    """
+    if not deals:
+        return _new_stats()
+
+    started = time.monotonic()
+
+    if replay_enabled():
+        print(f"📼 {spec.broker}: replaying {len(deals)} deals from the archive")
+        stats = _replay(spec, deals)
+        print(
+            f"🏁 {spec.broker}: {stats['enriched']} re-extracted | "
+            f"{stats['skipped']} skipped | {time.monotonic() - started:.0f}s"
+        )
+        return stats
+
+    limits = limits or limits_for(spec.broker)
+    headless = default_headless() if headless is None else headless
+
+    print(
+        f"⚡ {spec.broker}: {len(deals)} deals | {limits.concurrency} pages in flight"
+    )
+
+    stats = asyncio.run(
+        _run(
+            spec,
+            deals,
+            headless=headless,
+            limits=limits,
+            resource_policy=resource_policy,
+            storage_state=storage_state,
+            max_runtime=max_runtime,
+        )
+    )
+
+    print(
+        f"🏁 {spec.broker}: {stats['enriched']} enriched | "
+        f"{stats['skipped']} skipped | {stats['failed']} failed | "
+        f"{stats['pushbacks']} pushbacks | {stats['deferred']} deferred | "
+        f"{time.monotonic() - started:.0f}s"
+    )
+    return stats
@@ -0,0 +1,41 @@
+# src/enrichment/change_detection.py
+"""
+Skip re-enrichment of listings whose content did not change.
+
+Right after extraction an enricher computes the semantic content hash
+(compute_content_hash) and compares it with the stored deals.content_hash.
+Same hash and the deal already has its Drive folder → the PDF, Drive
+upload, artifact and field rewrite are skipped; only the fetch
+bookkeeping is touched, so a stable listing costs one page fetch.
+
+Callers submit UNCHANGED_SQL with unchanged_params(deal_id) through
+repo.writer (write_queue.py): stamps are group-committed, not one
+commit per deal.
+"""
+
+from datetime import datetime
+
+UNCHANGED_SQL = """
+    UPDATE deals
+    SET detail_fetched_at    = ?,
+        last_seen            = ?,
+        needs_detail_refresh = 0
+    WHERE id = ?
+"""
+
+
+def content_unchanged(deal, content_hash: str | None) -> bool:
+    """
+    deal: row with content_hash and drive_folder_id (ENRICHMENT_COLUMNS).
+    """
+    return (
+        content_hash is not None
+        and deal["content_hash"] == content_hash
+        and deal["drive_folder_id"] is not None
+    )
+
+
+def unchanged_params(deal_id: int) -> tuple:
+    now = datetime.today().isoformat(timespec="seconds")
+    return (now, now, deal_id)
+
@@ -0,0 +1,120 @@
+# src/extraction/dom_snapshot.py
+"""
+Single-round-trip DOM extraction for Playwright pages.
+
+Every locator / element-handle call is one IPC round-trip to the
+browser, so looping over the cards of an index page costs hundreds of
+them. Instead, pull the outerHTML of all matches in one evaluate and
+parse it in-process with lxml:
+
+    for li in dom_fragments(page, "ul.clearfix > li"):     # 1 IPC
+        a = first(li, ".//h2/a")
+        title = inner_text(a)
+
+The page selector is CSS (run by the browser); queries on the parsed
+fragments are XPath (lxml, no cssselect needed).
+"""
+
+from lxml import html as lxml_html
+
+OUTER_HTML_JS = "sel => Array.from(document.querySelectorAll(sel), el => el.outerHTML)"
+ATTRIBUTE_JS = "([sel, name]) => Array.from(document.querySelectorAll(sel), el => el.getAttribute(name))"
+
+# tags rendered on their own line by inner_text()
+BLOCK_TAGS = {
+    "p", "div", "section", "article", "li", "ul", "ol", "dl", "dt", "dd",
+    "h1", "h2", "h3", "h4", "h5", "h6", "tr", "table", "blockquote",
+}
+SKIP_TAGS = {"script", "style", "noscript", "template"}
+
+
+# ------------------------------------------------------------------
+# PAGE → LXML (one round-trip each)
+# ------------------------------------------------------------------
+
+def dom_fragments(page, selector: str) -> list:
+    """
+    Every element matching selector, parsed with lxml.
+    """
+    return [
+        lxml_html.fragment_fromstring(outer)
+        for outer in page.evaluate(OUTER_HTML_JS, selector)
+    ]
+
+
+def dom_document(page):
+    """
+    The whole rendered document, parsed with lxml.
+    """
+    return lxml_html.document_fromstring(page.content())
+
+
+def dom_attributes(page, selector: str, name: str) -> list[str | None]:
+    """
+    Attribute `name` of every element matching selector (no parsing).
+    """
+    return page.evaluate(ATTRIBUTE_JS, [selector, name])
+
+
+def html_elements(html: str, xpath: str) -> list:
+    """
+    Elements matching xpath in an HTML string (document or fragment,
+    e.g. an endpoint response from xhr_capture.py).
+    """
+    if not html or not html.strip():
+        return []
+    return lxml_html.fromstring(html).xpath(xpath)
+
+
+# ------------------------------------------------------------------
+# LXML HELPERS
+# ------------------------------------------------------------------
+
+def has_class(name: str) -> str:
+    """
+    XPath predicate body matching a CSS class: f".//span[{has_class('ref')}]"
+    """
+    return f"contains(concat(' ', normalize-space(@class), ' '), ' {name} ')"
+
+
+def first(el, xpath: str):
+    found = el.xpath(xpath)
+    return found[0] if found else None
+
+
+def _flat(text: str) -> str:
+    # source newlines are plain whitespace; only tags break lines
+    return text.replace("\r", " ").replace("\n", " ")
+
+
+def _text_parts(el):
+    if not isinstance(el.tag, str) or el.tag in SKIP_TAGS:
+        return  # comment / processing instruction / script
+
+    block = el.tag in BLOCK_TAGS
+    if block:
+        yield "\n"
+    if el.tag == "br":
+        yield "\n"
+    if el.text:
+        yield _flat(el.text)
+
+    for child in el:
+        yield from _text_parts(child)
+        if child.tail:
+            yield _flat(child.tail)
+
+    if block:
+        yield "\n"
+
+
+def inner_text(el) -> str:
+    """
+    Text of el laid out like Playwright's inner_text(): block elements
+    and <br> break lines, whitespace collapsed, blank lines dropped.
+    """
+    if el is None:
+        return ""
+
+    lines = (" ".join(line.split()) for line in "".join(_text_parts(el)).split("\n"))
+    return "\n".join(line for line in lines if line)
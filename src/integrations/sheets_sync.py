@@ -186,6 +186,10 @@ def ensure_sheet_headers(ws, columns):
 # PUSH: SQLite → Sheets
 # -----------------------------
 
+SHEETS_PUSH_CONSUMER = "sheets_push"
+SHEETS_BACKFILL_CONSUMER = "sheets_backfill"
+PUSH_FLUSH_ROWS = 1000
+
 def push_sqlite_to_sheets(repo, ws):
     headers = ws.row_values(1)
     expected = deal_column_names()
@@ -197,19 +201,47 @@ def push_sqlite_to_sheets(repo, ws):
             f"Expected: {expected}\n"
             f"Found:    {headers}"
         )
-    deals = repo.fetch_all_deals()
+
+    # read head first: anything written after this is picked up next run
+    head = repo.change_log_head()
+    cursor = repo.get_change_cursor(SHEETS_PUSH_CONSUMER)
+
     existing = get_existing_deal_ids(ws)
 
-    rows = []
-    for deal in deals:
-        deal_uid = f"{deal['source']}:{deal['source_listing_id']}"
-        if deal_uid in existing:
-            continue
+    if cursor is None:
+        # never pushed: every deal missing from the sheet, streamed, with
+        # rows already on the sheet filtered out in SQL
+        candidates = repo.iter_deals(exclude_uids=existing)
+    else:
+        # deals inserted, or re-keyed by an UPDATE of the uid columns,
+        # since the last push. A row an analyst deleted from the sheet
+        # only comes back on a full pass (drop the sheets_push cursor).
+        candidates = (
+            deal
+            for deal in repo.fetch_changed_deals(
+                cursor, head, columns=("source", "source_listing_id"),
+            )
+            if deal["deal_uid"] not in existing
+        )
+        print(f"🔁 Pushing changes #{cursor}..#{head}")
 
+    rows = []
+    pushed = 0
+    for deal in candidates:
         rows.append(row_from_deal(deal))  # ← THIS IS THE KEY LINE
 
+        if len(rows) >= PUSH_FLUSH_ROWS:
+            append_rows(ws, rows)
+            pushed += len(rows)
+            rows = []
+
     if rows:
         append_rows(ws, rows)
+        pushed += len(rows)
+
+    print(f"📤 {pushed} deals missing from the sheet pushed")
+
+    repo.set_change_cursor(SHEETS_PUSH_CONSUMER, head)
 
 # -----------------------------
 # PULL: Sheets → SQLite
@@ -269,14 +301,20 @@ def pull_sheets_to_sqlite(repo, ws, columns=DEAL_COLUMNS):
         if c.pull and not c.system and c.name in header_set
     ]
 
-    updated = 0
+    # deal_uid is mandatory
+    if "deal_uid" not in col_idx:
+        print("⚠️ Sheet has no deal_uid column")
+        return
+
+    # 🔑 one query for every deal, pullable columns only
+    db_deals = repo.fetch_deals_by_uid(
+        [c.name for c in pullable_columns] + ["status"]
+    )
+
+    changes = []
     skipped = 0
 
     for row in rows:
-        # deal_uid is mandatory
-        if "deal_uid" not in col_idx:
-            continue
-
         uid_idx = col_idx["deal_uid"]
         deal_uid = row[uid_idx].strip() if uid_idx < len(row) else ""
         if not deal_uid:
@@ -287,7 +325,7 @@ def pull_sheets_to_sqlite(repo, ws, columns=DEAL_COLUMNS):
         except ValueError:
             continue  # malformed UID
 
-        db_deal = repo.fetch_by_source_and_listing(source, source_listing_id)
+        db_deal = db_deals.get(deal_uid)
         if not db_deal:
             continue  # SQLite is source of truth for existence
 
@@ -329,27 +367,21 @@ def pull_sheets_to_sqlite(repo, ws, columns=DEAL_COLUMNS):
                     updates[col.name] = raw_val
 
         if updates:
-            updates["last_updated_source"] = "MANUAL"
-
-            # ----------------------------------
-            # STATUS HISTORY (single write point)
-            # ----------------------------------
-            if "status" in updates:
-                repo.insert_status_history(
-                    deal_id=db_deal["id"],  # ✅ PRIMARY KEY
-                    old_status=old_status,
-                    new_status=updates["status"],
-                )
-
-            repo.update_deal_fields(
-                source=source,
-                source_listing_id=source_listing_id,
-                updates=updates,
-            )
-            updated += 1
+            changes.append({
+                "id": db_deal["id"],  # ✅ PRIMARY KEY (status history)
+                "source": source,
+                "source_listing_id": source_listing_id,
+                "old_status": old_status,
+                "updates": updates,
+            })
         else:
             skipped += 1
 
+    # ----------------------------------
+    # SINGLE TRANSACTION: updates + status history
+    # ----------------------------------
+    updated = repo.apply_manual_updates(changes)
+
     print(f"✅ Reverse sync complete — {updated} updated, {skipped} unchanged")
 
 # -----------------------------
@@ -443,15 +475,30 @@ def backfill_system_columns(repo, ws, columns, batch_size=100):
         if uid.strip()
     }
 
+    head = repo.change_log_head()
+    cursor = repo.get_change_cursor(SHEETS_BACKFILL_CONSUMER)
+
+    changed = None
+    if cursor is not None:
+        # only rows whose backfilled columns changed since the last run
+        changed = {
+            d["deal_uid"]: d
+            for d in repo.fetch_changed_deals(cursor, head, columns=columns)
+        }
+        print(f"🔁 {len(changed)} deals with changed system columns since change #{cursor}")
+
     updates = []
 
     for deal_uid, row_num in row_by_uid.items():
-        try:
-            source, source_listing_id = deal_uid.split(":", 1)
-        except ValueError:
-            continue
+        if changed is not None:
+            deal = changed.get(deal_uid)
+        else:
+            try:
+                source, source_listing_id = deal_uid.split(":", 1)
+            except ValueError:
+                continue
 
-        deal = repo.fetch_by_source_and_listing(source, source_listing_id)
+            deal = repo.fetch_by_source_and_listing(source, source_listing_id)
         if not deal:
             continue
 
@@ -477,6 +524,7 @@ def backfill_system_columns(repo, ws, columns, batch_size=100):
     if updates:
         sheets_write_with_backoff(lambda: ws.batch_update(updates))
 
+    repo.set_change_cursor(SHEETS_BACKFILL_CONSUMER, head)
     print("✅ System column backfill complete")
 
 def col_letter(idx: int) -> str:
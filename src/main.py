@@ -1,4 +1,3 @@
-from datetime import date
 from pathlib import Path
 
 from brokers.businessbuyers_client import BusinessBuyersClient
@@ -24,15 +23,15 @@ DB_PATH = Path("db/deals.sqlite")
 def main():
     repo = SQLiteRepository(DB_PATH)
 
-    today = date.today()
-    already_used = repo.get_clicks_used("BusinessBuyers", today)
-
-    budget = DailyClickBudget(DAILY_DETAIL_PAGE_BUDGET - already_used)
+    # detail pages only, counted atomically in daily_clicks (shared with
+    # any other process running today); BudgetExhausted ends the run
+    budget = DailyClickBudget(DAILY_DETAIL_PAGE_BUDGET, repo=repo, broker="BusinessBuyers")
 
     client = BusinessBuyersClient(
-        BB_USERNAME,
-        BB_PASSWORD,
-        budget
+        username=BB_USERNAME,
+        password=BB_PASSWORD,
+        login=True,
+        click_budget=budget,
     )
 
     client.login()
@@ -48,7 +47,6 @@ def main():
 
         try:
             html = client.fetch_listing_detail(listing)
-            repo.increment_clicks(source, today)
 
             pdf_path = save_pdf(
                 client.page,
@@ -0,0 +1,139 @@
+# src/persistence/change_log.py
+"""
+Row-level change data capture for deals.
+
+deal_changes is an append-only log written by triggers, so every writer
+(repository, scripts, raw SQL, Sheets pulls) is captured:
+
+- seq              monotonically increasing (AUTOINCREMENT, never reused)
+- op               INSERT | UPDATE | DELETE
+- changed_columns  UPDATE only: ',col_a,col_b,' (leading/trailing commas
+                   so a column can be matched with LIKE '%,col,%');
+                   NULL for INSERT / DELETE (= every column)
+
+change_cursors holds one row per consumer (Sheets push, backfill, ...):
+the last seq it has fully processed. A consumer reads (cursor, head],
+does its work, then advances to head. No cursor = never synced, so the
+consumer does a full pass and starts its cursor there.
+
+An UPDATE touching only BOOKKEEPING_COLUMNS (touch_last_seen, the
+unchanged-content fetch stamp, ...) is not logged; when it comes with
+other changes, those columns still appear in changed_columns.
+
+The UPDATE trigger lists the deals columns explicitly. A migration that
+adds deals columns must call install_change_log() again afterwards.
+"""
+
+CHANGES_TABLE_DDL = [
+    """
+    CREATE TABLE IF NOT EXISTS deal_changes (
+        seq               INTEGER PRIMARY KEY AUTOINCREMENT,
+        deal_rowid        INTEGER NOT NULL,
+        source            TEXT,
+        source_listing_id TEXT,
+        op                TEXT NOT NULL,
+        changed_columns   TEXT,
+        changed_at        TEXT NOT NULL DEFAULT CURRENT_TIMESTAMP
+    )
+    """,
+    "CREATE INDEX IF NOT EXISTS idx_deal_changes_deal ON deal_changes(deal_rowid)",
+    """
+    CREATE TABLE IF NOT EXISTS change_cursors (
+        consumer   TEXT PRIMARY KEY,
+        last_seq   INTEGER NOT NULL,
+        updated_at TEXT NOT NULL
+    )
+    """,
+]
+
+# bookkeeping maintained by other triggers; changes to it are not news
+UNTRACKED_COLUMNS = {"id", "next_refresh_at"}
+
+# crawl / fetch stamps: logged alongside a real change, never on their own
+BOOKKEEPING_COLUMNS = {
+    "last_seen",
+    "last_updated",
+    "last_updated_source",
+    "detail_fetched_at",
+    "needs_detail_refresh",
+}
+
+
+def changed_columns_expr(columns: list[str]) -> str:
+    """
+    ',a,b,' listing the columns whose OLD and NEW values differ.
+    """
+    parts = [
+        f"CASE WHEN OLD.{c} IS NOT NEW.{c} THEN '{c},' ELSE '' END"
+        for c in columns
+    ]
+    return "',' || " + "\n            || ".join(parts)
+
+
+def change_log_ddl(columns: list[str]) -> list[str]:
+    tracked = [c for c in columns if c not in UNTRACKED_COLUMNS]
+    any_changed = "\n           OR ".join(
+        f"OLD.{c} IS NOT NEW.{c}" for c in tracked if c not in BOOKKEEPING_COLUMNS
+    )
+
+    return [
+        """
+        CREATE TRIGGER trg_deals_changes_insert
+        AFTER INSERT ON deals
+        BEGIN
+            INSERT INTO deal_changes (deal_rowid, source, source_listing_id, op)
+            VALUES (NEW.id, NEW.source, NEW.source_listing_id, 'INSERT');
+        END
+        """,
+        f"""
+        CREATE TRIGGER trg_deals_changes_update
+        AFTER UPDATE ON deals
+        WHEN {any_changed}
+        BEGIN
+            INSERT INTO deal_changes (deal_rowid, source, source_listing_id, op, changed_columns)
+            VALUES (
+                NEW.id,
+                NEW.source,
+                NEW.source_listing_id,
+                'UPDATE',
+                {changed_columns_expr(tracked)}
+            );
+        END
+        """,
+        """
+        CREATE TRIGGER trg_deals_changes_delete
+        AFTER DELETE ON deals
+        BEGIN
+            INSERT INTO deal_changes (deal_rowid, source, source_listing_id, op)
+            VALUES (OLD.id, OLD.source, OLD.source_listing_id, 'DELETE');
+        END
+        """,
+    ]
+
+
+def columns_filter_sql(columns) -> tuple[str, list]:
+    """
+    WHERE fragment matching changes that touch any of columns.
+    INSERT / DELETE always match.
+    """
+    if not columns:
+        return "1 = 1", []
+    likes = " OR ".join("changed_columns LIKE ?" for _ in columns)
+    return f"(op != 'UPDATE' OR {likes})", [f"%,{c},%" for c in columns]
+
+
+def install_change_log(conn):
+    """
+    Create the log + cursor tables and (re)create the capture triggers
+    for the current deals columns. Applied as migration 005, and again
+    as 010 (bookkeeping-only updates no longer logged).
+    """
+    for ddl in CHANGES_TABLE_DDL:
+        conn.execute(ddl)
+
+    columns = [row[1] for row in conn.execute("PRAGMA table_info(deals)")]
+
+    for name in ("insert", "update", "delete"):
+        conn.execute(f"DROP TRIGGER IF EXISTS trg_deals_changes_{name}")
+    for ddl in change_log_ddl(columns):
+        conn.execute(ddl)
@@ -0,0 +1,145 @@
+# src/persistence/connection.py
+
+import atexit
+import sqlite3
+import threading
+from pathlib import Path
+
+# ------------------------------------------------------------------
+# CONNECTION TUNING
+# ------------------------------------------------------------------
+
+DEFAULT_PRAGMAS = {
+    "journal_mode": "WAL",
+    "synchronous": "NORMAL",
+    "cache_size": -64000,        # ~64 MB page cache (negative = KiB)
+    "mmap_size": 268435456,      # 256 MB
+    "busy_timeout": 30000,       # ms
+    "temp_store": "MEMORY",
+}
+
+STATEMENT_CACHE_SIZE = 256
+
+
+class PooledConnection(sqlite3.Connection):
+    """
+    sqlite3 connection owned by a ConnectionManager.
+
+    Scripts historically call conn.close() on connections obtained
+    from SQLiteRepository.get_conn(). For a shared connection that
+    would break every other caller, so close() only discards any
+    uncommitted work (same observable effect as before) and leaves
+    the connection open. The manager closes it for real.
+    """
+
+    def close(self):
+        if self.in_transaction:
+            self.rollback()
+
+    def _release(self):
+        super().close()
+
+
+class ConnectionManager:
+    """
+    Long-lived SQLite connections for one database file.
+
+    - one connection per thread, opened lazily and reused
+    - PRAGMAs applied once at open time
+    - statement cache kept warm across calls
+    - close() releases everything; the next call reopens
+    """
+
+    def __init__(
+        self,
+        db_path: Path,
+        *,
+        pragmas: dict | None = None,
+        cached_statements: int = STATEMENT_CACHE_SIZE,
+    ):
+        self.db_path = Path(db_path)
+        self.pragmas = {**DEFAULT_PRAGMAS, **(pragmas or {})}
+        self.cached_statements = cached_statements
+
+        self._local = threading.local()
+        self._lock = threading.Lock()
+        self._conns: list[PooledConnection] = []
+
+    def connection(self) -> sqlite3.Connection:
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            conn = self._open()
+            self._local.conn = conn
+        return conn
+
+    def _open(self) -> PooledConnection:
+        conn = sqlite3.connect(
+            self.db_path,
+            timeout=self.pragmas["busy_timeout"] / 1000,
+            cached_statements=self.cached_statements,
+            check_same_thread=False,   # close() may run from atexit
+            factory=PooledConnection,
+        )
+        conn.row_factory = sqlite3.Row
+
+        for name, value in self.pragmas.items():
+            conn.execute(f"PRAGMA {name} = {value}")
+
+        with self._lock:
+            self._conns.append(conn)
+        return conn
+
+    def close(self):
+        with self._lock:
+            conns, self._conns = self._conns, []
+            # invalidate every thread's cached handle
+            self._local = threading.local()
+
+        for conn in conns:
+            try:
+                if conn.in_transaction:
+                    conn.commit()
+                # fold the WAL back into the main file so the .sqlite
+                # artifact published by CI is self-contained
+                conn.execute("PRAGMA wal_checkpoint(TRUNCATE)")
+            except sqlite3.Error as e:
+                print(f"⚠️ SQLite close failed for {self.db_path}: {e}")
+            finally:
+                conn._release()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.close()
+        return False
+
+
+# ------------------------------------------------------------------
+# PROCESS-WIDE REGISTRY
+# ------------------------------------------------------------------
+
+_MANAGERS: dict[Path, ConnectionManager] = {}
+_MANAGERS_LOCK = threading.Lock()
+
+
+def get_connection_manager(db_path: Path) -> ConnectionManager:
+    """
+    Return the shared manager for db_path.
+    Every SQLiteRepository on the same file shares one set of connections.
+    """
+    key = Path(db_path).resolve()
+    with _MANAGERS_LOCK:
+        manager = _MANAGERS.get(key)
+        if manager is None:
+            manager = ConnectionManager(key)
+            _MANAGERS[key] = manager
+        return manager
+
+
+@atexit.register
+def close_all_connections():
+    with _MANAGERS_LOCK:
+        managers = list(_MANAGERS.values())
+    for manager in managers:
+        manager.close()
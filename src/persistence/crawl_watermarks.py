@@ -0,0 +1,34 @@
+# src/persistence/crawl_watermarks.py
+"""
+Incremental index crawl state (see src/utils/incremental_crawl.py).
+
+One row per (broker, scope) — scope is the category / sector of a
+partitioned crawl, 'all' otherwise:
+
+- newest_ids          JSON list of the listing ids on the first index
+                      page of the last run (the broker's newest listings)
+- ordering            how the index is sorted: 'newest_first' lets the
+                      crawl stop as soon as it reaches last run's ids,
+                      'unknown' relies on consecutive known pages only
+- last_full_sweep_at  when every page was last crawled (refreshes
+                      last_seen for listings incremental runs never reach)
+"""
+
+CRAWL_WATERMARKS_DDL = [
+    """
+    CREATE TABLE IF NOT EXISTS crawl_watermarks (
+        broker             TEXT NOT NULL,
+        scope              TEXT NOT NULL DEFAULT 'all',
+        newest_ids         TEXT NOT NULL DEFAULT '[]',
+        ordering           TEXT NOT NULL DEFAULT 'unknown',
+        last_full_sweep_at TEXT,
+        updated_at         TEXT NOT NULL,
+        PRIMARY KEY (broker, scope)
+    )
+    """,
+]
+
+
+def install_crawl_watermarks(conn):
+    for ddl in CRAWL_WATERMARKS_DDL:
+        conn.execute(ddl)
@@ -1,6 +1,6 @@
 def record_deal_artifact(
-    *,
     conn,
+    *,
     source: str,
     source_listing_id: str,
     deal_id: int,
@@ -0,0 +1,117 @@
+# src/persistence/deal_search.py
+"""
+Full-text index over deals (FTS5).
+
+deals_fts is an external-content table on deals(id): it stores only the
+index, the text stays in deals. Triggers keep it in sync for every
+writer, so keyword matching is an index lookup instead of pulling every
+description into Python.
+
+Since migration 009 the tokenizer is trigram: a phrase matches as a
+case-insensitive substring, like `kw in text.lower()` ("care agency"
+matches "healthcare agency"). Terms need at least 3 characters.
+
+Query syntax is plain FTS5:
+- phrase:   "home care"
+- boolean:  care AND (home OR domiciliary) NOT nursing
+- column:   title: cleaning   /   {title description}: cleaning
+"""
+
+FTS_COLUMNS = ["title", "description", "sector_raw", "location_raw"]
+
+# bm25 column weights, same order as FTS_COLUMNS
+BM25_WEIGHTS = [10.0, 1.0, 5.0, 2.0]
+
+# shortest term the trigram tokenizer can match
+MIN_TERM_CHARS = 3
+
+
+def fts_phrase(text: str, *, prefix: bool = False) -> str:
+    """
+    Quote free text as a single FTS5 phrase (prefix=True: last token is a prefix).
+    """
+    quoted = '"' + text.replace('"', '""') + '"'
+    return f"{quoted} *" if prefix else quoted
+
+
+def fts_any(keywords, *, prefix: bool = False, columns=None) -> str:
+    """
+    OR of phrases — the FTS equivalent of any(k in text for k in keywords).
+    columns: restrict the match to these FTS_COLUMNS.
+    """
+    short = [k for k in keywords if len(k) < MIN_TERM_CHARS]
+    if short:
+        raise ValueError(f"FTS terms need {MIN_TERM_CHARS}+ characters: {short}")
+
+    query = " OR ".join(fts_phrase(k, prefix=prefix) for k in keywords)
+    if columns:
+        query = f"{{{' '.join(columns)}}} : ({query})"
+    return query
+
+
+def _fts_values(row: str) -> str:
+    return ", ".join(f"{row}{c}" for c in FTS_COLUMNS)
+
+
+def _fts_table_ddl(tokenize: str) -> str:
+    return f"""
+    CREATE VIRTUAL TABLE IF NOT EXISTS deals_fts USING fts5(
+        {", ".join(FTS_COLUMNS)},
+        content = 'deals',
+        content_rowid = 'id',
+        tokenize = '{tokenize}'
+    )
+    """
+
+
+DEAL_SEARCH_DDL = [
+    _fts_table_ddl("unicode61 remove_diacritics 2"),
+    f"""
+    CREATE TRIGGER IF NOT EXISTS trg_deals_fts_insert
+    AFTER INSERT ON deals
+    BEGIN
+        INSERT INTO deals_fts (rowid, {", ".join(FTS_COLUMNS)})
+        VALUES (NEW.id, {_fts_values("NEW.")});
+    END
+    """,
+    f"""
+    CREATE TRIGGER IF NOT EXISTS trg_deals_fts_delete
+    AFTER DELETE ON deals
+    BEGIN
+        INSERT INTO deals_fts (deals_fts, rowid, {", ".join(FTS_COLUMNS)})
+        VALUES ('delete', OLD.id, {_fts_values("OLD.")});
+    END
+    """,
+    f"""
+    CREATE TRIGGER IF NOT EXISTS trg_deals_fts_update
+    AFTER UPDATE OF {", ".join(FTS_COLUMNS)} ON deals
+    BEGIN
+        INSERT INTO deals_fts (deals_fts, rowid, {", ".join(FTS_COLUMNS)})
+        VALUES ('delete', OLD.id, {_fts_values("OLD.")});
+        INSERT INTO deals_fts (rowid, {", ".join(FTS_COLUMNS)})
+        VALUES (NEW.id, {_fts_values("NEW.")});
+    END
+    """,
+]
+
+
+def install_deal_search(conn):
+    """
+    Create deals_fts + sync triggers and index existing rows.
+    Applied as migration 006.
+    """
+    for ddl in DEAL_SEARCH_DDL:
+        conn.execute(ddl)
+    conn.execute("INSERT INTO deals_fts (deals_fts) VALUES ('rebuild')")
+
+
+def install_trigram_search(conn):
+    """
+    Rebuild deals_fts with the trigram tokenizer (SQLite 3.34+) so MATCH
+    keeps substring semantics. The sync triggers address deals_fts by
+    name and stay as they are.
+    Applied as migration 009.
+    """
+    conn.execute("DROP TABLE IF EXISTS deals_fts")
+    conn.execute(_fts_table_ddl("trigram"))
+    conn.execute("INSERT INTO deals_fts (deals_fts) VALUES ('rebuild')")
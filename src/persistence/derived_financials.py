@@ -0,0 +1,133 @@
+# src/persistence/derived_financials.py
+"""
+Derived financial columns, maintained incrementally.
+
+- *_effective: manual value overrides broker value
+- ebitda_margin / revenue_multiple / ebitda_multiple: from effective values
+
+A trigger recomputes them whenever a broker or manual input is written,
+and only touches the row (and last_updated) when a value actually
+changes. The repository's recompute methods use the same expressions
+as a dirty-only catch-up, so re-running them is a no-op.
+"""
+
+FINANCIAL_INPUT_COLUMNS = [
+    "revenue_k",
+    "ebitda_k",
+    "asking_price_k",
+    "revenue_k_manual",
+    "ebitda_k_manual",
+    "asking_price_k_manual",
+]
+
+EFFECTIVE_EXPRS = {
+    "revenue_k_effective": "COALESCE(revenue_k_manual, revenue_k)",
+    "ebitda_k_effective": "COALESCE(ebitda_k_manual, ebitda_k)",
+    "asking_price_k_effective": "COALESCE(asking_price_k_manual, asking_price_k)",
+}
+
+
+def metric_exprs(revenue: str, ebitda: str, asking_price: str) -> dict[str, str]:
+    """
+    Metric expressions over the given revenue / ebitda / asking price
+    expressions (stored effective columns, or their COALESCE form).
+    """
+    return {
+        "ebitda_margin": f"""CASE
+            WHEN {revenue} IS NOT NULL
+             AND {revenue} != 0
+             AND {ebitda} IS NOT NULL
+            THEN ROUND(({ebitda} * 100.0) / {revenue}, 2)
+            ELSE NULL
+        END""",
+        "revenue_multiple": f"""CASE
+            WHEN {revenue} IS NOT NULL
+             AND {revenue} != 0
+             AND {asking_price} IS NOT NULL
+            THEN ROUND({asking_price} / {revenue}, 2)
+            ELSE NULL
+        END""",
+        "ebitda_multiple": f"""CASE
+            WHEN {ebitda} IS NOT NULL
+             AND {ebitda} != 0
+             AND {asking_price} IS NOT NULL
+            THEN ROUND({asking_price} / {ebitda}, 2)
+            ELSE NULL
+        END""",
+    }
+
+
+# metrics from the stored effective columns
+METRIC_EXPRS = metric_exprs(
+    "revenue_k_effective",
+    "ebitda_k_effective",
+    "asking_price_k_effective",
+)
+
+# effective + metrics straight from the inputs (single pass, used by triggers)
+DERIVED_EXPRS = {
+    **EFFECTIVE_EXPRS,
+    **metric_exprs(
+        EFFECTIVE_EXPRS["revenue_k_effective"],
+        EFFECTIVE_EXPRS["ebitda_k_effective"],
+        EFFECTIVE_EXPRS["asking_price_k_effective"],
+    ),
+}
+
+
+def assignments_sql(exprs: dict[str, str]) -> str:
+    return ",\n".join(f"{col} = {expr}" for col, expr in exprs.items())
+
+
+def changed_sql(exprs: dict[str, str]) -> str:
+    """
+    True when any stored column differs from its expression (NULL-safe).
+    """
+    return " OR ".join(f"{col} IS NOT ({expr})" for col, expr in exprs.items())
+
+
+def _derived_trigger(name: str, event: str, bump_last_updated: bool) -> str:
+    bump = ",\nlast_updated = CURRENT_TIMESTAMP" if bump_last_updated else ""
+    return f"""
+    CREATE TRIGGER IF NOT EXISTS {name}
+    AFTER {event} ON deals
+    BEGIN
+        UPDATE deals
+        SET {assignments_sql(DERIVED_EXPRS)}{bump}
+        WHERE id = NEW.id
+          AND ({changed_sql(DERIVED_EXPRS)});
+    END
+    """
+
+
+DERIVED_FINANCIALS_DDL = [
+    # inserts carry their own last_updated
+    _derived_trigger(
+        "trg_deals_derived_financials_insert",
+        "INSERT",
+        bump_last_updated=False,
+    ),
+    _derived_trigger(
+        "trg_deals_derived_financials_update",
+        f"UPDATE OF {', '.join(FINANCIAL_INPUT_COLUMNS)}",
+        bump_last_updated=True,
+    ),
+]
+
+
+def install_derived_financials(conn):
+    """
+    Catch up existing rows once, then install the triggers.
+    Applied as migration 004.
+    """
+    conn.execute(
+        f"""
+        UPDATE deals
+        SET {assignments_sql(DERIVED_EXPRS)},
+            last_updated = CURRENT_TIMESTAMP
+        WHERE {changed_sql(DERIVED_EXPRS)}
+        """
+    )
+
+    for ddl in DERIVED_FINANCIALS_DDL:
+        conn.execute(ddl)
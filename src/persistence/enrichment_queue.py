@@ -0,0 +1,89 @@
+# src/persistence/enrichment_queue.py
+"""
+Enrichment eligibility, maintained on write.
+
+deals.next_refresh_at holds the moment a row becomes due for detail
+enrichment, normalised to 'YYYY-MM-DD HH:MM:SS' (detail_fetched_at is
+stored in mixed ISO / CURRENT_TIMESTAMP formats):
+
+- ''                       → due now (needs_detail_refresh = 1, or never fetched)
+- detail_fetched_at + 2d   → status = 'Under Offer'
+- detail_fetched_at + 14d  → everything else
+
+Triggers keep it current for every writer (repository, scripts, raw SQL),
+so fetch_deals_for_enrichment is a range scan on a partial index instead
+of a full-table scan.
+"""
+
+FRESHNESS_DAYS = 14
+UNDER_OFFER_DAYS = 2
+
+DUE_NOW = ""
+
+# identical text is required in queries for SQLite to pick the partial index
+ACTIVE_STATUS_SQL = "(status IS NULL OR status NOT IN ('Pass', 'Lost'))"
+
+
+def next_refresh_expr(row: str = "") -> str:
+    """
+    SQL expression computing next_refresh_at.
+    row: column qualifier, e.g. "NEW." inside a trigger.
+    """
+    return f"""
+        CASE
+            WHEN {row}needs_detail_refresh = 1
+              OR {row}detail_fetched_at IS NULL
+            THEN '{DUE_NOW}'
+            ELSE COALESCE(
+                datetime(
+                    {row}detail_fetched_at,
+                    CASE
+                        WHEN {row}status = 'Under Offer' THEN '+{UNDER_OFFER_DAYS} days'
+                        ELSE '+{FRESHNESS_DAYS} days'
+                    END
+                ),
+                '{DUE_NOW}'
+            )
+        END
+    """
+
+
+ENRICHMENT_QUEUE_DDL = [
+    f"""
+    CREATE INDEX IF NOT EXISTS idx_deals_enrichment_queue
+        ON deals(source, next_refresh_at)
+        WHERE {ACTIVE_STATUS_SQL}
+    """,
+    f"""
+    CREATE TRIGGER IF NOT EXISTS trg_deals_next_refresh_insert
+    AFTER INSERT ON deals
+    BEGIN
+        UPDATE deals
+        SET next_refresh_at = {next_refresh_expr("NEW.")}
+        WHERE id = NEW.id;
+    END
+    """,
+    f"""
+    CREATE TRIGGER IF NOT EXISTS trg_deals_next_refresh_update
+    AFTER UPDATE OF detail_fetched_at, needs_detail_refresh, status ON deals
+    BEGIN
+        UPDATE deals
+        SET next_refresh_at = {next_refresh_expr("NEW.")}
+        WHERE id = NEW.id;
+    END
+    """,
+]
+
+
+def install_enrichment_queue(conn):
+    """
+    Add next_refresh_at (backfilled), its index and triggers.
+    Applied as migration 003.
+    """
+    cols = {row[1] for row in conn.execute("PRAGMA table_info(deals)")}
+    if "next_refresh_at" not in cols:
+        conn.execute("ALTER TABLE deals ADD COLUMN next_refresh_at TEXT")
+    conn.execute(f"UPDATE deals SET next_refresh_at = {next_refresh_expr()}")
+
+    for ddl in ENRICHMENT_QUEUE_DDL:
+        conn.execute(ddl)
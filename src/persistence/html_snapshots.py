@@ -0,0 +1,40 @@
+# src/persistence/html_snapshots.py
+"""
+Manifest of archived raw HTML (see src/utils/html_archive.py).
+
+One row per fetch: the URL, the deal it belongs to (deals.id, resolved
+from source_url at insert time; NULL for index pages), when it was
+fetched and the sha256 of the body. The body itself is a compressed
+blob on disk named by that hash, so identical pages are stored once.
+"""
+
+HTML_SNAPSHOTS_DDL = [
+    """
+    CREATE TABLE IF NOT EXISTS html_snapshots (
+        id           INTEGER PRIMARY KEY AUTOINCREMENT,
+        url          TEXT NOT NULL,
+        deal_rowid   INTEGER,
+        status       INTEGER,
+        content_hash TEXT NOT NULL,
+        size         INTEGER NOT NULL,
+        fetched_at   TEXT NOT NULL
+    )
+    """,
+    "CREATE INDEX IF NOT EXISTS idx_html_snapshots_url ON html_snapshots(url, fetched_at)",
+    "CREATE INDEX IF NOT EXISTS idx_html_snapshots_deal ON html_snapshots(deal_rowid, fetched_at)",
+    "CREATE INDEX IF NOT EXISTS idx_html_snapshots_hash ON html_snapshots(content_hash)",
+]
+
+INSERT_SNAPSHOT_SQL = """
+    INSERT INTO html_snapshots (url, deal_rowid, status, content_hash, size, fetched_at)
+    VALUES (
+        ?,
+        (SELECT id FROM deals WHERE source_url = ? ORDER BY id LIMIT 1),
+        ?, ?, ?, ?
+    )
+"""
+
+
+def install_html_snapshots(conn):
+    for ddl in HTML_SNAPSHOTS_DDL:
+        conn.execute(ddl)
@@ -0,0 +1,367 @@
+# src/persistence/migrations.py
+"""
+Versioned schema migrations for the deals DB.
+
+Rules:
+- MIGRATIONS is append-only; never edit a migration that has shipped
+- every migration runs in its own transaction and bumps schema_version
+- once a DB is current, startup costs one SELECT on schema_version
+
+Schema changes go here, not in run_sql.py / docs/todo.txt.
+schema.sql is the resulting snapshot for reference.
+"""
+
+import sqlite3
+from pathlib import Path
+
+from src.persistence.change_log import install_change_log
+from src.persistence.crawl_watermarks import install_crawl_watermarks
+from src.persistence.deal_search import install_deal_search, install_trigram_search
+from src.persistence.derived_financials import install_derived_financials
+from src.persistence.enrichment_queue import install_enrichment_queue
+from src.persistence.html_snapshots import install_html_snapshots
+
+
+# ------------------------------------------------------------------
+# HELPERS
+# ------------------------------------------------------------------
+
+def _table_columns(conn, table: str) -> set[str]:
+    return {row[1] for row in conn.execute(f"PRAGMA table_info({table})")}
+
+
+def _create_or_extend(conn, table: str, columns: list[tuple[str, str]], constraints: list[str] = ()):
+    """
+    CREATE TABLE IF NOT EXISTS, then ADD COLUMN for anything an older
+    hand-migrated DB is missing.
+    """
+    body = ",\n    ".join([f"{name} {decl}" for name, decl in columns] + list(constraints))
+    conn.execute(f"CREATE TABLE IF NOT EXISTS {table} (\n    {body}\n)")
+
+    existing = _table_columns(conn, table)
+    for name, decl in columns:
+        if name not in existing:
+            conn.execute(f"ALTER TABLE {table} ADD COLUMN {name} {decl}")
+
+
+# ------------------------------------------------------------------
+# 001 — BASELINE (tables as they exist in production)
+# ------------------------------------------------------------------
+
+DEALS_BASELINE_COLUMNS = [
+    ("id", "INTEGER PRIMARY KEY AUTOINCREMENT"),
+    ("deal_id", "TEXT"),
+
+    ("source", "TEXT NOT NULL"),
+    ("source_listing_id", "TEXT NOT NULL"),
+    ("source_url", "TEXT"),
+    ("identity_method", "TEXT"),
+
+    ("title", "TEXT"),
+    ("industry", "TEXT"),
+    ("industry_raw", "TEXT"),
+    ("sector", "TEXT"),
+    ("sector_raw", "TEXT"),
+    ("sector_source", "TEXT"),
+    ("sector_inference_confidence", "REAL"),
+    ("sector_inference_reason", "TEXT"),
+
+    ("location", "TEXT"),
+    ("location_raw", "TEXT"),
+    ("turnover_range_raw", "TEXT"),
+    ("incorporation_year", "INTEGER"),
+
+    ("revenue_k", "REAL"),
+    ("ebitda_k", "REAL"),
+    ("asking_price_k", "REAL"),
+    ("revenue_k_manual", "REAL"),
+    ("ebitda_k_manual", "REAL"),
+    ("asking_price_k_manual", "REAL"),
+    ("revenue_k_effective", "REAL"),
+    ("ebitda_k_effective", "REAL"),
+    ("asking_price_k_effective", "REAL"),
+    ("profit_margin_pct", "REAL"),
+    ("revenue_growth_pct", "REAL"),
+    ("leverage_pct", "REAL"),
+    ("ebitda_margin", "REAL"),
+    ("revenue_multiple", "REAL"),
+    ("ebitda_multiple", "REAL"),
+
+    ("content_hash", "TEXT"),
+    ("description", "TEXT"),
+    ("description_hash", "TEXT"),
+    ("extracted_json", "TEXT"),
+
+    ("decision", "TEXT"),
+    ("decision_confidence", "TEXT"),
+    ("reasons", "TEXT"),
+    ("manual_decision", "TEXT"),
+
+    ("status", "TEXT"),
+    ("owner", "TEXT"),
+    ("priority", "TEXT"),
+    ("notes", "TEXT"),
+    ("last_touch", "TEXT"),
+    ("pass_reason", "TEXT"),
+    ("lost_reason", "TEXT"),
+
+    ("drive_folder_id", "TEXT"),
+    ("drive_folder_url", "TEXT"),
+    ("pdf_path", "TEXT"),
+    ("pdf_drive_url", "TEXT"),
+    ("pdf_generated_at", "DATETIME"),
+    ("pdf_error", "TEXT"),
+
+    ("needs_detail_refresh", "INTEGER DEFAULT 1"),
+    ("detail_fetched_at", "DATETIME"),
+    ("detail_fetch_reason", "TEXT"),
+
+    ("canonical_external_id", "TEXT"),
+    ("broker_name", "TEXT"),
+    ("broker_listing_url", "TEXT"),
+    ("source_role", "TEXT DEFAULT 'PRIMARY'"),
+
+    ("added_at", "DATE"),
+    ("first_seen", "DATETIME"),
+    ("last_seen", "DATETIME"),
+    ("last_updated", "DATETIME"),
+    ("last_updated_source", "TEXT"),
+    ("manual_imported_at", "TEXT"),
+
+    ("attributes", "TEXT"),
+]
+
+
+def _m001_baseline(conn):
+    _create_or_extend(
+        conn,
+        "deals",
+        DEALS_BASELINE_COLUMNS,
+        ["UNIQUE (source, source_listing_id)"],
+    )
+
+    _create_or_extend(
+        conn,
+        "daily_clicks",
+        [
+            ("date", "DATE NOT NULL"),
+            ("broker", "TEXT NOT NULL"),
+            ("clicks_used", "INTEGER NOT NULL"),
+        ],
+        ["PRIMARY KEY (date, broker)"],
+    )
+
+    _create_or_extend(
+        conn,
+        "deal_artifacts",
+        [
+            ("id", "INTEGER PRIMARY KEY AUTOINCREMENT"),
+            ("source", "TEXT NOT NULL"),
+            ("source_listing_id", "TEXT NOT NULL"),
+            ("deal_id", "INTEGER NULL"),
+            ("artifact_type", "TEXT NOT NULL"),
+            ("artifact_name", "TEXT NOT NULL"),
+            ("artifact_hash", "TEXT NOT NULL"),
+            ("drive_file_id", "TEXT NOT NULL"),
+            ("drive_url", "TEXT NOT NULL"),
+            ("created_at", "DATETIME NOT NULL"),
+            ("created_by", "TEXT NOT NULL"),
+            ("extraction_version", "TEXT NULL"),
+        ],
+        ["UNIQUE (source, source_listing_id, artifact_type, artifact_hash)"],
+    )
+
+    _create_or_extend(
+        conn,
+        "deal_status_history",
+        [
+            ("deal_id", "TEXT NOT NULL"),
+            ("old_status", "TEXT"),
+            ("new_status", "TEXT"),
+            ("changed_at", "TEXT NOT NULL"),
+        ],
+    )
+
+    _create_or_extend(
+        conn,
+        "intermediaries",
+        [
+            ("intermediary_id", "TEXT PRIMARY KEY"),
+            ("name", "TEXT"),
+            ("website", "TEXT"),
+            ("last_checked", "TEXT"),
+            ("existing_relationship", "TEXT"),
+            ("relationship_owner", "TEXT"),
+            ("active", "TEXT"),
+            ("sector_focus", "TEXT"),
+            ("geography", "TEXT"),
+            ("category", "TEXT"),
+            ("notes", "TEXT"),
+            ("description", "TEXT"),
+            ("updated_at", "DATETIME"),
+        ],
+    )
+
+    _create_or_extend(
+        conn,
+        "pipeline_snapshots",
+        [
+            ("id", "INTEGER PRIMARY KEY AUTOINCREMENT"),
+            ("snapshot_year", "INTEGER NOT NULL"),
+            ("snapshot_week", "INTEGER NOT NULL"),
+            ("snapshot_key", "TEXT NOT NULL"),
+            ("industry", "TEXT NOT NULL"),
+            ("status", "TEXT NOT NULL"),
+            ("source", "TEXT NOT NULL"),
+            ("deal_count", "INTEGER NOT NULL"),
+            ("snapshot_run_date", "DATE NOT NULL"),
+        ],
+    )
+
+
+# ------------------------------------------------------------------
+# 002 — INDEXES (previously hand-run, missing on fresh DBs)
+# ------------------------------------------------------------------
+
+def _m002_indexes(conn):
+    for ddl in [
+        # URL identity for brokers whose listing ids are unstable
+        """
+        CREATE UNIQUE INDEX IF NOT EXISTS ux_bb_source_url
+            ON deals(source, source_url)
+            WHERE source = 'BusinessBuyers'
+        """,
+        """
+        CREATE UNIQUE INDEX IF NOT EXISTS ux_b4s_source_url
+            ON deals(source, source_url)
+            WHERE source = 'BusinessesForSale'
+        """,
+        """
+        CREATE UNIQUE INDEX IF NOT EXISTS ux_tw_source_url
+            ON deals(source, source_url)
+            WHERE source = 'transworld_uk'
+        """,
+        """
+        CREATE UNIQUE INDEX IF NOT EXISTS idx_deals_source_canonical_external_id
+            ON deals(source, canonical_external_id)
+            WHERE canonical_external_id IS NOT NULL
+        """,
+
+        # hot lookups
+        "CREATE INDEX IF NOT EXISTS idx_deals_deal_id ON deals(deal_id)",
+        "CREATE INDEX IF NOT EXISTS idx_deals_source_url ON deals(source_url)",
+        "CREATE INDEX IF NOT EXISTS idx_deals_broker_listing_url ON deals(broker_listing_url)",
+
+        "CREATE INDEX IF NOT EXISTS idx_artifacts_lookup ON deal_artifacts(source, source_listing_id)",
+        "CREATE INDEX IF NOT EXISTS idx_artifacts_deal_id ON deal_artifacts(deal_id)",
+        "CREATE UNIQUE INDEX IF NOT EXISTS uniq_artifact_hash ON deal_artifacts(artifact_hash)",
+
+        "CREATE INDEX IF NOT EXISTS idx_status_history_deal_id ON deal_status_history(deal_id)",
+        "CREATE INDEX IF NOT EXISTS idx_pipeline_snapshots_key ON pipeline_snapshots(snapshot_key)",
+    ]:
+        conn.execute(ddl)
+
+
+# ------------------------------------------------------------------
+# REGISTRY
+# ------------------------------------------------------------------
+
+MIGRATIONS = [
+    (1, "baseline", _m001_baseline),
+    (2, "indexes", _m002_indexes),
+    (3, "enrichment_queue", install_enrichment_queue),
+    (4, "derived_financials", install_derived_financials),
+    (5, "change_log", install_change_log),
+    (6, "deal_search", install_deal_search),
+    (7, "html_snapshots", install_html_snapshots),
+    (8, "crawl_watermarks", install_crawl_watermarks),
+    (9, "deal_search_trigram", install_trigram_search),
+    (10, "change_log_bookkeeping", install_change_log),
+]
+
+LATEST_VERSION = MIGRATIONS[-1][0]
+
+
+# ------------------------------------------------------------------
+# RUNNER
+# ------------------------------------------------------------------
+
+def current_version(conn) -> int:
+    try:
+        row = conn.execute("SELECT version FROM schema_version WHERE id = 1").fetchone()
+    except sqlite3.OperationalError:
+        return 0  # pre-migration DB
+    return row[0] if row else 0
+
+
+def _set_version(conn, version: int):
+    conn.execute(
+        """
+        CREATE TABLE IF NOT EXISTS schema_version (
+            id         INTEGER PRIMARY KEY CHECK (id = 1),
+            version    INTEGER NOT NULL,
+            applied_at TEXT NOT NULL
+        )
+        """
+    )
+    conn.execute(
+        """
+        INSERT INTO schema_version (id, version, applied_at)
+        VALUES (1, ?, CURRENT_TIMESTAMP)
+        ON CONFLICT(id) DO UPDATE SET
+            version = excluded.version,
+            applied_at = excluded.applied_at
+        """,
+        (version,),
+    )
+
+
+def migrate(conn) -> int:
+    """
+    Apply pending migrations. Returns the resulting version.
+    Safe under concurrent starts: each step re-checks the version
+    inside its own write transaction.
+    """
+    version = current_version(conn)
+
+    if version > LATEST_VERSION:
+        raise RuntimeError(
+            f"INVALID DB SCHEMA — version {version} is newer than this code "
+            f"(latest known: {LATEST_VERSION})"
+        )
+
+    for target, name, apply in MIGRATIONS:
+        if target <= version:
+            continue
+
+        conn.execute("BEGIN IMMEDIATE")
+        try:
+            if current_version(conn) >= target:
+                conn.rollback()
+                continue
+
+            print(f"🧱 Applying migration {target:03d}_{name}")
+            apply(conn)
+            _set_version(conn, target)
+            conn.commit()
+        except Exception:
+            conn.rollback()
+            raise
+
+        version = target
+
+    return version
+
+
+_CURRENT: set[Path] = set()
+
+
+def ensure_schema(conn, db_path: Path):
+    """
+    Migrate once per DB file per process.
+    """
+    key = Path(db_path).resolve()
+    if key in _CURRENT:
+        return
+    migrate(conn)
+    _CURRENT.add(key)
@@ -1,8 +1,25 @@
+import json
 import sqlite3
 from pathlib import Path
-from src.domain.deal_columns import DEAL_COLUMNS, sqlite_select_columns
+from src.domain.deal_columns import DEAL_COLUMNS, ENRICHMENT_COLUMNS, sqlite_select_columns
 from datetime import date, datetime
-from src.persistence.schema_guard import assert_deals_schema
+from src.persistence.change_log import columns_filter_sql
+from src.persistence.connection import get_connection_manager
+from src.persistence.deal_search import BM25_WEIGHTS
+from src.persistence.enrichment_queue import (
+    ACTIVE_STATUS_SQL,
+    DUE_NOW,
+    FRESHNESS_DAYS,
+    UNDER_OFFER_DAYS,
+)
+from src.persistence.derived_financials import (
+    DERIVED_EXPRS,
+    METRIC_EXPRS,
+    assignments_sql,
+    changed_sql,
+)
+from src.persistence.migrations import ensure_schema
+from src.persistence.write_queue import WriteQueue, get_write_queue
 
 def today_iso():
     return date.today().isoformat()
@@ -10,6 +27,62 @@ def today_iso():
 def now_iso():
     return datetime.today().isoformat(timespec="seconds")
 
+
+# keys per snapshot query (SQLITE_MAX_VARIABLE_NUMBER is 999 on old builds)
+SNAPSHOT_CHUNK = 500
+
+
+def _empty_batch_counts() -> dict:
+    return {"inserted": 0, "updated": 0, "unchanged": 0, "failed": 0}
+
+
+def _batch_counts(keys, before: dict, after: dict, failed: set) -> dict:
+    counts = _empty_batch_counts()
+    counts["failed"] = len(failed)
+    for key in dict.fromkeys(keys):
+        if key in failed:
+            continue
+        if key not in before:
+            counts["inserted" if key in after else "unchanged"] += 1
+        elif after.get(key) != before[key]:
+            counts["updated"] += 1
+        else:
+            counts["unchanged"] += 1
+    return counts
+
+
+DEAL_V2_COLUMNS = [
+    "source",
+    "source_listing_id",
+    "source_url",
+
+    "title",
+    "industry",
+    "sector",
+    "location",
+    "incorporation_year",
+
+    "revenue_k",
+    "ebitda_k",
+    "asking_price_k",
+    "profit_margin_pct",
+    "revenue_growth_pct",
+    "leverage_pct",
+
+    "ebitda_margin",
+    "revenue_multiple",
+    "ebitda_multiple",
+
+    "decision",
+
+    "first_seen",
+    "last_seen",
+    "last_updated",
+    "last_updated_source",
+
+    "drive_folder_url",
+]
+
 class SQLiteRepository:
     def __init__(self, db_path: Path):
         # ✅ force path relative to project root
@@ -22,8 +95,23 @@ class SQLiteRepository:
             for c in DEAL_COLUMNS
             if c.pull and not c.system
         }
-        with self.get_conn() as conn:
-            assert_deals_schema(conn)
+        self._connections = get_connection_manager(self.db_path)
+        ensure_schema(self.get_conn(), self.db_path)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.close()
+        return False
+
+    def close(self):
+        """
+        Flush queued writes, then release the pooled connections for
+        this DB file. Safe to call repeatedly; the next query reopens.
+        """
+        self.writer.close()
+        self._connections.close()
 
     def fetch_all(self, sql: str, params=()):
         with self.get_conn() as conn:
@@ -37,9 +125,82 @@ class SQLiteRepository:
             conn.commit()
 
     def get_conn(self):
-        conn = sqlite3.connect(self.db_path)
-        conn.row_factory = sqlite3.Row   # ✅ THIS IS THE KEY LINE
-        return conn
+        # Shared, long-lived connection for this thread (see connection.py).
+        # `with conn:` still commits / rolls back; it never closes.
+        return self._connections.connection()
+
+    @property
+    def writer(self) -> WriteQueue:
+        """
+        Shared write-behind queue for this DB file (see write_queue.py).
+        Use it from long-running / concurrent writers instead of
+        committing per row.
+        """
+        return get_write_queue(self.db_path)
+
+    # ---------- BATCH WRITES ----------
+
+    def _apply_batch(self, recs, *, writes, keys, compare_cols, key_column=None) -> dict:
+        """
+        Apply per-record writes in record order, in a single transaction.
+
+        Each record runs in its own SAVEPOINT: a record that violates a
+        constraint (e.g. ux_bb_source_url) is rolled back alone, printed
+        and counted as failed; the rest of the batch commits.
+
+        Each distinct key is classified as inserted / updated / unchanged.
+        Only compare_cols are compared; bookkeeping stamps
+        (last_seen, last_updated, ...) do not count as a change.
+
+        keys:       (source, key value) per record
+        key_column: source -> column holding the key value
+                    (default: source_listing_id)
+        """
+        key_column = key_column or (lambda source: "source_listing_id")
+        failed = set()
+
+        with self.get_conn() as conn:
+            conn.execute("BEGIN IMMEDIATE")
+            before = self._snapshot(conn, keys, key_column, compare_cols)
+            for rec, key in zip(recs, keys):
+                conn.execute("SAVEPOINT batch_record")
+                try:
+                    for sql, params in writes(rec):
+                        conn.execute(sql, params)
+                except sqlite3.Error as e:
+                    conn.execute("ROLLBACK TO batch_record")
+                    failed.add(key)
+                    print(f"❌ {key[0]} {key[1]}: {e}")
+                conn.execute("RELEASE batch_record")
+            after = self._snapshot(conn, keys, key_column, compare_cols)
+
+        return _batch_counts(keys, before, after, failed)
+
+    @staticmethod
+    def _snapshot(conn, keys, key_column, compare_cols) -> dict:
+        """
+        compare_cols of the batch's own rows (indexed lookups, chunked
+        below the SQLite variable limit) — never the whole source.
+        """
+        by_source: dict[str, list] = {}
+        for source, value in dict.fromkeys(keys):
+            by_source.setdefault(source, []).append(value)
+
+        snapshot = {}
+        for source, values in by_source.items():
+            column = key_column(source)
+            select = ", ".join([column, *compare_cols])
+            for i in range(0, len(values), SNAPSHOT_CHUNK):
+                chunk = values[i:i + SNAPSHOT_CHUNK]
+                rows = conn.execute(
+                    f"""
+                    SELECT {select} FROM deals
+                    WHERE source = ? AND {column} IN ({",".join("?" for _ in chunk)})
+                    """,
+                    (source, *chunk),
+                ).fetchall()
+                snapshot.update({(source, r[0]): tuple(r[1:]) for r in rows})
+        return snapshot
 
     # ---------- DEALS ----------
 
@@ -150,6 +311,24 @@ class SQLiteRepository:
                 (day.isoformat(), broker),
             )
 
+    def try_consume_click(self, broker: str, day: date, limit: int) -> bool:
+        """
+        Atomically count one click against broker's daily limit.
+        False (and nothing counted) once the limit is reached.
+        """
+        with self.get_conn() as conn:
+            cur = conn.execute(
+                """
+                INSERT INTO daily_clicks (date, broker, clicks_used)
+                SELECT ?, ?, 1 WHERE ? > 0
+                ON CONFLICT(date, broker)
+                DO UPDATE SET clicks_used = clicks_used + 1
+                WHERE clicks_used < ?
+                """,
+                (day.isoformat(), broker, limit, limit),
+            )
+            return cur.rowcount == 1
+
     def upsert_index_only(
             self,
             *,
@@ -165,11 +344,87 @@ class SQLiteRepository:
             last_updated: str | None = None,
             last_updated_source: str | None = None,
     ):
+        rec = {
+            "source": source,
+            "source_listing_id": source_listing_id,
+            "source_url": source_url,
+            "title": title,
+            "sector_raw": sector_raw,
+            "location_raw": location_raw,
+            "turnover_range_raw": turnover_range_raw,
+            "first_seen": first_seen,
+            "last_seen": last_seen,
+            "last_updated": last_updated,
+            "last_updated_source": last_updated_source,
+        }
 
         with self.get_conn() as conn:
-            if source == "BusinessBuyers":
+            for sql, params in self._index_only_writes(rec):
+                conn.execute(sql, params)
+
+    def upsert_index_only_many(self, records) -> dict:
+        """
+        Batch variant of upsert_index_only.
+
+        records: iterable of dicts using the upsert_index_only keyword names.
+        Same per-broker semantics, one executemany per statement,
+        one transaction for the whole batch.
+        """
+        recs = [self._index_only_record(r) for r in records]
+        if not recs:
+            return _empty_batch_counts()
+
+        # BusinessBuyers / BusinessesForSale rows are identified by URL
+        url_keyed = {"BusinessBuyers", "BusinessesForSale"}
+        keys = [
+            (r["source"], r["source_url"] if r["source"] in url_keyed else r["source_listing_id"])
+            for r in recs
+        ]
+
+        return self._apply_batch(
+            recs,
+            writes=self._index_only_writes,
+            keys=keys,
+            key_column=lambda source: "source_url" if source in url_keyed else "source_listing_id",
+            compare_cols=[
+                "source_listing_id",
+                "source_url",
+                "title",
+                "sector_raw",
+                "location_raw",
+                "turnover_range_raw",
+            ],
+        )
+
+    @staticmethod
+    def _index_only_record(rec: dict) -> dict:
+        return {
+            k: rec.get(k)
+            for k in (
+                "source",
+                "source_listing_id",
+                "source_url",
+                "title",
+                "sector_raw",
+                "location_raw",
+                "turnover_range_raw",
+                "first_seen",
+                "last_seen",
+                "last_updated",
+                "last_updated_source",
+            )
+        }
+
+    @staticmethod
+    def _index_only_writes(rec: dict) -> list[tuple[str, tuple]]:
+        source = rec["source"]
+        last_updated = rec["last_updated"] or today_iso()
+        last_updated_source = rec["last_updated_source"] or "AUTO"
+
+        if source == "BusinessBuyers":
+            return [
                 # 1️⃣ insert if new (guarded by uniq(source, source_url))
-                conn.execute(
+                (
                     """
                     INSERT
                     OR IGNORE INTO deals (
@@ -189,21 +444,20 @@ class SQLiteRepository:
                     """,
                     (
                         source,
-                        source_listing_id,  # provisional slug
-                        source_url,
-                        title,
-                        sector_raw,
-                        location_raw,
-                        turnover_range_raw,
-                        first_seen,
-                        last_seen,
-                        last_updated or today_iso(),
-                        last_updated_source or "AUTO",
+                        rec["source_listing_id"],  # provisional slug
+                        rec["source_url"],
+                        rec["title"],
+                        rec["sector_raw"],
+                        rec["location_raw"],
+                        rec["turnover_range_raw"],
+                        rec["first_seen"],
+                        rec["last_seen"],
+                        last_updated,
+                        last_updated_source,
                     ),
-                )
-
+                ),
                 # 2️⃣ always update the existing row (by URL)
-                conn.execute(
+                (
                     """
                     UPDATE deals
                     SET source_listing_id   = COALESCE(?, source_listing_id),
@@ -218,19 +472,22 @@ class SQLiteRepository:
                       AND source_url = ?
                     """,
                     (
-                        source_listing_id,
-                        title,
-                        sector_raw,
-                        location_raw,
-                        turnover_range_raw,
-                        last_seen,
-                        last_updated or today_iso(),
-                        last_updated_source or "AUTO",
-                        source_url,
+                        rec["source_listing_id"],
+                        rec["title"],
+                        rec["sector_raw"],
+                        rec["location_raw"],
+                        rec["turnover_range_raw"],
+                        rec["last_seen"],
+                        last_updated,
+                        last_updated_source,
+                        rec["source_url"],
                     ),
-                )
-            elif source == "BusinessesForSale":
-                conn.execute(
+                ),
+            ]
+
+        if source == "BusinessesForSale":
+            return [
+                (
                     """
                     INSERT
                     OR IGNORE INTO deals (
@@ -249,20 +506,19 @@ class SQLiteRepository:
                     """,
                     (
                         source,
-                        source_listing_id,
-                        source_url,
-                        sector_raw,
-                        location_raw,
-                        turnover_range_raw,
-                        first_seen,
-                        last_seen,
-                        last_updated or today_iso(),
-                        last_updated_source or "AUTO",
+                        rec["source_listing_id"],
+                        rec["source_url"],
+                        rec["sector_raw"],
+                        rec["location_raw"],
+                        rec["turnover_range_raw"],
+                        rec["first_seen"],
+                        rec["last_seen"],
+                        last_updated,
+                        last_updated_source,
                     ),
-                )
-
+                ),
                 # 2️⃣ always update the existing row
-                conn.execute(
+                (
                     """
                     UPDATE deals
                     SET source_listing_id   = ?,
@@ -277,58 +533,60 @@ class SQLiteRepository:
                       AND source_url = ?
                     """,
                     (
-                        source_listing_id,
-                        sector_raw,
-                        location_raw,
-                        turnover_range_raw,
-                        first_seen,
-                        last_seen,
-                        last_updated or today_iso(),
-                        last_updated_source or "AUTO",
-                        source_url,
+                        rec["source_listing_id"],
+                        rec["sector_raw"],
+                        rec["location_raw"],
+                        rec["turnover_range_raw"],
+                        rec["first_seen"],
+                        rec["last_seen"],
+                        last_updated,
+                        last_updated_source,
+                        rec["source_url"],
                     ),
-                )
-            else:
-                conn.execute(
-                    """
-                    INSERT INTO deals (source,
-                                       source_listing_id,
-                                       source_url,
-                                       title,
-                                       sector_raw,
-                                       location_raw,
-                                       turnover_range_raw,
-                                       first_seen,
-                                       last_seen,
-                                       last_updated,
-                                       last_updated_source)
-                    VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?) ON CONFLICT(source, source_listing_id)
-                    DO
-                    UPDATE SET
-                        title = excluded.title,
-                        source_url = excluded.source_url,
-                        sector_raw = COALESCE (excluded.sector_raw, deals.sector_raw),
-                        location_raw = COALESCE (excluded.location_raw, deals.location_raw),
-                        turnover_range_raw = COALESCE (excluded.turnover_range_raw, deals.turnover_range_raw),
-                        last_seen = excluded.last_seen,
-                        last_updated = excluded.last_updated,
-                        last_updated_source= excluded.last_updated_source
-                    """,
-                    (
-                        source,
-                        source_listing_id,
-                        source_url,
-                        title,
-                        sector_raw,
-                        location_raw,
-                        turnover_range_raw,
-                        first_seen,
-                        last_seen,
-                        last_updated or today_iso(),
-                        last_updated_source or "AUTO",
+                ),
+            ]
 
-                    ),
-                )
+        return [
+            (
+                """
+                INSERT INTO deals (source,
+                                   source_listing_id,
+                                   source_url,
+                                   title,
+                                   sector_raw,
+                                   location_raw,
+                                   turnover_range_raw,
+                                   first_seen,
+                                   last_seen,
+                                   last_updated,
+                                   last_updated_source)
+                VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?) ON CONFLICT(source, source_listing_id)
+                DO
+                UPDATE SET
+                    title = excluded.title,
+                    source_url = excluded.source_url,
+                    sector_raw = COALESCE (excluded.sector_raw, deals.sector_raw),
+                    location_raw = COALESCE (excluded.location_raw, deals.location_raw),
+                    turnover_range_raw = COALESCE (excluded.turnover_range_raw, deals.turnover_range_raw),
+                    last_seen = excluded.last_seen,
+                    last_updated = excluded.last_updated,
+                    last_updated_source= excluded.last_updated_source
+                """,
+                (
+                    source,
+                    rec["source_listing_id"],
+                    rec["source_url"],
+                    rec["title"],
+                    rec["sector_raw"],
+                    rec["location_raw"],
+                    rec["turnover_range_raw"],
+                    rec["first_seen"],
+                    rec["last_seen"],
+                    last_updated,
+                    last_updated_source,
+                ),
+            ),
+        ]
 
     def get_pending_index_records(self, source: str):
         """
@@ -359,25 +617,224 @@ class SQLiteRepository:
             ]
 
     def fetch_all_deals(self):
-        cols = sqlite_select_columns()
-        print(cols)
-        print(", ".join(cols))
+        return list(self.iter_deals())
+
+    def iter_deals(
+            self,
+            *,
+            columns=None,
+            where: str | None = None,
+            params=(),
+            exclude_uids=None,
+            order_by: str = "first_seen ASC",
+            batch_size: int = 500,
+    ):
+        """
+        Stream deals as dicts (with deal_uid), batch_size rows at a time.
+
+        columns:      projection (default: every non-virtual DEAL_COLUMNS column)
+        where/params: extra SQL filter
+        exclude_uids: deal_uids to skip, filtered SQL-side (json_each)
+
+        Peak memory is one batch, whatever the table size.
+        """
+        cols = list(columns) if columns else sqlite_select_columns()
+        for required in ("source", "source_listing_id"):
+            if required not in cols:
+                cols.append(required)
+
+        clauses = [f"({where})"] if where else []
+        params = tuple(params)
+
+        if exclude_uids is not None:
+            # bound as one JSON array: no temp table to drop while the
+            # cursor may still be open (abandoned generator)
+            clauses.append(
+                "source || ':' || source_listing_id "
+                "NOT IN (SELECT value FROM json_each(?))"
+            )
+            params += (json.dumps(list(exclude_uids)),)
+
         sql = f"""
             SELECT {", ".join(cols)}
             FROM deals
-            ORDER BY first_seen ASC
+            {"WHERE " + " AND ".join(clauses) if clauses else ""}
+            ORDER BY {order_by}
         """
 
         with self.get_conn() as conn:
-            rows = conn.execute(sql).fetchall()
+            cur = conn.execute(sql, params)
+            try:
+                while True:
+                    batch = cur.fetchmany(batch_size)
+                    if not batch:
+                        break
+                    for row in batch:
+                        d = dict(zip(cols, row))
+                        d["deal_uid"] = f"{d['source']}:{d['source_listing_id']}"
+                        yield d
+            finally:
+                cur.close()
+
+    # ------------------------------------------------------------------
+    # CHANGE LOG (see change_log.py)
+    # ------------------------------------------------------------------
+
+    def change_log_head(self) -> int:
+        """
+        Highest seq written so far (0 if the log is empty).
+        Read this BEFORE fetching changes, then advance the cursor to it.
+        """
+        with self.get_conn() as conn:
+            row = conn.execute("SELECT MAX(seq) FROM deal_changes").fetchone()
+        return row[0] or 0
+
+    def get_change_cursor(self, consumer: str) -> int | None:
+        with self.get_conn() as conn:
+            row = conn.execute(
+                "SELECT last_seq FROM change_cursors WHERE consumer = ?",
+                (consumer,),
+            ).fetchone()
+        return row[0] if row else None
+
+    def set_change_cursor(self, consumer: str, seq: int):
+        with self.get_conn() as conn:
+            conn.execute(
+                """
+                INSERT INTO change_cursors (consumer, last_seq, updated_at)
+                VALUES (?, ?, CURRENT_TIMESTAMP)
+                ON CONFLICT(consumer) DO UPDATE SET
+                    last_seq = excluded.last_seq,
+                    updated_at = excluded.updated_at
+                """,
+                (consumer, seq),
+            )
+
+    def fetch_changes_since(self, seq: int, *, until: int | None = None, columns=None) -> list[dict]:
+        """
+        Changes in (seq, until], folded per deal:
+        {deal_rowid, deal_uid, ops, columns, last_seq}.
+        columns is None when the deal was inserted/deleted (= everything).
+        """
+        col_sql, col_params = columns_filter_sql(columns)
+        until = self.change_log_head() if until is None else until
 
-        out = []
-        for row in rows:
-            d = dict(row)
-            d["deal_uid"] = f"{d['source']}:{d['source_listing_id']}"
-            out.append(d)
+        with self.get_conn() as conn:
+            rows = conn.execute(
+                f"""
+                SELECT seq, deal_rowid, source, source_listing_id, op, changed_columns
+                FROM deal_changes
+                WHERE seq > ? AND seq <= ?
+                  AND {col_sql}
+                ORDER BY seq
+                """,
+                (seq, until, *col_params),
+            ).fetchall()
 
-        return out
+        out: dict[int, dict] = {}
+        for r in rows:
+            change = out.setdefault(r["deal_rowid"], {
+                "deal_rowid": r["deal_rowid"],
+                "deal_uid": f"{r['source']}:{r['source_listing_id']}",
+                "ops": set(),
+                "columns": set(),
+                "last_seq": r["seq"],
+            })
+            change["ops"].add(r["op"])
+            change["last_seq"] = r["seq"]
+            if r["changed_columns"] is None:
+                change["columns"] = None
+            elif change["columns"] is not None:
+                change["columns"].update(c for c in r["changed_columns"].split(",") if c)
+
+        return list(out.values())
+
+    def fetch_changed_deals(
+            self,
+            seq: int,
+            until: int,
+            *,
+            ops=None,
+            columns=None,
+    ) -> list[dict]:
+        """
+        Current rows (fetch_all_deals shape) for deals changed in (seq, until].
+        ops:     restrict to e.g. ("INSERT",)
+        columns: restrict to changes touching any of these columns
+        """
+        col_sql, col_params = columns_filter_sql(columns)
+        where = ["seq > ?", "seq <= ?", col_sql]
+        params = [seq, until, *col_params]
+
+        if ops:
+            where.append(f"op IN ({', '.join('?' for _ in ops)})")
+            params.extend(ops)
+
+        return list(self.iter_deals(
+            where=f"""
+                id IN (
+                    SELECT deal_rowid
+                    FROM deal_changes
+                    WHERE {" AND ".join(where)}
+                )
+            """,
+            params=params,
+        ))
+
+    def prune_change_log(self) -> int:
+        """
+        Drop log entries every consumer has already processed.
+        Returns rows deleted.
+        """
+        with self.get_conn() as conn:
+            cur = conn.execute(
+                """
+                DELETE FROM deal_changes
+                WHERE seq <= (SELECT MIN(last_seq) FROM change_cursors)
+                """
+            )
+            return cur.rowcount
+
+    # ------------------------------------------------------------------
+    # FULL-TEXT SEARCH (see deal_search.py)
+    # ------------------------------------------------------------------
+
+    def search_deals(
+            self,
+            query: str,
+            *,
+            source: str | None = None,
+            where: str | None = None,
+            params=(),
+            limit: int | None = 100,
+    ) -> list[int]:
+        """
+        Deal ids matching an FTS5 query, best bm25 match first.
+        where/params: extra filter on deals columns (aliased d).
+        """
+        clauses = ["deals_fts MATCH ?"]
+        args = [query]
+
+        if source:
+            clauses.append("d.source = ?")
+            args.append(source)
+        if where:
+            clauses.append(f"({where})")
+            args.extend(params)
+
+        sql = f"""
+            SELECT d.id
+            FROM deals_fts
+            JOIN deals d ON d.id = deals_fts.rowid
+            WHERE {" AND ".join(clauses)}
+            ORDER BY bm25(deals_fts, {", ".join(str(w) for w in BM25_WEIGHTS)})
+        """
+        if limit is not None:
+            sql += " LIMIT ?"
+            args.append(limit)
+
+        with self.get_conn() as conn:
+            return [row[0] for row in conn.execute(sql, args)]
 
     def update_human_fields(
             self,
@@ -443,6 +900,82 @@ class SQLiteRepository:
             conn.execute(sql, values)
             conn.commit()
 
+    def fetch_deals_by_uid(self, columns) -> dict[str, dict]:
+        """
+        All deals keyed by deal_uid, in one query.
+        Projects only id, source, source_listing_id and `columns`.
+        """
+        cols = ["id", "source", "source_listing_id"]
+        cols += [c for c in columns if c not in cols]
+
+        with self.get_conn() as conn:
+            rows = conn.execute(f"SELECT {', '.join(cols)} FROM deals").fetchall()
+
+        return {
+            f"{row['source']}:{row['source_listing_id']}": dict(row)
+            for row in rows
+        }
+
+    def apply_manual_updates(self, changes) -> int:
+        """
+        Bulk version of insert_status_history + update_deal_fields.
+
+        changes: iterable of
+            {"id", "source", "source_listing_id", "old_status", "updates"}
+
+        Everything is written in one transaction; rows are grouped by the
+        set of columns they touch so each shape is a single executemany.
+        Returns the number of deals updated.
+        """
+        history = []
+        grouped: dict[tuple, list] = {}
+
+        for change in changes:
+            safe_updates = {
+                k: v for k, v in change["updates"].items()
+                if k in self.DEALS_DB_COLUMNS
+            }
+            if not safe_updates:
+                continue
+
+            if "status" in safe_updates:
+                history.append(
+                    (change["id"], change.get("old_status"), safe_updates["status"])
+                )
+
+            cols = tuple(safe_updates)
+            grouped.setdefault(cols, []).append(
+                [*safe_updates.values(), change["source"], change["source_listing_id"]]
+            )
+
+        if not grouped:
+            return 0
+
+        with self.get_conn() as conn:
+            conn.executemany(
+                """
+                INSERT INTO deal_status_history
+                    (deal_id, old_status, new_status, changed_at)
+                VALUES (?, ?, ?, datetime('now'))
+                """,
+                history,
+            )
+
+            for cols, params in grouped.items():
+                conn.executemany(
+                    f"""
+                    UPDATE deals
+                    SET {", ".join(f"{k} = ?" for k in cols)},
+                        last_updated = CURRENT_TIMESTAMP,
+                        last_updated_source = 'MANUAL'
+                    WHERE source = ?
+                      AND source_listing_id = ?
+                    """,
+                    params,
+                )
+
+        return sum(len(params) for params in grouped.values())
+
     def update_sector_inference(
             self,
             deal_id,
@@ -564,68 +1097,97 @@ class SQLiteRepository:
             conn.execute(sql, values)
             conn.commit()
 
-    def upsert_legacy_deal(self, deal: dict):
-        with self.get_conn() as conn:
-            conn.execute(
-                """
-                INSERT INTO deals (source,
-                                   source_listing_id,
-                                   source_url,
-                                   title,
-                                   industry,
-                                   sector,
-                                   location,
-                                   incorporation_year,
-                                   first_seen,
-                                   last_updated,
-                                   last_updated_source,
-                                   status,
-                                   decision,
-                                   notes,
-                                   revenue_k,
-                                   ebitda_k,
-                                   asking_price_k,
-                                   drive_folder_url)
-                VALUES (:source,
-                        :source_listing_id,
-                        :source_url,
-                        :title,
-                        :industry,
-                        :sector,
-                        :location,
-                        :incorporation_year,
-                        :first_seen,
-                        :last_updated,
-                        'MANUAL',
-                        :status,
-                        :decision,
-                        :notes,
-                        :revenue_k,
-                        :ebitda_k,
-                        :asking_price_k,
-                        :drive_folder_url) ON CONFLICT (source, source_listing_id) DO
-                UPDATE SET
-                    title = excluded.title,
-                    industry = excluded.industry,
-                    sector = excluded.sector,
-                    location = excluded.location,
-                    incorporation_year = excluded.incorporation_year,
+    LEGACY_UPSERT_SQL = """
+        INSERT INTO deals (source,
+                           source_listing_id,
+                           source_url,
+                           title,
+                           industry,
+                           sector,
+                           location,
+                           incorporation_year,
+                           first_seen,
+                           last_updated,
+                           last_updated_source,
+                           status,
+                           decision,
+                           notes,
+                           revenue_k,
+                           ebitda_k,
+                           asking_price_k,
+                           drive_folder_url)
+        VALUES (:source,
+                :source_listing_id,
+                :source_url,
+                :title,
+                :industry,
+                :sector,
+                :location,
+                :incorporation_year,
+                :first_seen,
+                :last_updated,
+                'MANUAL',
+                :status,
+                :decision,
+                :notes,
+                :revenue_k,
+                :ebitda_k,
+                :asking_price_k,
+                :drive_folder_url) ON CONFLICT (source, source_listing_id) DO
+        UPDATE SET
+            title = excluded.title,
+            industry = excluded.industry,
+            sector = excluded.sector,
+            location = excluded.location,
+            incorporation_year = excluded.incorporation_year,
+
+            last_updated = excluded.last_updated,
+            last_updated_source = 'MANUAL',
+
+            status = excluded.status,
+            decision = excluded.decision,
+            notes = excluded.notes,
+
+            revenue_k = excluded.revenue_k,
+            ebitda_k = excluded.ebitda_k,
+            asking_price_k = excluded.asking_price_k,
+            drive_folder_url = excluded.drive_folder_url
+        ;
+        """
 
-                    last_updated = excluded.last_updated,
-                    last_updated_source = 'MANUAL',
+    LEGACY_COMPARE_COLUMNS = [
+        "title",
+        "industry",
+        "sector",
+        "location",
+        "incorporation_year",
+        "status",
+        "decision",
+        "notes",
+        "revenue_k",
+        "ebitda_k",
+        "asking_price_k",
+        "drive_folder_url",
+    ]
 
-                    status = excluded.status,
-                    decision = excluded.decision,
-                    notes = excluded.notes,
+    def upsert_legacy_deal(self, deal: dict):
+        with self.get_conn() as conn:
+            conn.execute(self.LEGACY_UPSERT_SQL, deal)
 
-                    revenue_k = excluded.revenue_k,
-                    ebitda_k = excluded.ebitda_k,
-                    asking_price_k = excluded.asking_price_k,
-                    drive_folder_url = excluded.drive_folder_url
-                ;
-                """,
-                deal,
-            )
+    def upsert_legacy_deal_many(self, deals) -> dict:
+        """
+        Batch variant of upsert_legacy_deal (one transaction).
+        """
+        deals = list(deals)
+        if not deals:
+            return _empty_batch_counts()
+
+        return self._apply_batch(
+            deals,
+            writes=lambda d: [(self.LEGACY_UPSERT_SQL, d)],
+            keys=[(d["source"], d["source_listing_id"]) for d in deals],
+            compare_cols=self.LEGACY_COMPARE_COLUMNS,
+        )
 
     def upsert_intermediary(self, rec: dict):
         with self.get_conn() as conn:
@@ -675,66 +1237,88 @@ class SQLiteRepository:
                 ),
             )
 
+    RAW_DEAL_UPSERT_SQL = """
+        INSERT INTO deals (
+            deal_id,
+            source,
+            source_url,
+            source_listing_id,
+            title,
+            identity_method,
+            content_hash,
+            description,
+            sector_raw,
+            industry_raw,
+            location,
+            revenue_k,
+            ebitda_k,
+            asking_price_k,
+            notes,
+            first_seen,
+            last_seen,
+            manual_imported_at
+        )
+        VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+
+        ON CONFLICT(source, source_listing_id)
+        DO UPDATE SET
+            last_seen = excluded.last_seen,
+            manual_imported_at = excluded.manual_imported_at
+        """
+
     def insert_raw_deal(self, deal: dict):
         """
         Insert or update a raw deal (e.g. Dmitry sheets).
         Deduplicates on (source, source_listing_id).
         Preserves first_seen.
         """
+        with self.get_conn() as conn:
+            for sql, params in self._raw_deal_writes(deal):
+                conn.execute(sql, params)
 
+    def insert_raw_deal_many(self, deals) -> dict:
+        """
+        Batch variant of insert_raw_deal (one transaction).
+        Only last_seen / manual_imported_at move on conflict,
+        so re-seen rows count as unchanged.
+        """
+        deals = list(deals)
+        if not deals:
+            return _empty_batch_counts()
+
+        return self._apply_batch(
+            deals,
+            writes=self._raw_deal_writes,
+            keys=[(d["source"], d["source_listing_id"]) for d in deals],
+            compare_cols=[],
+        )
+
+    def _raw_deal_writes(self, deal: dict) -> list[tuple[str, tuple]]:
         source_url = f"internal://{deal['source']}/{deal['source_listing_id']}"
 
-        with self.get_conn() as conn:
-            conn.execute(
-                """
-                INSERT INTO deals (
-                    deal_id,
-                    source,
-                    source_url,
-                    source_listing_id,
-                    title,
-                    identity_method,
-                    content_hash,
-                    description,
-                    sector_raw,
-                    industry_raw,
-                    location,
-                    revenue_k,
-                    ebitda_k,
-                    asking_price_k,
-                    notes,
-                    first_seen,
-                    last_seen,
-                    manual_imported_at
-                )
-                VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
-
-                ON CONFLICT(source, source_listing_id)
-                DO UPDATE SET
-                    last_seen = excluded.last_seen,
-                    manual_imported_at = excluded.manual_imported_at
-                """,
-                (
-                    deal["deal_id"],
-                    deal["source"],                     # "Dmitry"
-                    source_url,                         # synthetic URL
-                    deal["source_listing_id"],          # Aug25-D / Oct25-D
-                    deal["title"],
-                    deal["identity_method"],
-                    deal["content_hash"],
-                    deal["description"],
-                    deal["sector_raw"],
-                    deal["industry_raw"],
-                    deal["location"],
-                    deal["revenue_k"],
-                    deal["ebitda_k"],
-                    deal["asking_price_k"],
-                    deal["notes"],
-                    deal["first_seen"],                  # only used on INSERT
-                    deal["last_seen"],                   # updated on re-seen
-                    now_iso(),
-                ),
-            )
+        return [(
+            self.RAW_DEAL_UPSERT_SQL,
+            (
+                deal["deal_id"],
+                deal["source"],                     # "Dmitry"
+                source_url,                         # synthetic URL
+                deal["source_listing_id"],          # Aug25-D / Oct25-D
+                deal["title"],
+                deal["identity_method"],
+                deal["content_hash"],
+                deal["description"],
+                deal["sector_raw"],
+                deal["industry_raw"],
+                deal["location"],
+                deal["revenue_k"],
+                deal["ebitda_k"],
+                deal["asking_price_k"],
+                deal["notes"],
+                deal["first_seen"],                  # only used on INSERT
+                deal["last_seen"],                   # updated on re-seen
+                now_iso(),
+            ),
+        )]
 
     def update_dmitry_seen(self, deal_id: str, seen_date: str):
         """
@@ -831,46 +1415,24 @@ class SQLiteRepository:
     def compute_deal_uid(self, deal: dict) -> str:
         return f"{deal['source']}:{deal['source_listing_id']}"
 
-    def recalculate_financial_metrics(self):
+    def recalculate_financial_metrics(self) -> int:
         """
         Recalculate derived financial metrics from effective values.
-        Safe to run repeatedly.
+        Only rows whose stored metrics are stale are touched, so
+        last_updated moves only when a value actually changes.
+        Returns the number of rows updated.
         """
         with self.get_conn() as conn:
-            conn.execute(
-                """
+            cur = conn.execute(
+                f"""
                 UPDATE deals
-                    SET
-                        ebitda_margin = CASE
-                            WHEN revenue_k_effective IS NOT NULL
-                             AND revenue_k_effective != 0
-                             AND ebitda_k_effective IS NOT NULL
-                            THEN ROUND((ebitda_k_effective * 100.0) / revenue_k_effective, 2)
-                            ELSE NULL
-                        END,
-                    
-                        revenue_multiple = CASE
-                            WHEN revenue_k_effective IS NOT NULL
-                             AND revenue_k_effective != 0
-                             AND asking_price_k_effective IS NOT NULL
-                            THEN ROUND(asking_price_k_effective / revenue_k_effective, 2)
-                            ELSE NULL
-                        END,
-                    
-                        ebitda_multiple = CASE
-                            WHEN ebitda_k_effective IS NOT NULL
-                             AND ebitda_k_effective != 0
-                             AND asking_price_k_effective IS NOT NULL
-                            THEN ROUND(asking_price_k_effective / ebitda_k_effective, 2)
-                            ELSE NULL
-                        END,
-                    
-                        last_updated = CURRENT_TIMESTAMP,
-                        last_updated_source = 'AUTO'
-                    ;
+                SET {assignments_sql(METRIC_EXPRS)},
+                    last_updated = CURRENT_TIMESTAMP,
+                    last_updated_source = 'AUTO'
+                WHERE {changed_sql(METRIC_EXPRS)}
                 """
             )
-            conn.commit()
+            return cur.rowcount
 
     def fetch_deals_with_descriptions(
             self,
@@ -948,86 +1510,82 @@ class SQLiteRepository:
             conn.execute(sql, values)
             conn.commit()
 
-    def upsert_deal_v2(self, deal: dict):
-        """
-        Canonical v2 upsert.
-        Identity = (source, source_listing_id)
-        Analyst-owned fields are never overwritten here.
-        """
-
-        cols = [
+    DEAL_V2_UPSERT_SQL = f"""
+        INSERT INTO deals (
+            {", ".join(DEAL_V2_COLUMNS)}
+        )
+        VALUES (
+            {", ".join(["?"] * len(DEAL_V2_COLUMNS))}
+        )
+        ON CONFLICT(source, source_listing_id)
+        DO UPDATE SET
+            title = excluded.title,
+            industry = excluded.industry,
+            sector = excluded.sector,
+            location = excluded.location,
+            incorporation_year = excluded.incorporation_year,
+
+            revenue_k = excluded.revenue_k,
+            ebitda_k = excluded.ebitda_k,
+            asking_price_k = excluded.asking_price_k,
+            profit_margin_pct = excluded.profit_margin_pct,
+            revenue_growth_pct = excluded.revenue_growth_pct,
+            leverage_pct = excluded.leverage_pct,
+
+            ebitda_margin = excluded.ebitda_margin,
+            revenue_multiple = excluded.revenue_multiple,
+            ebitda_multiple = excluded.ebitda_multiple,
+
+            decision = excluded.decision,
+
+            last_seen = excluded.last_seen,
+            last_updated = excluded.last_updated,
+            last_updated_source = excluded.last_updated_source,
+
+            drive_folder_url = excluded.drive_folder_url
+    """
+
+    DEAL_V2_COMPARE_COLUMNS = [
+        c for c in DEAL_V2_COLUMNS
+        if c not in {
             "source",
             "source_listing_id",
             "source_url",
-
-            "title",
-            "industry",
-            "sector",
-            "location",
-            "incorporation_year",
-
-            "revenue_k",
-            "ebitda_k",
-            "asking_price_k",
-            "profit_margin_pct",
-            "revenue_growth_pct",
-            "leverage_pct",
-
-            "ebitda_margin",
-            "revenue_multiple",
-            "ebitda_multiple",
-
-            "decision",
-
             "first_seen",
             "last_seen",
             "last_updated",
             "last_updated_source",
+        }
+    ]
 
-            "drive_folder_url",
-        ]
-
-        values = [deal.get(c) for c in cols]
-
+    def upsert_deal_v2(self, deal: dict):
+        """
+        Canonical v2 upsert.
+        Identity = (source, source_listing_id)
+        Analyst-owned fields are never overwritten here.
+        """
         with self.get_conn() as conn:
-            conn.execute(
-                f"""
-                INSERT INTO deals (
-                    {", ".join(cols)}
-                )
-                VALUES (
-                    {", ".join(["?"] * len(cols))}
-                )
-                ON CONFLICT(source, source_listing_id)
-                DO UPDATE SET
-                    title = excluded.title,
-                    industry = excluded.industry,
-                    sector = excluded.sector,
-                    location = excluded.location,
-                    incorporation_year = excluded.incorporation_year,
-
-                    revenue_k = excluded.revenue_k,
-                    ebitda_k = excluded.ebitda_k,
-                    asking_price_k = excluded.asking_price_k,
-                    profit_margin_pct = excluded.profit_margin_pct,
-                    revenue_growth_pct = excluded.revenue_growth_pct,
-                    leverage_pct = excluded.leverage_pct,
-
-                    ebitda_margin = excluded.ebitda_margin,
-                    revenue_multiple = excluded.revenue_multiple,
-                    ebitda_multiple = excluded.ebitda_multiple,
-
-                    decision = excluded.decision,
+            conn.execute(self.DEAL_V2_UPSERT_SQL, self._deal_v2_values(deal))
+            conn.commit()
 
-                    last_seen = excluded.last_seen,
-                    last_updated = excluded.last_updated,
-                    last_updated_source = excluded.last_updated_source,
+    def upsert_deal_v2_many(self, deals) -> dict:
+        """
+        Batch variant of upsert_deal_v2 (one transaction).
+        """
+        deals = list(deals)
+        if not deals:
+            return _empty_batch_counts()
+
+        return self._apply_batch(
+            deals,
+            writes=lambda d: [(self.DEAL_V2_UPSERT_SQL, self._deal_v2_values(d))],
+            keys=[(d["source"], d["source_listing_id"]) for d in deals],
+            compare_cols=self.DEAL_V2_COMPARE_COLUMNS,
+        )
 
-                    drive_folder_url = excluded.drive_folder_url
-                """,
-                values,
-            )
-            conn.commit()
+    @staticmethod
+    def _deal_v2_values(deal: dict) -> list:
+        return [deal.get(c) for c in DEAL_V2_COLUMNS]
 
     def enrich_do_raw_fields(
             self,
@@ -1056,29 +1614,23 @@ class SQLiteRepository:
                 ),
             )
 
-    def recompute_effective_fields(self):
+    def recompute_effective_fields(self) -> int:
         """
-        Recompute effective financial fields.
+        Recompute effective financial fields (and the metrics built on them).
         Manual values override broker values.
-        Safe, idempotent, non-destructive.
+        Dirty-only: rows already in sync are left alone.
+        Returns the number of rows updated.
         """
         with self.get_conn() as conn:
-            conn.execute(
-                """
+            cur = conn.execute(
+                f"""
                 UPDATE deals
-                SET revenue_k_effective      =
-                        COALESCE(revenue_k_manual, revenue_k),
-
-                    ebitda_k_effective       =
-                        COALESCE(ebitda_k_manual, ebitda_k),
-
-                    asking_price_k_effective =
-                        COALESCE(asking_price_k_manual, asking_price_k),
-
-                    last_updated             = CURRENT_TIMESTAMP
+                SET {assignments_sql(DERIVED_EXPRS)},
+                    last_updated = CURRENT_TIMESTAMP
+                WHERE {changed_sql(DERIVED_EXPRS)}
                 """
             )
-            conn.commit()
+            return cur.rowcount
 
     def get_deals_table_columns(self) -> set[str]:
         with self.get_conn() as conn:
@@ -1099,62 +1651,165 @@ class SQLiteRepository:
     def fetch_deals_for_enrichment(
             self,
             source: str,
-            freshness_days: int = 14,
-            under_offer_days: int = 2,
+            freshness_days: int = FRESHNESS_DAYS,
+            under_offer_days: int = UNDER_OFFER_DAYS,
             force_refresh: bool = False,
     ):
-        from src.domain.deal_columns import sqlite_select_columns
+        """
+        Deals due for detail enrichment, in source_listing_id order.
+
+        Served by idx_deals_enrichment_queue (see enrichment_queue.py):
+        a range scan on (source, next_refresh_at), projecting only
+        ENRICHMENT_COLUMNS.
 
-        columns = sqlite_select_columns()
-        col_sql = ", ".join(columns)
+        force_refresh → only rows flagged needs_detail_refresh
+        or never fetched.
+        """
+        col_sql = ", ".join(ENRICHMENT_COLUMNS)
+
+        if force_refresh:
+            due_sql = "next_refresh_at = ?"
+            params = (source, DUE_NOW)
+        elif (freshness_days, under_offer_days) == (FRESHNESS_DAYS, UNDER_OFFER_DAYS):
+            due_sql = "next_refresh_at <= datetime('now')"
+            params = (source,)
+        else:
+            # non-default windows cannot use the precomputed column
+            due_sql = """
+                (
+                    needs_detail_refresh = 1
+                 OR detail_fetched_at IS NULL
+                 OR datetime(
+                        detail_fetched_at,
+                        CASE WHEN status = 'Under Offer' THEN ? ELSE ? END
+                    ) <= datetime('now')
+                )
+            """
+            params = (source, f"+{under_offer_days} days", f"+{freshness_days} days")
 
         with self.get_conn() as conn:
-            conn.row_factory = sqlite3.Row
+            return conn.execute(
+                f"""
+                SELECT {col_sql}
+                FROM deals
+                WHERE source = ?
+                  AND {ACTIVE_STATUS_SQL}
+                  AND {due_sql}
+                ORDER BY source_listing_id;
+                """,
+                params,
+            ).fetchall()
 
-            if force_refresh:
-                return conn.execute(
-                    f"""
-                    SELECT {col_sql}
-                    FROM deals
-                    WHERE source = ?
-                      AND (status IS NULL OR status NOT IN ('Pass', 'Lost'))
-                      AND (
-                            needs_detail_refresh = 1
-                         OR detail_fetched_at IS NULL
-                      )
-                    ORDER BY ASC;
-                    """,
-                    (source,),
-                ).fetchall()
+    # ---------- HTML ARCHIVE (see html_snapshots.py) ----------
 
-            # ---------- normal behavior ----------
+    def latest_html_snapshot(self, url: str) -> dict | None:
+        """
+        Most recent archived fetch of url (manifest row), or None.
+        """
+        with self.get_conn() as conn:
+            row = conn.execute(
+                """
+                SELECT url, deal_rowid, status, content_hash, size, fetched_at
+                FROM html_snapshots
+                WHERE url = ?
+                ORDER BY fetched_at DESC, id DESC
+                LIMIT 1
+                """,
+                (url,),
+            ).fetchone()
+
+        return dict(row) if row else None
+
+    def fetch_archived_deals(self, source: str):
+        """
+        Active deals of a source with at least one archived detail page,
+        projected like fetch_deals_for_enrichment (replay mode).
+        """
+        col_sql = ", ".join(ENRICHMENT_COLUMNS)
+
+        with self.get_conn() as conn:
             return conn.execute(
                 f"""
                 SELECT {col_sql}
                 FROM deals
                 WHERE source = ?
-                  AND (status IS NULL OR status NOT IN ('Pass', 'Lost'))
-                  AND (
-                        needs_detail_refresh = 1
-                     OR detail_fetched_at IS NULL
-                     OR (
-                            status = 'Under Offer'
-                        AND detail_fetched_at < datetime('now', ?)
-                     )
-                     OR (
-                            (status IS NULL OR status != 'Under Offer')
-                        AND detail_fetched_at < datetime('now', ?)
-                     )
+                  AND {ACTIVE_STATUS_SQL}
+                  AND EXISTS (
+                      SELECT 1 FROM html_snapshots s WHERE s.deal_rowid = deals.id
                   )
                 ORDER BY source_listing_id;
                 """,
-                (
-                    source,
-                    f"-{under_offer_days} days",
-                    f"-{freshness_days} days",
-                ),
+                (source,),
             ).fetchall()
 
+    # ---------- INCREMENTAL CRAWL (see crawl_watermarks.py) ----------
+
+    def fetch_listing_ids(self, source: str) -> set[str]:
+        with self.get_conn() as conn:
+            rows = conn.execute(
+                "SELECT source_listing_id FROM deals WHERE source = ?",
+                (source,),
+            ).fetchall()
+        return {r[0] for r in rows}
+
+    def touch_last_seen(self, source: str, listing_ids) -> int:
+        """
+        Refresh last_seen for listings seen on an index page that the
+        crawler does not re-upsert.
+        """
+        now = now_iso()
+        with self.get_conn() as conn:
+            cur = conn.executemany(
+                """
+                UPDATE deals
+                SET last_seen = ?
+                WHERE source = ? AND source_listing_id = ?
+                """,
+                [(now, source, listing_id) for listing_id in listing_ids],
+            )
+        return cur.rowcount
+
+    def get_crawl_watermark(self, broker: str, scope: str = "all") -> dict | None:
+        with self.get_conn() as conn:
+            row = conn.execute(
+                """
+                SELECT broker, scope, newest_ids, ordering, last_full_sweep_at, updated_at
+                FROM crawl_watermarks
+                WHERE broker = ? AND scope = ?
+                """,
+                (broker, scope),
+            ).fetchone()
+        return dict(row) if row else None
+
+    def set_crawl_watermark(
+        self,
+        broker: str,
+        scope: str,
+        *,
+        newest_ids: str,
+        ordering: str,
+        full_sweep: bool,
+    ):
+        now = now_iso()
+        with self.get_conn() as conn:
+            conn.execute(
+                """
+                INSERT INTO crawl_watermarks (
+                    broker, scope, newest_ids, ordering, last_full_sweep_at, updated_at
+                )
+                VALUES (?, ?, ?, ?, ?, ?)
+                ON CONFLICT(broker, scope) DO UPDATE SET
+                    newest_ids = excluded.newest_ids,
+                    ordering = excluded.ordering,
+                    last_full_sweep_at = COALESCE(
+                        excluded.last_full_sweep_at,
+                        crawl_watermarks.last_full_sweep_at
+                    ),
+                    updated_at = excluded.updated_at
+                """,
+                (broker, scope, newest_ids, ordering, now if full_sweep else None, now),
+            )
+
     def find_primary_by_url(self, url: str) -> dict | None:
         """
         Find an existing PRIMARY deal matching a broker or source URL.
@@ -1,16 +1,26 @@
+-- =========================================================
+-- REFERENCE SNAPSHOT — NOT EXECUTED
+-- The authoritative schema is src/persistence/migrations.py.
+-- Add a migration there, then mirror the result here.
+-- Schema version: 8
+-- =========================================================
+
 -- =========================================================
 -- DEALS (index + detail lifecycle)
 -- =========================================================
 
 CREATE TABLE IF NOT EXISTS deals (
     id INTEGER PRIMARY KEY AUTOINCREMENT,
+    deal_id TEXT,
 
     source TEXT NOT NULL,
     source_listing_id TEXT NOT NULL,
     source_url TEXT,
+    identity_method TEXT,
 
     title TEXT,
     industry TEXT,
+    industry_raw TEXT,
     sector TEXT,
     sector_raw TEXT,
     sector_source TEXT,
@@ -19,26 +29,49 @@ CREATE TABLE IF NOT EXISTS deals (
 
     location TEXT,
     location_raw TEXT,
+    turnover_range_raw TEXT,
+    incorporation_year INTEGER,
 
     revenue_k REAL,
     ebitda_k REAL,
     asking_price_k REAL,
 
+    revenue_k_manual REAL,
+    ebitda_k_manual REAL,
+    asking_price_k_manual REAL,
+
     revenue_k_effective REAL,
     ebitda_k_effective REAL,
     asking_price_k_effective REAL,
 
-    revenue_k_manual REAL,
-    ebitda_k_manual REAL,
-    asking_price_k_manual REAL,
+    profit_margin_pct REAL,
+    revenue_growth_pct REAL,
+    leverage_pct REAL,
+    ebitda_margin REAL,
+    revenue_multiple REAL,
+    ebitda_multiple REAL,
 
     content_hash TEXT,
     description TEXT,
     description_hash TEXT,
     extracted_json TEXT,
 
+    decision TEXT,
+    decision_confidence TEXT,
+    reasons TEXT,
+    manual_decision TEXT,
+
+    status TEXT,
+    owner TEXT,
+    priority TEXT,
+    notes TEXT,
+    last_touch TEXT,
+    pass_reason TEXT,
+    lost_reason TEXT,
+
     drive_folder_id TEXT,
     drive_folder_url TEXT,
+    pdf_path TEXT,
     pdf_drive_url TEXT,
     pdf_generated_at DATETIME,
     pdf_error TEXT,
@@ -46,23 +79,165 @@ CREATE TABLE IF NOT EXISTS deals (
     needs_detail_refresh INTEGER DEFAULT 1,
     detail_fetched_at DATETIME,
     detail_fetch_reason TEXT,
-    lost_reason TEXT,
+    next_refresh_at TEXT,          -- maintained by triggers (enrichment_queue.py)
 
     canonical_external_id TEXT,
     broker_name TEXT,
     broker_listing_url TEXT,
-    source_role TEXT DEFAULT 'PRIMARY',
+    source_role TEXT DEFAULT 'PRIMARY',   -- PRIMARY | AGGREGATOR
 
+    added_at DATE,
     first_seen DATETIME,
     last_seen DATETIME,
     last_updated DATETIME,
     last_updated_source TEXT,
+    manual_imported_at TEXT,
 
     attributes TEXT,
 
     UNIQUE (source, source_listing_id)
 );
 
+CREATE UNIQUE INDEX IF NOT EXISTS ux_bb_source_url
+    ON deals(source, source_url) WHERE source = 'BusinessBuyers';
+CREATE UNIQUE INDEX IF NOT EXISTS ux_b4s_source_url
+    ON deals(source, source_url) WHERE source = 'BusinessesForSale';
+CREATE UNIQUE INDEX IF NOT EXISTS ux_tw_source_url
+    ON deals(source, source_url) WHERE source = 'transworld_uk';
+CREATE UNIQUE INDEX IF NOT EXISTS idx_deals_source_canonical_external_id
+    ON deals(source, canonical_external_id) WHERE canonical_external_id IS NOT NULL;
+
+CREATE INDEX IF NOT EXISTS idx_deals_deal_id ON deals(deal_id);
+CREATE INDEX IF NOT EXISTS idx_deals_source_url ON deals(source_url);
+CREATE INDEX IF NOT EXISTS idx_deals_broker_listing_url ON deals(broker_listing_url);
+
+CREATE INDEX IF NOT EXISTS idx_deals_enrichment_queue
+    ON deals(source, next_refresh_at)
+    WHERE (status IS NULL OR status NOT IN ('Pass', 'Lost'));
+
+-- triggers trg_deals_next_refresh_insert / trg_deals_next_refresh_update:
+-- see src/persistence/enrichment_queue.py
+
+-- triggers trg_deals_derived_financials_insert / _update keep
+-- *_effective, ebitda_margin, revenue_multiple, ebitda_multiple current:
+-- see src/persistence/derived_financials.py
+
+-- full-text index (external content, synced by trg_deals_fts_* triggers):
+-- see src/persistence/deal_search.py
+CREATE VIRTUAL TABLE IF NOT EXISTS deals_fts USING fts5(
+    title, description, sector_raw, location_raw,
+    content = 'deals',
+    content_rowid = 'id',
+    tokenize = 'trigram'
+);
+
+-- =========================================================
+-- CHANGE LOG (CDC) + CONSUMER CURSORS
+-- triggers trg_deals_changes_insert / _update / _delete:
+-- see src/persistence/change_log.py (bookkeeping-only updates not logged)
+-- =========================================================
+
+CREATE TABLE IF NOT EXISTS deal_changes (
+    seq               INTEGER PRIMARY KEY AUTOINCREMENT,
+    deal_rowid        INTEGER NOT NULL,
+    source            TEXT,
+    source_listing_id TEXT,
+    op                TEXT NOT NULL,          -- INSERT | UPDATE | DELETE
+    changed_columns   TEXT,                   -- ',col_a,col_b,' (UPDATE only)
+    changed_at        TEXT NOT NULL DEFAULT CURRENT_TIMESTAMP
+);
+
+CREATE INDEX IF NOT EXISTS idx_deal_changes_deal ON deal_changes(deal_rowid);
+
+CREATE TABLE IF NOT EXISTS change_cursors (
+    consumer   TEXT PRIMARY KEY,
+    last_seq   INTEGER NOT NULL,
+    updated_at TEXT NOT NULL
+);
+
+-- =========================================================
+-- DEAL ARTIFACTS (Drive files per deal)
+-- =========================================================
+
+CREATE TABLE IF NOT EXISTS deal_artifacts (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+
+    -- canonical broker identity (AUTHORITATIVE)
+    source TEXT NOT NULL,
+    source_listing_id TEXT NOT NULL,
+
+    -- optional convenience pointer (NON-AUTHORITATIVE)
+    deal_id INTEGER NULL,
+
+    artifact_type TEXT NOT NULL,     -- pdf, html, snapshot
+    artifact_name TEXT NOT NULL,
+    artifact_hash TEXT NOT NULL,
+
+    drive_file_id TEXT NOT NULL,
+    drive_url TEXT NOT NULL,
+
+    created_at DATETIME NOT NULL,
+    created_by TEXT NOT NULL,
+    extraction_version TEXT NULL,
+
+    UNIQUE (source, source_listing_id, artifact_type, artifact_hash)
+);
+
+CREATE INDEX IF NOT EXISTS idx_artifacts_lookup ON deal_artifacts(source, source_listing_id);
+CREATE INDEX IF NOT EXISTS idx_artifacts_deal_id ON deal_artifacts(deal_id);
+CREATE UNIQUE INDEX IF NOT EXISTS uniq_artifact_hash ON deal_artifacts(artifact_hash);
+
+-- =========================================================
+-- STATUS HISTORY (Sheets → SQLite pulls)
+-- =========================================================
+
+CREATE TABLE IF NOT EXISTS deal_status_history (
+    deal_id TEXT NOT NULL,
+    old_status TEXT,
+    new_status TEXT,
+    changed_at TEXT NOT NULL
+);
+
+CREATE INDEX IF NOT EXISTS idx_status_history_deal_id ON deal_status_history(deal_id);
+
+-- =========================================================
+-- INTERMEDIARIES
+-- =========================================================
+
+CREATE TABLE IF NOT EXISTS intermediaries (
+    intermediary_id TEXT PRIMARY KEY,
+    name TEXT,
+    website TEXT,
+    last_checked TEXT,
+    existing_relationship TEXT,
+    relationship_owner TEXT,
+    active TEXT,
+    sector_focus TEXT,
+    geography TEXT,
+    category TEXT,
+    notes TEXT,
+    description TEXT,
+    updated_at DATETIME
+);
+
+-- =========================================================
+-- WEEKLY PIPELINE SNAPSHOTS
+-- =========================================================
+
+CREATE TABLE IF NOT EXISTS pipeline_snapshots (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    snapshot_year INTEGER NOT NULL,
+    snapshot_week INTEGER NOT NULL,
+    snapshot_key TEXT NOT NULL,
+    industry TEXT NOT NULL,
+    status TEXT NOT NULL,
+    source TEXT NOT NULL,
+    deal_count INTEGER NOT NULL,
+    snapshot_run_date DATE NOT NULL
+);
+
+CREATE INDEX IF NOT EXISTS idx_pipeline_snapshots_key ON pipeline_snapshots(snapshot_key);
+
 -- =========================================================
 -- DAILY CLICK BUDGET TRACKING
 -- =========================================================
@@ -73,4 +248,46 @@ CREATE TABLE IF NOT EXISTS daily_clicks (
     clicks_used INTEGER NOT NULL,
 
     PRIMARY KEY (date, broker)
-);
\ No newline at end of file
+);
+
+-- =========================================================
+-- RAW HTML ARCHIVE MANIFEST (blobs: src/utils/html_archive.py)
+-- =========================================================
+
+CREATE TABLE IF NOT EXISTS html_snapshots (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    url TEXT NOT NULL,
+    deal_rowid INTEGER,
+    status INTEGER,
+    content_hash TEXT NOT NULL,
+    size INTEGER NOT NULL,
+    fetched_at TEXT NOT NULL
+);
+
+CREATE INDEX IF NOT EXISTS idx_html_snapshots_url ON html_snapshots(url, fetched_at);
+CREATE INDEX IF NOT EXISTS idx_html_snapshots_deal ON html_snapshots(deal_rowid, fetched_at);
+CREATE INDEX IF NOT EXISTS idx_html_snapshots_hash ON html_snapshots(content_hash);
+
+-- =========================================================
+-- INCREMENTAL INDEX CRAWL STATE (src/utils/incremental_crawl.py)
+-- =========================================================
+
+CREATE TABLE IF NOT EXISTS crawl_watermarks (
+    broker TEXT NOT NULL,
+    scope TEXT NOT NULL DEFAULT 'all',
+    newest_ids TEXT NOT NULL DEFAULT '[]',
+    ordering TEXT NOT NULL DEFAULT 'unknown',
+    last_full_sweep_at TEXT,
+    updated_at TEXT NOT NULL,
+    PRIMARY KEY (broker, scope)
+);
+
+-- =========================================================
+-- SCHEMA VERSION (single row, id = 1)
+-- =========================================================
+
+CREATE TABLE IF NOT EXISTS schema_version (
+    id INTEGER PRIMARY KEY CHECK (id = 1),
+    version INTEGER NOT NULL,
+    applied_at TEXT NOT NULL
+);
@@ -0,0 +1,228 @@
+# src/persistence/write_queue.py
+"""
+Write-behind queue: one writer thread per DB file, group commit.
+
+Producers (any thread) submit statements or callables and get a
+concurrent.futures.Future back; they never hold the write lock.
+The writer drains the queue into one transaction and commits when
+max_batch operations are pending or max_delay seconds have passed.
+
+- each operation runs in its own SAVEPOINT: a failing UPDATE is rolled
+  back alone and its future carries the exception; the rest commit
+- futures resolve only after COMMIT, so result() means durable
+- the queue is bounded: submit() blocks when max_pending is reached
+- close() (also at exit) flushes everything before stopping
+"""
+
+import atexit
+import queue
+import sqlite3
+import threading
+import time
+from concurrent.futures import Future
+from pathlib import Path
+
+from src.persistence.connection import get_connection_manager
+
+MAX_BATCH = 200
+MAX_DELAY = 0.5        # seconds
+MAX_PENDING = 1000
+
+_FLUSH = object()
+_STOP = object()
+
+
+def _execute(conn, sql, params, expect_rows):
+    cur = conn.execute(sql, params)
+    if expect_rows is not None and cur.rowcount != expect_rows:
+        raise RuntimeError(f"Expected {expect_rows} row, got {cur.rowcount}")
+    return cur.rowcount
+
+
+def report_failures(futures, label: str = "write") -> int:
+    """
+    Print every failed future (call after flush()). Returns the failure count.
+    """
+    failed = 0
+    for future in futures:
+        error = future.exception()
+        if error is not None:
+            failed += 1
+            print(f"❌ {label} failed: {error}")
+    return failed
+
+
+class WriteQueue:
+    def __init__(
+        self,
+        db_path: Path,
+        *,
+        max_batch: int = MAX_BATCH,
+        max_delay: float = MAX_DELAY,
+        max_pending: int = MAX_PENDING,
+    ):
+        self.db_path = Path(db_path)
+        self.max_batch = max_batch
+        self.max_delay = max_delay
+
+        self._queue: queue.Queue = queue.Queue(maxsize=max_pending)
+        self._connections = get_connection_manager(self.db_path)
+        self._lock = threading.Lock()
+        self._thread: threading.Thread | None = None
+
+    # ------------------------------------------------------------------
+    # PRODUCER API
+    # ------------------------------------------------------------------
+
+    def submit(self, sql: str, params=(), *, expect_rows: int | None = None) -> Future:
+        """
+        Queue one statement. The future resolves to its rowcount.
+        expect_rows: fail the operation (and roll it back) on any other rowcount.
+        """
+        return self.call(_execute, sql, params, expect_rows)
+
+    def call(self, fn, *args, **kwargs) -> Future:
+        """
+        Queue fn(conn, *args, **kwargs) as one atomic operation
+        (e.g. check-then-insert). Arguments are bound now, not when the
+        writer runs it. fn must not commit. The future resolves to its
+        return value.
+        """
+        future = Future()
+        self._ensure_started()
+        self._queue.put((lambda conn: fn(conn, *args, **kwargs), future))
+        return future
+
+    def flush(self, timeout: float | None = None):
+        """
+        Block until everything submitted so far is committed.
+        """
+        if self._thread is None:
+            return
+        done = Future()
+        self._queue.put((_FLUSH, done))
+        done.result(timeout)
+
+    def close(self):
+        """
+        Flush and stop the writer thread. A later submit() restarts it.
+        """
+        with self._lock:
+            thread, self._thread = self._thread, None
+        if thread is None:
+            return
+        self._queue.put((_STOP, None))
+        thread.join()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.close()
+        return False
+
+    # ------------------------------------------------------------------
+    # WRITER THREAD
+    # ------------------------------------------------------------------
+
+    def _ensure_started(self):
+        with self._lock:
+            if self._thread is None:
+                self._thread = threading.Thread(
+                    target=self._run,
+                    name=f"sqlite-writer:{self.db_path.name}",
+                    daemon=True,
+                )
+                self._thread.start()
+
+    def _run(self):
+        stopping = False
+
+        while not stopping:
+            item = self._queue.get()
+            batch, waiters = [], []
+            deadline = time.monotonic() + self.max_delay
+
+            while True:
+                fn, future = item
+                if fn is _STOP:
+                    stopping = True
+                elif fn is _FLUSH:
+                    waiters.append(future)
+                else:
+                    batch.append((fn, future))
+
+                if stopping or waiters or len(batch) >= self.max_batch:
+                    break
+                timeout = deadline - time.monotonic()
+                if timeout <= 0:
+                    break
+                try:
+                    item = self._queue.get(timeout=timeout)
+                except queue.Empty:
+                    break
+
+            batch = [(fn, f) for fn, f in batch if f.set_running_or_notify_cancel()]
+            if batch:
+                self._commit_batch(self._connections.connection(), batch)
+            for waiter in waiters:
+                waiter.set_result(None)
+
+    def _commit_batch(self, conn, batch):
+        results = []
+        try:
+            conn.execute("BEGIN IMMEDIATE")
+            for fn, future in batch:
+                conn.execute("SAVEPOINT write_op")
+                try:
+                    results.append((future, fn(conn), None))
+                    conn.execute("RELEASE write_op")
+                except Exception as e:
+                    conn.execute("ROLLBACK TO write_op")
+                    conn.execute("RELEASE write_op")
+                    results.append((future, None, e))
+            conn.commit()
+        except sqlite3.Error as e:
+            if conn.in_transaction:
+                conn.rollback()
+            print(f"⚠️ Write batch of {len(batch)} failed: {e}")
+            for _, future in batch:
+                future.set_exception(e)
+            return
+
+        for future, result, error in results:
+            if error is not None:
+                future.set_exception(error)
+            else:
+                future.set_result(result)
+
+
+# ------------------------------------------------------------------
+# PROCESS-WIDE REGISTRY
+# ------------------------------------------------------------------
+
+_QUEUES: dict[Path, WriteQueue] = {}
+_QUEUES_LOCK = threading.Lock()
+
+
+def get_write_queue(db_path: Path) -> WriteQueue:
+    """
+    Return the shared writer for db_path (one writer thread per DB file).
+    """
+    key = Path(db_path).resolve()
+    with _QUEUES_LOCK:
+        writer = _QUEUES.get(key)
+        if writer is None:
+            writer = WriteQueue(key)
+            _QUEUES[key] = writer
+        return writer
+
+
+# registered after connection.py's hook, so it runs first at exit:
+# queued writes are flushed before connections are checkpointed/closed
+@atexit.register
+def close_all_write_queues():
+    with _QUEUES_LOCK:
+        writers = list(_QUEUES.values())
+    for writer in writers:
+        writer.close()
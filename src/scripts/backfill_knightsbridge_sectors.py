@@ -1,6 +1,8 @@
-import sqlite3
 from pathlib import Path
 
+from src.persistence.deal_search import fts_any
+from src.persistence.repository import SQLiteRepository
+
 DB_PATH = Path(__file__).resolve().parents[2] / "db" / "deals.sqlite"
 
 FACILITIES_KEYWORDS = [
@@ -20,44 +22,57 @@ CONSTRUCTION_KEYWORDS = [
     "maintenance", "roof", "builder", "installation", "repair"
 ]
 
-def classify(title: str):
-    t = title.lower()
-
-    if any(k in t for k in FACILITIES_KEYWORDS):
-        return "Business_Services", "Facilities Management"
+RULES = [
+    {
+        "keywords": FACILITIES_KEYWORDS,
+        "industry": "Business_Services",
+        "sector": "Facilities Management",
+    },
+    {
+        "keywords": BUILDING_MATERIALS_KEYWORDS,
+        "industry": "Construction_Built_Environment",
+        "sector": "Building Materials",
+    },
+    {
+        "keywords": CONSTRUCTION_KEYWORDS,
+        "industry": "Construction_Built_Environment",
+        "sector": "Construction Contractors",
+    },
+]
 
-    if any(k in t for k in BUILDING_MATERIALS_KEYWORDS):
-        return "Construction_Built_Environment", "Building Materials"
+CANDIDATES_SQL = """
+    d.source = 'Knightsbridge'
+    AND d.detail_fetch_reason = 'MISSING_SECTOR_CANONICAL'
+"""
+
+
+def classify(repo) -> dict[int, tuple[str, str]]:
+    """
+    (industry, sector) per candidate deal, first matching rule wins.
+    One deals_fts title lookup per rule (trigram: substring match, like
+    the old `k in title.lower()`) instead of reading every title.
+    """
+    matches = {}
+    for rule in RULES:
+        for deal_id in repo.search_deals(
+            fts_any(rule["keywords"], columns=["title"]),
+            where=CANDIDATES_SQL,
+            limit=None,
+        ):
+            matches.setdefault(deal_id, (rule["industry"], rule["sector"]))
+    return matches
 
-    if any(k in t for k in CONSTRUCTION_KEYWORDS):
-        return "Construction_Built_Environment", "Construction Contractors"
 
-    return None, None
+def main():
+    repo = SQLiteRepository(DB_PATH)
 
+    matches = classify(repo)
+    total = repo.fetch_all(
+        f"SELECT COUNT(*) AS n FROM deals d WHERE {CANDIDATES_SQL}"
+    )[0]["n"]
 
-def main():
-    conn = sqlite3.connect(DB_PATH)
-    conn.row_factory = sqlite3.Row
-
-    rows = conn.execute(
-        """
-        SELECT id, title
-        FROM deals
-        WHERE source = 'Knightsbridge'
-          AND detail_fetch_reason = 'MISSING_SECTOR_CANONICAL'
-        """
-    ).fetchall()
-
-    updated = 0
-    skipped = 0
-
-    for r in rows:
-        industry, sector = classify(r["title"] or "")
-        if not industry:
-            skipped += 1
-            continue
-
-        conn.execute(
+    with repo.get_conn() as conn:
+        conn.executemany(
             """
             UPDATE deals
             SET industry                    = ?,
@@ -69,15 +84,11 @@ def main():
                 last_updated_source         = 'AUTO'
             WHERE id = ?
             """,
-            (industry, sector, r["id"]),
+            [(industry, sector, deal_id) for deal_id, (industry, sector) in matches.items()],
         )
-        updated += 1
-
-    conn.commit()
-    conn.close()
 
-    print(f"Updated: {updated}")
-    print(f"Skipped (no match): {skipped}")
+    print(f"Updated: {len(matches)}")
+    print(f"Skipped (no match): {total - len(matches)}")
 
 
 if __name__ == "__main__":
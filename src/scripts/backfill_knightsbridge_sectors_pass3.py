@@ -1,6 +1,8 @@
-import sqlite3
 from pathlib import Path
 
+from src.persistence.deal_search import fts_any
+from src.persistence.repository import SQLiteRepository
+
 DB_PATH = Path(__file__).resolve().parents[2] / "db" / "deals.sqlite"
 
 RULES = [
@@ -41,38 +43,41 @@ RULES = [
 ]
 
 
-def classify(title: str):
-    t = (title or "").lower()
+CANDIDATES_SQL = """
+    d.source = 'Knightsbridge'
+    AND d.detail_fetch_reason = 'MISSING_SECTOR_CANONICAL'
+    AND (d.industry IS NULL OR d.sector IS NULL)
+"""
+
+
+def classify(repo) -> dict[int, tuple[str, str]]:
+    """
+    (industry, sector) per candidate deal, first matching rule wins.
+    One deals_fts title lookup per rule (trigram: substring match, like
+    the old `k in title.lower()`) instead of reading every title.
+    """
+    matches = {}
     for rule in RULES:
-        if any(k in t for k in rule["keywords"]):
-            return rule["industry"], rule["sector"]
-    return None, None
+        for deal_id in repo.search_deals(
+            fts_any(rule["keywords"], columns=["title"]),
+            where=CANDIDATES_SQL,
+            limit=None,
+        ):
+            matches.setdefault(deal_id, (rule["industry"], rule["sector"]))
+    return matches
 
 
 def main():
-    conn = sqlite3.connect(DB_PATH)
-    conn.row_factory = sqlite3.Row
-
-    rows = conn.execute(
-        """
-        SELECT id, title
-        FROM deals
-        WHERE source = 'Knightsbridge'
-          AND detail_fetch_reason = 'MISSING_SECTOR_CANONICAL'
-          AND (industry IS NULL OR sector IS NULL)
-        """
-    ).fetchall()
-
-    updated = 0
-    skipped = 0
-
-    for r in rows:
-        industry, sector = classify(r["title"])
-        if not industry:
-            skipped += 1
-            continue
-
-        conn.execute("""
+    repo = SQLiteRepository(DB_PATH)
+
+    matches = classify(repo)
+    total = repo.fetch_all(
+        f"SELECT COUNT(*) AS n FROM deals d WHERE {CANDIDATES_SQL}"
+    )[0]["n"]
+
+    with repo.get_conn() as conn:
+        conn.executemany(
+            """
             UPDATE deals
             SET
                 industry                    = ?,
@@ -88,14 +93,12 @@ def main():
                 last_updated                = CURRENT_TIMESTAMP,
                 last_updated_source         = 'AUTO'
             WHERE id = ?
-        """, (industry, sector, r["id"] ))
-        updated += 1
-
-    conn.commit()
-    conn.close()
+            """,
+            [(industry, sector, deal_id) for deal_id, (industry, sector) in matches.items()],
+        )
 
-    print(f"Updated: {updated}")
-    print(f"Skipped (still unresolved): {skipped}")
+    print(f"Updated: {len(matches)}")
+    print(f"Skipped (still unresolved): {total - len(matches)}")
 
 
 if __name__ == "__main__":
@@ -1,17 +1,16 @@
 from pathlib import Path
-import time
-import random
 from typing import Optional
 
-from playwright.sync_api import sync_playwright
 
 from src.persistence.repository import SQLiteRepository
 from src.persistence.deal_artifacts import record_deal_artifact
+from src.persistence.write_queue import report_failures
 from src.integrations.drive_folders import get_drive_parent_folder_id
 from src.integrations.google_drive import (
     find_or_create_deal_folder,
     upload_pdf_to_drive,
 )
+from src.enrichment.async_runner import EnrichmentSpec, run_enrichment
 from src.utils.hash_utils import compute_file_hash
 
 # -------------------------------------------------
@@ -25,15 +24,34 @@ ABERCORN_EXTRACTION_VERSION = "v1-listing+im"
 PDF_ROOT = Path("/tmp/abercorn_pdfs")
 PDF_ROOT.mkdir(parents=True, exist_ok=True)
 
-SLEEP_BETWEEN = (1.5, 3.0)
 DRY_RUN = False
 
+IM_URL = "https://abercornbusinesssales.com/download-nda.php?id={ref}"
+PDF_MARGIN = {"top": "15mm", "bottom": "15mm"}
+MIN_PDF_BYTES = 10_000
+
 repo = SQLiteRepository(Path("db/deals.sqlite"))
 
 # -------------------------------------------------
 # ENRICHMENT
 # -------------------------------------------------
 
+def extract_abercorn_detail(deal: dict, html: str) -> dict:
+    # nothing parsed: the listing is archived as printed (PDF) + the IM
+    return {}
+
+
+def abercorn_pdf_path(deal: dict, fields: dict) -> Path:
+    return PDF_ROOT / f"{deal['source_listing_id']}-listing.pdf"
+
+
+def abercorn_downloads(deal: dict, fields: dict) -> list[tuple[str, Path]]:
+    ref = deal["source_listing_id"]
+    im_pdf_path = PDF_ROOT / f"{ref}.pdf"
+    im_pdf_path.unlink(missing_ok=True)  # persist() checks existence
+    return [(IM_URL.format(ref=ref), im_pdf_path)]
+
+
 def enrich_abercorn(limit: Optional[int] = None) -> None:
     deals = repo.fetch_deals_for_enrichment(source=SOURCE)
     if limit:
@@ -43,190 +61,162 @@ def enrich_abercorn(limit: Optional[int] = None) -> None:
     if not deals:
         return
 
-    conn = repo.get_conn()
-
-    with sync_playwright() as p:
-        browser = p.chromium.launch(headless=True)
-
-        try:
-            for i, deal in enumerate(deals, start=1):
-                ref = deal["source_listing_id"]
-                url = deal["source_url"]
-                title = deal["title"] or ""
-                industry = deal["industry"]
-
-                print(f"\n➡️ [{i}/{len(deals)}] {ref}")
-                print(url)
-
-                if not url or url.endswith("/#"):
-                    print("⚠️ Invalid listing URL — marking Lost")
-
-                    if not DRY_RUN:
-                        conn.execute(
-                            """
-                            UPDATE deals
-                            SET status = 'Lost',
-                                lost_reason = 'Invalid source URL',
-                                needs_detail_refresh = 0,
-                                detail_fetched_at = CURRENT_TIMESTAMP,
-                                last_updated = CURRENT_TIMESTAMP,
-                                last_updated_source = 'AUTO'
-                            WHERE id = ?
-                            """,
-                            (deal["id"],),
-                        )
-                        conn.commit()
-                    continue
-
-                context = browser.new_context(
-                    viewport={"width": 1280, "height": 900},
-                    user_agent=(
-                        "Mozilla/5.0 (Macintosh; Intel Mac OS X 10_15_7) "
-                        "AppleWebKit/537.36 (KHTML, like Gecko) "
-                        "Chrome/120.0.0.0 Safari/537.36"
-                    ),
+    # persist() runs on worker threads: group-committed writes only
+    writer = repo.writer
+    pending = []
+
+    valid = []
+    for deal in deals:
+        url = deal["source_url"]
+        if url and not url.endswith("/#"):
+            valid.append(deal)
+            continue
+
+        print(f"⚠️ {deal['source_listing_id']}: invalid listing URL — marking Lost")
+        if not DRY_RUN:
+            pending.append(writer.submit(
+                """
+                UPDATE deals
+                SET status = 'Lost',
+                    lost_reason = 'Invalid source URL',
+                    needs_detail_refresh = 0,
+                    detail_fetched_at = CURRENT_TIMESTAMP,
+                    last_updated = CURRENT_TIMESTAMP,
+                    last_updated_source = 'AUTO'
+                WHERE id = ?
+                """,
+                (deal["id"],),
+            ))
+
+    def persist(deal: dict, fields: dict, listing_pdf_path: Optional[Path]) -> None:
+        ref = deal["source_listing_id"]
+
+        # -------------------------------------------------
+        # DRIVE FOLDER (AUTHORITATIVE)
+        # -------------------------------------------------
+        if DRY_RUN:
+            deal_folder_id = "DRY_RUN"
+        else:
+            parent_folder_id = get_drive_parent_folder_id(
+                industry=deal["industry"],
+                broker=BROKER_NAME,
+            )
+            deal_folder_id = find_or_create_deal_folder(
+                parent_folder_id=parent_folder_id,
+                deal_id=ref,
+                deal_title=deal["title"] or "",
+            )
+
+            pending.append(writer.submit(
+                """
+                UPDATE deals
+                SET drive_folder_id = ?,
+                    drive_folder_url = 'https://drive.google.com/drive/folders/' || ?,
+                    last_updated = CURRENT_TIMESTAMP,
+                    last_updated_source = 'AUTO'
+                WHERE id = ?
+                """,
+                (deal_folder_id, deal_folder_id, deal["id"]),
+            ))
+
+        # -------------------------------------------------
+        # LISTING PAGE PDF
+        # -------------------------------------------------
+        if listing_pdf_path.exists() and listing_pdf_path.stat().st_size > MIN_PDF_BYTES:
+            listing_hash = compute_file_hash(listing_pdf_path)
+
+            if not DRY_RUN:
+                drive_url = upload_pdf_to_drive(
+                    local_path=listing_pdf_path,
+                    filename=f"{ref}-listing.pdf",
+                    folder_id=deal_folder_id,
                 )
 
-                try:
-                    page = context.new_page()
-                    page.goto(url, timeout=60_000, wait_until="domcontentloaded")
-
-                    # -------------------------------------------------
-                    # DRIVE FOLDER (AUTHORITATIVE)
-                    # -------------------------------------------------
-                    if DRY_RUN:
-                        deal_folder_id = "DRY_RUN"
-                    else:
-                        parent_folder_id = get_drive_parent_folder_id(
-                            industry=industry,
-                            broker=BROKER_NAME,
-                        )
-                        deal_folder_id = find_or_create_deal_folder(
-                            parent_folder_id=parent_folder_id,
-                            deal_id=ref,
-                            deal_title=title,
-                        )
-
-                        conn.execute(
-                            """
-                            UPDATE deals
-                            SET drive_folder_id = ?,
-                                drive_folder_url = 'https://drive.google.com/drive/folders/' || ?,
-                                last_updated = CURRENT_TIMESTAMP,
-                                last_updated_source = 'AUTO'
-                            WHERE id = ?
-                            """,
-                            (deal_folder_id, deal_folder_id, deal["id"]),
-                        )
-                        conn.commit()
-
-                    # -------------------------------------------------
-                    # LISTING PAGE PDF
-                    # -------------------------------------------------
-                    listing_pdf_path = PDF_ROOT / f"{ref}-listing.pdf"
-
-                    page.emulate_media(media="print")
-                    page.pdf(
-                        path=str(listing_pdf_path),
-                        format="A4",
-                        margin={"top": "15mm", "bottom": "15mm"},
-                        print_background=True,
-                    )
-
-                    if listing_pdf_path.exists() and listing_pdf_path.stat().st_size > 10_000:
-                        listing_hash = compute_file_hash(listing_pdf_path)
-
-                        if not DRY_RUN:
-                            drive_url = upload_pdf_to_drive(
-                                local_path=listing_pdf_path,
-                                filename=f"{ref}-listing.pdf",
-                                folder_id=deal_folder_id,
-                            )
-
-                            record_deal_artifact(
-                                conn=conn,
-                                source=SOURCE,
-                                source_listing_id=ref,
-                                deal_id=deal["id"],
-                                artifact_type="listing_pdf",
-                                artifact_name=f"{ref}-listing.pdf",
-                                artifact_hash=listing_hash,
-                                drive_file_id=drive_url.split("/d/")[1].split("/")[0],
-                                drive_url=drive_url,
-                                extraction_version=ABERCORN_EXTRACTION_VERSION,
-                                created_by="enrich_abercorn.py",
-                            )
-
-                        listing_pdf_path.unlink(missing_ok=True)
-
-                    # -------------------------------------------------
-                    # INFORMATION MEMORANDUM (IM)
-                    # -------------------------------------------------
-                    im_url = f"https://abercornbusinesssales.com/download-nda.php?id={ref}"
-                    response = context.request.get(im_url, timeout=60_000)
-
-                    if not response.ok:
-                        print("⚠️ IM download failed")
-                        continue
-
-                    im_pdf_path = PDF_ROOT / f"{ref}.pdf"
-                    im_pdf_path.write_bytes(response.body())
-
-                    if im_pdf_path.stat().st_size < 10_000:
-                        im_pdf_path.unlink(missing_ok=True)
-                        continue
-
-                    im_hash = compute_file_hash(im_pdf_path)
-
-                    if not DRY_RUN:
-                        im_drive_url = upload_pdf_to_drive(
-                            local_path=im_pdf_path,
-                            filename=f"{ref}.pdf",
-                            folder_id=deal_folder_id,
-                        )
-
-                        record_deal_artifact(
-                            conn=conn,
-                            source=SOURCE,
-                            source_listing_id=ref,
-                            deal_id=deal["id"],
-                            artifact_type="information_memorandum",
-                            artifact_name=f"{ref}.pdf",
-                            artifact_hash=im_hash,
-                            drive_file_id=im_drive_url.split("/d/")[1].split("/")[0],
-                            drive_url=im_drive_url,
-                            extraction_version=ABERCORN_EXTRACTION_VERSION,
-                            created_by="enrich_abercorn.py",
-                        )
-
-                        conn.execute(
-                            """
-                            UPDATE deals
-                            SET pdf_drive_url = ?,
-                                needs_detail_refresh = 0,
-                                detail_fetched_at = CURRENT_TIMESTAMP,
-                                last_updated = CURRENT_TIMESTAMP,
-                                last_updated_source = 'AUTO'
-                            WHERE id = ?
-                            """,
-                            (im_drive_url, deal["id"]),
-                        )
-                        conn.commit()
-
-                    im_pdf_path.unlink(missing_ok=True)
-                    print("✅ Listing + IM uploaded")
-
-                    time.sleep(random.uniform(*SLEEP_BETWEEN))
-
-                finally:
-                    context.close()
-
-        finally:
-            browser.close()
-            conn.close()
+                pending.append(writer.call(
+                    record_deal_artifact,
+                    source=SOURCE,
+                    source_listing_id=ref,
+                    deal_id=deal["id"],
+                    artifact_type="listing_pdf",
+                    artifact_name=f"{ref}-listing.pdf",
+                    artifact_hash=listing_hash,
+                    drive_file_id=drive_url.split("/d/")[1].split("/")[0],
+                    drive_url=drive_url,
+                    extraction_version=ABERCORN_EXTRACTION_VERSION,
+                    created_by="enrich_abercorn.py",
+                ))
+
+        listing_pdf_path.unlink(missing_ok=True)
+
+        # -------------------------------------------------
+        # INFORMATION MEMORANDUM (IM), fetched by the runner
+        # -------------------------------------------------
+        im_pdf_path = PDF_ROOT / f"{ref}.pdf"
+        if not im_pdf_path.exists():
+            print("⚠️ IM download failed")
+            return
+
+        if im_pdf_path.stat().st_size < MIN_PDF_BYTES:
+            im_pdf_path.unlink(missing_ok=True)
+            return
+
+        im_hash = compute_file_hash(im_pdf_path)
+
+        if not DRY_RUN:
+            im_drive_url = upload_pdf_to_drive(
+                local_path=im_pdf_path,
+                filename=f"{ref}.pdf",
+                folder_id=deal_folder_id,
+            )
+
+            pending.append(writer.call(
+                record_deal_artifact,
+                source=SOURCE,
+                source_listing_id=ref,
+                deal_id=deal["id"],
+                artifact_type="information_memorandum",
+                artifact_name=f"{ref}.pdf",
+                artifact_hash=im_hash,
+                drive_file_id=im_drive_url.split("/d/")[1].split("/")[0],
+                drive_url=im_drive_url,
+                extraction_version=ABERCORN_EXTRACTION_VERSION,
+                created_by="enrich_abercorn.py",
+            ))
+
+            pending.append(writer.submit(
+                """
+                UPDATE deals
+                SET pdf_drive_url = ?,
+                    needs_detail_refresh = 0,
+                    detail_fetched_at = CURRENT_TIMESTAMP,
+                    last_updated = CURRENT_TIMESTAMP,
+                    last_updated_source = 'AUTO'
+                WHERE id = ?
+                """,
+                (im_drive_url, deal["id"]),
+            ))
+
+        im_pdf_path.unlink(missing_ok=True)
+        print(f"✅ {ref}: listing + IM uploaded")
+
+    spec = EnrichmentSpec(
+        broker="Abercorn",
+        extract=extract_abercorn_detail,
+        persist=persist,
+        pdf_path=abercorn_pdf_path,
+        downloads=abercorn_downloads,
+        wait_until="domcontentloaded",
+        pdf_margin=PDF_MARGIN,
+    )
+
+    try:
+        run_enrichment(spec, valid, headless=True)
+    finally:
+        writer.flush()
+        report_failures(pending, "Abercorn DB write")
 
     print("\n🏁 Abercorn enrichment complete")
 
 
 if __name__ == "__main__":
-    enrich_abercorn()
\ No newline at end of file
+    enrich_abercorn()
@@ -7,20 +7,22 @@ Contract:
 - PDF + artifact creation
 - Deduplicate via canonical_external_id
 - DRY_RUN supported
+- --replay: re-extract from the HTML archive (no network, PDF or Drive)
 """
 import os
 import csv
 import re
 import time
-import random
 from pathlib import Path
 from datetime import datetime
 from typing import Optional
 
 from bs4 import BeautifulSoup
-from playwright.sync_api import sync_playwright, TimeoutError
+from playwright.sync_api import TimeoutError
 
 from src.persistence.repository import SQLiteRepository
+from src.persistence.write_queue import report_failures
+from src.enrichment.change_detection import UNCHANGED_SQL, content_unchanged, unchanged_params
 from src.persistence.deal_artifacts import record_deal_artifact
 from src.integrations.drive_folders import get_drive_parent_folder_id
 from src.integrations.google_drive import (
@@ -28,6 +30,14 @@ from src.integrations.google_drive import (
     upload_pdf_to_drive,
 )
 from src.utils.hash_utils import compute_content_hash, compute_file_hash
+from src.utils.html_archive import NotArchived, enable_replay, get_html_archive
+from src.utils.browser_pool import (
+    DEFAULT_USER_AGENT,
+    DEFAULT_VIEWPORT,
+    get_browser_pool,
+)
+from src.utils.rate_limit import polite_goto
+from src.utils.resource_policy import PDF_POLICY
 from src.utils.financial_normalization import _normalize_money_to_k
 from src.sector_mappings.bsr import BSR_SECTOR_MAP
 
@@ -43,7 +53,6 @@ PDF_ROOT = Path("/tmp/bsr_pdfs")
 PDF_ROOT.mkdir(parents=True, exist_ok=True)
 
 DETAIL_WAIT_SELECTOR = "body"
-SLEEP_BETWEEN = (2, 4)
 
 DRY_RUN = False
 HEADLESS = True
@@ -126,6 +135,108 @@ def is_bsr_sold_listing(soup: BeautifulSoup) -> bool:
     return any(p in h1_text for p in terminal_phrases)
 
 
+def resolve_bsr_sector(sector_raw: Optional[str]) -> tuple[str, str, float, str]:
+    if sector_raw:
+        mapping = BSR_SECTOR_MAP.get(sector_raw.lower())
+        if mapping:
+            return (
+                mapping["industry"],
+                mapping["sector"],
+                mapping["confidence"],
+                mapping["reason"],
+            )
+        return "Other", "Other", 0.4, f"BSR unmapped sector_raw: {sector_raw}"
+
+    return "Other", "Other", 0.4, "BSR listing without declared sector (explicit fallback)"
+
+
+# -------------------------------------------------
+# REPLAY
+# -------------------------------------------------
+
+def replay_bsr(conn, deals) -> None:
+    """
+    Re-run extraction over archived detail pages (html_archive.py).
+    Extracted fields only: no PDF, Drive, artifact or fetch time.
+    """
+    archive = get_html_archive()
+    replayed = 0
+
+    for deal in deals:
+        try:
+            _, html = archive.snapshot(deal["source_url"])
+        except NotArchived:
+            continue
+
+        soup = BeautifulSoup(html, "html.parser")
+        if is_bsr_sold_listing(soup):
+            continue
+
+        title_el = soup.select_one("h1")
+        title = title_el.get_text(strip=True) if title_el else None
+        canonical_external_id = extract_web_reference(soup)
+        if not title or not canonical_external_id:
+            continue
+
+        sector_raw = extract_bsr_sector_raw(soup)
+        industry, sector, sector_confidence, sector_reason = resolve_bsr_sector(sector_raw)
+        financials = extract_bsr_financials(soup)
+        location_raw = extract_location(soup)
+
+        content_hash = compute_content_hash(
+            title=title,
+            description=title,  # gated content
+            location=location_raw or "",
+            facts=financials,
+        )
+
+        if DRY_RUN:
+            print("🔍 DRY RUN", {"id": deal["id"], "sector_raw": sector_raw, **financials})
+            continue
+
+        conn.execute(
+            """
+            UPDATE deals
+            SET
+                title = ?,
+                location = ?,
+                sector_raw = ?,
+
+                industry = ?,
+                sector = ?,
+                sector_source = 'bsr',
+                sector_inference_confidence = ?,
+                sector_inference_reason = ?,
+
+                canonical_external_id = ?,
+                revenue_k = ?,
+                asking_price_k = ?,
+                content_hash = ?,
+                last_updated = CURRENT_TIMESTAMP,
+                last_updated_source = 'AUTO'
+            WHERE id = ?
+            """,
+            (
+                title,
+                location_raw,
+                sector_raw,
+                industry,
+                sector,
+                sector_confidence,
+                sector_reason,
+                canonical_external_id,
+                financials["revenue_k"],
+                financials["asking_price_k"],
+                content_hash,
+                deal["id"],
+            ),
+        )
+        replayed += 1
+
+    conn.commit()
+    print(f"📼 {replayed} BSR deals re-extracted")
+
+
 # -------------------------------------------------
 # MAIN
 # -------------------------------------------------
@@ -144,8 +255,15 @@ def enrich_bsr(
 
     repo = SQLiteRepository(DB_PATH)
     conn = repo.get_conn()
-
-    deals = repo.fetch_deals_for_enrichment(source=SOURCE)
+    # unchanged-content stamps: group-committed, no per-deal fsync
+    writer = repo.writer
+    pending = []
+
+    replay = enable_replay()
+    if replay:
+        deals = repo.fetch_archived_deals(SOURCE)
+    else:
+        deals = repo.fetch_deals_for_enrichment(source=SOURCE)
     if min_id is not None:
         deals = [d for d in deals if d["id"] >= min_id]
     if limit:
@@ -155,6 +273,13 @@ def enrich_bsr(
     if not deals:
         return
 
+    if replay:
+        try:
+            replay_bsr(conn, deals)
+        finally:
+            conn.close()
+        return
+
     captured_ids: set[str] = set()
     csv_file = None
     csv_writer = None
@@ -175,232 +300,221 @@ def enrich_bsr(
         if csv_mode == "w":
             csv_writer.writeheader()
 
-    with sync_playwright() as p:
-        browser = p.chromium.launch(headless=HEADLESS)
-
-        try:
-            for i, deal in enumerate(deals, start=1):
-                if time.time() - job_started_at > MAX_RUNTIME_SECONDS:
-                    print("⏱️ Max runtime reached, exiting cleanly")
-                    break
-                url = deal["source_url"]
-
-                print(f"\n➡️ [{i}/{len(deals)}]")
-                print(url)
-
-                context = browser.new_context(
-                    viewport={"width": 1280, "height": 900},
-                    user_agent=(
-                        "Mozilla/5.0 (Macintosh; Intel Mac OS X 10_15_7) "
-                        "AppleWebKit/537.36 (KHTML, like Gecko) "
-                        "Chrome/120.0.0.0 Safari/537.36"
-                    ),
-                )
-                page = context.new_page()
-
-                try:
-                    page.goto(url, timeout=60_000)
-                    page.wait_for_selector(DETAIL_WAIT_SELECTOR, timeout=20_000)
-                except TimeoutError:
-                    print("⚠️ Timeout")
-                    context.close()
-                    continue
-
-                soup = BeautifulSoup(page.content(), "html.parser")
-
-                if is_bsr_sold_listing(soup):
-                    print("🏁 SOLD / removed listing detected")
-
-                    if not DRY_RUN:
-                        conn.execute(
-                            """
-                            UPDATE deals
-                            SET status               = 'Lost',
-                                needs_detail_refresh = 0,
-                                last_updated         = CURRENT_TIMESTAMP,
-                                last_updated_source  = 'AUTO'
-                            WHERE id = ?
-                            """,
-                            (deal["id"],),
-                        )
-                        conn.commit()
-
-                    context.close()
-                    continue
-
-                title_el = soup.select_one("h1")
-                title = title_el.get_text(strip=True) if title_el else None
-
-                canonical_external_id = extract_web_reference(soup)
-                sector_raw = extract_bsr_sector_raw(soup)
-
-                # --- Canonical sector resolution (mandatory) ---
-                if sector_raw:
-                    mapping = BSR_SECTOR_MAP.get(sector_raw.lower())
-                    if mapping:
-                        industry = mapping["industry"]
-                        sector = mapping["sector"]
-                        sector_confidence = mapping["confidence"]
-                        sector_reason = mapping["reason"]
-                    else:
-                        industry = "Other"
-                        sector = "Other"
-                        sector_confidence = 0.4
-                        sector_reason = f"BSR unmapped sector_raw: {sector_raw}"
-                else:
-                    industry = "Other"
-                    sector = "Other"
-                    sector_confidence = 0.4
-                    sector_reason = "BSR listing without declared sector (explicit fallback)"
-
-                if not title or not canonical_external_id:
-                    print("⚠️ Missing critical fields")
-                    context.close()
+    pool = get_browser_pool()
+
+    try:
+        for i, deal in enumerate(deals, start=1):
+            if time.time() - job_started_at > MAX_RUNTIME_SECONDS:
+                print("⏱️ Max runtime reached, exiting cleanly")
+                break
+            url = deal["source_url"]
+
+            print(f"\n➡️ [{i}/{len(deals)}]")
+            print(url)
+
+            context = pool.new_context(
+                "BSR",
+                headless=HEADLESS,
+                viewport=DEFAULT_VIEWPORT,
+                user_agent=DEFAULT_USER_AGENT,
+                resource_policy=PDF_POLICY,  # page is printed
+            )
+            page = context.new_page()
+
+            try:
+                polite_goto(page, url, timeout=60_000)
+                page.wait_for_selector(DETAIL_WAIT_SELECTOR, timeout=20_000)
+            except TimeoutError:
+                print("⚠️ Timeout")
+                pool.release(context)
+                continue
+
+            soup = BeautifulSoup(page.content(), "html.parser")
+
+            if is_bsr_sold_listing(soup):
+                print("🏁 SOLD / removed listing detected")
+
+                if not DRY_RUN:
+                    conn.execute(
+                        """
+                        UPDATE deals
+                        SET status               = 'Lost',
+                            needs_detail_refresh = 0,
+                            last_updated         = CURRENT_TIMESTAMP,
+                            last_updated_source  = 'AUTO'
+                        WHERE id = ?
+                        """,
+                        (deal["id"],),
+                    )
+                    conn.commit()
+
+                pool.release(context)
+                continue
+
+            title_el = soup.select_one("h1")
+            title = title_el.get_text(strip=True) if title_el else None
+
+            canonical_external_id = extract_web_reference(soup)
+            sector_raw = extract_bsr_sector_raw(soup)
+
+            # --- Canonical sector resolution (mandatory) ---
+            industry, sector, sector_confidence, sector_reason = resolve_bsr_sector(sector_raw)
+
+            if not title or not canonical_external_id:
+                print("⚠️ Missing critical fields")
+                pool.release(context)
+                continue
+
+            if DRY_RUN:
+                if canonical_external_id in captured_ids:
+                    print("⏭ already captured, skipping")
+                    pool.release(context)
                     continue
 
-                if DRY_RUN:
-                    if canonical_external_id in captured_ids:
-                        print("⏭ already captured, skipping")
-                        context.close()
-                        continue
-
-                    print("🔍 DRY RUN – capture only")
-                    print({
-                        "canonical_external_id": canonical_external_id,
-                        "sector_raw": sector_raw,
-                    })
-
-                    csv_writer.writerow({
-                        "source_listing_id": canonical_external_id,
-                        "sector_raw": sector_raw,
-                    })
-                    csv_file.flush()
-                    captured_ids.add(canonical_external_id)
-
-                    context.close()
-                    continue
-
-                # ---------------- FULL ENRICHMENT (DRY_RUN=False) ----------------
-
-                kv = extract_kv_table(soup)
-                financials = extract_bsr_financials(soup)
-                location_raw = extract_location(soup)
-
-                content_hash = compute_content_hash(
-                    title=title,
-                    description=title,  # gated content
-                    location=location_raw or "",
-                )
-
-                pdf_path = PDF_ROOT / f"{canonical_external_id}.pdf"
-
-                page.add_style_tag(content="""
-                header, footer, nav, button, iframe,
-                .cookie-banner, .cta {
-                    display: none !important;
-                }
-                """)
-
-                page.wait_for_timeout(400)
-                page.emulate_media(media="print")
-
-                page.pdf(
-                    path=str(pdf_path),
-                    format="A4",
-                    print_background=True,
-                )
-
-                pdf_hash = compute_file_hash(pdf_path)
-
-                parent_folder_id = get_drive_parent_folder_id(
-                    industry=industry,
-                    broker="BusinessSaleReport",
-                )
-
-                deal_folder_id = find_or_create_deal_folder(
-                    parent_folder_id=parent_folder_id,
-                    deal_id=f"BSR-{canonical_external_id}",
-                    deal_title=title,
-                )
-
-                pdf_drive_url = upload_pdf_to_drive(
-                    local_path=pdf_path,
-                    filename=f"{canonical_external_id}.pdf",
-                    folder_id=deal_folder_id,
-                )
-
-                conn.execute(
-                    """
-                    UPDATE deals
-                    SET
-                        title = ?,
-                        location = ?,
-                        sector_raw = ?,
-                        
-                        industry = ?,
-                        sector = ?,
-                        sector_source = 'bsr',
-                        sector_inference_confidence = ?,
-                        sector_inference_reason = ?,
-                        
-                        canonical_external_id = ?,
-                        revenue_k = ?,
-                        asking_price_k = ?,
-                        content_hash = ?,
-                        drive_folder_id = ?,
-                        drive_folder_url =
-                          'https://drive.google.com/drive/folders/' || ?,
-                        detail_fetched_at = ?,
-                        needs_detail_refresh = 0,
-                        last_updated = CURRENT_TIMESTAMP,
-                        last_updated_source = 'AUTO'
-                    WHERE id = ?
-                    """,
-                    (
-                        title,
-                        location_raw,
-                        sector_raw,
-                        industry,
-                        sector,
-                        sector_confidence,
-                        sector_reason,
-                        canonical_external_id,
-                        financials["revenue_k"],
-                        financials["asking_price_k"],
-                        content_hash,
-                        deal_folder_id,
-                        deal_folder_id,
-                        datetime.utcnow().isoformat(),
-                        deal["id"],
-                    ),
-                )
-                conn.commit()
-
-                record_deal_artifact(
-                    conn=conn,
-                    source=SOURCE,
-                    source_listing_id=canonical_external_id,
-                    deal_id=deal["id"],
-                    artifact_type="pdf",
-                    artifact_name=f"{canonical_external_id}.pdf",
-                    artifact_hash=pdf_hash,
-                    drive_file_id=pdf_drive_url.split("/d/")[1].split("/")[0],
-                    drive_url=pdf_drive_url,
-                    extraction_version=BSR_EXTRACTION_VERSION,
-                    created_by="enrich_bsr.py",
-                )
-
-                pdf_path.unlink(missing_ok=True)
-
-                print("✅ Enriched")
-                context.close()
-                time.sleep(random.uniform(*SLEEP_BETWEEN))
-
-        finally:
-            browser.close()
-            conn.close()
-            if csv_file:
-                csv_file.close()
+                print("🔍 DRY RUN – capture only")
+                print({
+                    "canonical_external_id": canonical_external_id,
+                    "sector_raw": sector_raw,
+                })
+
+                csv_writer.writerow({
+                    "source_listing_id": canonical_external_id,
+                    "sector_raw": sector_raw,
+                })
+                csv_file.flush()
+                captured_ids.add(canonical_external_id)
+
+                pool.release(context)
+                continue
+
+            # ---------------- FULL ENRICHMENT (DRY_RUN=False) ----------------
+
+            kv = extract_kv_table(soup)
+            financials = extract_bsr_financials(soup)
+            location_raw = extract_location(soup)
+
+            content_hash = compute_content_hash(
+                title=title,
+                description=title,  # gated content
+                location=location_raw or "",
+                facts=financials,
+            )
+
+            if content_unchanged(deal, content_hash):
+                print("⏭️ Content unchanged — PDF / Drive / DB rewrite skipped")
+                pending.append(writer.submit(UNCHANGED_SQL, unchanged_params(deal["id"])))
+                pool.release(context)
+                continue
+
+            pdf_path = PDF_ROOT / f"{canonical_external_id}.pdf"
+
+            page.add_style_tag(content="""
+            header, footer, nav, button, iframe,
+            .cookie-banner, .cta {
+                display: none !important;
+            }
+            """)
+
+            page.wait_for_timeout(400)
+            page.emulate_media(media="print")
+
+            page.pdf(
+                path=str(pdf_path),
+                format="A4",
+                print_background=True,
+            )
+
+            pdf_hash = compute_file_hash(pdf_path)
+
+            parent_folder_id = get_drive_parent_folder_id(
+                industry=industry,
+                broker="BusinessSaleReport",
+            )
+
+            deal_folder_id = find_or_create_deal_folder(
+                parent_folder_id=parent_folder_id,
+                deal_id=f"BSR-{canonical_external_id}",
+                deal_title=title,
+            )
+
+            pdf_drive_url = upload_pdf_to_drive(
+                local_path=pdf_path,
+                filename=f"{canonical_external_id}.pdf",
+                folder_id=deal_folder_id,
+            )
+
+            conn.execute(
+                """
+                UPDATE deals
+                SET
+                    title = ?,
+                    location = ?,
+                    sector_raw = ?,
+                    
+                    industry = ?,
+                    sector = ?,
+                    sector_source = 'bsr',
+                    sector_inference_confidence = ?,
+                    sector_inference_reason = ?,
+                    
+                    canonical_external_id = ?,
+                    revenue_k = ?,
+                    asking_price_k = ?,
+                    content_hash = ?,
+                    drive_folder_id = ?,
+                    drive_folder_url =
+                      'https://drive.google.com/drive/folders/' || ?,
+                    detail_fetched_at = ?,
+                    needs_detail_refresh = 0,
+                    last_updated = CURRENT_TIMESTAMP,
+                    last_updated_source = 'AUTO'
+                WHERE id = ?
+                """,
+                (
+                    title,
+                    location_raw,
+                    sector_raw,
+                    industry,
+                    sector,
+                    sector_confidence,
+                    sector_reason,
+                    canonical_external_id,
+                    financials["revenue_k"],
+                    financials["asking_price_k"],
+                    content_hash,
+                    deal_folder_id,
+                    deal_folder_id,
+                    datetime.utcnow().isoformat(),
+                    deal["id"],
+                ),
+            )
+            conn.commit()
+
+            record_deal_artifact(
+                conn=conn,
+                source=SOURCE,
+                source_listing_id=canonical_external_id,
+                deal_id=deal["id"],
+                artifact_type="pdf",
+                artifact_name=f"{canonical_external_id}.pdf",
+                artifact_hash=pdf_hash,
+                drive_file_id=pdf_drive_url.split("/d/")[1].split("/")[0],
+                drive_url=pdf_drive_url,
+                extraction_version=BSR_EXTRACTION_VERSION,
+                created_by="enrich_bsr.py",
+            )
+
+            pdf_path.unlink(missing_ok=True)
+
+            print("✅ Enriched")
+            pool.release(context)
+
+    finally:
+        writer.flush()
+        report_failures(pending, "BSR unchanged stamp")
+        conn.close()
+        if csv_file:
+            csv_file.close()
 
     print("🏁 BSR enrichment complete")
 
@@ -1,5 +1,4 @@
 # src/scripts/enrich_businessbuyers.py
-import sqlite3
 from pathlib import Path
 from datetime import datetime
 import re
@@ -7,9 +6,9 @@ from typing import Optional
 
 from bs4 import BeautifulSoup
 
-from src.brokers.businessbuyers_client import BusinessBuyersClient
-from src.config import BB_USERNAME, BB_PASSWORD
+from src.enrichment.async_runner import EnrichmentSpec, run_enrichment
 from src.persistence.deal_artifacts import record_deal_artifact
+from src.persistence.write_queue import report_failures
 
 from src.integrations.drive_folders import get_drive_parent_folder_id
 from src.integrations.google_drive import (
@@ -29,6 +28,16 @@ PDF_ROOT = Path("/tmp/bb_pdfs")
 PDF_ROOT.mkdir(parents=True, exist_ok=True)
 BB_EXTRACTION_VERSION = "v1"
 
+# detail pages are fetched anonymously: no login, no saved session
+PRINT_CSS = """
+#onetrust-consent-sdk, .ot-sdk-container, [role="dialog"], .ReactModal__Overlay {
+    display: none !important;
+}
+body { overflow: visible !important; }
+"""
+PDF_MARGIN = {"top": "20mm", "bottom": "20mm", "left": "15mm", "right": "15mm"}
+MIN_PDF_BYTES = 10_000
+
 # -------------------------------------------------
 # LOST DETECTION
 # -------------------------------------------------
@@ -104,12 +113,38 @@ def _extract_price_k(soup: BeautifulSoup) -> Optional[int]:
 
     return int(m.group(1).replace(",", "")) // 1_000
 
+def extract_businessbuyers_detail(deal: dict, html: str) -> dict:
+    if is_businessbuyers_lost(html):
+        return {"lost": "listing_removed"}
+
+    soup = BeautifulSoup(html, "html.parser")
+
+    ref_id = _extract_ref_id(soup)
+    if not ref_id:
+        return {"lost": "ref_missing_assumed_lost"}
+
+    raw_sector = _extract_raw_sector(soup)
+    return {
+        "lost": None,
+        "ref_id": ref_id,
+        "title": _extract_title(soup) or deal["title"],
+        "description": _extract_description(soup),
+        "asking_price_k": _extract_price_k(soup),
+        "mapping": map_businessbuyers_sector(raw_sector=raw_sector),
+    }
+
+
+def businessbuyers_pdf_path(deal: dict, fields: dict) -> Optional[Path]:
+    if fields["lost"]:
+        return None
+    return PDF_ROOT / f"BB-{fields['ref_id']}.pdf"
+
 # -------------------------------------------------
 # DATABASE HELPER
 # -------------------------------------------------
 
-def _find_existing_ref_owner(conn, ref_id: str, current_row_id: int) -> Optional[int]:
-    row = conn.execute(
+def _find_existing_ref_owner(ref_id: str, current_row_id: int) -> Optional[int]:
+    rows = repo.fetch_all(
         """
         SELECT id
         FROM deals
@@ -118,8 +153,8 @@ def _find_existing_ref_owner(conn, ref_id: str, current_row_id: int) -> Optional
           AND id != ?
         """,
         (ref_id, current_row_id),
-    ).fetchone()
-    return row["id"] if row else None
+    )
+    return rows[0]["id"] if rows else None
 
 # -------------------------------------------------
 # ENRICHMENT
@@ -128,9 +163,6 @@ def _find_existing_ref_owner(conn, ref_id: str, current_row_id: int) -> Optional
 def enrich_businessbuyers(limit: Optional[int] = None) -> None:
     print(f"📀 SQLite DB path: {DB_PATH}")
 
-    conn = sqlite3.connect(DB_PATH)
-    conn.row_factory = sqlite3.Row
-
     rows = repo.fetch_deals_for_enrichment(
         source="BusinessBuyers",
     )
@@ -140,244 +172,203 @@ def enrich_businessbuyers(limit: Optional[int] = None) -> None:
 
     if not rows:
         print("✅ Nothing to enrich")
-        conn.close()
         return
 
-    bb = BusinessBuyersClient(
-        username=BB_USERNAME,
-        password=BB_PASSWORD,
-        click_budget=None,
-    )
-    bb.login()
-
-    try:
-        for r in rows:
-            row_id = r["id"]
-            url = r["source_url"]
-
-            print("\n➡️ Enriching BusinessBuyers deal")
-            print(url)
-
-            try:
-                html = bb.fetch_detail_anon_with_pdf(
-                    url,
-                    PDF_ROOT / "scratch.pdf",
-                )
-            except Exception as e:
-                print(f"⚠️ Fetch error — retry later: {e}")
-                conn.execute(
-                    "UPDATE deals SET detail_fetch_reason='fetch_error' WHERE id=?",
-                    (row_id,),
-                )
-                conn.commit()
-                continue
-
-            if is_businessbuyers_lost(html):
-                print("❌ Deal marked Lost (404 / removed)")
-                # Only fire Slack if this is a NEW transition
-                cur = conn.execute(
-                    """
-                    UPDATE deals
-                    SET status               = 'Lost',
-                        needs_detail_refresh = 0,
-                        detail_fetch_reason  = 'listing_removed',
-                        last_updated         = CURRENT_TIMESTAMP
-                    WHERE id = ?
-                      AND (status IS NULL OR status != 'Lost')
-                    """,
-                    (row_id,),
-                )
-
-                conn.commit()
-
-                if cur.rowcount != 1:
-                    from src.integrations.slack import SlackNotifier
-
-                    SlackNotifier().send_message(
-                        title="Deal marked Lost",
-                        text=(
-                            f"*Source:* BusinessBuyers\n"
-                            f"*URL:* {url}\n"
-                            f"*Reason:* listing removed (404)"
-                        ),
-                        level="warning",
-                    )
-
-                continue
-
-            soup = BeautifulSoup(html, "html.parser")
-
-            ref_id = _extract_ref_id(soup)
-            if not ref_id:
-                print("❌ REF missing — marking Lost")
-                conn.execute(
-                    """
-                    UPDATE deals
-                    SET status='Lost',
-                        needs_detail_refresh=0,
-                        detail_fetch_reason='ref_missing_assumed_lost',
-                        last_updated=CURRENT_TIMESTAMP,
-                        last_updated_source='AUTO'
-                    WHERE id=?
-                    """,
-                    (row_id,),
-                )
-                conn.commit()
-                continue
-
-            existing_owner_id = _find_existing_ref_owner(conn, ref_id, row_id)
-            if existing_owner_id:
-                conn.execute(
-                    """
-                    UPDATE deals
-                    SET needs_detail_refresh=0,
-                        detail_fetch_reason='duplicate_businessbuyers_ref'
-                    WHERE id=?
-                    """,
-                    (row_id,),
-                )
-                conn.commit()
-                continue
-
-            deal_identity = f"BB-{ref_id}"
-            pdf_path = PDF_ROOT / f"{deal_identity}.pdf"
-
-            try:
-                html = bb.fetch_detail_anon_with_pdf(url, pdf_path)
-            except Exception:
-                conn.execute(
-                    "UPDATE deals SET detail_fetch_reason='fetch_error_after_ref' WHERE id=?",
-                    (row_id,),
-                )
-                conn.commit()
-                continue
-
-            if is_businessbuyers_lost(html):
-                conn.execute(
-                    """
-                    UPDATE deals
-                    SET status='Lost',
-                        needs_detail_refresh=0,
-                        detail_fetch_reason='broker_confirmed_lost',
-                        last_updated=CURRENT_TIMESTAMP
-                    WHERE id=?
-                    """,
-                    (row_id,),
-                )
-                conn.commit()
-                continue
+    # persist() / on_error() run on worker threads: group-committed writes only
+    writer = repo.writer
+    pending = []
+
+    def on_error(deal: dict, exc: Exception) -> None:
+        print(f"⚠️ Fetch error — retry later: {exc}")
+        pending.append(writer.submit(
+            "UPDATE deals SET detail_fetch_reason='fetch_error' WHERE id=?",
+            (deal["id"],),
+        ))
+
+    def persist(deal: dict, fields: dict, pdf_path: Optional[Path]) -> None:
+        row_id = deal["id"]
+        url = deal["source_url"]
+
+        if fields["lost"] == "listing_removed":
+            print("❌ Deal marked Lost (404 / removed)")
+            # Only fire Slack if this is a NEW transition
+            marked = writer.submit(
+                """
+                UPDATE deals
+                SET status               = 'Lost',
+                    needs_detail_refresh = 0,
+                    detail_fetch_reason  = 'listing_removed',
+                    last_updated         = CURRENT_TIMESTAMP
+                WHERE id = ?
+                  AND (status IS NULL OR status != 'Lost')
+                """,
+                (row_id,),
+            )
 
-            if not pdf_path.exists() or pdf_path.stat().st_size < 10_000:
-                conn.execute(
-                    "UPDATE deals SET detail_fetch_reason='pdf_failed' WHERE id=?",
-                    (row_id,),
+            if marked.result() != 1:
+                from src.integrations.slack import SlackNotifier
+
+                SlackNotifier().send_message(
+                    title="Deal marked Lost",
+                    text=(
+                        f"*Source:* BusinessBuyers\n"
+                        f"*URL:* {url}\n"
+                        f"*Reason:* listing removed (404)"
+                    ),
+                    level="warning",
                 )
-                conn.commit()
-                continue
-
-            soup = BeautifulSoup(html, "html.parser")
+            return
 
-            title = _extract_title(soup) or r["title"]
-            description = _extract_description(soup)
-            asking_price_k = _extract_price_k(soup)
-
-            raw_sector = _extract_raw_sector(soup)
-            mapping = map_businessbuyers_sector(raw_sector=raw_sector)
-            sector_source = "broker" if mapping["confidence"] >= 0.9 else "unclassified"
-
-            parent_folder_id = get_drive_parent_folder_id(
-                industry=mapping["industry"],
-                broker="BusinessBuyers",
-            )
-
-            deal_folder_id = find_or_create_deal_folder(
-                parent_folder_id=parent_folder_id,
-                deal_id=deal_identity,
-                deal_title=title,
-                # month_prefix="2512"
-            )
+        if fields["lost"]:
+            print("❌ REF missing — marking Lost")
+            pending.append(writer.submit(
+                """
+                UPDATE deals
+                SET status='Lost',
+                    needs_detail_refresh=0,
+                    detail_fetch_reason='ref_missing_assumed_lost',
+                    last_updated=CURRENT_TIMESTAMP,
+                    last_updated_source='AUTO'
+                WHERE id=?
+                """,
+                (row_id,),
+            ))
+            return
 
-            pdf_drive_url = upload_pdf_to_drive(
-                local_path=pdf_path,
-                filename=f"{ref_id}.pdf",
-                folder_id=deal_folder_id,
-            )
-            pdf_hash = compute_file_hash(pdf_path)
-
-            record_deal_artifact(
-                conn=conn,
-                source="BusinessBuyers",
-                source_listing_id=ref_id,
-                deal_id=row_id,  # optional, fine to pass
-                artifact_type="pdf",
-                artifact_name=f"{ref_id}.pdf",
-                artifact_hash=pdf_hash,
-                drive_file_id=pdf_drive_url.split("/d/")[1].split("/")[0],
-                drive_url=pdf_drive_url,
-                extraction_version=BB_EXTRACTION_VERSION,
-                created_by="enrich_businessbuyers.py",
-            )
+        ref_id = fields["ref_id"]
 
+        if _find_existing_ref_owner(ref_id, row_id):
             pdf_path.unlink(missing_ok=True)
-
-            conn.execute(
+            pending.append(writer.submit(
                 """
                 UPDATE deals
-                SET source_listing_id           = ?,
-                    title                       = ?,
-                    description                 = ?,
-
-                    asking_price_k = CASE
-                        WHEN asking_price_k IS NULL THEN ?
-                        ELSE asking_price_k
-                    END,
-                    revenue_k                   = NULL,
-                    ebitda_k                    = NULL,
-
-                    industry                    = ?,
-                    sector                      = ?,
-                    sector_source               = ?,
-                    sector_inference_confidence = ?,
-                    sector_inference_reason     = ?,
-
-                    drive_folder_id             = ?,
-                    drive_folder_url            = 'https://drive.google.com/drive/folders/' || ?,
-                    pdf_drive_url               = ?,
-
-                    detail_fetched_at           = ?,
-                    needs_detail_refresh        = 0,
-                    last_updated                = CURRENT_TIMESTAMP,
-                    last_updated_source         = 'AUTO'
-                WHERE id = ?
+                SET needs_detail_refresh=0,
+                    detail_fetch_reason='duplicate_businessbuyers_ref'
+                WHERE id=?
                 """,
-                (
-                    ref_id,
-                    title,
-                    description,
-                    asking_price_k,
-
-                    mapping["industry"],
-                    mapping["sector"],
-                    sector_source,
-                    mapping["confidence"],
-                    mapping["reason"],
-
-                    deal_folder_id,
-                    deal_folder_id,
-                    pdf_drive_url,
-
-                    datetime.today().isoformat(),
-                    row_id,
-                ),
-            )
-            conn.commit()
-            print(f"✅ Enriched + uploaded ({deal_identity})")
+                (row_id,),
+            ))
+            return
 
+        if not pdf_path.exists() or pdf_path.stat().st_size < MIN_PDF_BYTES:
+            pdf_path.unlink(missing_ok=True)
+            pending.append(writer.submit(
+                "UPDATE deals SET detail_fetch_reason='pdf_failed' WHERE id=?",
+                (row_id,),
+            ))
+            return
+
+        deal_identity = f"BB-{ref_id}"
+        title = fields["title"]
+        mapping = fields["mapping"]
+        sector_source = "broker" if mapping["confidence"] >= 0.9 else "unclassified"
+
+        parent_folder_id = get_drive_parent_folder_id(
+            industry=mapping["industry"],
+            broker="BusinessBuyers",
+        )
+
+        deal_folder_id = find_or_create_deal_folder(
+            parent_folder_id=parent_folder_id,
+            deal_id=deal_identity,
+            deal_title=title,
+            # month_prefix="2512"
+        )
+
+        pdf_drive_url = upload_pdf_to_drive(
+            local_path=pdf_path,
+            filename=f"{ref_id}.pdf",
+            folder_id=deal_folder_id,
+        )
+        pdf_hash = compute_file_hash(pdf_path)
+
+        pending.append(writer.call(
+            record_deal_artifact,
+            source="BusinessBuyers",
+            source_listing_id=ref_id,
+            deal_id=row_id,  # optional, fine to pass
+            artifact_type="pdf",
+            artifact_name=f"{ref_id}.pdf",
+            artifact_hash=pdf_hash,
+            drive_file_id=pdf_drive_url.split("/d/")[1].split("/")[0],
+            drive_url=pdf_drive_url,
+            extraction_version=BB_EXTRACTION_VERSION,
+            created_by="enrich_businessbuyers.py",
+        ))
+
+        pdf_path.unlink(missing_ok=True)
+
+        pending.append(writer.submit(
+            """
+            UPDATE deals
+            SET source_listing_id           = ?,
+                title                       = ?,
+                description                 = ?,
+
+                asking_price_k = CASE
+                    WHEN asking_price_k IS NULL THEN ?
+                    ELSE asking_price_k
+                END,
+                revenue_k                   = NULL,
+                ebitda_k                    = NULL,
+
+                industry                    = ?,
+                sector                      = ?,
+                sector_source               = ?,
+                sector_inference_confidence = ?,
+                sector_inference_reason     = ?,
+
+                drive_folder_id             = ?,
+                drive_folder_url            = 'https://drive.google.com/drive/folders/' || ?,
+                pdf_drive_url               = ?,
+
+                detail_fetched_at           = ?,
+                needs_detail_refresh        = 0,
+                last_updated                = CURRENT_TIMESTAMP,
+                last_updated_source         = 'AUTO'
+            WHERE id = ?
+            """,
+            (
+                ref_id,
+                title,
+                fields["description"],
+                fields["asking_price_k"],
+
+                mapping["industry"],
+                mapping["sector"],
+                sector_source,
+                mapping["confidence"],
+                mapping["reason"],
+
+                deal_folder_id,
+                deal_folder_id,
+                pdf_drive_url,
+
+                datetime.today().isoformat(),
+                row_id,
+            ),
+        ))
+        print(f"✅ Enriched + uploaded ({deal_identity})")
+
+    spec = EnrichmentSpec(
+        broker="BusinessBuyers",
+        extract=extract_businessbuyers_detail,
+        persist=persist,
+        pdf_path=businessbuyers_pdf_path,
+        on_error=on_error,
+        wait_until="networkidle",
+        print_css=PRINT_CSS,
+        pdf_margin=PDF_MARGIN,
+    )
+
+    try:
+        run_enrichment(spec, rows, headless=True)
     finally:
-        conn.close()
+        writer.flush()
+        report_failures(pending, "BusinessBuyers DB write")
 
     print("\n🏁 BusinessBuyers enrichment complete")
 
 
 if __name__ == "__main__":
-    enrich_businessbuyers()
\ No newline at end of file
+    enrich_businessbuyers()
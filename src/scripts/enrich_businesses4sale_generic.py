@@ -27,6 +27,8 @@ from bs4 import BeautifulSoup
 from playwright.sync_api import sync_playwright, TimeoutError
 
 from src.persistence.repository import SQLiteRepository
+from src.persistence.write_queue import report_failures
+from src.enrichment.change_detection import UNCHANGED_SQL, content_unchanged, unchanged_params
 from src.persistence.deal_artifacts import record_deal_artifact
 from src.integrations.drive_folders import get_drive_parent_folder_id
 from src.integrations.google_drive import (
@@ -136,6 +138,9 @@ def enrich_businesses4sale_generic(limit: Optional[int] = None) -> None:
 
     repo = SQLiteRepository(DB_PATH)
     conn = repo.get_conn()
+    # unchanged-content stamps: group-committed, no per-deal fsync
+    writer = repo.writer
+    pending = []
 
     deals = repo.fetch_deals_for_enrichment(source=SOURCE)
     if limit:
@@ -216,8 +221,16 @@ def enrich_businesses4sale_generic(limit: Optional[int] = None) -> None:
                     title=title,
                     description=description,
                     location=location or "",
+                    facts=financials,
                 )
 
+                if content_unchanged(deal, content_hash):
+                    print("⏭️ Content unchanged — PDF / Drive / DB rewrite skipped")
+                    pending.append(writer.submit(UNCHANGED_SQL, unchanged_params(row_id)))
+                    skipped += 1
+                    context.close()
+                    continue
+
                 pdf_path = PDF_ROOT / f"{canonical_id}.pdf"
 
                 page.emulate_media(media="print")
@@ -319,6 +332,8 @@ def enrich_businesses4sale_generic(limit: Optional[int] = None) -> None:
 
         finally:
             browser.close()
+            writer.flush()
+            report_failures(pending, "BusinessesForSale_Generic unchanged stamp")
             conn.close()
 
     print(
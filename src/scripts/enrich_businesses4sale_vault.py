@@ -12,6 +12,8 @@ from bs4 import BeautifulSoup
 from playwright.sync_api import sync_playwright, TimeoutError
 
 from src.persistence.repository import SQLiteRepository
+from src.persistence.write_queue import report_failures
+from src.enrichment.change_detection import UNCHANGED_SQL, content_unchanged, unchanged_params
 from src.enrichment.financial_extractor import extract_financial_metrics
 from src.persistence.deal_artifacts import record_deal_artifact
 from src.integrations.drive_folders import get_drive_parent_folder_id
@@ -21,6 +23,7 @@ from src.integrations.google_drive import (
 )
 from src.utils.financial_normalization import _normalize_money_to_k, _normalize_pct, normalize_from_description
 from src.utils.hash_utils import compute_content_hash, compute_file_hash
+from src.utils.rate_limit import polite_goto
 
 # -------------------------------------------------
 # CONFIG
@@ -153,6 +156,9 @@ def enrich_businesses4sale(limit: Optional[int] = None) -> None:
 
     repo = SQLiteRepository(Path("db/deals.sqlite"))
     conn = repo.get_conn()
+    # unchanged-content stamps: group-committed, no per-deal fsync
+    writer = repo.writer
+    pending = []
 
     deals = repo.fetch_deals_for_enrichment(
         source="BusinessesForSale",
@@ -188,7 +194,7 @@ def enrich_businesses4sale(limit: Optional[int] = None) -> None:
                 )
                 page = context.new_page()
                 try:
-                    page.goto(url, timeout=60_000)
+                    polite_goto(page, url, timeout=60_000)  # archived (html_archive.py)
                     page.wait_for_selector(DETAIL_WAIT_SELECTOR, timeout=20_000)
                 except TimeoutError:
                     print("⚠️ Detail selector not found — marking UNKNOWN")
@@ -269,40 +275,6 @@ def enrich_businesses4sale(limit: Optional[int] = None) -> None:
                         context.close()
                         continue
 
-                # ---------------- PDF (clean + scoped) ----------------
-                pdf_path = PDF_ROOT / f"{mv_id}.pdf"
-
-                page.add_style_tag(content="""
-                body * { visibility: hidden !important; }
-                #hero, #hero *,
-                div.teaser-content, div.teaser-content * {
-                    visibility: visible !important;
-                }
-                header, footer, nav, button,
-                .cookie-banner, #onetrust-consent-sdk,
-                .cta, .back-link, aside, iframe {
-                    display: none !important;
-                }
-                """)
-
-                page.wait_for_timeout(500)
-                page.emulate_media(media="print")
-                if not DRY_RUN:
-                    page.pdf(
-                        path=str(pdf_path),
-                        format="A4",
-                        margin={
-                            "top": "15mm",
-                            "bottom": "15mm",
-                            "left": "15mm",
-                            "right": "15mm",
-                        },
-                        print_background=True,
-                    )
-
-                    if not pdf_path.exists() or pdf_path.stat().st_size < 10_000:
-                        raise RuntimeError("PDF generation failed")
-
                 # ---------------- Extract ----------------
                 title = text_or_none(soup.select_one("#hero h1"))
                 location = text_or_none(soup.select_one("#hero p.location"))
@@ -338,6 +310,13 @@ def enrich_businesses4sale(limit: Optional[int] = None) -> None:
                     title=title,
                     description=description,
                     location=location,
+                    facts={
+                        "revenue_k": revenue_k,
+                        "ebitda_k": ebitda_k,
+                        "profit_margin_pct": profit_margin_pct,
+                        "revenue_growth_pct": revenue_growth_pct,
+                        "leverage_pct": leverage_pct,
+                    },
                 )
                 # ---------- DRY RUN GUARD ----------
                 if DRY_RUN:
@@ -361,6 +340,46 @@ def enrich_businesses4sale(limit: Optional[int] = None) -> None:
                     context.close()
                     continue
 
+                if content_unchanged(deal, content_hash):
+                    print("⏭️ Content unchanged — PDF / Drive / DB rewrite skipped")
+                    pending.append(writer.submit(UNCHANGED_SQL, unchanged_params(row_id)))
+                    context.close()
+                    continue
+
+                # ---------------- PDF (clean + scoped) ----------------
+                pdf_path = PDF_ROOT / f"{mv_id}.pdf"
+
+                page.add_style_tag(content="""
+                body * { visibility: hidden !important; }
+                #hero, #hero *,
+                div.teaser-content, div.teaser-content * {
+                    visibility: visible !important;
+                }
+                header, footer, nav, button,
+                .cookie-banner, #onetrust-consent-sdk,
+                .cta, .back-link, aside, iframe {
+                    display: none !important;
+                }
+                """)
+
+                page.wait_for_timeout(500)
+                page.emulate_media(media="print")
+                if not DRY_RUN:
+                    page.pdf(
+                        path=str(pdf_path),
+                        format="A4",
+                        margin={
+                            "top": "15mm",
+                            "bottom": "15mm",
+                            "left": "15mm",
+                            "right": "15mm",
+                        },
+                        print_background=True,
+                    )
+
+                    if not pdf_path.exists() or pdf_path.stat().st_size < 10_000:
+                        raise RuntimeError("PDF generation failed")
+
                 if not DRY_RUN:
                     # ---------------- Drive ----------------
                     parent_folder_id = get_drive_parent_folder_id(
@@ -478,6 +497,8 @@ def enrich_businesses4sale(limit: Optional[int] = None) -> None:
 
         finally:
             browser.close()
+            writer.flush()
+            report_failures(pending, "BusinessesForSale unchanged stamp")
             conn.close()
 
     print("\n🏁 BusinessesForSale enrichment complete")
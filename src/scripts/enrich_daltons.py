@@ -7,26 +7,29 @@ Contract:
 - PDF + artifact creation
 - Deduplicate against broker PRIMARY deals
 - DRY_RUN supported
+- --replay: re-extract from the HTML archive (no network, PDF or Drive)
 """
 
 import csv
-import time
-import random
+import threading
 from pathlib import Path
 from datetime import datetime
 from typing import Optional
 
 from bs4 import BeautifulSoup
-from playwright.sync_api import sync_playwright, TimeoutError
 
 from src.persistence.repository import SQLiteRepository
 from src.persistence.deal_artifacts import record_deal_artifact
+from src.persistence.write_queue import report_failures
+from src.enrichment.async_runner import EnrichmentSpec, run_enrichment
+from src.enrichment.change_detection import UNCHANGED_SQL, content_unchanged, unchanged_params
 from src.integrations.drive_folders import get_drive_parent_folder_id
 from src.integrations.google_drive import (
     find_or_create_deal_folder,
     upload_pdf_to_drive,
 )
 from src.utils.hash_utils import compute_content_hash, compute_file_hash
+from src.utils.html_archive import enable_replay
 from src.sector_mappings.daltons import DALTONS_SECTOR_MAP
 
 # -------------------------------------------------
@@ -41,7 +44,7 @@ PDF_ROOT = Path("/tmp/daltons_pdfs")
 PDF_ROOT.mkdir(parents=True, exist_ok=True)
 
 DETAIL_WAIT_SELECTOR = "body"
-SLEEP_BETWEEN = (3, 6)
+# pacing / concurrency: BROKER_LIMITS["Daltons"] in async_runner.py
 
 DRY_RUN = 0 # os.getenv("DRY_RUN", "1") == "1"
 HEADLESS = True
@@ -92,6 +95,88 @@ def is_lost_listing(soup: BeautifulSoup) -> bool:
     return False
 
 
+# -------------------------------------------------
+# DETAIL PAGE
+# -------------------------------------------------
+
+PRINT_CSS = """
+header, footer, nav, button, iframe,
+.cookie-banner, .cta {
+    display: none !important;
+}
+"""
+
+
+def resolve_daltons_sector(sector_raw: Optional[str]) -> tuple[str, str, float, str]:
+    if not sector_raw:
+        # Daltons edge case: some hotel / overseas listings have no breadcrumbs
+        return "Other", "Other", 0.4, "Daltons listing without breadcrumb (Other)"
+
+    # split breadcrumbs and take SECOND level
+    crumbs = [c.strip().lower() for c in sector_raw.split(">")]
+
+    if len(crumbs) < 2:
+        raise RuntimeError(f"Unexpected Daltons breadcrumb: {sector_raw}")
+
+    sector_key = crumbs[1]
+
+    if sector_key not in DALTONS_SECTOR_MAP:
+        raise RuntimeError(f"Unmapped Daltons sector breadcrumb: {sector_key}")
+
+    industry = DALTONS_SECTOR_MAP[sector_key]
+
+    # Daltons does not provide a clean sub-sector → keep coarse
+    return industry, industry, 0.6, f"Daltons category: {sector_key}"
+
+
+def extract_daltons_detail(deal: dict, html: str) -> Optional[dict]:
+    soup = BeautifulSoup(html, "html.parser")
+
+    if is_lost_listing(soup):
+        print(f"⚠️ Lost listing: {deal['source_listing_id']}")
+        return {"lost": True}
+
+    title = soup.select_one("h1")
+    title = title.get_text(strip=True) if title else None
+
+    description = extract_description(soup)
+    sector_raw = extract_daltons_sector_raw(soup)
+    location = extract_location(soup)
+
+    # --- Canonical sector resolution (Daltons) ---
+    industry, sector, sector_confidence, sector_reason = resolve_daltons_sector(sector_raw)
+
+    if not title or not description:
+        print(f"⚠️ Incomplete content: {deal['source_listing_id']}")
+        return None
+
+    content_hash = compute_content_hash(
+        title=title,
+        description=description,
+        location=location or "",
+    )
+
+    return {
+        "lost": False,
+        "unchanged": content_unchanged(deal, content_hash),
+        "title": title,
+        "description": description,
+        "sector_raw": sector_raw,
+        "location": location,
+        "industry": industry,
+        "sector": sector,
+        "sector_confidence": sector_confidence,
+        "sector_reason": sector_reason,
+        "content_hash": content_hash,
+    }
+
+
+def daltons_pdf_path(deal: dict, fields: dict) -> Optional[Path]:
+    if DRY_RUN or fields["lost"] or fields["unchanged"]:
+        return None
+    return PDF_ROOT / f"{deal['source_listing_id']}.pdf"
+
+
 # -------------------------------------------------
 # MAIN
 # -------------------------------------------------
@@ -101,9 +186,12 @@ def enrich_daltons(limit: Optional[int] = None) -> None:
     print(f"🏷️ Daltons enrichment starting | DRY_RUN={DRY_RUN}")
 
     repo = SQLiteRepository(DB_PATH)
-    conn = repo.get_conn()
 
-    deals = repo.fetch_deals_for_enrichment(source=SOURCE)
+    replay = enable_replay()
+    if replay:
+        deals = repo.fetch_archived_deals(SOURCE)
+    else:
+        deals = repo.fetch_deals_for_enrichment(source=SOURCE)
     if limit:
         deals = deals[:limit]
 
@@ -114,6 +202,7 @@ def enrich_daltons(limit: Optional[int] = None) -> None:
     captured_ids: set[str] = set()
     csv_file = None
     csv_writer = None
+    csv_lock = threading.Lock()
 
     if DRY_RUN:
         if CAPTURE_CSV.exists():
@@ -131,233 +220,190 @@ def enrich_daltons(limit: Optional[int] = None) -> None:
         if csv_mode == "w":
             csv_writer.writeheader()
 
-    with sync_playwright() as p:
-        browser = p.chromium.launch(headless=HEADLESS)
-
-        try:
-            for i, deal in enumerate(deals, start=1):
-                row_id = deal["id"]
-                url = deal["source_url"]
-                listing_id = deal["source_listing_id"]
-                if DRY_RUN and listing_id in captured_ids:
-                    print("⏭ already captured, skipping")
-                    continue
-
-                print(f"\n➡️ [{i}/{len(deals)}] {listing_id}")
-                print(url)
-
-                context = browser.new_context(
-                    viewport={"width": 1280, "height": 900},
-                    user_agent=(
-                        "Mozilla/5.0 (Macintosh; Intel Mac OS X 10_15_7) "
-                        "AppleWebKit/537.36 (KHTML, like Gecko) "
-                        "Chrome/120.0.0.0 Safari/537.36"
-                    ),
-                )
-                page = context.new_page()
-
-                try:
-                    page.goto(url, timeout=60_000)
-                    page.wait_for_selector(DETAIL_WAIT_SELECTOR, timeout=20_000)
-                except TimeoutError:
-                    print("⚠️ Timeout")
-                    context.close()
-                    continue
-
-                soup = BeautifulSoup(page.content(), "html.parser")
-
-                if is_lost_listing(soup):
-                    print("⚠️ Lost listing")
-                    if not DRY_RUN:
-                        conn.execute(
-                            """
-                            UPDATE deals
-                            SET status = 'Lost',
-                                needs_detail_refresh = 0,
-                                detail_fetched_at = CURRENT_TIMESTAMP,
-                                last_updated = CURRENT_TIMESTAMP,
-                                last_updated_source = 'AUTO'
-                            WHERE id = ?
-                            """,
-                            (row_id,),
-                        )
-                        conn.commit()
-                    context.close()
-                    continue
-
-                title = soup.select_one("h1")
-                title = title.get_text(strip=True) if title else None
-
-                description = extract_description(soup)
-                sector_raw = extract_daltons_sector_raw(soup)
-                location = extract_location(soup)
-
-                # --- Canonical sector resolution (Daltons) ---
-                if not sector_raw:
-                    # Daltons edge case: some hotel / overseas listings have no breadcrumbs
-                    industry = "Other"
-                    sector = "Other"
-                    sector_confidence = 0.4
-                    sector_reason = "Daltons listing without breadcrumb (Other)"
-                else:
-                    # split breadcrumbs and take SECOND level
-                    crumbs = [c.strip().lower() for c in sector_raw.split(">")]
-
-                    if len(crumbs) < 2:
-                        raise RuntimeError(f"Unexpected Daltons breadcrumb: {sector_raw}")
-
-                    sector_key = crumbs[1]
-
-                    if sector_key not in DALTONS_SECTOR_MAP:
-                        raise RuntimeError(f"Unmapped Daltons sector breadcrumb: {sector_key}")
-
-                    industry = DALTONS_SECTOR_MAP[sector_key]
-
-                    # Daltons does not provide a clean sub-sector → keep coarse
-                    sector = industry
-
-                    sector_confidence = 0.6
-                    sector_reason = f"Daltons category: {sector_key}"
-
-                if not title or not description:
-                    print("⚠️ Incomplete content")
-                    context.close()
-                    continue
-
-                content_hash = compute_content_hash(
-                    title=title,
-                    description=description,
-                    location=location or "",
-                )
-
-                # ---------------- PDF ----------------
-                pdf_path = PDF_ROOT / f"{listing_id}.pdf"
-
-                page.add_style_tag(content="""
-                header, footer, nav, button, iframe,
-                .cookie-banner, .cta {
-                    display: none !important;
-                }
-                """)
-
-                page.wait_for_timeout(500)
-                page.emulate_media(media="print")
-
-                if DRY_RUN:
-                    print("🔍 DRY RUN – PDF / Drive / DB skipped")
-                    print("sector_raw:", sector_raw)
-                    print("industry:", industry)
-
-                    csv_writer.writerow({
-                        "source_listing_id": listing_id,
-                        "sector_raw": sector_raw,
-                    })
-                    csv_file.flush()
-                    captured_ids.add(listing_id)
-
-                    context.close()
-                    continue
-
-                page.pdf(
-                    path=str(pdf_path),
-                    format="A4",
-                    print_background=True,
-                )
-
-                pdf_hash = compute_file_hash(pdf_path)
-
-                # ---------------- Drive ----------------
-                parent_folder_id = get_drive_parent_folder_id(
-                    industry=industry,
-                    broker="Daltons",
-                )
-
-                deal_folder_id = find_or_create_deal_folder(
-                    parent_folder_id=parent_folder_id,
-                    deal_id=f"DAL-{listing_id}",
-                    deal_title=title,
-                )
-
-                pdf_drive_url = upload_pdf_to_drive(
-                    local_path=pdf_path,
-                    filename=f"{listing_id}.pdf",
-                    folder_id=deal_folder_id,
-                )
-
-                # ---------------- DB UPDATE ----------------
-                conn.execute(
+        deals = [d for d in deals if d["source_listing_id"] not in captured_ids]
+
+    # persist() runs on worker threads: group-committed writes only
+    writer = repo.writer
+    pending = []
+
+    def persist(deal: dict, fields: dict, pdf_path: Optional[Path]) -> None:
+        row_id = deal["id"]
+        listing_id = deal["source_listing_id"]
+
+        if fields["lost"]:
+            if not DRY_RUN and not replay:
+                pending.append(writer.submit(
                     """
                     UPDATE deals
-                    SET
-                        title = ?,
-                        description = ?,
-                        sector_raw = ?,
-                        
-                        industry = ?,
-                        sector = ?,
-                        sector_source = 'daltons',
-                        sector_inference_confidence = ?,
-                        sector_inference_reason = ?,
-                        
-                        location = ?,
-                        content_hash = ?,
-
-                        drive_folder_id = ?,
-                        drive_folder_url =
-                          'https://drive.google.com/drive/folders/' || ?,
-
-                        detail_fetched_at = ?,
+                    SET status = 'Lost',
                         needs_detail_refresh = 0,
+                        detail_fetched_at = CURRENT_TIMESTAMP,
                         last_updated = CURRENT_TIMESTAMP,
                         last_updated_source = 'AUTO'
                     WHERE id = ?
                     """,
-                    (
-                        title,
-                        description,
-                        sector_raw,
-                        industry,
-                        sector,
-                        sector_confidence,
-                        sector_reason,
-                        location,
-                        content_hash,
-                        deal_folder_id,
-                        deal_folder_id,
-                        datetime.utcnow().isoformat(),
-                        row_id,
-                    ),
-                )
-                conn.commit()
-
-                record_deal_artifact(
-                    conn=conn,
-                    source=SOURCE,
-                    source_listing_id=listing_id,
-                    deal_id=row_id,
-                    artifact_type="pdf",
-                    artifact_name=f"{listing_id}.pdf",
-                    artifact_hash=pdf_hash,
-                    drive_file_id=pdf_drive_url.split("/d/")[1].split("/")[0],
-                    drive_url=pdf_drive_url,
-                    extraction_version=DALTONS_EXTRACTION_VERSION,
-                    created_by="enrich_daltons.py",
-                )
-
-                pdf_path.unlink(missing_ok=True)
-
-                print("✅ Enriched")
-                context.close()
-                time.sleep(random.uniform(*SLEEP_BETWEEN))
-
-        finally:
-            browser.close()
-            conn.close()
-            if csv_file:
-                csv_file.close()
+                    (row_id,),
+                ))
+            return
+
+        if DRY_RUN:
+            print("🔍 DRY RUN – PDF / Drive / DB skipped")
+            print("sector_raw:", fields["sector_raw"])
+            print("industry:", fields["industry"])
+
+            with csv_lock:
+                csv_writer.writerow({
+                    "source_listing_id": listing_id,
+                    "sector_raw": fields["sector_raw"],
+                })
+                csv_file.flush()
+            return
+
+        if fields["unchanged"] and not replay:
+            print(f"⏭️ Unchanged {listing_id} — PDF / Drive / DB rewrite skipped")
+            pending.append(writer.submit(UNCHANGED_SQL, unchanged_params(row_id)))
+            return
+
+        if replay:
+            # archived HTML: extracted fields only, no PDF / Drive / fetch time
+            pending.append(writer.submit(
+                """
+                UPDATE deals
+                SET
+                    title = ?,
+                    description = ?,
+                    sector_raw = ?,
+
+                    industry = ?,
+                    sector = ?,
+                    sector_source = 'daltons',
+                    sector_inference_confidence = ?,
+                    sector_inference_reason = ?,
+
+                    location = ?,
+                    content_hash = ?,
+
+                    last_updated = CURRENT_TIMESTAMP,
+                    last_updated_source = 'AUTO'
+                WHERE id = ?
+                """,
+                (
+                    fields["title"],
+                    fields["description"],
+                    fields["sector_raw"],
+                    fields["industry"],
+                    fields["sector"],
+                    fields["sector_confidence"],
+                    fields["sector_reason"],
+                    fields["location"],
+                    fields["content_hash"],
+                    row_id,
+                ),
+            ))
+            print(f"📼 Re-extracted {listing_id}")
+            return
+
+        pdf_hash = compute_file_hash(pdf_path)
+
+        # ---------------- Drive ----------------
+        parent_folder_id = get_drive_parent_folder_id(
+            industry=fields["industry"],
+            broker="Daltons",
+        )
+
+        deal_folder_id = find_or_create_deal_folder(
+            parent_folder_id=parent_folder_id,
+            deal_id=f"DAL-{listing_id}",
+            deal_title=fields["title"],
+        )
+
+        pdf_drive_url = upload_pdf_to_drive(
+            local_path=pdf_path,
+            filename=f"{listing_id}.pdf",
+            folder_id=deal_folder_id,
+        )
+
+        # ---------------- DB UPDATE ----------------
+        pending.append(writer.submit(
+            """
+            UPDATE deals
+            SET
+                title = ?,
+                description = ?,
+                sector_raw = ?,
+
+                industry = ?,
+                sector = ?,
+                sector_source = 'daltons',
+                sector_inference_confidence = ?,
+                sector_inference_reason = ?,
+
+                location = ?,
+                content_hash = ?,
+
+                drive_folder_id = ?,
+                drive_folder_url =
+                  'https://drive.google.com/drive/folders/' || ?,
+
+                detail_fetched_at = ?,
+                needs_detail_refresh = 0,
+                last_updated = CURRENT_TIMESTAMP,
+                last_updated_source = 'AUTO'
+            WHERE id = ?
+            """,
+            (
+                fields["title"],
+                fields["description"],
+                fields["sector_raw"],
+                fields["industry"],
+                fields["sector"],
+                fields["sector_confidence"],
+                fields["sector_reason"],
+                fields["location"],
+                fields["content_hash"],
+                deal_folder_id,
+                deal_folder_id,
+                datetime.utcnow().isoformat(),
+                row_id,
+            ),
+        ))
+
+        pending.append(writer.call(
+            record_deal_artifact,
+            source=SOURCE,
+            source_listing_id=listing_id,
+            deal_id=row_id,
+            artifact_type="pdf",
+            artifact_name=f"{listing_id}.pdf",
+            artifact_hash=pdf_hash,
+            drive_file_id=pdf_drive_url.split("/d/")[1].split("/")[0],
+            drive_url=pdf_drive_url,
+            extraction_version=DALTONS_EXTRACTION_VERSION,
+            created_by="enrich_daltons.py",
+        ))
+
+        pdf_path.unlink(missing_ok=True)
+        print(f"✅ Enriched {listing_id}")
+
+    spec = EnrichmentSpec(
+        broker="Daltons",
+        extract=extract_daltons_detail,
+        persist=persist,
+        pdf_path=daltons_pdf_path,
+        wait_selector=DETAIL_WAIT_SELECTOR,
+        print_css=PRINT_CSS,
+    )
+
+    try:
+        run_enrichment(spec, deals, headless=HEADLESS)
+    finally:
+        writer.flush()
+        report_failures(pending, "Daltons DB write")
+        if csv_file:
+            csv_file.close()
 
     print("🏁 Daltons enrichment complete")
 
 
 if __name__ == "__main__":
-    enrich_daltons()
\ No newline at end of file
+    enrich_daltons()
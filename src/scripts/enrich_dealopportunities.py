@@ -1,23 +1,18 @@
-import sqlite3
-import time
-import random
 import hashlib
-import json
 from datetime import datetime
 from pathlib import Path
 
 from bs4 import BeautifulSoup
-from playwright._impl._errors import Error as PlaywrightError
 
-from src.brokers.dealopportunities_client import DealOpportunitiesClient
+from src.enrichment.async_runner import EnrichmentSpec, run_enrichment
 from src.sector_mappings.dealopportunities import map_dealopportunities_sector
 from src.integrations.drive_folders import get_drive_parent_folder_id
 from src.integrations.google_drive import (
-    get_drive_service,
     find_or_create_deal_folder,
     upload_pdf_to_drive,
 )
 from src.persistence.repository import SQLiteRepository
+from src.persistence.write_queue import report_failures
 
 # =========================================================
 # CONFIG (unchanged behavior)
@@ -29,22 +24,23 @@ PDF_ROOT = Path("/tmp/do_pdfs")
 PDF_ROOT.mkdir(parents=True, exist_ok=True)
 
 MAX_RUNTIME = 60 * 60            # GitHub-safe
-BROWSER_RESET_EVERY = 25
+# pacing / concurrency: BROKER_LIMITS["DealOpportunities"] in async_runner.py
 
-HUMAN_SLEEP_BASE = 4            # protection layer 3
-HUMAN_SLEEP_JITTER = 4
+PRINT_CSS = """
+div[role="dialog"] {
+    display: none !important;
+}
+"""
+PDF_MARGIN = {"top": "20mm", "bottom": "20mm", "left": "15mm", "right": "15mm"}
 
 DRY_RUN = False
 
 REENRICH_ADDED_ONLY = False
 
 # =========================================================
-# HUMAN THROTTLING (layer 3)
+# LOST DETECTION
 # =========================================================
 
-def human_sleep():
-    time.sleep(HUMAN_SLEEP_BASE + random.random() * HUMAN_SLEEP_JITTER)
-
 def is_do_lost(html: str) -> bool:
     text = html.lower()
     return any(p in text for p in [
@@ -101,6 +97,46 @@ def extract_do_title(html: str) -> str | None:
     return None
 
 
+def parse_added_at(raw_added: str | None):
+    if not raw_added:
+        return None
+    try:
+        return datetime.strptime(raw_added, "%d %B %Y").date()
+    except ValueError:
+        print(f"⚠️ Could not parse Added date: {raw_added}")
+        return None
+
+
+def extract_dealopportunities_detail(deal: dict, html: str) -> dict:
+    if is_do_lost(html):
+        return {"lost": "Listing no longer available"}
+
+    parsed = parse_do_detail(html)
+    added_at = parse_added_at(parsed["facts"].get("added_at_raw"))
+    if REENRICH_ADDED_ONLY:
+        return {"lost": None, "added_at": added_at}
+
+    page_title = extract_do_title(html)
+    description = parsed["description"]
+    if not description and not page_title:
+        return {"lost": "Empty or invalid detail page"}
+
+    return {
+        "lost": None,
+        "added_at": added_at,
+        "title": page_title or deal["title"],
+        "description": description,
+        "location_raw": parsed["facts"].get("location"),
+        "content_hash": hashlib.sha256(html.encode()).hexdigest(),
+    }
+
+
+def dealopportunities_pdf_path(deal: dict, fields: dict) -> Path | None:
+    if fields["lost"] or REENRICH_ADDED_ONLY:
+        return None
+    return PDF_ROOT / f"{deal['source_listing_id']}.pdf"
+
+
 # =========================================================
 # MAIN — FULL REPAIR RUN
 # =========================================================
@@ -112,12 +148,6 @@ def enrich_dealopportunities():
     print(f"🧪 DRY_RUN   : {DRY_RUN}")
     print("=" * 72)
 
-    start_time = time.time()
-    processed = 0
-
-    conn = sqlite3.connect(DB_PATH)
-    conn.row_factory = sqlite3.Row
-
     # 🔧 ONE-TIME REPAIR: ALL DO DEALS
     rows = repo.fetch_deals_for_enrichment(
         source="DealOpportunities"
@@ -125,222 +155,168 @@ def enrich_dealopportunities():
 
     if not rows:
         print("✅ Nothing to enrich")
-        conn.close()
         return
 
-    client = DealOpportunitiesClient()
-    client.start()
+    missing = [r for r in rows if not r["source_listing_id"]]
+    if missing:
+        print(f"⚠️ {len(missing)} deals missing source_listing_id — skipping")
+    rows = [r for r in rows if r["source_listing_id"]]
+
+    # persist() / on_error() run on worker threads: group-committed writes only
+    writer = repo.writer
+    pending = []
+
+    def on_error(deal: dict, exc: Exception) -> None:
+        pending.append(writer.submit(
+            """
+            UPDATE deals
+            SET pdf_error = ?,
+                last_updated = CURRENT_TIMESTAMP
+            WHERE id = ?
+            """,
+            (str(exc)[:500], deal["id"]),
+        ))
+        print(f"❌ Fetch failed: {deal['source_listing_id']}")
+
+    def persist(deal: dict, fields: dict, pdf_path: Path | None) -> None:
+        deal_id = deal["id"]
+        deal_key = deal["source_listing_id"]
+
+        if fields["lost"]:
+            print(f"⚠️ {deal_key}: {fields['lost']} — marking Lost")
+            if not DRY_RUN:
+                pending.append(writer.submit(
+                    """
+                    UPDATE deals
+                    SET status               = 'Lost',
+                        lost_reason          = ?,
+                        needs_detail_refresh = 0,
+                        detail_fetched_at    = CURRENT_TIMESTAMP,
+                        last_updated         = CURRENT_TIMESTAMP,
+                        last_updated_source  = 'AUTO'
+                    WHERE id = ?
+                    """,
+                    (fields["lost"], deal_id),
+                ))
+            return
 
-    try:
-        for idx, r in enumerate(rows):
-            if time.time() - start_time > MAX_RUNTIME:
-                print("⏱️ Time limit reached — exiting cleanly")
-                break
-
-            if processed > 0 and processed % BROWSER_RESET_EVERY == 0:
-                print("🔄 Browser recycle")
-                client.stop()
-                human_sleep()
-                client.start()
-
-            deal_id = r["id"]
-            deal_key = r["source_listing_id"]
-            url = r["source_url"]
-
-            print(f"\n[{processed + 1}] ➜ {deal_key}")
-            print(f"➡️ Fetching detail page:\n   {url}")
-
-            if not deal_key:
-                print("⚠️ Missing source_listing_id — skipping")
-                continue
-
-            pdf_path = PDF_ROOT / f"{deal_key}.pdf"
-
-            # -------- SINGLE FETCH (NO DUPLICATION) --------
-            try:
-                if REENRICH_ADDED_ONLY:
-                    html = client.fetch_listing_detail(url=url)
-                else:
-                    html = client.fetch_listing_detail_and_pdf(
-                        url=url,
-                        pdf_path=pdf_path,
-                    )
-
-                if is_do_lost(html):
-                    pdf_path.unlink(missing_ok=True)
-                    print("⚠️ Listing marked LOST by broker")
-
-                    if not DRY_RUN:
-                        conn.execute(
-                            """
-                            UPDATE deals
-                            SET status               = 'Lost',
-                                lost_reason          = 'Listing no longer available',
-                                needs_detail_refresh = 0,
-                                detail_fetched_at    = CURRENT_TIMESTAMP,
-                                last_updated         = CURRENT_TIMESTAMP,
-                                last_updated_source  = 'AUTO'
-                            WHERE id = ?
-                            """,
-                            (deal_id,),
-                        )
-                        conn.commit()
-
-                    pdf_path.unlink(missing_ok=True)
-                    continue
-            except PlaywrightError as e:
-                conn.execute(
+        added_at = fields["added_at"]
+
+        if REENRICH_ADDED_ONLY:
+            if added_at and not DRY_RUN:
+                pending.append(writer.submit(
                     """
                     UPDATE deals
-                    SET pdf_error = ?,
-                        last_updated = CURRENT_TIMESTAMP
+                    SET added_at            = ?,
+                        last_seen           = CURRENT_TIMESTAMP,
+                        last_updated        = CURRENT_TIMESTAMP,
+                        last_updated_source = 'AUTO'
                     WHERE id = ?
+                      AND added_at IS NULL;
                     """,
-                    (str(e)[:500], deal_id),
-                )
-                conn.commit()
-                print("❌ Fetch failed")
-                continue
-
-            parsed = parse_do_detail(html)
-            added_at = None
-            raw_added = parsed["facts"].get("added_at_raw")
-
-            if raw_added:
-                try:
-                    added_at = datetime.strptime(raw_added, "%d %B %Y").date()
-                except ValueError:
-                    print(f"⚠️ Could not parse Added date: {raw_added}")
-            if REENRICH_ADDED_ONLY:
-                if added_at and not DRY_RUN:
-                    conn.execute(
-                        """
-                        UPDATE deals
-                        SET added_at            = ?,
-                            last_seen           = CURRENT_TIMESTAMP,
-                            last_updated        = CURRENT_TIMESTAMP,
-                            last_updated_source = 'AUTO'
-                        WHERE id = ?
-                          AND added_at IS NULL;
-                        """,
-                        (added_at, deal_id),
-                    )
-                    conn.commit()
-
-                pdf_path.unlink(missing_ok=True)
-                processed += 1
-                human_sleep()
-                print("✅ Reenriched (added_at)")
-                continue
-            else:
-                title = extract_do_title(html) or r["title"]
-                description = parsed["description"]
-                location_raw = parsed["facts"].get("location")
-                if not description and not extract_do_title(html):
-                    print("⚠️ Empty detail page — marking Lost")
-                    if not DRY_RUN:
-                        conn.execute(
-                            """
-                            UPDATE deals
-                            SET status               = 'Lost',
-                                lost_reason          = 'Empty or invalid detail page',
-                                needs_detail_refresh = 0,
-                                detail_fetched_at    = CURRENT_TIMESTAMP,
-                                last_updated         = CURRENT_TIMESTAMP,
-                                last_updated_source  = 'AUTO'
-                            WHERE id = ?
-                            """,
-                            (deal_id,),
-                        )
-                        conn.commit()
-
-                    pdf_path.unlink(missing_ok=True)
-                    continue
-                content_hash = hashlib.sha256(html.encode()).hexdigest()
-
-                # -------- INDUSTRY / SECTOR (AUTHORITATIVE, RESTORED) --------
-                mapping = map_dealopportunities_sector(
-                    raw_sector=r["sector_raw"]
-                )
-
-                industry = mapping["industry"]
-                sector = mapping["sector"]
-
-                # -------- DRIVE (IDEMPOTENT) --------
-                parent_id = get_drive_parent_folder_id(
-                    industry=industry,
-                    broker="DealOpportunities",
-                )
-
-                deal_folder_id = find_or_create_deal_folder(
-                    parent_folder_id=parent_id,
-                    deal_id=deal_key,
-                    deal_title=title,
-                )
-
-                drive_folder_url = (
-                    f"https://drive.google.com/drive/folders/{deal_folder_id}"
-                )
-
-                pdf_drive_url = upload_pdf_to_drive(
-                    local_path=pdf_path,
-                    filename=f"{deal_key}.pdf",
-                    folder_id=deal_folder_id,
-                )
-
-                # -------- DB UPDATE (ATOMIC, FULL REPAIR) --------
-                if not DRY_RUN:
-                    conn.execute(
-                        """
-                            UPDATE deals
-                            SET
-                                title = ?,
-                                description = ?,
-                                location_raw = ?,
-                                location = COALESCE(location, ?),
-                                industry = ?,
-                                sector = ?,
-                                content_hash = ?,
-                                drive_folder_id = ?,
-                                drive_folder_url = ?,
-                                pdf_drive_url = ?,
-                                pdf_generated_at = CURRENT_TIMESTAMP,
-                                detail_fetched_at = CURRENT_TIMESTAMP,
-                                added_at = ?,
-                                needs_detail_refresh = 0,
-                                detail_fetch_reason = NULL,
-                                last_updated = CURRENT_TIMESTAMP,
-                                last_updated_source = 'AUTO'
-                            WHERE id = ?
-                        """,
-                        (
-                            title,
-                            description,
-                            location_raw,
-                            location_raw,
-                            industry,
-                            sector,
-                            content_hash,
-                            deal_folder_id,
-                            drive_folder_url,
-                            pdf_drive_url,
-                            added_at,
-                            deal_id,
-                        ),
-                    )
-                    conn.commit()
-
-                pdf_path.unlink(missing_ok=True)
-                processed += 1
-                human_sleep()
-
-                print("✅ Enriched")
+                    (added_at, deal_id),
+                ))
+            print(f"✅ Reenriched (added_at) {deal_key}")
+            return
+
+        title = fields["title"]
+        location_raw = fields["location_raw"]
+
+        # -------- INDUSTRY / SECTOR (AUTHORITATIVE, RESTORED) --------
+        mapping = map_dealopportunities_sector(
+            raw_sector=deal["sector_raw"]
+        )
+
+        industry = mapping["industry"]
+        sector = mapping["sector"]
+
+        # -------- DRIVE (IDEMPOTENT) --------
+        parent_id = get_drive_parent_folder_id(
+            industry=industry,
+            broker="DealOpportunities",
+        )
+
+        deal_folder_id = find_or_create_deal_folder(
+            parent_folder_id=parent_id,
+            deal_id=deal_key,
+            deal_title=title,
+        )
+
+        drive_folder_url = (
+            f"https://drive.google.com/drive/folders/{deal_folder_id}"
+        )
+
+        pdf_drive_url = upload_pdf_to_drive(
+            local_path=pdf_path,
+            filename=f"{deal_key}.pdf",
+            folder_id=deal_folder_id,
+        )
+
+        # -------- DB UPDATE (ATOMIC, FULL REPAIR) --------
+        if not DRY_RUN:
+            pending.append(writer.submit(
+                """
+                    UPDATE deals
+                    SET
+                        title = ?,
+                        description = ?,
+                        location_raw = ?,
+                        location = COALESCE(location, ?),
+                        industry = ?,
+                        sector = ?,
+                        content_hash = ?,
+                        drive_folder_id = ?,
+                        drive_folder_url = ?,
+                        pdf_drive_url = ?,
+                        pdf_generated_at = CURRENT_TIMESTAMP,
+                        detail_fetched_at = CURRENT_TIMESTAMP,
+                        added_at = ?,
+                        needs_detail_refresh = 0,
+                        detail_fetch_reason = NULL,
+                        last_updated = CURRENT_TIMESTAMP,
+                        last_updated_source = 'AUTO'
+                    WHERE id = ?
+                """,
+                (
+                    title,
+                    fields["description"],
+                    location_raw,
+                    location_raw,
+                    industry,
+                    sector,
+                    fields["content_hash"],
+                    deal_folder_id,
+                    drive_folder_url,
+                    pdf_drive_url,
+                    added_at,
+                    deal_id,
+                ),
+            ))
+
+        pdf_path.unlink(missing_ok=True)
+        print(f"✅ Enriched {deal_key}")
+
+    spec = EnrichmentSpec(
+        broker="DealOpportunities",
+        extract=extract_dealopportunities_detail,
+        persist=persist,
+        pdf_path=dealopportunities_pdf_path,
+        on_error=on_error,
+        wait_until="networkidle",
+        print_css=PRINT_CSS,
+        pdf_margin=PDF_MARGIN,
+        retries=2,
+    )
 
+    try:
+        stats = run_enrichment(spec, rows, headless=True, max_runtime=MAX_RUNTIME)
     finally:
-        client.stop()
-        conn.close()
+        writer.flush()
+        report_failures(pending, "DealOpportunities DB write")
 
-    print(f"\n🏁 Completed — deals processed: {processed}")
+    if stats["deferred"]:
+        print("⏱️ Time limit reached — remaining deals left for the next run")
+    print(f"\n🏁 Completed — deals processed: {stats['enriched']}")
 
 
 # =========================================================
@@ -348,4 +324,4 @@ def enrich_dealopportunities():
 # =========================================================
 
 if __name__ == "__main__":
-    enrich_dealopportunities()
\ No newline at end of file
+    enrich_dealopportunities()
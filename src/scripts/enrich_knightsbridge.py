@@ -2,10 +2,7 @@
 
 from src.config import KB_USERNAME, KB_PASSWORD
 
-import os
 import re
-import sqlite3
-import time
 from pathlib import Path
 from datetime import datetime
 from typing import Optional
@@ -17,9 +14,13 @@ from src.integrations.google_drive import (
     find_or_create_deal_folder,
     upload_pdf_to_drive,
 )
+from src.enrichment.async_runner import EnrichmentSpec, run_enrichment
+from src.enrichment.change_detection import UNCHANGED_SQL, content_unchanged, unchanged_params
+from src.extraction.dom_snapshot import has_class, html_elements, inner_text
 from src.persistence.deal_artifacts import record_deal_artifact
-from src.utils.hash_utils import compute_file_hash
-from src.brokers.knightsbridge_client import KnightsbridgeClient
+from src.utils.hash_utils import compute_content_hash, compute_file_hash
+from src.utils.html_archive import enable_replay
+from src.brokers.knightsbridge_client import CONSENT_COOKIE, KnightsbridgeClient
 from src.persistence.repository import SQLiteRepository
 from src.domain.industries import CANONICAL_INDUSTRIES
 # ---------------------------------------------------------------------
@@ -32,10 +33,10 @@ PDF_ROOT = Path("/tmp/knightsbridge_pdfs")
 PDF_ROOT.mkdir(parents=True, exist_ok=True)
 
 KNIGHTSBRIDGE_BASE = "https://www.knightsbridgeplc.com"
-REPORT_FREQUENCY = 5
-RESTART_EVERY = 50
-BASE_SLEEP = 1.2
-JITTER = 0.8
+# pacing / concurrency: BROKER_LIMITS["Knightsbridge"] in async_runner.py
+
+DESCRIPTION_XPATH = "//*[@id='BusinessDetails']//p"
+PRICE_XPATH = f"//*[{has_class('btn')} and {has_class('price')}]"
 
 if not KB_USERNAME or not KB_PASSWORD:
     raise RuntimeError("KB_USERNAME / KB_PASSWORD not set")
@@ -45,42 +46,6 @@ DRY_RUN = False
 # ---------------------------------------------------------------------
 # HELPERS
 # ---------------------------------------------------------------------
-def handle_cookiebot(page, timeout=5000):
-    """
-    Ensure Cookiebot consent modal is dismissed.
-    Safe to call multiple times.
-    """
-    try:
-        # Common accept button texts
-        accept_selectors = [
-            "button:has-text('Allow all')",
-            "button:has-text('Accept all')",
-            "button:has-text('Allow selection')",
-        ]
-
-        for sel in accept_selectors:
-            if page.locator(sel).count() > 0:
-                page.locator(sel).first.click(timeout=timeout)
-                break
-
-        # Also handle iframe-based Cookiebot
-        for frame in page.frames:
-            try:
-                btn = frame.locator("button:has-text('Allow all')")
-                if btn.count() > 0:
-                    btn.first.click(timeout=timeout)
-                    break
-            except Exception:
-                pass
-
-        # Hard assertion: modal must be gone
-        page.wait_for_timeout(500)  # let DOM settle
-
-    except Exception as e:
-        # Do NOT fail enrichment yet — just log
-        print(f"⚠️ Cookiebot handling issue: {e}")
-
-
 def is_knightsbridge_lost_page(page) -> bool:
     text = page.content().lower()
     return (
@@ -114,16 +79,11 @@ def assert_knightsbridge_not_lost(page, response):
     if "login" in page.url.lower():
         raise RuntimeError("LISTING_LOST_LOGIN_REDIRECT")
 
-def _sleep(extra: float = 0.0):
-    time.sleep(BASE_SLEEP + extra + (JITTER * os.urandom(1)[0] / 255))
-
-
-def _extract_description(page) -> Optional[str]:
+def _extract_description(html: str) -> Optional[str]:
     try:
-        blocks = page.locator("#BusinessDetails p")
         texts = []
-        for i in range(blocks.count()):
-            t = blocks.nth(i).inner_text().strip()
+        for p in html_elements(html, DESCRIPTION_XPATH):
+            t = inner_text(p)
             if len(t) > 40:
                 texts.append(t)
         return "\n\n".join(texts) if texts else None
@@ -131,16 +91,16 @@ def _extract_description(page) -> Optional[str]:
         return None
 
 
-def _extract_asking_price_k(page) -> Optional[int]:
+def _extract_asking_price_k(html: str) -> Optional[int]:
     """
     Extract asking price from Knightsbridge UI and return £k.
     """
     try:
-        price = page.locator(".btn.price")
-        if not price.count():
+        prices = html_elements(html, PRICE_XPATH)
+        if not prices:
             return None
 
-        raw = price.first.inner_text().strip()
+        raw = inner_text(prices[0]).strip()
         # e.g. "£4,000,000"
         m = re.search(r"£\s*([\d,]+)", raw)
         if not m:
@@ -163,15 +123,8 @@ def normalize_knightsbridge_sector(s: str | None) -> str | None:
 # ---------------------------------------------------------------------
 # ENRICHMENT
 # ---------------------------------------------------------------------
-def goto_with_retry(page, url, retries=2):
-    for attempt in range(retries):
-        try:
-            response = page.goto(url, wait_until="domcontentloaded", timeout=30_000)
-            return response
-        except PlaywrightTimeout:
-            if attempt == retries - 1:
-                raise RuntimeError("LISTING_LOST_TIMEOUT")
-            time.sleep(2)
+def full_listing_url(url: str) -> str:
+    return url if url.startswith("http") else f"{KNIGHTSBRIDGE_BASE}{url}"
 
 MAX_TITLE_LEN = 80  # this is sane for Drive
 
@@ -211,15 +164,79 @@ def clean_and_shorten_title(title: str | None) -> str:
 
     return t or "Untitled Deal"
 
-def enrich_knightsbridge(limit: Optional[int] = None):
-    print(f"📀 SQLite DB path: {DB_PATH}")
-
-    conn = sqlite3.connect(DB_PATH)
-    conn.row_factory = sqlite3.Row
+def _record_pdf_artifact(conn, *, listing_id, row_id, pdf_hash, drive_file_id, pdf_drive_url):
+    """
+    Runs on the writer thread: check + insert are one atomic operation.
+    """
+    existing = conn.execute(
+        """
+        SELECT 1
+        FROM deal_artifacts
+        WHERE deal_id = ?
+          AND artifact_hash = ?
+          AND artifact_type = 'pdf'
+        """,
+        (row_id, pdf_hash),
+    ).fetchone()
+    if existing:
+        return
 
-    rows = repo.fetch_deals_for_enrichment(
+    record_deal_artifact(
+        conn,
         source="Knightsbridge",
+        source_listing_id=str(listing_id),
+        deal_id=row_id,
+        artifact_type="pdf",
+        artifact_name=f"{listing_id}.pdf",
+        artifact_hash=pdf_hash,
+        drive_file_id=drive_file_id,
+        drive_url=pdf_drive_url,
+        extraction_version=KNIGHTSBRIDGE_EXTRACTION_VERSION,
+        created_by="enrich_knightsbridge.py",
     )
+
+def extract_knightsbridge_detail(deal: dict, html: str) -> dict:
+    description = _extract_description(html)
+    asking_price_k = _extract_asking_price_k(html)
+    if asking_price_k is None:
+        print(f"⚠️ Knightsbridge {deal['source_listing_id']}: asking price not visible")
+
+    content_hash = (
+        compute_content_hash(
+            title=deal["title"],
+            description=description,
+            facts={"asking_price_k": asking_price_k},
+        )
+        if deal["title"] and description
+        else None
+    )
+    return {
+        "description": description,
+        "asking_price_k": asking_price_k,
+        "content_hash": content_hash,
+        "unchanged": content_unchanged(deal, content_hash),
+        # Knightsbridge sector is broker-declared at index time.
+        # Enrichment must never infer or override it.
+        "missing_sector": not deal["industry"] or not deal["sector"],
+    }
+
+
+def knightsbridge_pdf_path(deal: dict, fields: dict) -> Optional[Path]:
+    if fields["unchanged"] or fields["missing_sector"]:
+        return None
+    return PDF_ROOT / f"{deal['source_listing_id']}.pdf"
+
+
+def enrich_knightsbridge(limit: Optional[int] = None):
+    print(f"📀 SQLite DB path: {DB_PATH}")
+
+    replay = enable_replay()
+    if replay:
+        rows = repo.fetch_archived_deals("Knightsbridge")
+    else:
+        rows = repo.fetch_deals_for_enrichment(
+            source="Knightsbridge",
+        )
     total = len(rows)
 
     print(f"🔍 Knightsbridge enrichment starting — {total} eligible deals")
@@ -231,257 +248,258 @@ def enrich_knightsbridge(limit: Optional[int] = None):
         print("✅ Nothing to enrich")
         return
 
-    client = KnightsbridgeClient()
-    client.start()
-    client.login()
-    handle_cookiebot(client.page)
+    rows = [dict(r, source_url=full_listing_url(r["source_url"])) for r in rows]
 
-    processed = 0
+    # persist() / on_error() run on worker threads: group-committed writes
+    # only, resolved per deal so a failed write reaches that deal's handling
+    writer = repo.writer
 
-    try:
-        processed = 0
-        for r in rows:
-            error: Exception | None = None
-            success = False
-            row_id = r["id"]
-            listing_id = r["source_listing_id"]
-            url        = r["source_url"]
-            raw_title = r["title"]
-            title = clean_and_shorten_title(raw_title)
-            remaining = total - processed
-            processed += 1
-            if processed % REPORT_FREQUENCY == 0:
-                print(
-                    f"📊 Progress: {processed}/{total} | "
-                    # f"✅ {succeeded} enriched | "
-                    # f"⏸️ {parked} parked | "
-                    # f"❌ {failed} retryable | "
-                    # f"⏳ {remaining} remaining"
-                )
-
-            if processed % RESTART_EVERY == 0:
-                client.stop()
-                client = KnightsbridgeClient()
-                client.start()
-                client.login()
-
-            print(f"\n➡️ Enriching Knightsbridge {listing_id}")
-            full_url = url if url.startswith("http") else f"{KNIGHTSBRIDGE_BASE}{url}"
-
-            try:
-                response = goto_with_retry(client.page,full_url)
-
-                try:
-                    client.page.wait_for_selector("#BusinessDetails", timeout=15_000)
-                except PlaywrightTimeout:
-                    print("PlaywrightTimeout waiting for #BusinessDetails")
-                    # Only now can we evaluate LOST
-                    client.page.reload(wait_until="domcontentloaded")
-                    try:
-                        client.page.wait_for_selector("#BusinessDetails", timeout=10_000)
-                    except PlaywrightTimeout:
-                        raise RuntimeError("LISTING_LOST_DOM_TIMEOUT")
-                handle_cookiebot(client.page)
-                description = _extract_description(client.page)
-                asking_price_k = _extract_asking_price_k(client.page)
-                if asking_price_k is None:
-                    print(f"⚠️ Knightsbridge {listing_id}: asking price not visible")
-
-                pdf_path = PDF_ROOT / f"{listing_id}.pdf"
-                client.page.pdf(path=str(pdf_path), format="A4", print_background=True)
-                industry = r["industry"]
-                sector = r["sector"]
-                sector_confidence = 1.0
-                sector_reason = "broker"
-
-                if not industry or not sector:
-                    raise RuntimeError("MISSING_SECTOR_CANONICAL")
-
-                if industry not in CANONICAL_INDUSTRIES:
-                    raise RuntimeError(f"ILLEGAL_INDUSTRY_STATE: {industry}")
-
-                # Knightsbridge sector is broker-declared at index time.
-                # Enrichment must never infer or override it.
-
-                parent_folder_id = get_drive_parent_folder_id(
-                    industry=industry,
-                    broker="Knightsbridge",
-                )
-
-                listing_id = r["source_listing_id"]
-                if not listing_id:
-                    raise RuntimeError("source_listing_id is required for Knightsbridge")
-
-                canonical_id = f"KB-{listing_id}"
-
-                deal_folder_id = find_or_create_deal_folder(
-                    parent_folder_id=parent_folder_id,
-                    deal_id=canonical_id,
-                    deal_title=r["title"],
-                )
-
-                pdf_drive_url = upload_pdf_to_drive(
-                    local_path=str(pdf_path),
-                    filename=f"{listing_id}.pdf",
-                    folder_id=deal_folder_id,
-                )
-                drive_file_id = pdf_drive_url.split("/d/")[1].split("/")[0]
-
-                pdf_hash = compute_file_hash(pdf_path)
-                pdf_path.unlink(missing_ok=True)
-                existing = conn.execute(
-                    """
-                    SELECT 1
-                    FROM deal_artifacts
-                    WHERE deal_id = ?
-                      AND artifact_hash = ?
-                      AND artifact_type = 'pdf'
-                    """,
-                    (row_id, pdf_hash),
-                ).fetchone()
-                if not existing:
-                    record_deal_artifact(
-                        conn=conn,
-                        source="Knightsbridge",
-                        source_listing_id=str(listing_id),
-                        deal_id=row_id,
-                        artifact_type="pdf",
-                        artifact_name=f"{listing_id}.pdf",
-                        artifact_hash=pdf_hash,
-                        drive_file_id=drive_file_id,
-                        drive_url=pdf_drive_url,
-                        extraction_version=KNIGHTSBRIDGE_EXTRACTION_VERSION,
-                        created_by="enrich_knightsbridge.py",
-                    )
-                fetched_at = datetime.today().isoformat()
-                drive_folder_url = f"https://drive.google.com/drive/folders/{deal_folder_id}"
-                if DRY_RUN:
-                    print("DRY_RUN → would UPDATE deals:", row_id)
-                    print("Price:", asking_price_k)
-
-                    print("URL:", client.page.url)
-                    print("HTTP status:", response.status if response else None)
-                    print("Title:", client.page.title())
-                    print("Body snippet:", client.page.content()[:500])
-                    client.page.screenshot(path=f"/tmp/kb_{listing_id}.png")
-                    success = True
-                else:
-                    cur = conn.execute(
-                        """
-                        UPDATE deals
-                         SET
-                            description                 = ?,
-                            asking_price_k              = COALESCE(asking_price_k, ?),
-                        
-                            industry                    = ?,
-                            sector                      = ?,
-                            sector_source               = 'broker',
-                            sector_inference_confidence = ?,
-                            sector_inference_reason     = ?,
-                        
-                            drive_folder_id             = ?,
-                            drive_folder_url            = ?,
-                            pdf_drive_url               = ?,
-                        
-                            detail_fetched_at           = ?,
-                            needs_detail_refresh        = 0,
-                            detail_fetch_reason         = NULL,
-                            last_updated                = CURRENT_TIMESTAMP,
-                            last_updated_source         = 'AUTO'
-                        WHERE id = ?
-                        """,
-                        (
-                            description,
-                            asking_price_k,
-                            industry,
-                            sector,
-                            sector_confidence,
-                            sector_reason,
-                            deal_folder_id,
-                            drive_folder_url,
-                            pdf_drive_url,
-                            fetched_at,
-                            row_id,
-                        )
-                    )
-                    if cur.rowcount != 1:
-                        raise RuntimeError(f"Expected 1 row, got {cur.rowcount}")
-                    conn.commit()
-
-                    print("✅ Enriched + uploaded")
-                    success = True
-            except Exception as exc:
-                error = exc
-                reason = str(exc) if exc else "UNKNOWN_EXCEPTION"
-                print("EXCEPTION STR:", reason)
-                if success:
-                    # This was a clean DRY_RUN or successful write
-                    continue
-                if reason == "MISSING_SECTOR_CANONICAL":
-                    if DRY_RUN:
-                        print("DRY_RUN → would park deal due to missing canonical sector:", row_id)
-                    else:
-                        conn.execute(
-                            """
-                            UPDATE deals
-                            SET detail_fetched_at    = CURRENT_TIMESTAMP,
-                                needs_detail_refresh = 0,
-                                detail_fetch_reason  = 'MISSING_SECTOR_CANONICAL',
-                                last_updated         = CURRENT_TIMESTAMP,
-                                last_updated_source  = 'AUTO'
-                            WHERE id = ?
-                            """,
-                            (row_id,),
-                        )
-                        conn.commit()
-                    continue
-                if "LISTING_LOST" in reason:
-                    lost_reason = reason
-                    if DRY_RUN:
-                        print("DRY_RUN → would UPDATE deals:", row_id)
-                    else:
-                        conn.execute(
-                            """
-                            UPDATE deals
-                            SET status               = 'Lost',
-                                lost_reason          = ?,
-                                needs_detail_refresh = 0,
-                                last_updated         = CURRENT_TIMESTAMP,
-                                detail_fetched_at    = CURRENT_TIMESTAMP,
-                                last_updated_source  = 'AUTO'
-                            WHERE id = ?
-                            """,
-                            (lost_reason, row_id,),
-                        )
-                        conn.commit()
-                        print(f"🗑️ Marked Knightsbridge {listing_id} as LOST")
-                        success = True
-                    continue
-                if DRY_RUN:
-                    print("DRY_RUN → would UPDATE deals:", row_id)
-                else:
-                    cur = conn.execute(
-                        """
-                        UPDATE deals
-                        SET needs_detail_refresh = 1,
-                            detail_fetch_reason = ?,
-                            last_updated_source = 'AUTO'
-                        WHERE id = ?
-                        """,
-                        (reason[:500], row_id),
-                    )
-                    if cur.rowcount != 1:
-                        raise RuntimeError(f"Expected 1 row, got {cur.rowcount}")
-                    conn.commit()
-                    success = True
-                print(f"❌ Error: {reason}")
-
-    finally:
-        client.stop()
-        conn.close()
+    def record_failure(deal: dict, exc: Exception) -> None:
+        try:
+            record_failure_state(deal, exc)
+        except Exception as db_exc:
+            # deal stays eligible: fetch_deals_for_enrichment picks it up again
+            print(f"❌ Knightsbridge {deal['source_listing_id']}: failure not recorded: {db_exc}")
+
+    def record_failure_state(deal: dict, exc: Exception) -> None:
+        row_id = deal["id"]
+        reason = str(exc) if exc else "UNKNOWN_EXCEPTION"
+        print("EXCEPTION STR:", reason)
+
+        if reason == "MISSING_SECTOR_CANONICAL":
+            if DRY_RUN:
+                print("DRY_RUN → would park deal due to missing canonical sector:", row_id)
+                return
+            writer.submit(
+                """
+                UPDATE deals
+                SET detail_fetched_at    = CURRENT_TIMESTAMP,
+                    needs_detail_refresh = 0,
+                    detail_fetch_reason  = 'MISSING_SECTOR_CANONICAL',
+                    last_updated         = CURRENT_TIMESTAMP,
+                    last_updated_source  = 'AUTO'
+                WHERE id = ?
+                """,
+                (row_id,),
+            ).result()
+            return
+
+        if "LISTING_LOST" in reason:
+            if DRY_RUN:
+                print("DRY_RUN → would UPDATE deals:", row_id)
+                return
+            writer.submit(
+                """
+                UPDATE deals
+                SET status               = 'Lost',
+                    lost_reason          = ?,
+                    needs_detail_refresh = 0,
+                    last_updated         = CURRENT_TIMESTAMP,
+                    detail_fetched_at    = CURRENT_TIMESTAMP,
+                    last_updated_source  = 'AUTO'
+                WHERE id = ?
+                """,
+                (reason, row_id,),
+            ).result()
+            print(f"🗑️ Marked Knightsbridge {deal['source_listing_id']} as LOST")
+            return
+
+        if DRY_RUN:
+            print("DRY_RUN → would UPDATE deals:", row_id)
+        else:
+            writer.submit(
+                """
+                UPDATE deals
+                SET needs_detail_refresh = 1,
+                    detail_fetch_reason = ?,
+                    last_updated_source = 'AUTO'
+                WHERE id = ?
+                """,
+                (reason[:500], row_id),
+                expect_rows=1,
+            ).result()
+        print(f"❌ Error: {reason}")
+
+    def on_error(deal: dict, exc: Exception) -> None:
+        # detail page never rendered (goto or #BusinessDetails, after a retry)
+        if isinstance(exc, PlaywrightTimeout):
+            exc = RuntimeError("LISTING_LOST_TIMEOUT")
+        record_failure(deal, exc)
+
+    def persist(deal: dict, fields: dict, pdf_path: Optional[Path]) -> None:
+        try:
+            for future in persist_deal(deal, fields, pdf_path):
+                future.result()  # committed, or the DB error for this deal
+        except Exception as exc:
+            if replay:
+                # archived HTML: report only, the deal's live state is untouched
+                print(f"❌ Knightsbridge {deal['source_listing_id']} replay failed: {exc}")
+            else:
+                record_failure(deal, exc)
+            return
+        if fields["unchanged"] or replay or DRY_RUN:
+            return
+        print("✅ Enriched + uploaded")
+
+    def persist_deal(deal: dict, fields: dict, pdf_path: Optional[Path]) -> list:
+        """
+        Drive upload + queued writes; returns the deal's write futures.
+        """
+        row_id = deal["id"]
+        listing_id = deal["source_listing_id"]
+        futures = []
+        description = fields["description"]
+        asking_price_k = fields["asking_price_k"]
+        content_hash = fields["content_hash"]
+
+        if replay:
+            # archived HTML: extracted fields only, no PDF / Drive / fetch time
+            if DRY_RUN:
+                print("DRY_RUN → would UPDATE deals:", row_id, "Price:", asking_price_k)
+                return futures
+            futures.append(writer.submit(
+                """
+                UPDATE deals
+                SET description         = ?,
+                    asking_price_k      = COALESCE(asking_price_k, ?),
+                    content_hash        = ?,
+                    last_updated        = CURRENT_TIMESTAMP,
+                    last_updated_source = 'AUTO'
+                WHERE id = ?
+                """,
+                (description, asking_price_k, content_hash, row_id),
+                expect_rows=1,
+            ))
+            return futures
+
+        if fields["unchanged"]:
+            print("⏭️ Content unchanged — PDF / Drive / DB rewrite skipped")
+            if not DRY_RUN:
+                futures.append(writer.submit(UNCHANGED_SQL, unchanged_params(row_id)))
+            return futures
+
+        industry = deal["industry"]
+        sector = deal["sector"]
+        sector_confidence = 1.0
+        sector_reason = "broker"
+
+        if fields["missing_sector"]:
+            raise RuntimeError("MISSING_SECTOR_CANONICAL")
+
+        if industry not in CANONICAL_INDUSTRIES:
+            raise RuntimeError(f"ILLEGAL_INDUSTRY_STATE: {industry}")
+
+        if not listing_id:
+            raise RuntimeError("source_listing_id is required for Knightsbridge")
+
+        parent_folder_id = get_drive_parent_folder_id(
+            industry=industry,
+            broker="Knightsbridge",
+        )
+
+        canonical_id = f"KB-{listing_id}"
+
+        deal_folder_id = find_or_create_deal_folder(
+            parent_folder_id=parent_folder_id,
+            deal_id=canonical_id,
+            deal_title=deal["title"],
+        )
+
+        pdf_drive_url = upload_pdf_to_drive(
+            local_path=str(pdf_path),
+            filename=f"{listing_id}.pdf",
+            folder_id=deal_folder_id,
+        )
+        drive_file_id = pdf_drive_url.split("/d/")[1].split("/")[0]
+
+        pdf_hash = compute_file_hash(pdf_path)
+        pdf_path.unlink(missing_ok=True)
+        futures.append(writer.call(
+            _record_pdf_artifact,
+            listing_id=listing_id,
+            row_id=row_id,
+            pdf_hash=pdf_hash,
+            drive_file_id=drive_file_id,
+            pdf_drive_url=pdf_drive_url,
+        ))
+        fetched_at = datetime.today().isoformat()
+        drive_folder_url = f"https://drive.google.com/drive/folders/{deal_folder_id}"
+        if DRY_RUN:
+            print("DRY_RUN → would UPDATE deals:", row_id)
+            print("Price:", asking_price_k)
+            print("URL:", deal["source_url"])
+            return futures
+
+        futures.append(writer.submit(
+            """
+            UPDATE deals
+             SET
+                description                 = ?,
+                asking_price_k              = COALESCE(asking_price_k, ?),
+                content_hash                = ?,
+            
+                industry                    = ?,
+                sector                      = ?,
+                sector_source               = 'broker',
+                sector_inference_confidence = ?,
+                sector_inference_reason     = ?,
+            
+                drive_folder_id             = ?,
+                drive_folder_url            = ?,
+                pdf_drive_url               = ?,
+            
+                detail_fetched_at           = ?,
+                needs_detail_refresh        = 0,
+                detail_fetch_reason         = NULL,
+                last_updated                = CURRENT_TIMESTAMP,
+                last_updated_source         = 'AUTO'
+            WHERE id = ?
+            """,
+            (
+                description,
+                asking_price_k,
+                content_hash,
+                industry,
+                sector,
+                sector_confidence,
+                sector_reason,
+                deal_folder_id,
+                drive_folder_url,
+                pdf_drive_url,
+                fetched_at,
+                row_id,
+            ),
+            expect_rows=1,
+        ))
+        return futures
+
+    spec = EnrichmentSpec(
+        broker="Knightsbridge",
+        extract=extract_knightsbridge_detail,
+        persist=persist,
+        pdf_path=knightsbridge_pdf_path,
+        on_error=on_error,
+        wait_until="domcontentloaded",
+        wait_selector="#BusinessDetails",
+        cookies=(CONSENT_COOKIE,),
+        goto_timeout=30_000,
+        wait_timeout=15_000,
+        retries=1,
+    )
+
+    if not replay:
+        # refresh the saved session (browser_pool.state_path) the runner starts from
+        client = KnightsbridgeClient()
+        client.start()
+        try:
+            client.login()
+        finally:
+            client.stop()
+
+    run_enrichment(spec, rows, headless=True, storage_state=True)
 
     print("\n🏁 Knightsbridge enrichment complete")
 
 
 if __name__ == "__main__":
-    enrich_knightsbridge()
\ No newline at end of file
+    enrich_knightsbridge()
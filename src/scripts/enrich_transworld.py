@@ -1,20 +1,27 @@
 from pathlib import Path
 from datetime import datetime
-import time
-import random
 from typing import Optional
 
 from bs4 import BeautifulSoup
-from playwright.sync_api import sync_playwright, TimeoutError
+from playwright.sync_api import TimeoutError
 
 from src.persistence.repository import SQLiteRepository
+from src.persistence.write_queue import report_failures
+from src.enrichment.change_detection import UNCHANGED_SQL, content_unchanged, unchanged_params
 from src.persistence.deal_artifacts import record_deal_artifact
 from src.integrations.drive_folders import get_drive_parent_folder_id
 from src.integrations.google_drive import (
     find_or_create_deal_folder,
     upload_pdf_to_drive,
 )
-from src.utils.hash_utils import compute_file_hash
+from src.utils.hash_utils import compute_content_hash, compute_file_hash
+from src.utils.browser_pool import (
+    DEFAULT_USER_AGENT,
+    DEFAULT_VIEWPORT,
+    get_browser_pool,
+)
+from src.utils.rate_limit import polite_goto
+from src.utils.resource_policy import PDF_POLICY
 from src.utils.financial_normalization import _normalize_money_to_k
 from src.sector_mappings.transworld import map_transworld_category
 from src.domain.industries import assert_valid_industry
@@ -31,7 +38,6 @@ PDF_ROOT = Path("/tmp/transworld_pdfs")
 PDF_ROOT.mkdir(parents=True, exist_ok=True)
 
 DETAIL_WAIT_SELECTOR = "div.description-wrapper"
-SLEEP_BETWEEN = (2.0, 4.0)
 
 DRY_RUN = False
 
@@ -96,30 +102,78 @@ def enrich_transworld(limit: Optional[int] = None) -> None:
         return
 
     conn = repo.get_conn()   # single connection
+    # unchanged-content stamps: group-committed, no per-deal fsync
+    writer = repo.writer
+    pending = []
+
+    pool = get_browser_pool()
+
+    try:
+        for i, deal in enumerate(deals, start=1):
+            url = deal["source_url"]
+            title = deal["title"] or ""
+            row_id = deal["id"]
+
+            print(f"\n➡️ [{i}/{len(deals)}] {deal['source_listing_id']}")
+            print(url)
+
+            # -------------------------------
+            # SOLD → LOST (NO ID MUTATION)
+            # -------------------------------
+            if "sold" in title.lower() or "/sold" in url.lower():
+                print("⚠️ Marked SOLD — setting Lost (identity preserved)")
+                if not DRY_RUN:
+                    conn.execute(
+                        """
+                        UPDATE deals
+                        SET status               = 'Lost',
+                            lost_reason          = 'Marked SOLD in listing',
+                            needs_detail_refresh = 0,
+                            detail_fetched_at    = ?,
+                            last_updated         = CURRENT_TIMESTAMP,
+                            last_updated_source  = 'AUTO'
+                        WHERE id = ?
+                        """,
+                        (
+                            datetime.today().isoformat(),
+                            row_id,
+                        ),
+                    )
+                    conn.commit()
+                continue
+
+            context = pool.new_context(
+                "transworld_uk",
+                headless=True,
+                viewport=DEFAULT_VIEWPORT,
+                user_agent=DEFAULT_USER_AGENT,
+                resource_policy=PDF_POLICY,  # page is printed
+            )
 
-    with sync_playwright() as p:
-        browser = p.chromium.launch(headless=True)
+            try:
+                page = context.new_page()
+                polite_goto(page, url, timeout=60_000, wait_until="domcontentloaded")
 
-        try:
-            for i, deal in enumerate(deals, start=1):
-                url = deal["source_url"]
-                title = deal["title"] or ""
-                row_id = deal["id"]
+                try:
+                    page.wait_for_selector(DETAIL_WAIT_SELECTOR, timeout=20_000)
+                except TimeoutError:
+                    print("⚠️ Description wrapper missing")
 
-                print(f"\n➡️ [{i}/{len(deals)}] {deal['source_listing_id']}")
-                print(url)
+                soup = BeautifulSoup(page.content(), "html.parser")
+
+                raw_listing_number = extract_listing_number(soup)
 
                 # -------------------------------
-                # SOLD → LOST (NO ID MUTATION)
+                # HARD LOST
                 # -------------------------------
-                if "sold" in title.lower() or "/sold" in url.lower():
-                    print("⚠️ Marked SOLD — setting Lost (identity preserved)")
+                if not raw_listing_number:
+                    print("⚠️ Listing number missing — marking Lost")
                     if not DRY_RUN:
                         conn.execute(
                             """
                             UPDATE deals
                             SET status               = 'Lost',
-                                lost_reason          = 'Marked SOLD in listing',
+                                lost_reason          = 'Redirected to listings index',
                                 needs_detail_refresh = 0,
                                 detail_fetched_at    = ?,
                                 last_updated         = CURRENT_TIMESTAMP,
@@ -134,216 +188,191 @@ def enrich_transworld(limit: Optional[int] = None) -> None:
                         conn.commit()
                     continue
 
-                context = browser.new_context(
-                    viewport={"width": 1280, "height": 900},
-                    user_agent=(
-                        "Mozilla/5.0 (Macintosh; Intel Mac OS X 10_15_7) "
-                        "AppleWebKit/537.36 (KHTML, like Gecko) "
-                        "Chrome/120.0.0.0 Safari/537.36"
-                    ),
-                )
+                canonical_external_id = f"TW-{raw_listing_number}"
 
-                try:
-                    page = context.new_page()
-                    page.goto(url, timeout=60_000, wait_until="domcontentloaded")
-
-                    try:
-                        page.wait_for_selector(DETAIL_WAIT_SELECTOR, timeout=20_000)
-                    except TimeoutError:
-                        print("⚠️ Description wrapper missing")
-
-                    soup = BeautifulSoup(page.content(), "html.parser")
-
-                    raw_listing_number = extract_listing_number(soup)
-
-                    # -------------------------------
-                    # HARD LOST
-                    # -------------------------------
-                    if not raw_listing_number:
-                        print("⚠️ Listing number missing — marking Lost")
-                        if not DRY_RUN:
-                            conn.execute(
-                                """
-                                UPDATE deals
-                                SET status               = 'Lost',
-                                    lost_reason          = 'Redirected to listings index',
-                                    needs_detail_refresh = 0,
-                                    detail_fetched_at    = ?,
-                                    last_updated         = CURRENT_TIMESTAMP,
-                                    last_updated_source  = 'AUTO'
-                                WHERE id = ?
-                                """,
-                                (
-                                    datetime.today().isoformat(),
-                                    row_id,
-                                ),
-                            )
-                            conn.commit()
-                        continue
-
-                    canonical_external_id = f"TW-{raw_listing_number}"
-
-                    # -------------------------------
-                    # DEDUPE (canonical_external_id)
-                    # -------------------------------
-                    existing = conn.execute(
+                # -------------------------------
+                # DEDUPE (canonical_external_id)
+                # -------------------------------
+                existing = conn.execute(
+                    """
+                    SELECT id
+                    FROM deals
+                    WHERE source = ?
+                      AND canonical_external_id = ?
+                      AND id != ?
+                    """,
+                    (SOURCE, canonical_external_id, row_id),
+                ).fetchone()
+
+                if existing:
+                    print("⚠️ Duplicate Transworld canonical_external_id — quarantining")
+                    conn.execute(
                         """
-                        SELECT id
-                        FROM deals
-                        WHERE source = ?
-                          AND canonical_external_id = ?
-                          AND id != ?
+                        UPDATE deals
+                        SET needs_detail_refresh = 0,
+                            detail_fetched_at    = CURRENT_TIMESTAMP,
+                            detail_fetch_reason  = 'canonicalised_elsewhere',
+                            last_updated         = CURRENT_TIMESTAMP,
+                            last_updated_source  = 'AUTO'
+                        WHERE id = ?
                         """,
-                        (SOURCE, canonical_external_id, row_id),
-                    ).fetchone()
-
-                    if existing:
-                        print("⚠️ Duplicate Transworld canonical_external_id — quarantining")
-                        conn.execute(
-                            """
-                            UPDATE deals
-                            SET needs_detail_refresh = 0,
-                                detail_fetched_at    = CURRENT_TIMESTAMP,
-                                detail_fetch_reason  = 'canonicalised_elsewhere',
-                                last_updated         = CURRENT_TIMESTAMP,
-                                last_updated_source  = 'AUTO'
-                            WHERE id = ?
-                            """,
-                            (row_id,),
-                        )
-                        conn.commit()
-                        continue
-
-                    facts = extract_listing_details(soup)
-                    description = text_or_none(
-                        soup.select_one("div.description-wrapper p")
+                        (row_id,),
                     )
+                    conn.commit()
+                    continue
 
-                    mapping = map_transworld_category(
-                        sector_raw=facts.get("sector_raw"),
-                        title=title,
-                    )
+                facts = extract_listing_details(soup)
+                description = text_or_none(
+                    soup.select_one("div.description-wrapper p")
+                )
 
-                    industry = mapping["industry"] or "Other"
-                    sector = mapping["sector"]
+                mapping = map_transworld_category(
+                    sector_raw=facts.get("sector_raw"),
+                    title=title,
+                )
 
-                    assert_valid_industry(industry)
+                industry = mapping["industry"] or "Other"
+                sector = mapping["sector"]
 
-                    fetched_at = datetime.today().isoformat()
+                assert_valid_industry(industry)
 
-                    if DRY_RUN:
-                        print("🔍 DRY RUN")
-                        continue
+                fetched_at = datetime.today().isoformat()
 
-                    # -------------------------------
-                    # PDF
-                    # -------------------------------
-                    pdf_path = PDF_ROOT / f"{canonical_external_id}.pdf"
-                    page.emulate_media(media="print")
-                    page.pdf(
-                        path=str(pdf_path),
-                        format="A4",
-                        margin={"top": "15mm", "bottom": "15mm"},
-                        print_background=True,
+                content_hash = (
+                    compute_content_hash(
+                        title=title,
+                        description=description,
+                        location=facts.get("location"),
+                        facts={
+                            "asking_price_k": facts.get("asking_price_k"),
+                            "ebitda_k": facts.get("ebitda_k"),
+                            "notes": facts.get("notes"),
+                        },
                     )
+                    if title and description
+                    else None
+                )
 
-                    if not pdf_path.exists() or pdf_path.stat().st_size < 10_000:
-                        pdf_path.unlink(missing_ok=True)
-                        continue
+                if DRY_RUN:
+                    print("🔍 DRY RUN")
+                    continue
 
-                    parent_folder_id = get_drive_parent_folder_id(
-                        industry=industry,
-                        broker=BROKER_NAME,
-                    )
+                if content_unchanged(deal, content_hash):
+                    print("⏭️ Content unchanged — PDF / Drive / DB rewrite skipped")
+                    pending.append(writer.submit(UNCHANGED_SQL, unchanged_params(row_id)))
+                    continue
 
-                    deal_folder_id = find_or_create_deal_folder(
-                        parent_folder_id=parent_folder_id,
-                        deal_id=canonical_external_id,
-                        deal_title=title,
-                    )
+                # -------------------------------
+                # PDF
+                # -------------------------------
+                pdf_path = PDF_ROOT / f"{canonical_external_id}.pdf"
+                page.emulate_media(media="print")
+                page.pdf(
+                    path=str(pdf_path),
+                    format="A4",
+                    margin={"top": "15mm", "bottom": "15mm"},
+                    print_background=True,
+                )
 
-                    pdf_hash = compute_file_hash(pdf_path)
+                if not pdf_path.exists() or pdf_path.stat().st_size < 10_000:
+                    pdf_path.unlink(missing_ok=True)
+                    continue
 
-                    pdf_drive_url = upload_pdf_to_drive(
-                        local_path=str(pdf_path),
-                        filename=f"{canonical_external_id}.pdf",
-                        folder_id=deal_folder_id,
-                    )
+                parent_folder_id = get_drive_parent_folder_id(
+                    industry=industry,
+                    broker=BROKER_NAME,
+                )
 
-                    record_deal_artifact(
-                        conn=conn,
-                        source=SOURCE,
-                        source_listing_id=canonical_external_id,
-                        deal_id=row_id,
-                        artifact_type="pdf",
-                        artifact_name=f"{canonical_external_id}.pdf",
-                        artifact_hash=pdf_hash,
-                        drive_file_id=pdf_drive_url.split("/d/")[1].split("/")[0],
-                        drive_url=pdf_drive_url,
-                        extraction_version=TRANSWORLD_EXTRACTION_VERSION,
-                        created_by="enrich_transworld.py",
-                    )
+                deal_folder_id = find_or_create_deal_folder(
+                    parent_folder_id=parent_folder_id,
+                    deal_id=canonical_external_id,
+                    deal_title=title,
+                )
 
-                    pdf_path.unlink(missing_ok=True)
+                pdf_hash = compute_file_hash(pdf_path)
 
-                    # -------------------------------
-                    # FINAL UPDATE (IDENTITY SAFE)
-                    # -------------------------------
-                    conn.execute(
-                        """
-                        UPDATE deals
-                        SET
-                            canonical_external_id = ?,
-                            description           = ?,
-                            location              = ?,
-                            sector_raw            = ?,
-                            industry              = ?,
-                            sector                = ?,
-                            sector_source         = 'broker',
-                            sector_inference_confidence = ?,
-                            sector_inference_reason     = ?,
-                            asking_price_k        = ?,
-                            ebitda_k              = ?,
-                            notes                 = ?,
-                            pdf_drive_url         = ?,
-                            drive_folder_id       = ?,
-                            drive_folder_url      = 'https://drive.google.com/drive/folders/' || ?,
-                            detail_fetched_at     = ?,
-                            needs_detail_refresh  = 0,
-                            last_updated          = CURRENT_TIMESTAMP,
-                            last_updated_source   = 'AUTO'
-                        WHERE id = ?
-                        """,
-                        (
-                            canonical_external_id,
-                            description,
-                            facts.get("location"),
-                            facts.get("sector_raw"),
-                            industry,
-                            sector,
-                            mapping["confidence"],
-                            mapping["reason"],
-                            facts.get("asking_price_k"),
-                            facts.get("ebitda_k"),
-                            facts.get("notes"),
-                            pdf_drive_url,
-                            deal_folder_id,
-                            deal_folder_id,
-                            fetched_at,
-                            row_id,
-                        ),
-                    )
-                    conn.commit()
+                pdf_drive_url = upload_pdf_to_drive(
+                    local_path=str(pdf_path),
+                    filename=f"{canonical_external_id}.pdf",
+                    folder_id=deal_folder_id,
+                )
+
+                record_deal_artifact(
+                    conn=conn,
+                    source=SOURCE,
+                    source_listing_id=canonical_external_id,
+                    deal_id=row_id,
+                    artifact_type="pdf",
+                    artifact_name=f"{canonical_external_id}.pdf",
+                    artifact_hash=pdf_hash,
+                    drive_file_id=pdf_drive_url.split("/d/")[1].split("/")[0],
+                    drive_url=pdf_drive_url,
+                    extraction_version=TRANSWORLD_EXTRACTION_VERSION,
+                    created_by="enrich_transworld.py",
+                )
+
+                pdf_path.unlink(missing_ok=True)
+
+                # -------------------------------
+                # FINAL UPDATE (IDENTITY SAFE)
+                # -------------------------------
+                conn.execute(
+                    """
+                    UPDATE deals
+                    SET
+                        canonical_external_id = ?,
+                        description           = ?,
+                        location              = ?,
+                        sector_raw            = ?,
+                        industry              = ?,
+                        sector                = ?,
+                        sector_source         = 'broker',
+                        sector_inference_confidence = ?,
+                        sector_inference_reason     = ?,
+                        asking_price_k        = ?,
+                        ebitda_k              = ?,
+                        notes                 = ?,
+                        content_hash          = ?,
+                        pdf_drive_url         = ?,
+                        drive_folder_id       = ?,
+                        drive_folder_url      = 'https://drive.google.com/drive/folders/' || ?,
+                        detail_fetched_at     = ?,
+                        needs_detail_refresh  = 0,
+                        last_updated          = CURRENT_TIMESTAMP,
+                        last_updated_source   = 'AUTO'
+                    WHERE id = ?
+                    """,
+                    (
+                        canonical_external_id,
+                        description,
+                        facts.get("location"),
+                        facts.get("sector_raw"),
+                        industry,
+                        sector,
+                        mapping["confidence"],
+                        mapping["reason"],
+                        facts.get("asking_price_k"),
+                        facts.get("ebitda_k"),
+                        facts.get("notes"),
+                        content_hash,
+                        pdf_drive_url,
+                        deal_folder_id,
+                        deal_folder_id,
+                        fetched_at,
+                        row_id,
+                    ),
+                )
+                conn.commit()
 
-                    print("✅ Enriched + uploaded")
-                    time.sleep(random.uniform(*SLEEP_BETWEEN))
+                print("✅ Enriched + uploaded")
 
-                finally:
-                    context.close()
+            finally:
+                pool.release(context)
 
-        finally:
-            browser.close()
-            conn.close()
+    finally:
+        writer.flush()
+        report_failures(pending, "Transworld unchanged stamp")
+        conn.close()
 
     print("\n🏁 Transworld enrichment complete")
 
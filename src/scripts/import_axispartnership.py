@@ -14,20 +14,17 @@ def main():
     finally:
         client.stop()
 
-    inserted = 0
-    refreshed = 0
-
-    for row in rows:
-        is_new = repo.upsert_index_only(
-            source=row["source"],
-            source_listing_id=row["source_listing_id"],
-            source_url=row["source_url"],
-        )
-
-        if is_new:
-            inserted += 1
-        else:
-            refreshed += 1
+    counts = repo.upsert_index_only_many(
+        {
+            "source": row["source"],
+            "source_listing_id": row["source_listing_id"],
+            "source_url": row["source_url"],
+        }
+        for row in rows
+    )
+
+    inserted = counts["inserted"]
+    refreshed = counts["updated"] + counts["unchanged"]
 
     print(f"✅ Axis import complete — inserted={inserted}, refreshed={refreshed}")
 
@@ -6,11 +6,11 @@ Contract:
 - Index pages only (detail pages may be gated)
 - Idempotent
 - DRY_RUN supported
+- --replay supported (HTML archive, no network)
 """
 
 import os
 import re
-import time
 from pathlib import Path
 from urllib.parse import urljoin, urlparse
 
@@ -18,6 +18,8 @@ from bs4 import BeautifulSoup
 
 from src.brokers.bsr_client import BusinessSaleReportClient
 from src.persistence.repository import SQLiteRepository
+from src.utils.html_archive import enable_replay, get_html_archive
+from src.utils.http_cache import get_http_cache
 
 
 # -------------------------------------------------------------------
@@ -31,7 +33,6 @@ DB_PATH = Path(__file__).resolve().parents[2] / "db" / "deals.sqlite"
 
 DRY_RUN = False #os.getenv("DRY_RUN", "1") == "0"
 MAX_PAGES = int(os.getenv("BSR_MAX_PAGES", "500"))
-SLEEP_SECS = float(os.getenv("BSR_SLEEP", "1.0"))
 
 
 # -------------------------------------------------------------------
@@ -54,6 +55,10 @@ def extract_listing_id(url: str) -> str:
 # Parsers
 # -------------------------------------------------------------------
 
+# bump when parse_index output changes (cached parse results are keyed by it)
+PARSER_VERSION = 1
+
+
 def parse_index(html: str) -> list[dict]:
     """
     Parse BSR index page.
@@ -94,22 +99,24 @@ def parse_index(html: str) -> list[dict]:
 def main():
     repo = SQLiteRepository(DB_PATH)
     client = BusinessSaleReportClient()
+    enable_replay()  # --replay: index/detail pages from the HTML archive
 
     print(f"🏷️ BSR import starting | DRY_RUN={DRY_RUN}")
 
     total_seen = 0
-    total_inserted = 0
+    inserted = 0
 
     for page in range(1, MAX_PAGES + 1):
         print(f"📄 Index page {page}")
 
-        html = client.list_page(page)
-        listings = parse_index(html)
+        # unchanged page (304): parsed listings come from the cache
+        listings = client.get(client.list_url(page)).parsed(parse_index, version=PARSER_VERSION)
 
         if not listings:
             print("🛑 No listings found, stopping")
             break
 
+        deals = []
         for rec in listings:
             total_seen += 1
 
@@ -148,17 +155,17 @@ def main():
             if DRY_RUN:
                 print("🧪 DRY_RUN deal:", deal)
             else:
-                repo.upsert_deal_v2(deal)
-                total_inserted += 1
-
-            time.sleep(SLEEP_SECS)
+                deals.append(deal)
 
-        time.sleep(SLEEP_SECS * 2)
+        # one batch per index page: a crash mid-crawl keeps earlier pages
+        inserted += repo.upsert_deal_v2_many(deals)["inserted"]
 
     print(
         f"✅ BSR import complete | "
-        f"seen={total_seen} inserted={total_inserted}"
+        f"seen={total_seen} inserted={inserted}"
     )
+    get_http_cache().report()
+    get_html_archive().report()
 
 
 if __name__ == "__main__":
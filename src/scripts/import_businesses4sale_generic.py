@@ -2,17 +2,18 @@
 #
 # DRY RUN – BusinessesForSale (Generic)
 # Category-based crawl, Cloudflare-safe
+# Incremental per category (CRAWL_MODE=full forces a full sweep)
 
 import os
-import time
-import random
 import sqlite3
 from pathlib import Path
-from typing import Dict, Set
+from typing import Set
 
 from bs4 import BeautifulSoup
-from playwright.sync_api import sync_playwright, TimeoutError
+from src.persistence.repository import SQLiteRepository
 from src.sector_mappings.b4s import B4S_SECTOR_MAP
+from src.utils.incremental_crawl import IncrementalCrawl
+from src.utils.partitioned_crawl import PartitionedCrawlSpec, run_partitioned_crawl
 # -------------------------------------------------
 # CONFIG
 # -------------------------------------------------
@@ -32,12 +33,10 @@ B4S_CATEGORIES = {
 }
 
 MAX_PAGES = 50
-SLEEP_BETWEEN_PAGES = 2
 
 HEADLESS = os.getenv("PLAYWRIGHT_HEADLESS", "0") == "1"
 
 STORAGE_STATE = Path(".playwright/businesses4sale_search_state.json")
-STORAGE_STATE.parent.mkdir(parents=True, exist_ok=True)
 
 REPO_ROOT = Path(__file__).resolve().parents[2]
 DB_PATH = REPO_ROOT / "db" / "deals.sqlite"
@@ -48,7 +47,6 @@ DB_PATH = REPO_ROOT / "db" / "deals.sqlite"
 
 def import_businesses4sale_search() -> None:
     seen_urls: Set[str] = set()
-    listings: Dict[str, dict] = {}
 
     # ---------------------------------------------
     # Preload existing B4S URLs for dedupe
@@ -69,148 +67,132 @@ def import_businesses4sale_search() -> None:
         print(f"🧠 Loaded {len(seen_urls)} existing B4S URLs for dedupe")
     else:
         print("⚠️ DB not found — skipping dedupe preload")
-    conn = sqlite3.connect(DB_PATH)
-    with sync_playwright() as p:
-        browser = p.chromium.launch(headless=HEADLESS)
-        context = _create_context(browser)
-        page = context.new_page()
-
-        # -----------------------------------------
-        # SESSION WARM-UP (homepage only)
-        # -----------------------------------------
-        print("🔥 Warming Cloudflare session")
-        page.goto("https://uk.businessesforsale.com", timeout=60_000)
-        time.sleep(5)
-
-        for category, base_url in B4S_CATEGORIES.items():
-            print(f"\n📂 CATEGORY: {category}")
-            mapping = B4S_SECTOR_MAP[category]  # ← THIS LINE
-            page_num = 1
-
-            while True:
-                url = base_url if page_num == 1 else f"{base_url}-{page_num}"
-                print(f"  🔍 PAGE {page_num}: {url}")
-
-                page.goto(url, timeout=60_000, wait_until="domcontentloaded")
-
-                try:
-                    page.wait_for_selector("div.result, div.search-result", timeout=20_000)
-                except TimeoutError:
-                    print("  🛑 No results — stopping category")
-                    break
-
-                soup = BeautifulSoup(page.content(), "html.parser")
-                blocks = soup.select("div.result, div.search-result")
-                print(f"  🔎 Results found: {len(blocks)}")
-
-                added = 0
-                skipped = 0
-
-                for block in blocks:
-                    rec = _parse_search_block(block)
-                    if not rec:
-                        continue
-
-                    url = rec["source_url"]
-
-                    if url in seen_urls:
-                        skipped += 1
-                        print("duplicate found")
-                        continue
-
-                    if "/franchises/" in url:
-                        skipped += 1
-                        print("franchise found")
-                        continue
-
-                    seen_urls.add(url)
-                    listings[url] = rec
-                    added += 1
-                    mapping = B4S_SECTOR_MAP[category]
-
-                    if DRY_RUN:
-                        print(
-                            "DRY_RUN →",
-                            rec["source_listing_id"],
-                            category,
-                            mapping["industry"],
-                            mapping["sector"],
-                            rec["source_url"],
-                        )
-                    else:
-                        conn.execute(
-                            """
-                            INSERT INTO deals (source,
-                                               source_listing_id,
-                                               source_url,
-                                               title,
-                                               sector_raw,
-                                               industry,
-                                               sector,
-                                               sector_source,
-                                               sector_inference_confidence,
-                                               sector_inference_reason,
-                                               needs_detail_refresh,
-                                               first_seen,
-                                               last_seen)
-                            VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, 1,
-                                    CURRENT_TIMESTAMP, CURRENT_TIMESTAMP) ON CONFLICT(source, source_listing_id)
-                            DO
-                            UPDATE SET last_seen = CURRENT_TIMESTAMP
-                            """,
-                            (
-                                SOURCE,
-                                rec["source_listing_id"],
-                                rec["source_url"],
-                                rec["title"],
-                                category,  # sector_raw
-                                mapping["industry"],
-                                mapping["sector"],
-                                "broker",
-                                mapping["confidence"],
-                                mapping["reason"],
-                            ),
-                        )
-                    print(f"    ➕ {rec['title'][:70]}")
-
-                print(f"  ➕ New: {added} | 🔁 Skipped: {skipped}")
-
-                if added == 0 or page_num >= MAX_PAGES:
-                    break
-
-                page_num += 1
-                time.sleep(SLEEP_BETWEEN_PAGES + random.random() * 2)
-
-        if DRY_RUN:
-            print(f"\n✅ DRY RUN COMPLETE — {len(listings)} net new listings (not persisted)")
-        else:
-            conn.commit()
-            print(f"\n✅ IMPORT COMPLETE — {len(listings)} net new listings committed")
 
-        conn.close()
-        context.storage_state(path=STORAGE_STATE)
-        browser.close()
+    repo = SQLiteRepository(DB_PATH)
+    known = repo.fetch_listing_ids(SOURCE)
+    crawls = {
+        category: IncrementalCrawl(repo, SOURCE, category, known=known)
+        for category in B4S_CATEGORIES
+    }
+
+    # every category in its own context; concurrency: PARTITION_LIMITS in
+    # partitioned_crawl.py, pacing: rate_limit.DOMAIN_LIMITS
+    rows = run_partitioned_crawl(
+        PartitionedCrawlSpec(
+            broker="BusinessesForSale",
+            partitions=B4S_CATEGORIES,
+            page_url=_page_url,
+            parse=_parse_results_page,
+            stop=lambda category, rows: crawls[category].page_seen(
+                [r["source_listing_id"] for r in rows]
+            ),
+            wait_selector="div.result, div.search-result",
+            max_pages=MAX_PAGES,
+            # Cloudflare session: homepage once, cookies shared by all categories
+            warmup_url="https://uk.businessesforsale.com",
+            warmup_wait_ms=5_000,
+            storage_state=STORAGE_STATE,
+        ),
+        headless=HEADLESS,
+    )
+
+    listings = [r for r in rows if r["source_url"] not in seen_urls]
+    still_listed = [r["source_listing_id"] for r in rows if r["source_url"] in seen_urls]
+    print(f"➕ New: {len(listings)} | 🔁 Already known: {len(still_listed)}")
+
+    if DRY_RUN:
+        for rec in listings:
+            mapping = B4S_SECTOR_MAP[rec["sector_raw"]]
+            print(
+                "DRY_RUN →",
+                rec["source_listing_id"],
+                rec["sector_raw"],
+                mapping["industry"],
+                mapping["sector"],
+                rec["source_url"],
+            )
+        print(f"\n✅ DRY RUN COMPLETE — {len(listings)} net new listings (not persisted)")
+        return
+
+    # one transaction for the whole index
+    conn = sqlite3.connect(DB_PATH)
+    with conn:
+        conn.executemany(
+            """
+            INSERT INTO deals (source,
+                               source_listing_id,
+                               source_url,
+                               title,
+                               sector_raw,
+                               industry,
+                               sector,
+                               sector_source,
+                               sector_inference_confidence,
+                               sector_inference_reason,
+                               needs_detail_refresh,
+                               first_seen,
+                               last_seen)
+            VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, 1,
+                    CURRENT_TIMESTAMP, CURRENT_TIMESTAMP) ON CONFLICT(source, source_listing_id)
+            DO
+            UPDATE SET last_seen = CURRENT_TIMESTAMP
+            """,
+            [_insert_values(rec) for rec in listings],
+        )
+        # listings known from earlier runs: keep last_seen current
+        conn.executemany(
+            """
+            UPDATE deals
+            SET last_seen = CURRENT_TIMESTAMP
+            WHERE source = ? AND source_listing_id = ?
+            """,
+            [(SOURCE, listing_id) for listing_id in still_listed],
+        )
+    conn.close()
+    print(f"\n✅ IMPORT COMPLETE — {len(listings)} net new listings committed")
+
+    for crawl in crawls.values():
+        crawl.finish()
 
 # -------------------------------------------------
 # HELPERS
 # -------------------------------------------------
 
-def _create_context(browser):
-    if STORAGE_STATE.exists():
-        print("🔐 Reusing Cloudflare session")
-        return browser.new_context(storage_state=STORAGE_STATE)
-
-    print("🧠 New browser context")
-    return browser.new_context(
-        viewport={"width": 1280, "height": 900},
-        user_agent=(
-            "Mozilla/5.0 (Macintosh; Intel Mac OS X 10_15_7) "
-            "AppleWebKit/537.36 (KHTML, like Gecko) "
-            "Chrome/120.0.0.0 Safari/537.36"
-        ),
+def _page_url(base_url: str, page_num: int) -> str:
+    return base_url if page_num == 1 else f"{base_url}-{page_num}"
+
+
+def _insert_values(rec: dict) -> tuple:
+    mapping = B4S_SECTOR_MAP[rec["sector_raw"]]
+    return (
+        SOURCE,
+        rec["source_listing_id"],
+        rec["source_url"],
+        rec["title"],
+        rec["sector_raw"],  # category
+        mapping["industry"],
+        mapping["sector"],
+        "broker",
+        mapping["confidence"],
+        mapping["reason"],
     )
 
 
+def _parse_results_page(category: str, html: str) -> list[dict]:
+    soup = BeautifulSoup(html, "html.parser")
+    blocks = soup.select("div.result, div.search-result")
+    print(f"  🔎 {category}: {len(blocks)} results")
+
+    rows = []
+    for block in blocks:
+        rec = _parse_search_block(block)
+        if not rec or "/franchises/" in rec["source_url"]:
+            continue
+        rec["sector_raw"] = category
+        rows.append(rec)
+    return rows
+
+
 def _parse_search_block(block) -> dict | None:
     a = block.select_one("h2 a")
     if not a:
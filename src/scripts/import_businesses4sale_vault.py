@@ -30,16 +30,16 @@ def main():
     # later:
     # repo.insert_raw_deal(...)
 
-    inserted = 0
-    for rec in records:
-        repo.upsert_index_only(
-            source=rec["source"],
-            source_listing_id=rec["source_listing_id"],
-            source_url=rec["source_url"],
-        )
-        inserted += 1
-
-    print(f"✅ BusinessesForSale index imported: {inserted}")
+    counts = repo.upsert_index_only_many(
+        {
+            "source": rec["source"],
+            "source_listing_id": rec["source_listing_id"],
+            "source_url": rec["source_url"],
+        }
+        for rec in records
+    )
+
+    print(f"✅ BusinessesForSale index imported: {len(records)} | {counts}")
 
 if __name__ == "__main__":
     main()
\ No newline at end of file
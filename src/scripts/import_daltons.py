@@ -6,11 +6,13 @@ Contract:
 - Prevent broker duplicates
 - Idempotent
 - DRY_RUN supported
+- --replay supported (HTML archive, no network)
+- Incremental: stops paging once the index only shows known listings
+  (CRAWL_MODE=full forces a full sweep, see incremental_crawl.py)
 """
 
 import os
 import re
-import time
 from pathlib import Path
 from urllib.parse import urljoin, urlparse
 
@@ -18,6 +20,9 @@ from bs4 import BeautifulSoup
 
 from src.brokers.daltons_client import DaltonsClient
 from src.persistence.repository import SQLiteRepository
+from src.utils.html_archive import enable_replay, get_html_archive
+from src.utils.http_cache import get_http_cache
+from src.utils.incremental_crawl import NEWEST_FIRST, IncrementalCrawl
 
 SOURCE = "Daltons"
 BASE_URL = "https://www.daltonsbusiness.com"
@@ -25,7 +30,6 @@ DB_PATH = Path(__file__).resolve().parents[2] / "db" / "deals.sqlite"
 
 DRY_RUN = False #os.getenv("DRY_RUN", "1") == "1"
 MAX_PAGES = int(os.getenv("DALTONS_MAX_PAGES", "50"))
-SLEEP_SECS = float(os.getenv("DALTONS_SLEEP", "1.2"))
 
 
 # --------------------------------------------------
@@ -65,6 +69,10 @@ def extract_broker_info(soup: BeautifulSoup) -> tuple[str | None, str | None]:
 # Parsers
 # --------------------------------------------------
 
+# bump when parse_index output changes (cached parse results are keyed by it)
+PARSER_VERSION = 1
+
+
 def parse_index(html: str) -> list[str]:
     soup = BeautifulSoup(html, "html.parser")
     seen = set()
@@ -106,24 +114,35 @@ def parse_detail(html: str) -> dict:
 def main():
     repo = SQLiteRepository(DB_PATH)
     client = DaltonsClient()
+    replay = enable_replay()  # --replay: index/detail pages from the HTML archive
 
     print(f"🏷️ Daltons import starting | DRY_RUN={DRY_RUN}")
 
-    seen = inserted = skipped = 0
+    # WordPress archive: newest listings first
+    crawl = IncrementalCrawl(repo, SOURCE, ordering=NEWEST_FIRST)
+
+    seen = skipped = 0
+    counts = {"inserted": 0, "updated": 0}
 
     for page in range(1, MAX_PAGES + 1):
         print(f"📄 Index page {page}")
-        urls = parse_index(client.list_page(page))
+        # unchanged page (304): parsed URLs come from the cache
+        urls = client.get(client.list_url(page)).parsed(parse_index, version=PARSER_VERSION)
 
         if not urls:
             break
 
+        stop = crawl.page_seen([extract_listing_id(url) for url in urls])
+
+        deals = []
+        still_listed = []
         for url in urls:
             seen += 1
             listing_id = extract_listing_id(url)
 
             # Idempotency (Daltons-level)
             if repo.deal_exists(SOURCE, listing_id):
+                still_listed.append(listing_id)
                 skipped += 1
                 continue
 
@@ -162,12 +181,27 @@ def main():
             if DRY_RUN:
                 print("🧪 DRY_RUN deal:", deal)
             else:
-                repo.upsert_deal_v2(deal)
-                inserted += 1
+                deals.append(deal)
 
-            time.sleep(SLEEP_SECS)
+        # one batch per index page: a crash mid-crawl keeps earlier pages
+        page_counts = repo.upsert_deal_v2_many(deals)
+        for key in counts:
+            counts[key] += page_counts[key]
+        if not DRY_RUN and not replay:
+            repo.touch_last_seen(SOURCE, still_listed)
 
-    print(f"✅ Daltons import complete | seen={seen} inserted={inserted} skipped={skipped}")
+        if stop:
+            break
+
+    if not DRY_RUN and not replay:
+        crawl.finish()
+
+    print(
+        f"✅ Daltons import complete | seen={seen} inserted={counts['inserted']} "
+        f"updated={counts['updated']} skipped={skipped}"
+    )
+    get_http_cache().report()
+    get_html_archive().report()
 
 
 if __name__ == "__main__":
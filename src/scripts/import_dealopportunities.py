@@ -3,6 +3,7 @@ from datetime import datetime
 
 from src.persistence.repository import SQLiteRepository
 from src.brokers.dealopportunities_client import DealOpportunitiesClient
+from src.utils.incremental_crawl import IncrementalCrawl
 
 # ----------------------------------
 # DRY RUN CONFIG
@@ -19,9 +20,13 @@ def main():
     client = DealOpportunitiesClient()
     client.start()          # 🔑 REQUIRED
 
+    # stops once pages only show known listings (CRAWL_MODE=full: every page)
+    crawl = IncrementalCrawl(repo, "DealOpportunities")
+
     try:
         rows = client.fetch_index(
-            max_pages=DRY_RUN_PAGES if DRY_RUN else 100
+            max_pages=DRY_RUN_PAGES if DRY_RUN else 100,
+            crawl=crawl,
         )
     finally:
         client.stop()       # 🔑 ALWAYS clean up
@@ -88,6 +93,8 @@ def main():
         print(f"\n🧪 DRY RUN complete — rows_fetched={len(preview)}")
         return
 
+    crawl.finish()
+
     print(
         f"✅ DealOpportunities import complete — "
         f"inserted={inserted}, refreshed={refreshed}"
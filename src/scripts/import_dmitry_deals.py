@@ -154,6 +154,7 @@ def main():
 
     imported = 0
     updated = 0
+    deals = []
 
     for sheet_name, sheet_date in SHEETS.items():
         ws = sh.worksheet(sheet_name)
@@ -328,13 +329,15 @@ def main():
                             + f"\n⚠ Possible duplicate of {dup['source_listing_id']} (desc hash match)"
                     )
 
-            repo.upsert_deal_v2(deal)
+            deals.append(deal)
 
             if existing:
                 updated += 1
             else:
                 imported += 1
 
+    repo.upsert_deal_v2_many(deals)
+
     print(
         f"✅ Dmitry import complete — imported={imported}, updated={updated}"
     )
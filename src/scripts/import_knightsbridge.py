@@ -25,49 +25,31 @@ def normalize_knightsbridge_sector(s: str | None) -> str | None:
 def import_knightsbridge():
     print(f"📀 SQLite DB path: {DB_PATH}")
 
+    # sectors crawled in parallel, merged and de-duplicated (public index:
+    # no browser session / login needed)
+    rows = KnightsbridgeClient().fetch_index()
+    today = date.today().isoformat()
+
     conn = sqlite3.connect(DB_PATH)
     conn.row_factory = sqlite3.Row
 
-    client = KnightsbridgeClient()
-    client.start()
-
     try:
-        rows = client.fetch_index()
-        today = date.today().isoformat()
+        existing = {
+            r["source_listing_id"]: r["id"]
+            for r in conn.execute(
+                "SELECT id, source_listing_id FROM deals WHERE source = 'Knightsbridge'"
+            )
+        }
 
-        inserted = 0
-        refreshed = 0
+        refreshes = []
+        inserts = []
 
         for row in rows:
-            cur = conn.execute(
-                """
-                SELECT id
-                FROM deals
-                WHERE source = ?
-                  AND source_listing_id = ?
-                """,
-                (row["source"], row["source_listing_id"]),
-            ).fetchone()
-
-            if cur:
-                conn.execute(
-                    """
-                    UPDATE deals
-                    SET
-                        last_seen = ?,
-                        title = COALESCE(title, ?),
-                        source_url = ?
-                    WHERE id = ?
-                    """,
-                    (
-                        today,
-                        row["title"],
-                        row["source_url"],
-                        cur["id"],
-                    ),
-                )
-                refreshed += 1
+            deal_id = existing.get(row["source_listing_id"])
+            if deal_id is not None:
+                refreshes.append((today, row["title"], row["source_url"], deal_id))
                 continue
+
             normalized_sector_raw = normalize_knightsbridge_sector(
                 row["sector_raw"]
             )
@@ -87,10 +69,38 @@ def import_knightsbridge():
                     reason,
                 ) = resolve_knightsbridge_sector(normalized_sector_raw)
 
-            conn.execute(
+            inserts.append(
+                (
+                    row["source"],
+                    row["source_listing_id"],
+                    row["source_url"],
+                    row["title"],
+                    normalized_sector_raw,
+                    industry,
+                    sector,
+                    sector_source,
+                    confidence,
+                    reason,
+                    today,
+                    today,
+                )
+            )
 
+        # one transaction for the whole index
+        with conn:
+            conn.executemany(
+                """
+                UPDATE deals
+                SET
+                    last_seen = ?,
+                    title = COALESCE(title, ?),
+                    source_url = ?
+                WHERE id = ?
+                """,
+                refreshes,
+            )
+            conn.executemany(
                 """
-
                 INSERT INTO deals (source,
                                    source_listing_id,
                                    source_url,
@@ -106,32 +116,15 @@ def import_knightsbridge():
                                    needs_detail_refresh)
                 VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, 1)
                 """,
-                (
-                    row["source"],
-                    row["source_listing_id"],
-                    row["source_url"],
-                    row["title"],
-                    normalized_sector_raw,
-                    industry,
-                    sector,
-                    sector_source,
-                    confidence,
-                    reason,
-                    today,
-                    today,
-                ),
+                inserts,
             )
-            inserted += 1
-
-        conn.commit()
 
         print(
             f"✅ Knightsbridge import complete — "
-            f"inserted={inserted}, refreshed={refreshed}"
+            f"inserted={len(inserts)}, refreshed={len(refreshes)}"
         )
 
     finally:
-        client.stop()
         conn.close()
 
 if __name__ == "__main__":
@@ -103,7 +103,7 @@ def main():
 
     print(f"📥 Loaded {len(rows)} legacy rows")
 
-    imported = 0
+    deals = []
 
     for row_num, row in enumerate(rows, start=2):
 
@@ -175,13 +175,13 @@ def main():
         #     deal["deal_id"],
         #     "OUTCOME=", repr(deal.get("outcome"))
         # )
-        repo.upsert_legacy_deal(deal)
-        imported += 1
+        deals.append(deal)
 
     if DRY_RUN:
         print("🧪 DRY RUN complete — no data written")
     else:
-        print(f"✅ Imported {imported} legacy deals into SQLite")
+        counts = repo.upsert_legacy_deal_many(deals)
+        print(f"✅ Imported {len(deals)} legacy deals into SQLite | {counts}")
 
 
 if __name__ == "__main__":
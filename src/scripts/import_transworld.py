@@ -4,9 +4,12 @@ from pathlib import Path
 from bs4 import BeautifulSoup
 from hashlib import sha1
 import re
+from urllib.parse import urljoin
 from datetime import datetime
 from src.persistence.repository import SQLiteRepository
 from src.brokers.transworld_client import TransworldUKClient
+from src.utils.html_archive import enable_replay, get_html_archive
+from src.utils.http_cache import get_http_cache
 
 DRY_RUN = False
 
@@ -37,9 +40,78 @@ def parse_asking_price_k(text: str | None):
     return value
 
 
+# bump when parse_index output changes (cached parse results are keyed by it)
+PARSER_VERSION = 1
+
+
+def parse_index(html: str) -> dict:
+    """
+    One index page: {"items", "records": [...], "skipped": [url, ...],
+    "next_url": str | None}. Pure: results are cached (http_cache.py).
+    """
+    soup = BeautifulSoup(html, "html.parser")
+    items = soup.select("li.result-item.paginateresults")
+    records = []
+    skipped = []
+
+    for item in items:
+        a_tag = item.find("a")
+        if not a_tag:
+            continue
+
+        source_url = urljoin(TransworldUKClient.BASE_URL, a_tag["href"])
+        source_listing_id = a_tag["href"].rstrip("/").split("/")[-1]
+
+        # --------------------------------------------
+        # HARD GUARD — INVALID TRANSWORLD LISTINGS
+        # --------------------------------------------
+        if not is_valid_transworld_listing(source_listing_id, source_url):
+            skipped.append(source_url)
+            continue
+
+        def text(sel):
+            el = item.select_one(sel)
+            return el.get_text(strip=True) if el else None
+
+        title = text("h3.locname")
+
+        location = price = sector_raw = None
+        for li in item.select("ul li"):
+            t = li.get_text(strip=True)
+            if t.startswith("Location:"):
+                location = t.replace("Location:", "").strip()
+            elif t.startswith("Asking Price:"):
+                price = t.replace("Asking Price:", "").strip()
+            elif t.startswith("Category:"):
+                sector_raw = t.replace("Category:", "").strip()
+
+        asking_price_k = parse_asking_price_k(price)
+
+        blob = "|".join(str(x) for x in [title, location, price, sector_raw])
+        content_hash = sha1(blob.encode("utf-8")).hexdigest()
+
+        records.append({
+            "source": "transworld_uk",
+            "source_listing_id": source_listing_id,
+            "source_url": source_url,
+            "title": title,
+            "sector_raw": sector_raw,
+            "location_raw": location,
+            "asking_price_k": asking_price_k,
+            "status": "active",
+            "content_hash": content_hash,
+        })
+
+    next_link = soup.find("a", string=lambda s: s and "Next" in s)
+    next_url = urljoin(TransworldUKClient.BASE_URL, next_link["href"]) if next_link else None
+
+    return {"items": len(items), "records": records, "skipped": skipped, "next_url": next_url}
+
+
 def main():
     repo = SQLiteRepository(Path("db/deals.sqlite"))
     client = TransworldUKClient()
+    enable_replay()  # --replay: index/detail pages from the HTML archive
 
     print("🚀 import_transworld started")
 
@@ -49,66 +121,21 @@ def main():
 
     while next_page_url and next_page_url not in visited:
         visited.add(next_page_url)
-        html = client.fetch_index_page(next_page_url)
-        if not html:
+        resp = client.get_page(next_page_url)
+        if not resp:
             break
 
-        soup = BeautifulSoup(html, "html.parser")
-        items = soup.select("li.result-item.paginateresults")
-        if not items:
+        # unchanged page (304): parsed records come from the cache
+        page = resp.parsed(parse_index, version=PARSER_VERSION)
+        if not page["items"]:
             break
 
-        for item in items:
-            a_tag = item.find("a")
-            if not a_tag:
-                continue
-
-            source_url = client.resolve_url(a_tag["href"])
-            source_listing_id = a_tag["href"].rstrip("/").split("/")[-1]
-
-            # --------------------------------------------
-            # HARD GUARD — INVALID TRANSWORLD LISTINGS
-            # --------------------------------------------
-            if not is_valid_transworld_listing(source_listing_id, source_url):
-                if DRY_RUN:
-                    print("⛔ skipped invalid listing:", source_url)
-                continue
-
-            def text(sel):
-                el = item.select_one(sel)
-                return el.get_text(strip=True) if el else None
-
-            title = text("h3.locname")
-
-            location = price = sector_raw = None
-            for li in item.select("ul li"):
-                t = li.get_text(strip=True)
-                if t.startswith("Location:"):
-                    location = t.replace("Location:", "").strip()
-                elif t.startswith("Asking Price:"):
-                    price = t.replace("Asking Price:", "").strip()
-                elif t.startswith("Category:"):
-                    sector_raw = t.replace("Category:", "").strip()
-
-            asking_price_k = parse_asking_price_k(price)
-
-            blob = "|".join(str(x) for x in [title, location, price, sector_raw])
-            content_hash = sha1(blob.encode("utf-8")).hexdigest()
-
-            records.append({
-                "source": "transworld_uk",
-                "source_listing_id": source_listing_id,
-                "source_url": source_url,
-                "title": title,
-                "sector_raw": sector_raw,
-                "location_raw": location,
-                "asking_price_k": asking_price_k,
-                "status": "active",
-                "content_hash": content_hash,
-            })
-
-        next_link = soup.find("a", string=lambda s: s and "Next" in s)
-        next_page_url = client.resolve_url(next_link["href"]) if next_link else None
+        if DRY_RUN:
+            for url in page["skipped"]:
+                print("⛔ skipped invalid listing:", url)
+
+        records.extend(page["records"])
+        next_page_url = page["next_url"]
 
     print(f"📦 Records scraped: {len(records)}")
     for r in records[:5]:
@@ -118,6 +145,7 @@ def main():
         print("\n🧪 DRY RUN — no database writes performed")
         return
 
+    batch = []
     for r in records:
         now = datetime.today().isoformat()
         existing = repo.get_conn().execute(
@@ -133,20 +161,24 @@ def main():
         if existing:
             continue
 
-        repo.upsert_index_only(
-            source=r["source"],
-            source_listing_id=r["source_listing_id"],
-            source_url=r["source_url"],
-            title=r["title"],
-            sector_raw=r.get("sector_raw"),
-            location_raw=r.get("location_raw"),
-            turnover_range_raw=None,
-            first_seen=now,
-            last_seen=now,
-            last_updated=now,
-            last_updated_source="IMPORT",
-        )
+        batch.append({
+            "source": r["source"],
+            "source_listing_id": r["source_listing_id"],
+            "source_url": r["source_url"],
+            "title": r["title"],
+            "sector_raw": r.get("sector_raw"),
+            "location_raw": r.get("location_raw"),
+            "turnover_range_raw": None,
+            "first_seen": now,
+            "last_seen": now,
+            "last_updated": now,
+            "last_updated_source": "IMPORT",
+        })
+
+    repo.upsert_index_only_many(batch)
     print(f"✅ Transworld index import complete: {len(records)}")
+    get_http_cache().report()
+    get_html_archive().report()
 
 
 if __name__ == "__main__":
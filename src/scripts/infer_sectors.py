@@ -1,4 +1,5 @@
 from pathlib import Path
+from src.persistence.deal_search import fts_any
 from src.persistence.repository import SQLiteRepository
 from src.integrations.drive_folders import get_drive_parent_folder_id
 from src.integrations.google_drive import move_folder_to_parent
@@ -101,21 +102,48 @@ SECTOR_KEYWORDS = [
 # HELPERS
 # ============================================================
 
-def normalize(text: str) -> str:
-    return (text or "").lower()
-
-def infer_sector(text: str):
-    text_l = normalize(text)
-    for industry, sector, keywords in SECTOR_KEYWORDS:
-        hits = [kw for kw in keywords if kw in text_l]
-        if hits:
-            return {
-                "industry": industry,
-                "sector": sector,
-                "confidence": min(0.9, 0.4 + 0.1 * len(hits)),
-                "reason": f"Matched keywords: {', '.join(hits)}",
-            }
-    return None
+# deals still waiting for a sector
+CANDIDATES_SQL = "d.sector_source IS NULL OR d.sector_source = 'unclassified'"
+
+# text the keywords are matched against
+KEYWORD_COLUMNS = ["sector_raw", "description"]
+
+# ids per lookup query (SQLITE_MAX_VARIABLE_NUMBER is 999 on old builds)
+ID_CHUNK = 500
+
+def infer_sectors(repo) -> dict[int, dict]:
+    """
+    Keyword inference for every candidate deal. One deals_fts lookup per
+    keyword (trigram index, so "care agency" matches "healthcare agency"
+    like the old `kw in text`); only ids leave SQLite. First matching
+    SECTOR_KEYWORDS rule wins.
+    """
+    matched_by_id: dict[int, set[str]] = {}
+
+    for _, _, kws in SECTOR_KEYWORDS:
+        for kw in kws:
+            for deal_id in repo.search_deals(
+                fts_any([kw], columns=KEYWORD_COLUMNS),
+                where=CANDIDATES_SQL,
+                limit=None,
+            ):
+                matched_by_id.setdefault(deal_id, set()).add(kw)
+
+    inferred: dict[int, dict] = {}
+
+    for deal_id, matched_all in matched_by_id.items():
+        for industry, sector, kws in SECTOR_KEYWORDS:
+            matched = [kw for kw in kws if kw in matched_all]
+            if matched:
+                inferred[deal_id] = {
+                    "industry": industry,
+                    "sector": sector,
+                    "confidence": min(0.9, 0.4 + 0.1 * len(matched)),
+                    "reason": f"Matched keywords: {', '.join(matched)}",
+                }
+                break
+
+    return inferred
 
 def maybe_move_drive_folder(deal, new_industry):
     old_industry = deal.get("industry")
@@ -149,37 +177,34 @@ def maybe_move_drive_folder(deal, new_industry):
 def main():
     repo = SQLiteRepository(Path("db/deals.sqlite"))
 
-    deals = repo.fetch_all("""
-            SELECT
-                id,
-                source,
-                industry,
-                sector,
-                sector_source,
-                sector_raw,
-                description,
-                drive_folder_id
-            FROM deals
-            WHERE sector_source IS NULL
-               OR sector_source = 'unclassified'
-    """)
+    inferred = infer_sectors(repo)
+    if not inferred:
+        print("\n✅ Sector inference complete — updated=0")
+        return
+
+    ids = sorted(inferred)
+    deals = []
+    for i in range(0, len(ids), ID_CHUNK):
+        chunk = ids[i:i + ID_CHUNK]
+        deals.extend(repo.fetch_all(f"""
+                SELECT
+                    id,
+                    source,
+                    industry,
+                    sector,
+                    sector_source,
+                    drive_folder_id
+                FROM deals
+                WHERE id IN ({", ".join("?" for _ in chunk)})
+                ORDER BY id
+        """, tuple(chunk)))
 
     updated = 0
 
     for d in deals:
         old_industry = d.get("industry")
 
-        text = " ".join(
-            filter(None, [
-                d.get("sector_raw"),
-                d.get("industry_raw"),
-                d.get("description"),
-            ])
-        )
-
-        inference = infer_sector(text)
-        if not inference:
-            continue
+        inference = inferred[d["id"]]
 
         if inference["confidence"] < 0.5:
             continue
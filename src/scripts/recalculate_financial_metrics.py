@@ -5,8 +5,8 @@ from src.persistence.repository import SQLiteRepository
 
 def main():
     repo = SQLiteRepository(Path("db/deals.sqlite"))
-    repo.recalculate_financial_metrics()
-    print("✅ Financial metrics recalculated")
+    updated = repo.recalculate_financial_metrics()
+    print(f"✅ Financial metrics recalculated ({updated} rows changed)")
 
 if __name__ == "__main__":
     main()
\ No newline at end of file
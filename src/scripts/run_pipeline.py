@@ -1,11 +1,10 @@
 import time
-import subprocess
-import sys
 from pathlib import Path
 import os
 
+from src.utils.run_scripts import run_script, run_scripts_by_domain
+
 PROJECT_ROOT = Path(__file__).resolve().parents[2]
-SCRIPTS_DIR = PROJECT_ROOT / "src" / "scripts"
 
 SCRIPTS = [
     "import_axispartnership.py",
@@ -16,7 +15,7 @@ SCRIPTS = [
     "import_hiltonsmythe.py",
     "import_transworld.py",
     "import_abercorn.py",
-    "import_businesses4sale_generic.py"
+    "import_businesses4sale_generic.py",
 
     "enrich_axispartnership.py",
     "enrich_businessbuyers.py",
@@ -27,47 +26,33 @@ SCRIPTS = [
     "enrich_transworld.py",
     "enrich_abercorn.py",
 
+    # POSTPROCESS_FROM: from here on, sequential
     "infer_sectors.py",
     "enrich_financials_from_description.py",
     "recalculate_financial_metrics.py",
     "sync_to_sheets.py",
 ]
+POSTPROCESS_FROM = SCRIPTS.index("infer_sectors.py")
 
-def run_script(script_name: str, env=None):
-    script_path = SCRIPTS_DIR / script_name
-    print(f"\n🚀 Running {script_name}")
-
+def main():
     start = time.perf_counter()
 
-    try:
-        subprocess.check_call(
-            [sys.executable, str(script_path)],
-            env={**os.environ, **(env or {})},
-        )
-        status = "ok"
-    except subprocess.CalledProcessError:
-        print(f"⚠️ Script failed but pipeline continues: {script_name}")
-        status = "failed"
-
-    elapsed = time.perf_counter() - start
-    print(f"⏱️ {script_name} finished in {elapsed:.1f}s ({status})")
-
-    return elapsed, status
+    # broker imports + enrichment side by side, one lane per domain
+    # (see run_scripts_by_domain); the rest runs after them, in order
+    timings = run_scripts_by_domain(SCRIPTS[:POSTPROCESS_FROM])
 
-
-def main():
-    timings = []
-
-    for script in SCRIPTS:
+    for script in SCRIPTS[POSTPROCESS_FROM:]:
         elapsed, status = run_script(script)
         timings.append((script, elapsed, status))
 
+    wall = time.perf_counter() - start
+
     print("\n📊 PIPELINE TIMING SUMMARY")
     for script, elapsed, status in sorted(timings, key=lambda x: x[1], reverse=True):
         print(f"{elapsed:7.1f}s  {status:6}  {script}")
 
     total = sum(t for _, t, _ in timings)
-    print(f"\n⏱️ TOTAL PIPELINE TIME: {total/60:.1f} minutes")
+    print(f"\n⏱️ TOTAL PIPELINE TIME: {wall/60:.1f} minutes ({total/60:.1f} minutes of script time)")
 
 
 if __name__ == "__main__":
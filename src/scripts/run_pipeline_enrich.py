@@ -7,7 +7,7 @@ import os
 PROJECT_ROOT = Path(__file__).resolve().parents[2]
 SCRIPTS_DIR = PROJECT_ROOT / "src" / "scripts"
 
-from src.utils.run_scripts import run_script
+from src.utils.run_scripts import run_scripts_by_domain
 
 SCRIPTS = [
     # "import_axispartnership.py",
@@ -38,18 +38,19 @@ SCRIPTS = [
 ]
 
 def main():
-    timings = []
+    start = time.perf_counter()
 
-    for script in SCRIPTS:
-        elapsed, status = run_script(script)
-        timings.append((script, elapsed, status))
+    # brokers side by side, one lane per domain (see run_scripts_by_domain)
+    timings = run_scripts_by_domain(SCRIPTS)
+
+    wall = time.perf_counter() - start
 
     print("\n📊 PIPELINE TIMING SUMMARY")
     for script, elapsed, status in sorted(timings, key=lambda x: x[1], reverse=True):
         print(f"{elapsed:7.1f}s  {status:6}  {script}")
 
     total = sum(t for _, t, _ in timings)
-    print(f"\n⏱️ TOTAL PIPELINE TIME: {total/60:.1f} minutes")
+    print(f"\n⏱️ TOTAL PIPELINE TIME: {wall/60:.1f} minutes ({total/60:.1f} minutes of script time)")
 
 
 if __name__ == "__main__":
@@ -3,7 +3,7 @@ import os
 import json
 from pathlib import Path
 
-from src.utils.run_scripts import run_script
+from src.utils.run_scripts import run_scripts_by_domain
 
 PROJECT_ROOT = Path(__file__).resolve().parents[2]
 
@@ -27,15 +27,13 @@ FAILURE_REPORT_PATH = PROJECT_ROOT / "pipeline_failures.json"
 
 
 def main():
-    timings = []
-    failed_scripts = []
+    start = time.perf_counter()
 
-    for script in SCRIPTS:
-        elapsed, status = run_script(script)
-        timings.append((script, elapsed, status))
+    # brokers side by side, one lane per domain (see run_scripts_by_domain)
+    timings = run_scripts_by_domain(SCRIPTS)
+    failed_scripts = [script for script, _, status in timings if status != "ok"]
 
-        if status != "ok":
-            failed_scripts.append(script)
+    wall = time.perf_counter() - start
 
     # -----------------------------
     # Timing summary (unchanged)
@@ -47,7 +45,7 @@ def main():
         print(f"{elapsed:7.1f}s  {status:6}  {script}")
 
     total = sum(t for _, t, _ in timings)
-    print(f"\n⏱️ TOTAL PIPELINE TIME: {total/60:.1f} minutes")
+    print(f"\n⏱️ TOTAL PIPELINE TIME: {wall/60:.1f} minutes ({total/60:.1f} minutes of script time)")
 
     # -----------------------------
     # Failure signal for GitHub Actions
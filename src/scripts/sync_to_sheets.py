@@ -95,6 +95,7 @@ def main():
 
     # 1️⃣ ALWAYS pull analyst edits first
     pull_sheets_to_sqlite(repo, ws, columns=DEAL_COLUMNS)
+    # catch-up only: triggers keep derived financials current on write
     repo.recompute_effective_fields()
     recalculate_financial_metrics()
 
@@ -118,6 +119,7 @@ def main():
         assert_schema_alignment(repo, ws)
 
         push_sqlite_to_sheets(repo, ws)
+        repo.prune_change_log()
 
         print("✅ DATA PHASE COMPLETE (INCREMENTAL)")
         return
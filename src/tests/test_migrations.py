@@ -0,0 +1,161 @@
+# src/tests/test_migrations.py
+"""
+Schema check on an empty DB: every migration applies, then the triggers
+the pipeline relies on do their job (enrichment queue, derived
+financials, change log, full-text index).
+
+    python -m src.tests.test_migrations
+"""
+
+import sqlite3
+import tempfile
+from pathlib import Path
+
+from src.persistence.deal_search import fts_any
+from src.persistence.enrichment_queue import DUE_NOW
+from src.persistence.migrations import LATEST_VERSION, current_version, migrate
+
+
+def insert_deal(conn, listing_id: str, **fields) -> int:
+    cols = {"source": "TestBroker", "source_listing_id": listing_id, **fields}
+    cur = conn.execute(
+        f"INSERT INTO deals ({', '.join(cols)}) VALUES ({', '.join('?' for _ in cols)})",
+        tuple(cols.values()),
+    )
+    return cur.lastrowid
+
+
+def deal(conn, deal_id: int) -> sqlite3.Row:
+    return conn.execute("SELECT * FROM deals WHERE id = ?", (deal_id,)).fetchone()
+
+
+def check_migrations(conn):
+    assert current_version(conn) == 0
+    assert migrate(conn) == LATEST_VERSION
+    # already current: nothing applied, same version
+    assert migrate(conn) == LATEST_VERSION
+    print(f"✅ migrations 1–{LATEST_VERSION} applied")
+
+
+def check_enrichment_queue(conn):
+    deal_id = insert_deal(conn, "Q1")
+    assert deal(conn, deal_id)["next_refresh_at"] == DUE_NOW
+
+    conn.execute(
+        """
+        UPDATE deals
+        SET detail_fetched_at = '2026-01-01T10:00:00', needs_detail_refresh = 0
+        WHERE id = ?
+        """,
+        (deal_id,),
+    )
+    assert deal(conn, deal_id)["next_refresh_at"] == "2026-01-15 10:00:00"
+
+    conn.execute("UPDATE deals SET status = 'Under Offer' WHERE id = ?", (deal_id,))
+    assert deal(conn, deal_id)["next_refresh_at"] == "2026-01-03 10:00:00"
+
+    conn.execute("UPDATE deals SET needs_detail_refresh = 1 WHERE id = ?", (deal_id,))
+    assert deal(conn, deal_id)["next_refresh_at"] == DUE_NOW
+    print("✅ next_refresh_at maintained on insert / update")
+
+
+def check_derived_financials(conn):
+    deal_id = insert_deal(conn, "F1", revenue_k=1000, ebitda_k=200, asking_price_k=800)
+    row = deal(conn, deal_id)
+    assert row["revenue_k_effective"] == 1000
+    assert row["ebitda_margin"] == 20.0
+    assert row["revenue_multiple"] == 0.8
+    assert row["ebitda_multiple"] == 4.0
+
+    # manual value overrides the broker value
+    conn.execute("UPDATE deals SET revenue_k_manual = 2000 WHERE id = ?", (deal_id,))
+    row = deal(conn, deal_id)
+    assert row["revenue_k_effective"] == 2000
+    assert row["ebitda_margin"] == 10.0
+    assert row["revenue_multiple"] == 0.4
+    print("✅ derived financials maintained on insert / update")
+
+
+def check_change_log(conn):
+    def changes(deal_id):
+        return [
+            (r["op"], r["changed_columns"])
+            for r in conn.execute(
+                "SELECT op, changed_columns FROM deal_changes WHERE deal_rowid = ? ORDER BY seq",
+                (deal_id,),
+            )
+        ]
+
+    deal_id = insert_deal(conn, "C1", title="Old title")
+    assert changes(deal_id) == [("INSERT", None)]
+
+    # bookkeeping only (touch_last_seen, unchanged-content stamp): not logged
+    conn.execute(
+        "UPDATE deals SET last_seen = '2026-01-01', detail_fetched_at = '2026-01-01' WHERE id = ?",
+        (deal_id,),
+    )
+    assert changes(deal_id) == [("INSERT", None)]
+
+    conn.execute("UPDATE deals SET title = 'New title' WHERE id = ?", (deal_id,))
+    assert changes(deal_id)[-1] == ("UPDATE", ",title,")
+
+    conn.execute("DELETE FROM deals WHERE id = ?", (deal_id,))
+    assert changes(deal_id)[-1] == ("DELETE", None)
+    print("✅ deal_changes logs inserts, real updates and deletes")
+
+
+def check_full_text_search(conn):
+    def search(query):
+        return [
+            r[0]
+            for r in conn.execute(
+                "SELECT rowid FROM deals_fts WHERE deals_fts MATCH ?", (query,)
+            )
+        ]
+
+    deal_id = insert_deal(
+        conn,
+        "S1",
+        title="Established healthcare agency",
+        description="Domiciliary care across Surrey",
+    )
+
+    # trigram: substring match, like `kw in text`
+    assert search(fts_any(["care agency"])) == [deal_id]
+    assert search(fts_any(["care agency"], columns=["description"])) == []
+    assert search(fts_any(["domiciliary"], columns=["description"])) == [deal_id]
+
+    try:
+        fts_any(["ai"])
+    except ValueError:
+        pass
+    else:
+        raise AssertionError("terms below the trigram length must be rejected")
+
+    conn.execute("UPDATE deals SET title = 'Cleaning contractor' WHERE id = ?", (deal_id,))
+    assert search(fts_any(["care agency"])) == []
+    assert search(fts_any(["cleaning"])) == [deal_id]
+
+    conn.execute("DELETE FROM deals WHERE id = ?", (deal_id,))
+    assert search(fts_any(["cleaning"])) == []
+    print("✅ deals_fts kept in sync (trigram)")
+
+
+def main():
+    with tempfile.TemporaryDirectory() as tmp:
+        conn = sqlite3.connect(Path(tmp) / "deals.sqlite", isolation_level=None)
+        conn.row_factory = sqlite3.Row
+        try:
+            check_migrations(conn)
+            check_enrichment_queue(conn)
+            check_derived_financials(conn)
+            check_change_log(conn)
+            check_full_text_search(conn)
+        finally:
+            conn.close()
+
+    print("\n🏁 Schema checks passed")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,357 @@
+# src/utils/browser_pool.py
+"""
+Shared Chromium pool for every Playwright broker client.
+
+One long-lived Playwright driver and a handful of browsers (one per
+launch profile: headless / slow_mo) per process; clients only ever get
+an isolated BrowserContext.
+
+- acquire:  pool.new_context("Knightsbridge", storage_state=True)
+- release:  pool.release(context, save_state=True)
+- or:       with pool.context("Daltons") as ctx: ...
+
+Contexts come with the broker's request-blocking policy installed
+(resource_policy.py).
+
+Health: a disconnected browser is relaunched on the next acquire.
+Recycling: after RECYCLE_AFTER contexts a browser is relaunched as soon
+as it has no open contexts (keeps Chromium memory in check on long runs).
+Long-lived contexts (logged-in enrichment runs) are recycled by their
+caller when ContextHealth says so: renderer JS heap above
+RECYCLE_HEAP_MB or error rate above RECYCLE_ERROR_RATE.
+Shutdown: explicit pool.shutdown(), or automatically at exit.
+
+Playwright's sync API is bound to the thread that started it, so the
+pool is per thread (get_browser_pool()).
+"""
+
+import atexit
+import os
+import threading
+from collections import deque
+from contextlib import contextmanager
+from pathlib import Path
+
+from playwright.sync_api import sync_playwright
+
+from src.utils.resource_policy import (
+    ResourcePolicy,
+    apply_resource_policy,
+    policy_for,
+)
+
+STATE_DIR = Path(".playwright")
+RECYCLE_AFTER = 200
+
+# ContextHealth thresholds
+RECYCLE_HEAP_MB = int(os.getenv("PLAYWRIGHT_RECYCLE_HEAP_MB", "512"))
+RECYCLE_ERROR_RATE = float(os.getenv("PLAYWRIGHT_RECYCLE_ERROR_RATE", "0.3"))
+ERROR_WINDOW = 20        # pages
+HEAP_CHECK_EVERY = 10    # pages
+
+DEFAULT_VIEWPORT = {"width": 1280, "height": 900}
+DEFAULT_USER_AGENT = (
+    "Mozilla/5.0 (Macintosh; Intel Mac OS X 10_15_7) "
+    "AppleWebKit/537.36 (KHTML, like Gecko) "
+    "Chrome/120.0.0.0 Safari/537.36"
+)
+
+
+def default_headless() -> bool:
+    return os.getenv("PLAYWRIGHT_HEADLESS", "0") == "1"
+
+
+def state_path(broker: str) -> Path:
+    """
+    Where a broker's cookies / localStorage are persisted.
+    """
+    return STATE_DIR / f"{broker.lower()}_state.json"
+
+
+class _BrowserSlot:
+    def __init__(self, browser):
+        self.browser = browser
+        self.served = 0
+        self.open: set = set()
+
+
+class BrowserPool:
+    def __init__(self, *, recycle_after: int = RECYCLE_AFTER):
+        self.recycle_after = recycle_after
+        self._playwright = None
+        self._slots: dict[tuple, _BrowserSlot] = {}
+        self._owner: dict = {}          # context -> (slot key, state path)
+
+    # ------------------------------------------------------------------
+    # BROWSERS
+    # ------------------------------------------------------------------
+
+    def _slot(self, headless: bool, slow_mo: int) -> _BrowserSlot:
+        if self._playwright is None:
+            self._playwright = sync_playwright().start()
+
+        key = (headless, slow_mo)
+        slot = self._slots.get(key)
+
+        if slot is not None and not slot.browser.is_connected():
+            print("⚠️ Pooled browser disconnected — relaunching")
+            slot = None
+
+        if slot is not None and slot.served >= self.recycle_after and not slot.open:
+            print(f"♻️ Recycling browser after {slot.served} contexts")
+            self._close_browser(slot)
+            slot = None
+
+        if slot is None:
+            print(f"🚀 Launching pooled Chromium (headless={headless}, slow_mo={slow_mo})")
+            slot = _BrowserSlot(
+                self._playwright.chromium.launch(headless=headless, slow_mo=slow_mo)
+            )
+            self._slots[key] = slot
+
+        return slot
+
+    def browser(self, *, headless: bool | None = None, slow_mo: int = 0):
+        """
+        The pooled browser itself, for code that needs Browser-level calls.
+        Prefer new_context(): contexts are what get isolated and recycled.
+        """
+        headless = default_headless() if headless is None else headless
+        return self._slot(headless, slow_mo).browser
+
+    # ------------------------------------------------------------------
+    # CONTEXTS
+    # ------------------------------------------------------------------
+
+    def new_context(
+        self,
+        broker: str,
+        *,
+        headless: bool | None = None,
+        slow_mo: int = 0,
+        storage_state: bool | Path = False,
+        resource_policy: ResourcePolicy | bool = True,
+        **context_options,
+    ):
+        """
+        Fresh isolated context for broker.
+        storage_state: True → state_path(broker); or an explicit path.
+                       Loaded if the file exists, written on release(save_state=True).
+        resource_policy: True → policy_for(broker); a ResourcePolicy; False → no blocking.
+        """
+        headless = default_headless() if headless is None else headless
+        slot = self._slot(headless, slow_mo)
+
+        state_file = None
+        if storage_state:
+            state_file = state_path(broker) if storage_state is True else Path(storage_state)
+            if state_file.exists():
+                print(f"🔐 Reusing saved {broker} session")
+                context_options.setdefault("storage_state", str(state_file))
+
+        context = slot.browser.new_context(**context_options)
+
+        if resource_policy is True:
+            resource_policy = policy_for(broker)
+        if resource_policy:
+            apply_resource_policy(context, resource_policy)
+
+        slot.served += 1
+        slot.open.add(context)
+        self._owner[context] = ((headless, slow_mo), state_file)
+        return context
+
+    def release(self, context, *, save_state: bool = False):
+        """
+        Close a context obtained from new_context (optionally persisting its state).
+        """
+        key, state_file = self._owner.pop(context, (None, None))
+
+        try:
+            if save_state and state_file is not None:
+                state_file.parent.mkdir(parents=True, exist_ok=True)
+                context.storage_state(path=str(state_file))
+        finally:
+            try:
+                context.close()
+            except Exception as e:
+                print(f"⚠️ Context close failed: {e}")
+
+            slot = self._slots.get(key)
+            if slot is not None:
+                slot.open.discard(context)
+
+    def save_state(self, context) -> bool:
+        """
+        Persist a context's cookies / localStorage now (e.g. right after
+        login), without closing it. False if it has no state file.
+        """
+        _, state_file = self._owner.get(context, (None, None))
+        if state_file is None:
+            return False
+
+        state_file.parent.mkdir(parents=True, exist_ok=True)
+        context.storage_state(path=str(state_file))
+        return True
+
+    @contextmanager
+    def context(self, broker: str, *, save_state: bool = False, **kwargs):
+        ctx = self.new_context(broker, **kwargs)
+        try:
+            yield ctx
+        finally:
+            self.release(ctx, save_state=save_state)
+
+    # ------------------------------------------------------------------
+    # HEALTH / SHUTDOWN
+    # ------------------------------------------------------------------
+
+    def health(self) -> list[dict]:
+        return [
+            {
+                "headless": headless,
+                "slow_mo": slow_mo,
+                "connected": slot.browser.is_connected(),
+                "contexts_served": slot.served,
+                "contexts_open": len(slot.open),
+            }
+            for (headless, slow_mo), slot in self._slots.items()
+        ]
+
+    def _close_browser(self, slot: _BrowserSlot):
+        for context in list(slot.open):
+            self._owner.pop(context, None)
+        slot.open.clear()
+        try:
+            slot.browser.close()
+        except Exception as e:
+            print(f"⚠️ Browser close failed: {e}")
+
+    def shutdown(self):
+        slots, self._slots = list(self._slots.values()), {}
+        for slot in slots:
+            self._close_browser(slot)
+        self._owner.clear()
+
+        if self._playwright is not None:
+            try:
+                self._playwright.stop()
+            finally:
+                self._playwright = None
+
+
+# ------------------------------------------------------------------
+# CONTEXT HEALTH
+# ------------------------------------------------------------------
+
+class ContextHealth:
+    """
+    When to recycle a long-lived context: measured renderer memory
+    (JS heap, sampled every heap_check_every pages) or the error rate
+    over the last `window` pages.
+
+        health.tick()                      # one page started
+        health.failed()                    # ... and it failed
+        if health.should_recycle(page): ...recycle, then health.reset()
+    """
+
+    def __init__(
+        self,
+        label: str,
+        *,
+        max_heap_mb: float = RECYCLE_HEAP_MB,
+        max_error_rate: float = RECYCLE_ERROR_RATE,
+        window: int = ERROR_WINDOW,
+        heap_check_every: int = HEAP_CHECK_EVERY,
+    ):
+        self.label = label
+        self.max_heap_mb = max_heap_mb
+        self.max_error_rate = max_error_rate
+        self.heap_check_every = heap_check_every
+        self.outcomes: deque[bool] = deque(maxlen=window)
+        self.pages = 0
+        self.recycles = 0
+
+    def tick(self):
+        self.outcomes.append(True)
+        self.pages += 1
+
+    def failed(self):
+        if self.outcomes:
+            self.outcomes[-1] = False
+
+    def error_rate(self) -> float:
+        if not self.outcomes:
+            return 0.0
+        return self.outcomes.count(False) / len(self.outcomes)
+
+    @staticmethod
+    def heap_mb(page) -> float | None:
+        """
+        Renderer JS heap of page, in MB (CDP Performance metrics).
+        """
+        try:
+            cdp = page.context.new_cdp_session(page)
+            try:
+                cdp.send("Performance.enable")
+                metrics = cdp.send("Performance.getMetrics")["metrics"]
+            finally:
+                cdp.detach()
+        except Exception:
+            return None
+
+        for m in metrics:
+            if m["name"] == "JSHeapTotalSize":
+                return m["value"] / 1e6
+        return None
+
+    def should_recycle(self, page=None) -> bool:
+        if len(self.outcomes) == self.outcomes.maxlen and self.error_rate() > self.max_error_rate:
+            print(
+                f"♻️ {self.label}: recycling context — "
+                f"error rate {self.error_rate():.0%} over {len(self.outcomes)} pages"
+            )
+            return True
+
+        if page is None or not self.pages or self.pages % self.heap_check_every:
+            return False
+
+        heap = self.heap_mb(page)
+        if heap is not None and heap > self.max_heap_mb:
+            print(f"♻️ {self.label}: recycling context — JS heap {heap:.0f} MB")
+            return True
+        return False
+
+    def reset(self):
+        self.outcomes.clear()
+        self.recycles += 1
+
+
+# ------------------------------------------------------------------
+# PER-THREAD REGISTRY
+# ------------------------------------------------------------------
+
+_local = threading.local()
+_POOLS: list[BrowserPool] = []
+_POOLS_LOCK = threading.Lock()
+
+
+def get_browser_pool() -> BrowserPool:
+    pool = getattr(_local, "pool", None)
+    if pool is None:
+        pool = BrowserPool()
+        _local.pool = pool
+        with _POOLS_LOCK:
+            _POOLS.append(pool)
+    return pool
+
+
+@atexit.register
+def shutdown_browser_pools():
+    with _POOLS_LOCK:
+        pools, _POOLS[:] = list(_POOLS), []
+    for pool in pools:
+        try:
+            pool.shutdown()
+        except Exception as e:
+            print(f"⚠️ Browser pool shutdown failed: {e}")
@@ -36,6 +36,7 @@ def compute_content_hash(
     title: str,
     description: str,
     location: Optional[str] = None,
+    facts: Optional[dict] = None,
 ) -> str:
     """
     Canonical hash of extracted business content.
@@ -43,6 +44,8 @@ def compute_content_hash(
     Contract:
     - title and description MUST be present
     - location is optional
+    - facts: optional broker-declared values (price, financials) that
+      are not part of the description; omitted → same hash as before
     - hashing is semantic, not presentational
     - broker-agnostic meaning
     """
@@ -52,6 +55,8 @@ def compute_content_hash(
         "description": _normalize_text(description),
         "location": _normalize_text(location) if location else None,
     }
+    if facts:
+        payload["facts"] = facts
 
     blob = json.dumps(payload, sort_keys=True, ensure_ascii=False)
     return hashlib.sha256(blob.encode("utf-8")).hexdigest()
\ No newline at end of file
@@ -0,0 +1,207 @@
+# src/utils/html_archive.py
+"""
+Content-addressed archive of every fetched broker page, and offline
+replay from it.
+
+Archive: the raw HTML of each index / detail fetch is stored once per
+distinct body as ARCHIVE_DIR/<sha256[:2]>/<sha256>.html.gz; every fetch
+adds a manifest row to html_snapshots (url, deal, fetched_at, hash —
+see src/persistence/html_snapshots.py), written through repo.writer.
+The shared fetch paths archive automatically: polite_goto / polite_get
+(rate_limit.py), HttpCache.get, HybridFetcher and the async enrichment
+runner.
+
+Replay: a script started with --replay calls enable_replay(); from then
+on those same fetch paths serve the latest archived snapshot of a URL
+instead of touching the network, so extraction can be re-run over the
+whole corpus (new *_EXTRACTION_VERSION, parser fix) without crawling.
+Replay never writes to the archive.
+
+Blobs live on local disk only. Where they cannot outlive the run (CI:
+only db/deals.sqlite is restored), archiving is off — HTML_ARCHIVE=1 /
+=0 overrides — so no manifest row points at a blob that is gone. A
+manifest row whose blob is missing replays as NotArchived.
+
+    if enable_replay():
+        deals = repo.fetch_archived_deals(SOURCE)
+"""
+
+import gzip
+import hashlib
+import os
+import sys
+import threading
+import weakref
+from datetime import datetime
+from pathlib import Path
+
+from src.persistence.html_snapshots import INSERT_SNAPSHOT_SQL
+from src.persistence.repository import SQLiteRepository
+
+ARCHIVE_DIR = Path(os.getenv("HTML_ARCHIVE_DIR", "archive/html"))
+# off by default on GitHub Actions: the blob directory is not kept
+ARCHIVE_ENABLED = os.getenv(
+    "HTML_ARCHIVE", "0" if os.getenv("GITHUB_ACTIONS") == "true" else "1"
+) == "1"
+DB_PATH = Path("db/deals.sqlite")
+
+REPLAY_FLAG = "--replay"
+
+
+class NotArchived(LookupError):
+    pass
+
+
+class HtmlArchive:
+    def __init__(self, root: Path = ARCHIVE_DIR, db_path: Path = DB_PATH, *, enabled: bool = ARCHIVE_ENABLED):
+        self.root = Path(root)
+        self.db_path = db_path
+        self.enabled = enabled
+        self.replay = False
+        self.stats = {"stored": 0, "deduplicated": 0, "replayed": 0}
+
+        self._repo: SQLiteRepository | None = None
+        self._lock = threading.Lock()
+
+    @property
+    def repo(self) -> SQLiteRepository:
+        with self._lock:
+            if self._repo is None:
+                self._repo = SQLiteRepository(self.db_path)
+            return self._repo
+
+    # ------------------------------------------------------------------
+    # BLOBS
+    # ------------------------------------------------------------------
+
+    def blob_path(self, content_hash: str) -> Path:
+        return self.root / content_hash[:2] / f"{content_hash}.html.gz"
+
+    def read(self, content_hash: str) -> str:
+        with gzip.open(self.blob_path(content_hash), "rt", encoding="utf-8") as f:
+            return f.read()
+
+    def _write_blob(self, content_hash: str, data: bytes) -> bool:
+        path = self.blob_path(content_hash)
+        if path.exists():
+            return False
+
+        path.parent.mkdir(parents=True, exist_ok=True)
+        tmp = path.with_name(f"{path.name}.{os.getpid()}.{threading.get_ident()}.tmp")
+        with gzip.open(tmp, "wb") as f:
+            f.write(data)
+        tmp.replace(path)
+        return True
+
+    # ------------------------------------------------------------------
+    # ARCHIVE / REPLAY
+    # ------------------------------------------------------------------
+
+    def put(self, url: str, html: str | None, *, status: int | None = None) -> str | None:
+        """
+        Archive one fetch. Returns the content hash (None in replay mode,
+        with archiving off or for an empty body).
+        """
+        if self.replay or not self.enabled or not html:
+            return None
+
+        data = html.encode("utf-8")
+        content_hash = hashlib.sha256(data).hexdigest()
+
+        stored = self._write_blob(content_hash, data)
+        with self._lock:
+            self.stats["stored" if stored else "deduplicated"] += 1
+
+        self.repo.writer.submit(
+            INSERT_SNAPSHOT_SQL,
+            (url, url, status, content_hash, len(data), datetime.utcnow().isoformat()),
+        )
+        return content_hash
+
+    def snapshot(self, url: str) -> tuple[int, str]:
+        """
+        (status, html) of the latest archived fetch of url.
+        """
+        row = self.repo.latest_html_snapshot(url)
+        if row is None:
+            raise NotArchived(url)
+
+        try:
+            html = self.read(row["content_hash"])
+        except FileNotFoundError:
+            # manifest row from a run whose blob directory was not kept
+            raise NotArchived(url) from None
+        with self._lock:
+            self.stats["replayed"] += 1
+        return row["status"] or 200, html
+
+    def report(self):
+        s = self.stats
+        if self.replay:
+            print(f"📼 HTML archive: {s['replayed']} pages replayed")
+        else:
+            print(
+                f"📼 HTML archive: {s['stored']} new blobs | "
+                f"{s['deduplicated']} unchanged"
+            )
+
+
+_ARCHIVE: HtmlArchive | None = None
+_ARCHIVE_LOCK = threading.Lock()
+
+
+def get_html_archive() -> HtmlArchive:
+    global _ARCHIVE
+    with _ARCHIVE_LOCK:
+        if _ARCHIVE is None:
+            _ARCHIVE = HtmlArchive()
+        return _ARCHIVE
+
+
+def enable_replay(argv=None) -> bool:
+    """
+    Switch the process to replay mode when --replay was given.
+    Returns whether replay mode is on.
+    """
+    argv = sys.argv[1:] if argv is None else argv
+    archive = get_html_archive()
+    if REPLAY_FLAG in argv and not archive.replay:
+        archive.replay = True
+        print("📼 Replay mode — pages come from the HTML archive, no network")
+    return archive.replay
+
+
+def replay_enabled() -> bool:
+    return _ARCHIVE is not None and _ARCHIVE.replay
+
+
+# ------------------------------------------------------------------
+# PLAYWRIGHT
+# ------------------------------------------------------------------
+
+# page → {url: (status, html)} served by its replay route
+_REPLAY_DOCUMENTS = weakref.WeakKeyDictionary()
+
+
+def replay_goto(page, url: str, **goto_kwargs):
+    """
+    page.goto served from the archive: the document is fulfilled from
+    its snapshot, every other request of the page is aborted.
+    """
+    documents = _REPLAY_DOCUMENTS.get(page)
+    if documents is None:
+        documents = _REPLAY_DOCUMENTS[page] = {}
+
+        def serve(route):
+            doc = documents.get(route.request.url)
+            if doc is None:
+                route.abort()
+                return
+            status, html = doc
+            route.fulfill(status=status, content_type="text/html; charset=utf-8", body=html)
+
+        page.route("**/*", serve)
+
+    documents[url] = get_html_archive().snapshot(url)
+    return page.goto(url, **goto_kwargs)
+
@@ -0,0 +1,331 @@
+# src/utils/http_cache.py
+"""
+On-disk HTTP cache with conditional GET for the requests-based clients
+(Daltons, BSR, Transworld, Hilton Smythe).
+
+Each URL has one gzip-compressed JSON entry under CACHE_DIR (body,
+ETag / Last-Modified, timestamps, memoised parse results). A repeat
+request for a cached URL:
+
+- within `fresh_for` seconds      → served from disk, no request
+- otherwise                       → If-None-Match / If-Modified-Since;
+                                    a 304 serves the cached body
+- entry older than `max_age`      → dropped, plain GET
+
+Every network request still goes through the domain's rate limiter,
+and every new body is archived (html_archive.py). In replay mode the
+archived snapshot is served and nothing is cached.
+
+Eviction: entries past max_age are deleted, then the least recently
+used ones until the cache is below max_bytes (at startup and every
+EVICT_EVERY stores).
+
+Unchanged pages are not re-parsed either: CachedResponse.parsed(fn,
+version=...) returns the result stored with the entry when the body did
+not change. The version is an explicit PARSER_VERSION next to the
+parser, bumped whenever its output changes.
+
+    cache = get_http_cache()
+    resp = cache.get(session, url, timeout=(5, 20))
+    resp.raise_for_status()
+    listings = resp.parsed(parse_index, version=PARSER_VERSION)
+    ...
+    cache.report()
+"""
+
+import gzip
+import hashlib
+import json
+import os
+import threading
+import time
+from pathlib import Path
+
+import requests
+
+from src.utils.html_archive import NotArchived, get_html_archive, replay_enabled
+from src.utils.rate_limit import get_rate_limiter
+
+CACHE_DIR = Path(os.getenv("HTTP_CACHE_DIR", ".cache/http"))
+
+DEFAULT_FRESH_FOR = 0               # always revalidate
+DEFAULT_MAX_AGE = 30 * 24 * 3600
+DEFAULT_MAX_BYTES = 200 * 1024 * 1024
+
+EVICT_EVERY = 200
+
+
+def _url_key(url: str) -> str:
+    return hashlib.sha256(url.encode("utf-8")).hexdigest()
+
+
+def _body_hash(text: str) -> str:
+    return hashlib.sha1(text.encode("utf-8")).hexdigest()
+
+
+def _parser_key(fn, version) -> str:
+    # explicit version: bump the parser's PARSER_VERSION when its output
+    # changes, stored results for older versions are ignored
+    return f"{fn.__module__}.{fn.__qualname__}:v{version}"
+
+
+def _as_json(value):
+    # results are served as stored (JSON): same types on hits and misses
+    return json.loads(json.dumps(value))
+
+
+class CachedResponse:
+    """
+    Response served by HttpCache.
+
+    source: "hit"          fresh entry, no request made
+            "not_modified" 304, cached body
+            "miss"         full response from the broker
+            "replay"       archived snapshot (replay mode)
+    """
+
+    def __init__(self, cache, url: str, status: int, text: str, source: str, entry: dict | None = None):
+        self.cache = cache
+        self.url = url
+        self.status = status
+        self.text = text
+        self.source = source
+        self.entry = entry
+
+    @property
+    def not_modified(self) -> bool:
+        return self.source != "miss"
+
+    def raise_for_status(self):
+        if self.status >= 400:
+            raise requests.HTTPError(f"{self.status} Error for url: {self.url}")
+
+    def parsed(self, fn, *, version: int):
+        """
+        fn(text), memoised with the cache entry: only re-run when the
+        body changed or `version` was bumped. fn must be pure (it is
+        skipped on a hit) and return JSON data (tuples come back as lists,
+        on every path).
+        """
+        if self.entry is None:
+            return _as_json(fn(self.text))
+
+        key = _parser_key(fn, version)
+        parsed = self.entry.setdefault("parsed", {})
+        if key in parsed:
+            self.cache.stats["parse_skipped"] += 1
+            return parsed[key]
+
+        result = _as_json(fn(self.text))
+        parsed[key] = result
+        self.cache.store(self.entry)
+        return result
+
+
+class HttpCache:
+    def __init__(
+        self,
+        cache_dir: Path = CACHE_DIR,
+        *,
+        fresh_for: float = DEFAULT_FRESH_FOR,
+        max_age: float = DEFAULT_MAX_AGE,
+        max_bytes: int = DEFAULT_MAX_BYTES,
+    ):
+        self.cache_dir = Path(cache_dir)
+        self.fresh_for = fresh_for
+        self.max_age = max_age
+        self.max_bytes = max_bytes
+        self.stats = {"hit": 0, "not_modified": 0, "miss": 0, "parse_skipped": 0}
+
+        self._lock = threading.Lock()
+        self._stores = 0
+
+        self.cache_dir.mkdir(parents=True, exist_ok=True)
+        self.evict()
+
+    # ------------------------------------------------------------------
+    # ENTRIES
+    # ------------------------------------------------------------------
+
+    def _path(self, url: str) -> Path:
+        key = _url_key(url)
+        return self.cache_dir / key[:2] / f"{key}.json.gz"
+
+    def load(self, url: str) -> dict | None:
+        path = self._path(url)
+        try:
+            with gzip.open(path, "rt", encoding="utf-8") as f:
+                entry = json.load(f)
+        except FileNotFoundError:
+            return None
+        except (OSError, EOFError, ValueError):
+            # truncated / corrupt entry
+            path.unlink(missing_ok=True)
+            return None
+
+        if entry.get("url") != url:
+            return None
+        if time.time() - entry["validated_at"] > self.max_age:
+            path.unlink(missing_ok=True)
+            return None
+        return entry
+
+    def store(self, entry: dict):
+        path = self._path(entry["url"])
+        path.parent.mkdir(parents=True, exist_ok=True)
+
+        tmp = path.with_name(f"{path.name}.{os.getpid()}.{threading.get_ident()}.tmp")
+        with gzip.open(tmp, "wt", encoding="utf-8") as f:
+            json.dump(entry, f)
+        tmp.replace(path)
+
+        with self._lock:
+            self._stores += 1
+            evict = self._stores % EVICT_EVERY == 0
+        if evict:
+            self.evict()
+
+    def touch(self, url: str):
+        # mtime = last use, for LRU eviction
+        try:
+            os.utime(self._path(url))
+        except FileNotFoundError:
+            pass
+
+    # ------------------------------------------------------------------
+    # FETCH
+    # ------------------------------------------------------------------
+
+    def get(self, session, url: str, **get_kwargs) -> CachedResponse:
+        """
+        session.get with caching and conditional GET. Network requests
+        go through the domain's rate limiter.
+        """
+        if replay_enabled():
+            try:
+                status, text = get_html_archive().snapshot(url)
+            except NotArchived:
+                # never fetched: as if the page did not exist
+                status, text = 404, ""
+            return CachedResponse(self, url, status, text, "replay")
+
+        entry = self.load(url)
+        now = time.time()
+
+        if entry and now - entry["validated_at"] < self.fresh_for:
+            self._count("hit")
+            self.touch(url)
+            return CachedResponse(self, url, entry["status"], entry["body"], "hit", entry)
+
+        headers = dict(get_kwargs.pop("headers", None) or {})
+        if entry:
+            if entry.get("etag"):
+                headers["If-None-Match"] = entry["etag"]
+            if entry.get("last_modified"):
+                headers["If-Modified-Since"] = entry["last_modified"]
+
+        limiter = get_rate_limiter()
+        limiter.acquire(url)
+        resp = session.get(url, headers=headers, **get_kwargs)
+
+        if resp.status_code == 304 and entry:
+            limiter.observe(url, status=304)
+            self._count("not_modified")
+            entry["validated_at"] = now
+            entry["etag"] = resp.headers.get("ETag", entry.get("etag"))
+            entry["last_modified"] = resp.headers.get("Last-Modified", entry.get("last_modified"))
+            self.store(entry)
+            return CachedResponse(self, url, entry["status"], entry["body"], "not_modified", entry)
+
+        text = resp.text
+        limiter.observe(url, status=resp.status_code, html=text)
+        get_html_archive().put(url, text, status=resp.status_code)
+        self._count("miss")
+
+        if resp.status_code != 200:
+            return CachedResponse(self, url, resp.status_code, text, "miss")
+
+        body_hash = _body_hash(text)
+        new_entry = {
+            "url": url,
+            "status": resp.status_code,
+            "etag": resp.headers.get("ETag"),
+            "last_modified": resp.headers.get("Last-Modified"),
+            "validated_at": now,
+            "body_hash": body_hash,
+            "body": text,
+            # same body without a 304 (no validators): parse results still hold
+            "parsed": entry.get("parsed", {}) if entry and entry.get("body_hash") == body_hash else {},
+        }
+        self.store(new_entry)
+        return CachedResponse(self, url, resp.status_code, text, "miss", new_entry)
+
+    def _count(self, key: str):
+        with self._lock:
+            self.stats[key] += 1
+
+    # ------------------------------------------------------------------
+    # EVICTION
+    # ------------------------------------------------------------------
+
+    def evict(self):
+        """
+        Drop entries past max_age, then least recently used ones until
+        the cache fits in max_bytes.
+        """
+        now = time.time()
+        files = []
+        total = 0
+        removed = 0
+
+        for path in self.cache_dir.glob("*/*.json.gz"):
+            try:
+                st = path.stat()
+            except FileNotFoundError:
+                continue
+            if now - st.st_mtime > self.max_age:
+                path.unlink(missing_ok=True)
+                removed += 1
+                continue
+            files.append((st.st_mtime, st.st_size, path))
+            total += st.st_size
+
+        if total > self.max_bytes:
+            files.sort()
+            for _, size, path in files:
+                if total <= self.max_bytes:
+                    break
+                path.unlink(missing_ok=True)
+                total -= size
+                removed += 1
+
+        if removed:
+            print(f"🧹 HTTP cache: evicted {removed} entries ({total / 1e6:.1f} MB kept)")
+
+    # ------------------------------------------------------------------
+    # REPORTING
+    # ------------------------------------------------------------------
+
+    def report(self):
+        s = self.stats
+        requests_made = s["not_modified"] + s["miss"]
+        print(
+            f"🗄️ HTTP cache: {s['hit']} hits | {s['not_modified']} not modified (304) | "
+            f"{s['miss']} misses | {requests_made} requests | "
+            f"{s['parse_skipped']} parses skipped"
+        )
+
+
+_CACHE: HttpCache | None = None
+_CACHE_LOCK = threading.Lock()
+
+
+def get_http_cache() -> HttpCache:
+    """
+    Process-wide cache shared by every requests-based client.
+    """
+    global _CACHE
+    with _CACHE_LOCK:
+        if _CACHE is None:
+            _CACHE = HttpCache()
+        return _CACHE
@@ -0,0 +1,213 @@
+# src/utils/hybrid_fetch.py
+"""
+HTTP-first detail fetching on top of a logged-in Playwright context.
+
+Detail pages of most brokers are server-rendered: the HTML we parse is
+in the first response. HybridFetcher copies the context's cookies into
+a requests.Session and fetches that HTML over plain HTTP; the browser
+is only used when the response looks wrong:
+
+- pushback (403/429/503, Cloudflare challenge)  → browser (+ cookie resync)
+- JS shell (almost no text / required marker missing) → browser
+- network error / 5xx                          → browser
+- anything else, 404/410 included              → HTTP result is final
+
+When a page is still needed (PDF, DOM-based extraction), goto() hands
+the already-fetched document to the page via route.fulfill: the browser
+renders it without requesting it from the broker again.
+
+Fetched pages are archived; in replay mode both paths are served from
+the archive (html_archive.py).
+
+    fetcher = HybridFetcher(context, required_marker='id="BusinessDetails"')
+    html = fetcher.fetch_html(url)            # parse only
+    response = fetcher.goto(page, url)        # page needed (PDF)
+"""
+
+import re
+
+import requests
+
+from src.utils.browser_pool import DEFAULT_USER_AGENT
+from src.utils.html_archive import NotArchived, get_html_archive, replay_enabled, replay_goto
+from src.utils.rate_limit import get_rate_limiter, polite_goto
+
+HTTP_TIMEOUT = (5, 20)
+
+# visible text below this = client-rendered shell, not a real page
+MIN_TEXT_LENGTH = 500
+
+_INVISIBLE = re.compile(r"<(script|style|noscript|template)\b.*?</\1>", re.S | re.I)
+_TAG = re.compile(r"<[^>]+>")
+
+
+def visible_text_length(html: str) -> int:
+    text = _TAG.sub(" ", _INVISIBLE.sub(" ", html))
+    return len(" ".join(text.split()))
+
+
+class HttpPage:
+    """
+    Result of an HTTP fetch (status + final URL + HTML).
+    """
+
+    def __init__(self, status: int, url: str, html: str, content_type: str):
+        self.status = status
+        self.url = url
+        self.html = html
+        self.content_type = content_type
+
+
+class HybridFetcher:
+    def __init__(
+        self,
+        context=None,
+        *,
+        required_marker: str | None = None,
+        min_text_length: int = MIN_TEXT_LENGTH,
+    ):
+        self.context = context
+        self.required_marker = required_marker
+        self.min_text_length = min_text_length
+        self.stats = {"http": 0, "browser": 0}
+
+        self.session = requests.Session()
+        self.session.headers.update({
+            "User-Agent": DEFAULT_USER_AGENT,
+            "Accept-Language": "en-GB,en;q=0.9",
+            "Accept": "text/html,application/xhtml+xml,application/xml;q=0.9,*/*;q=0.8",
+        })
+        self.sync_cookies()
+
+    # ------------------------------------------------------------------
+    # SESSION
+    # ------------------------------------------------------------------
+
+    def attach(self, context):
+        """
+        Switch to another context (e.g. one per deal), keeping the HTTP
+        session and its open connections.
+        """
+        self.context = context
+        self.sync_cookies()
+
+    def sync_cookies(self):
+        """
+        Copy the browser context's cookies (login, consent, clearance)
+        into the HTTP session.
+        """
+        if self.context is None:
+            return
+        for c in self.context.cookies():
+            self.session.cookies.set(
+                c["name"],
+                c["value"],
+                domain=c["domain"],
+                path=c.get("path", "/"),
+                secure=c.get("secure", False),
+                expires=int(c["expires"]) if c.get("expires", -1) > 0 else None,
+            )
+
+    # ------------------------------------------------------------------
+    # HTTP
+    # ------------------------------------------------------------------
+
+    def looks_complete(self, html: str) -> bool:
+        if self.required_marker and self.required_marker not in html:
+            return False
+        return visible_text_length(html) >= self.min_text_length
+
+    def fetch_http(self, url: str) -> HttpPage | None:
+        """
+        Detail page over plain HTTP, or None when the browser is needed.
+        """
+        if replay_enabled():
+            try:
+                status, html = get_html_archive().snapshot(url)
+            except NotArchived:
+                # never fetched: as if the page did not exist
+                status, html = 404, ""
+            return HttpPage(status, url, html, "text/html; charset=utf-8")
+
+        limiter = get_rate_limiter()
+        limiter.acquire(url)
+
+        try:
+            resp = self.session.get(url, timeout=HTTP_TIMEOUT, allow_redirects=True)
+        except requests.RequestException as e:
+            print(f"⚠️ HTTP fetch failed ({e.__class__.__name__}) — using browser")
+            return None
+
+        html = resp.text
+        if limiter.observe(url, status=resp.status_code, html=html):
+            return None
+        if resp.status_code >= 500:
+            return None
+        if resp.status_code == 200 and not self.looks_complete(html):
+            print("🧩 Looks client-rendered — using browser")
+            return None
+
+        self.stats["http"] += 1
+        get_html_archive().put(url, html, status=resp.status_code)
+        return HttpPage(
+            resp.status_code,
+            resp.url,
+            html,
+            resp.headers.get("Content-Type", "text/html; charset=utf-8"),
+        )
+
+    def fetch_html(self, url: str, page=None) -> str:
+        """
+        Detail HTML for parsing: HTTP first, browser page as fallback
+        (page given: navigate it; else a throwaway page of the context).
+        """
+        result = self.fetch_http(url)
+        if result is not None:
+            return result.html
+
+        own_page = page is None
+        page = page or self.context.new_page()
+        try:
+            self._browser_goto(page, url, wait_until="domcontentloaded")
+            return page.content()
+        finally:
+            if own_page:
+                page.close()
+
+    # ------------------------------------------------------------------
+    # BROWSER
+    # ------------------------------------------------------------------
+
+    def goto(self, page, url: str, **goto_kwargs):
+        """
+        Drop-in for page.goto when the page itself is needed: the
+        document comes from the HTTP fetch, sub-resources load as usual.
+        Returns the Playwright response.
+        """
+        if replay_enabled():
+            return replay_goto(page, url, **goto_kwargs)
+
+        result = self.fetch_http(url)
+        if result is None or result.url != url:
+            # redirects (e.g. to a login page) are left to the browser
+            return self._browser_goto(page, url, **goto_kwargs)
+
+        def serve(route):
+            route.fulfill(
+                status=result.status,
+                content_type=result.content_type,
+                body=result.html,
+            )
+
+        page.route(url, serve)
+        try:
+            return page.goto(url, **goto_kwargs)
+        finally:
+            page.unroute(url, serve)
+
+    def _browser_goto(self, page, url: str, **goto_kwargs):
+        self.stats["browser"] += 1
+        response = polite_goto(page, url, **goto_kwargs)
+        # challenge clearance / refreshed session cookies
+        self.sync_cookies()
+        return response
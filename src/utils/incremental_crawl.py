@@ -0,0 +1,151 @@
+# src/utils/incremental_crawl.py
+"""
+Incremental index crawling: stop paging once the index only shows
+listings we already know.
+
+Per broker / scope (category, sector) a watermark is kept in
+crawl_watermarks (src/persistence/crawl_watermarks.py): the listing ids
+of the first index page of the last run, and the index ordering.
+
+Incremental run (default):
+- a page counts as "known" when none of its listing ids are new
+- STOP_AFTER_KNOWN consecutive known pages → stop
+- ordering 'newest_first' and a known page holding last run's newest
+  ids → stop at once: everything below is older than the last run
+
+Full sweep (CRAWL_MODE=full, first run, or the last full sweep is older
+than FULL_SWEEP_DAYS): every page is crawled, so last_seen is refreshed
+for listings incremental runs never reach.
+
+Replay (--replay) always crawls the whole archived index and never
+moves the watermark.
+
+    crawl = IncrementalCrawl(repo, "Daltons", ordering=NEWEST_FIRST)
+    for page in ...:
+        ids = [...]
+        if crawl.page_seen(ids):
+            break
+    crawl.finish()
+"""
+
+import json
+import os
+from datetime import datetime, timedelta
+
+from src.utils.html_archive import replay_enabled
+
+CRAWL_MODE = os.getenv("CRAWL_MODE", "incremental")  # incremental | full
+STOP_AFTER_KNOWN = int(os.getenv("CRAWL_STOP_AFTER_KNOWN", "2"))
+FULL_SWEEP_DAYS = int(os.getenv("CRAWL_FULL_SWEEP_DAYS", "7"))
+
+WATERMARK_SIZE = 50
+
+NEWEST_FIRST = "newest_first"
+UNKNOWN_ORDER = "unknown"
+
+
+class IncrementalCrawl:
+    def __init__(
+        self,
+        repo,
+        broker: str,
+        scope: str = "all",
+        *,
+        ordering: str = UNKNOWN_ORDER,
+        known: set[str] | None = None,
+        stop_after: int = STOP_AFTER_KNOWN,
+    ):
+        """
+        repo:  SQLiteRepository (watermark + known ids)
+        known: listing ids already in the DB (default: all ids of broker)
+        """
+        self.repo = repo
+        self.broker = broker
+        self.scope = scope
+        self.ordering = ordering
+        self.stop_after = stop_after
+
+        mark = repo.get_crawl_watermark(broker, scope)
+        self.watermark = set(json.loads(mark["newest_ids"])) if mark else set()
+        self.known = repo.fetch_listing_ids(broker) if known is None else known
+
+        self.replay = replay_enabled()
+        self.full = self.replay or self._full_sweep_due(mark)
+
+        self.pages = 0
+        self.known_streak = 0
+        self.new_ids: list[str] = []
+        self.newest_ids: list[str] = []
+
+        label = broker if scope == "all" else f"{broker}/{scope}"
+        if self.full:
+            print(f"🧹 {label}: full index sweep")
+        else:
+            print(
+                f"⏩ {label}: incremental crawl "
+                f"(stop after {self.stop_after} known pages, ordering={self.ordering})"
+            )
+
+    @staticmethod
+    def _full_sweep_due(mark: dict | None) -> bool:
+        if CRAWL_MODE == "full":
+            return True
+        if CRAWL_MODE != "incremental":
+            raise RuntimeError(f"Unknown CRAWL_MODE: {CRAWL_MODE!r} (incremental | full)")
+        if not mark or not mark["last_full_sweep_at"]:
+            return True
+
+        last = datetime.fromisoformat(mark["last_full_sweep_at"])
+        return datetime.today() - last > timedelta(days=FULL_SWEEP_DAYS)
+
+    def page_seen(self, listing_ids) -> bool:
+        """
+        Record one index page. Returns True when the crawl should stop.
+        """
+        ids = [i for i in dict.fromkeys(listing_ids) if i]
+        self.pages += 1
+
+        if self.pages == 1:
+            self.newest_ids = ids[:WATERMARK_SIZE]
+
+        new = [i for i in ids if i not in self.known]
+        self.new_ids.extend(new)
+        self.known.update(new)
+
+        if new or not ids:
+            self.known_streak = 0
+            return False
+
+        self.known_streak += 1
+        if self.full:
+            return False
+
+        if self.ordering == NEWEST_FIRST and self.watermark.intersection(ids):
+            print("⏹️ Reached last run's newest listings — stopping")
+            return True
+
+        if self.known_streak >= self.stop_after:
+            print(f"⏹️ {self.known_streak} consecutive pages of known listings — stopping")
+            return True
+
+        return False
+
+    def finish(self, *, completed: bool = True):
+        """
+        Store the watermark. completed=False (crawl aborted / blocked)
+        keeps the previous full-sweep timestamp.
+        """
+        print(
+            f"📈 {self.broker}: {self.pages} index pages | "
+            f"{len(self.new_ids)} new listings"
+        )
+        if self.replay or not self.newest_ids:
+            return
+
+        self.repo.set_crawl_watermark(
+            self.broker,
+            self.scope,
+            newest_ids=json.dumps(self.newest_ids),
+            ordering=self.ordering,
+            full_sweep=self.full and completed,
+        )
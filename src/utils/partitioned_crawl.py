@@ -0,0 +1,257 @@
+# src/utils/partitioned_crawl.py
+"""
+Parallel partitioned index crawl (async Playwright).
+
+Brokers whose index is split by a filter (Knightsbridge sectors, B4S
+categories) used to crawl the partitions one after another in a single
+page. Here every partition runs in its own browser context, up to
+`concurrency` partitions at once (PARTITION_LIMITS, or
+CRAWL_PARTITIONS_IN_FLIGHT); every navigation still goes through the
+domain's rate limiter, so the cap only helps while the broker's token
+bucket allows it. Wall time ≈ the largest partition, not the sum.
+
+The broker logic stays in the caller, as plain sync functions:
+
+- page_url(value, page_no) -> str          index page of a partition
+- parse(name, html) -> list[dict]          rows of one index page
+- stop(name, rows) -> bool                 optional, e.g. an
+                                           IncrementalCrawl per partition
+
+A partition ends on its first page without new rows, a wait_selector
+timeout (no results) or max_pages. Rows are merged in partition order
+and de-duplicated on source_listing_id (a multi-sector listing keeps
+its first partition), so the caller does one bulk write.
+
+Index pages are archived; in replay mode no browser is started and the
+archived pages are parsed instead.
+"""
+
+import asyncio
+import json
+import os
+import time
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Callable
+
+from playwright.async_api import TimeoutError as PlaywrightTimeout
+from playwright.async_api import async_playwright
+
+from src.utils.browser_pool import DEFAULT_USER_AGENT, DEFAULT_VIEWPORT, default_headless
+from src.utils.html_archive import NotArchived, get_html_archive, replay_enabled
+from src.utils.rate_limit import get_rate_limiter
+from src.utils.resource_policy import apply_resource_policy_async, policy_for
+
+
+@dataclass(frozen=True)
+class PartitionLimits:
+    # partitions (browser contexts) crawled at once
+    concurrency: int = 2
+
+
+DEFAULT_LIMITS = PartitionLimits()
+
+# keyed by the broker name used for the browser pool
+PARTITION_LIMITS = {
+    "Knightsbridge": PartitionLimits(concurrency=4),
+    "BusinessesForSale": PartitionLimits(concurrency=2),
+}
+
+
+def limits_for(broker: str) -> PartitionLimits:
+    override = os.getenv("CRAWL_PARTITIONS_IN_FLIGHT")
+    if override:
+        return PartitionLimits(concurrency=max(1, int(override)))
+    return PARTITION_LIMITS.get(broker, DEFAULT_LIMITS)
+
+
+@dataclass(frozen=True)
+class PartitionedCrawlSpec:
+    broker: str
+    # partition name -> filter value / base URL, in priority order
+    partitions: dict
+    page_url: Callable[[object, int], str]
+    parse: Callable[[str, str], list[dict]]
+    stop: Callable[[str, list[dict]], bool] | None = None
+    # None: the page is complete at domcontentloaded
+    wait_selector: str | None = None
+    max_pages: int = 50
+    # cookies added to every context (e.g. pre-accepted consent)
+    cookies: tuple = ()
+    # visited once before the partitions; its cookies are shared by all
+    warmup_url: str | None = None
+    warmup_wait_ms: int = 0
+    # loaded if present, rewritten after the warm-up
+    storage_state: Path | None = None
+    goto_timeout: int = 60_000
+    wait_timeout: int = 20_000
+    context_options: dict = field(default_factory=dict)
+
+
+def _new_rows(rows: list[dict], seen: set) -> list[dict]:
+    new = []
+    for row in rows:
+        key = row["source_listing_id"]
+        if key not in seen:
+            seen.add(key)
+            new.append(row)
+    return new
+
+
+async def _crawl_partition(spec, browser, context_options, limiter, slots, name, value, results, stats):
+    async with slots:
+        print(f"🧭 {spec.broker}/{name}: crawling")
+        context = await browser.new_context(**context_options)
+        if spec.cookies:
+            await context.add_cookies(list(spec.cookies))
+        await apply_resource_policy_async(context, policy_for(spec.broker))
+        page = await context.new_page()
+
+        rows: list[dict] = []
+        seen: set = set()
+        try:
+            for page_no in range(1, spec.max_pages + 1):
+                url = spec.page_url(value, page_no)
+                await asyncio.sleep(limiter.reserve(url))
+                try:
+                    response = await page.goto(url, wait_until="domcontentloaded", timeout=spec.goto_timeout)
+                    if spec.wait_selector:
+                        await page.wait_for_selector(spec.wait_selector, timeout=spec.wait_timeout)
+                except PlaywrightTimeout:
+                    print(f"🛑 {spec.broker}/{name}: no results on page {page_no}")
+                    break
+
+                html = await page.content()
+                status = response.status if response else None
+                if limiter.observe(url, status=status, html=html):
+                    stats["pushbacks"] += 1
+                get_html_archive().put(url, html, status=status)
+                stats["pages"] += 1
+
+                new = _new_rows(spec.parse(name, html), seen)
+                if not new:
+                    break
+                rows.extend(new)
+                if spec.stop and spec.stop(name, new):
+                    break
+        finally:
+            await context.close()
+
+    results[name] = rows
+    print(f"🧩 {spec.broker}/{name}: {len(rows)} listings")
+
+
+async def _warm_up(spec, browser, context_options, limiter):
+    """
+    Visit warmup_url once (session / challenge cookies); returns the
+    storage state every partition context starts from.
+    """
+    print(f"🔥 Warming {spec.broker} session")
+    context = await browser.new_context(**context_options)
+    try:
+        page = await context.new_page()
+        await asyncio.sleep(limiter.reserve(spec.warmup_url))
+        await page.goto(spec.warmup_url, timeout=spec.goto_timeout)
+        if spec.warmup_wait_ms:
+            await page.wait_for_timeout(spec.warmup_wait_ms)
+        state = await context.storage_state()
+    finally:
+        await context.close()
+
+    if spec.storage_state is not None:
+        spec.storage_state.parent.mkdir(parents=True, exist_ok=True)
+        spec.storage_state.write_text(json.dumps(state))
+    return state
+
+
+async def _run(spec, *, headless, limits):
+    stats = {"pages": 0, "pushbacks": 0}
+    results: dict[str, list[dict]] = {}
+
+    async with async_playwright() as p:
+        browser = await p.chromium.launch(headless=headless)
+
+        context_options = {
+            "viewport": DEFAULT_VIEWPORT,
+            "user_agent": DEFAULT_USER_AGENT,
+            **spec.context_options,
+        }
+        if spec.storage_state is not None and spec.storage_state.exists():
+            context_options["storage_state"] = str(spec.storage_state)
+
+        limiter = get_rate_limiter()
+        slots = asyncio.Semaphore(limits.concurrency)
+
+        try:
+            if spec.warmup_url:
+                context_options["storage_state"] = await _warm_up(spec, browser, context_options, limiter)
+
+            await asyncio.gather(*(
+                _crawl_partition(spec, browser, context_options, limiter, slots, name, value, results, stats)
+                for name, value in spec.partitions.items()
+            ))
+        finally:
+            await browser.close()
+
+    return results, stats
+
+
+def _replay(spec):
+    stats = {"pages": 0, "pushbacks": 0}
+    results: dict[str, list[dict]] = {}
+    archive = get_html_archive()
+
+    for name, value in spec.partitions.items():
+        rows: list[dict] = []
+        seen: set = set()
+        for page_no in range(1, spec.max_pages + 1):
+            try:
+                _, html = archive.snapshot(spec.page_url(value, page_no))
+            except NotArchived:
+                break
+            stats["pages"] += 1
+            new = _new_rows(spec.parse(name, html), seen)
+            if not new:
+                break
+            rows.extend(new)
+        results[name] = rows
+
+    return results, stats
+
+
+def run_partitioned_crawl(
+    spec: PartitionedCrawlSpec,
+    *,
+    headless: bool | None = None,
+    limits: PartitionLimits | None = None,
+) -> list[dict]:
+    """
+    Crawl every partition; returns the merged, de-duplicated rows.
+    """
+    started = time.monotonic()
+
+    if replay_enabled():
+        print(f"📼 {spec.broker}: replaying {len(spec.partitions)} partitions from the archive")
+        results, stats = _replay(spec)
+    else:
+        limits = limits or limits_for(spec.broker)
+        headless = default_headless() if headless is None else headless
+        print(
+            f"⚡ {spec.broker}: {len(spec.partitions)} partitions | "
+            f"{limits.concurrency} in flight"
+        )
+        results, stats = asyncio.run(_run(spec, headless=headless, limits=limits))
+
+    merged: dict[str, dict] = {}
+    total = 0
+    for name in spec.partitions:
+        for row in results.get(name, []):
+            total += 1
+            merged.setdefault(row["source_listing_id"], row)
+
+    print(
+        f"🏁 {spec.broker}: {len(merged)} unique listings "
+        f"({total - len(merged)} in several partitions) | {stats['pages']} pages | "
+        f"{stats['pushbacks']} pushbacks | {time.monotonic() - started:.0f}s"
+    )
+    return list(merged.values())
@@ -1,5 +1,6 @@
 from pathlib import Path
-from playwright.sync_api import sync_playwright
+
+from src.utils.browser_pool import get_browser_pool
 
 
 def html_to_pdf(html: str, output_path: Path):
@@ -9,9 +10,9 @@ def html_to_pdf(html: str, output_path: Path):
     """
     output_path = Path(output_path)
 
-    with sync_playwright() as p:
-        browser = p.chromium.launch(headless=True)
-        page = browser.new_page()
+    # PDF printing needs headless Chromium
+    with get_browser_pool().context("html_to_pdf", headless=True) as context:
+        page = context.new_page()
 
         # Load HTML directly
         page.set_content(html, wait_until="networkidle")
@@ -28,5 +29,3 @@ def html_to_pdf(html: str, output_path: Path):
                 "right": "15mm",
             },
         )
-
-        browser.close()
\ No newline at end of file
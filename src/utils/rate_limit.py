@@ -1,13 +1,267 @@
+# src/utils/rate_limit.py
+"""
+Central politeness control for every broker request.
+
+Per domain (suffix match, so portal.x.com and www.x.com share one):
+
+- token bucket:  `rate` requests/second on average, up to `burst` back
+                 to back. No fixed sleeps: a request only waits when the
+                 bucket is empty.
+- AIMD:          a pushback (HTTP 429/403/503, Cloudflare challenge page)
+                 halves the current rate and empties the bucket; every
+                 success adds back `rate * RECOVERY_STEP` until the
+                 configured rate is reached again.
+- daily budget:  optional cap on requests per broker per day, counted in
+                 daily_clicks with one atomic UPSERT (shared by every
+                 process that runs that day).
+
+Usage:
+
+    limiter = get_rate_limiter()
+    limiter.acquire(url)                 # blocks until allowed
+    response = page.goto(url)
+    limiter.observe(url, status=response.status, html=page.content())
+
+Async code uses `await asyncio.sleep(limiter.reserve(url))` instead of
+acquire().
+"""
+
+import random
+import threading
+import time
+from dataclasses import dataclass
+from datetime import date
+from pathlib import Path
+from urllib.parse import urlsplit
+
+from src.persistence.repository import SQLiteRepository
+from src.utils.html_archive import get_html_archive, replay_enabled, replay_goto
+
+DB_PATH = Path("db/deals.sqlite")
+
+PUSHBACK_STATUSES = {403, 429, 503}
+# Cloudflare interstitial; only meaningful on a pushback status — normal
+# 200 pages of CF-fronted sites embed /cdn-cgi/challenge-platform/ scripts
+CHALLENGE_MARKERS = (
+    "<title>Just a moment...</title>",
+    "Verify you are human",
+)
+
+# fraction of the configured rate regained per successful request
+RECOVERY_STEP = 0.1
+# small random spread on waits so requests don't look machine-timed
+JITTER = 0.25
+
+
 class BudgetExhausted(Exception):
     pass
 
 
+@dataclass(frozen=True)
+class DomainLimits:
+    broker: str
+    rate: float                      # requests / second at full speed
+    burst: int = 1
+    min_rate: float = 1 / 60
+    daily_budget: int | None = None
+
+
+DEFAULT_LIMITS = DomainLimits(broker="default", rate=1 / 3, burst=1)
+
+DOMAIN_LIMITS = {
+    "knightsbridgeplc.com": DomainLimits("Knightsbridge", rate=1 / 1.5, burst=2),
+    "dealopportunities.co.uk": DomainLimits("DealOpportunities", rate=1 / 8, burst=1),
+    "axispartnership.co.uk": DomainLimits("AxisPartnership", rate=1 / 2, burst=2),
+    "abercornbusinesssales.com": DomainLimits("Abercorn", rate=1 / 1.5, burst=2),
+    "daltonsbusiness.com": DomainLimits("Daltons", rate=1 / 1.2, burst=3),
+    "business-sale.com": DomainLimits("BSR", rate=1 / 1.5, burst=2),
+    "tworldba.co.uk": DomainLimits("transworld_uk", rate=1 / 2, burst=2),
+    "businessesforsale.com": DomainLimits("BusinessesForSale", rate=1 / 4, burst=1),
+    "hiltonsmythe.com": DomainLimits("HiltonSmythe", rate=1 / 1.2, burst=2),
+    "businessbuyers.co.uk": DomainLimits("BusinessBuyers", rate=1 / 3, burst=1),
+}
+
+
+def domain_of(url_or_domain: str) -> str:
+    host = urlsplit(url_or_domain).hostname if "//" in url_or_domain else url_or_domain
+    host = (host or "").lower()
+    for domain in DOMAIN_LIMITS:
+        if host == domain or host.endswith("." + domain):
+            return domain
+    return host
+
+
+def is_challenge(status: int | None = None, html: str | None = None) -> bool:
+    if status not in PUSHBACK_STATUSES:
+        return False
+    return bool(html) and any(m in html for m in CHALLENGE_MARKERS)
+
+
+def is_pushback(status: int | None = None, html: str | None = None) -> bool:
+    # a challenge page is always served with a pushback status
+    return status in PUSHBACK_STATUSES
+
+
 class DailyClickBudget:
-    def __init__(self, limit: int):
+    """
+    Requests allowed per broker per day.
+    With a repo, usage lives in daily_clicks and is checked + incremented
+    atomically; without one it is an in-memory counter.
+    """
+
+    def __init__(self, limit: int, *, repo=None, broker: str | None = None):
+        if repo is not None and broker is None:
+            raise RuntimeError("DailyClickBudget with a repo needs a broker")
         self.limit = limit
         self.remaining = limit
+        self.repo = repo
+        self.broker = broker
 
     def consume(self):
+        if self.repo is not None:
+            if not self.repo.try_consume_click(self.broker, date.today(), self.limit):
+                raise BudgetExhausted(f"Daily {self.broker} budget exhausted")
+            return
+
         if self.remaining <= 0:
             raise BudgetExhausted("Daily detail-page budget exhausted")
-        self.remaining -= 1
\ No newline at end of file
+        self.remaining -= 1
+
+
+class DomainLimiter:
+    def __init__(self, domain: str, limits: DomainLimits, *, budget: DailyClickBudget | None = None):
+        self.domain = domain
+        self.limits = limits
+        self.budget = budget
+
+        self.rate = limits.rate
+        self.tokens = float(limits.burst)
+        self._updated = time.monotonic()
+        self._lock = threading.Lock()
+
+    def _refill(self, now: float):
+        elapsed = now - self._updated
+        self._updated = now
+        self.tokens = min(float(self.limits.burst), self.tokens + elapsed * self.rate)
+
+    def reserve(self) -> float:
+        """
+        Take a token (counting against the daily budget) and return how
+        long the caller must wait before sending the request.
+        """
+        if self.budget is not None:
+            self.budget.consume()
+
+        with self._lock:
+            self._refill(time.monotonic())
+            self.tokens -= 1
+            if self.tokens >= 0:
+                return 0.0
+            wait = -self.tokens / self.rate
+
+        return wait * (1 + random.uniform(0, JITTER))
+
+    def success(self):
+        with self._lock:
+            self.rate = min(self.limits.rate, self.rate + self.limits.rate * RECOVERY_STEP)
+
+    def pushback(self, reason: str = ""):
+        with self._lock:
+            self.rate = max(self.limits.min_rate, self.rate / 2)
+            self._refill(time.monotonic())
+            self.tokens = min(self.tokens, 0.0)
+        print(f"🐢 {self.domain} pushed back{f' ({reason})' if reason else ''} — {1 / self.rate:.1f}s per request")
+
+
+class RateLimiter:
+    def __init__(self, *, db_path: Path = DB_PATH):
+        # daily budgets (DomainLimits.daily_budget) are counted in this DB
+        self.db_path = db_path
+        self._repo = None
+        self._domains: dict[str, DomainLimiter] = {}
+        self._lock = threading.Lock()
+
+    def limiter(self, url_or_domain: str) -> DomainLimiter:
+        domain = domain_of(url_or_domain)
+        with self._lock:
+            limiter = self._domains.get(domain)
+            if limiter is None:
+                limits = DOMAIN_LIMITS.get(domain, DEFAULT_LIMITS)
+                budget = None
+                if limits.daily_budget is not None:
+                    if self._repo is None:
+                        self._repo = SQLiteRepository(self.db_path)
+                    budget = DailyClickBudget(limits.daily_budget, repo=self._repo, broker=limits.broker)
+                limiter = DomainLimiter(domain, limits, budget=budget)
+                self._domains[domain] = limiter
+            return limiter
+
+    def reserve(self, url_or_domain: str) -> float:
+        return self.limiter(url_or_domain).reserve()
+
+    def acquire(self, url_or_domain: str):
+        wait = self.reserve(url_or_domain)
+        if wait > 0:
+            time.sleep(wait)
+
+    def observe(self, url_or_domain: str, *, status: int | None = None, html: str | None = None) -> bool:
+        """
+        Feed a response back into AIMD. Returns True on pushback.
+        """
+        limiter = self.limiter(url_or_domain)
+        if is_pushback(status, html):
+            limiter.pushback("challenge page" if is_challenge(status, html) else f"HTTP {status}")
+            return True
+        limiter.success()
+        return False
+
+    def pushback(self, url_or_domain: str, reason: str = ""):
+        self.limiter(url_or_domain).pushback(reason)
+
+
+_LIMITER: RateLimiter | None = None
+_LIMITER_LOCK = threading.Lock()
+
+
+def get_rate_limiter() -> RateLimiter:
+    """
+    Process-wide limiter, so every client hitting a domain shares its bucket.
+    """
+    global _LIMITER
+    with _LIMITER_LOCK:
+        if _LIMITER is None:
+            _LIMITER = RateLimiter()
+        return _LIMITER
+
+
+def polite_goto(page, url: str, **goto_kwargs):
+    """
+    page.goto through the domain's limiter, feeding the response back
+    into AIMD. Returns the Playwright response (may be None).
+    The page is archived (html_archive.py); in replay mode it is served
+    from the archive instead.
+    """
+    if replay_enabled():
+        return replay_goto(page, url, **goto_kwargs)
+
+    limiter = get_rate_limiter()
+    limiter.acquire(url)
+    response = page.goto(url, **goto_kwargs)
+    status = response.status if response else None
+    html = page.content()
+    limiter.observe(url, status=status, html=html)
+    get_html_archive().put(url, html, status=status)
+    return response
+
+
+def polite_get(session, url: str, **get_kwargs):
+    """
+    session.get through the domain's limiter (requests-based clients).
+    The body is archived (html_archive.py).
+    """
+    limiter = get_rate_limiter()
+    limiter.acquire(url)
+    resp = session.get(url, **get_kwargs)
+    limiter.observe(url, status=resp.status_code, html=resp.text)
+    get_html_archive().put(url, resp.text, status=resp.status_code)
+    return resp
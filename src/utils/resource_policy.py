@@ -0,0 +1,172 @@
+# src/utils/resource_policy.py
+"""
+Request interception for scraping contexts.
+
+Every pooled context gets a ResourcePolicy (see browser_pool.new_context):
+one route handler that aborts requests by resource type and
+by domain before they hit the network. Index / detail pages only need
+HTML + scripts, so images, fonts, media, analytics and chat widgets are
+dropped — and networkidle no longer waits on them.
+
+- SCRAPE_POLICY:  default for every broker
+- PDF_POLICY:     "PDF-faithful": keeps styles, images and fonts,
+                  only trackers / media are dropped
+- BROKER_POLICIES: per-broker overrides, looked up by policy_for()
+
+A page that is about to be printed gets PDF_POLICY on top of its
+context's policy (page routes win over context routes):
+
+    apply_resource_policy(page, PDF_POLICY)   # before goto()
+"""
+
+from dataclasses import dataclass, replace
+from urllib.parse import urlsplit
+
+ROUTE_PATTERN = "**/*"
+
+# analytics, ads, chat widgets, session recorders
+TRACKER_DOMAINS = (
+    "google-analytics.com",
+    "googletagmanager.com",
+    "googleadservices.com",
+    "googlesyndication.com",
+    "doubleclick.net",
+    "facebook.net",
+    "connect.facebook.com",
+    "bat.bing.com",
+    "clarity.ms",
+    "hotjar.com",
+    "hotjar.io",
+    "snap.licdn.com",
+    "static.ads-twitter.com",
+    "analytics.tiktok.com",
+    "hs-scripts.com",
+    "hs-analytics.net",
+    "hs-banner.com",
+    "hubspot.com",
+    "intercom.io",
+    "intercomcdn.com",
+    "tawk.to",
+    "livechatinc.com",
+    "zdassets.com",
+    "zopim.com",
+    "drift.com",
+    "driftt.com",
+    "crisp.chat",
+    "leadforensics.com",
+    "lfeeder.com",
+)
+
+# never blocked, whatever the policy says (bot challenges must load fully)
+ALWAYS_ALLOWED_DOMAINS = (
+    "challenges.cloudflare.com",
+)
+
+
+@dataclass(frozen=True)
+class ResourcePolicy:
+    name: str
+    # Playwright request.resource_type values
+    block_types: frozenset = frozenset()
+    # suffix match on the request host
+    block_domains: tuple = ()
+    # if set: only these hosts (suffix match) may load
+    allow_domains: tuple = ()
+
+    def blocks(self, resource_type: str, url: str) -> bool:
+        host = urlsplit(url).hostname or ""
+        if not host:
+            return False              # data:, blob:, about:
+        if _matches(host, ALWAYS_ALLOWED_DOMAINS):
+            return False
+        if resource_type in self.block_types:
+            return True
+        if _matches(host, self.block_domains):
+            return True
+        if self.allow_domains and not _matches(host, self.allow_domains):
+            return True
+        return False
+
+    def extend(self, *, name: str | None = None, block_types=(), block_domains=()):
+        return replace(
+            self,
+            name=name or self.name,
+            block_types=self.block_types | frozenset(block_types),
+            block_domains=self.block_domains + tuple(block_domains),
+        )
+
+
+def _matches(host: str, domains) -> bool:
+    return any(host == d or host.endswith("." + d) for d in domains)
+
+
+SCRAPE_POLICY = ResourcePolicy(
+    name="scrape",
+    block_types=frozenset({"image", "media", "font"}),
+    block_domains=TRACKER_DOMAINS,
+)
+
+PDF_POLICY = ResourcePolicy(
+    name="pdf",
+    block_types=frozenset({"media"}),
+    block_domains=TRACKER_DOMAINS,
+)
+
+# keyed by the broker name passed to browser_pool.new_context()
+BROKER_POLICIES = {
+    # consent is pre-accepted via cookie; Cookiebot itself is dead weight
+    "Knightsbridge": SCRAPE_POLICY.extend(
+        name="knightsbridge",
+        block_domains=("cookiebot.com", "cookiebot.eu"),
+    ),
+    # OneTrust overlay is removed by hand anyway
+    "BusinessBuyers": SCRAPE_POLICY.extend(
+        name="businessbuyers",
+        block_domains=("cookielaw.org", "onetrust.com"),
+    ),
+    "html_to_pdf": PDF_POLICY,
+}
+
+
+def policy_for(broker: str) -> ResourcePolicy:
+    return BROKER_POLICIES.get(broker, SCRAPE_POLICY)
+
+
+def apply_resource_policy(target, policy: ResourcePolicy | None):
+    """
+    Install policy on a BrowserContext or Page, replacing any policy
+    previously installed on that same target. None removes it (a page
+    then falls back to its context's policy).
+    """
+    target.unroute(ROUTE_PATTERN)
+    if policy is None:
+        return
+
+    def handle(route):
+        request = route.request
+        if policy.blocks(request.resource_type, request.url):
+            route.abort("blockedbyclient")
+        else:
+            # continue_ (not fallback): a page policy must not fall
+            # through to its context's stricter policy
+            route.continue_()
+
+    target.route(ROUTE_PATTERN, handle)
+
+
+async def apply_resource_policy_async(target, policy: ResourcePolicy | None):
+    """
+    apply_resource_policy for async-API contexts / pages.
+    """
+    await target.unroute(ROUTE_PATTERN)
+    if policy is None:
+        return
+
+    async def handle(route):
+        request = route.request
+        if policy.blocks(request.resource_type, request.url):
+            await route.abort("blockedbyclient")
+        else:
+            await route.continue_()
+
+    await target.route(ROUTE_PATTERN, handle)
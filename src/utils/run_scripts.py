@@ -1,6 +1,7 @@
 import time
 import subprocess
 import sys
+from concurrent.futures import ThreadPoolExecutor
 from pathlib import Path
 import os
 
@@ -33,4 +34,64 @@ def run_script(script_name: str, env=None):
     elapsed = time.perf_counter() - start
     print(f"⏱️ {script_name} finished in {elapsed:.1f}s ({status})")
 
-    return elapsed, status
\ No newline at end of file
+    return elapsed, status
+
+# broker part of import_<broker>.py / enrich_<broker>.py → the domain it crawls
+BROKER_DOMAINS = {
+    "abercorn": "abercornbusinesssales.com",
+    "axispartnership": "axispartnership.co.uk",
+    "bsr": "business-sale.com",
+    "businessbuyers": "businessbuyers.co.uk",
+    "businesses4sale_generic": "businessesforsale.com",
+    "businesses4sale_vault": "businessesforsale.com",
+    "daltons": "daltonsbusiness.com",
+    "dealopportunities": "dealopportunities.co.uk",
+    "hiltonsmythe": "hiltonsmythe.com",
+    "knightsbridge": "knightsbridgeplc.com",
+    "transworld": "tworldba.co.uk",
+}
+
+SCRIPT_PRIORITY = {"import": 0, "enrich": 1}
+
+# domain lanes (browser processes) running at once
+PIPELINE_WORKERS = int(os.getenv("PIPELINE_WORKERS", "4"))
+
+
+def script_domain(script_name: str) -> str:
+    """
+    Domain a broker script crawls; scripts that crawl nothing get their
+    own lane (keyed by the script name).
+    """
+    stem = Path(script_name).stem
+    _, _, broker = stem.partition("_")
+    return BROKER_DOMAINS.get(broker, stem)
+
+
+def _run_lane(lane, env):
+    return [(script, *run_script(script, env=env)) for script in lane]
+
+
+def run_scripts_by_domain(scripts, env=None, *, workers: int = PIPELINE_WORKERS):
+    """
+    Run broker scripts with one lane per domain: lanes run side by side
+    (one broker's politeness waits overlap another's fetches), the
+    scripts of a lane one at a time — imports before enrichment — so the
+    domain's rate limit holds across processes. Each script paces its
+    own requests (rate_limit.py). Returns [(script, elapsed, status)]
+    like run_script, grouped by lane.
+    """
+    lanes: dict[str, list[str]] = {}
+    for script in scripts:
+        lanes.setdefault(script_domain(script), []).append(script)
+    for lane in lanes.values():
+        lane.sort(key=lambda script: SCRIPT_PRIORITY.get(
+            Path(script).stem.partition("_")[0], len(SCRIPT_PRIORITY)
+        ))
+
+    print(f"🗺️ {len(scripts)} scripts in {len(lanes)} domain lanes | {workers} in parallel")
+
+    timings = []
+    with ThreadPoolExecutor(max_workers=max(1, workers)) as pool:
+        for lane_timings in pool.map(lambda lane: _run_lane(lane, env), lanes.values()):
+            timings.extend(lane_timings)
+    return timings
@@ -0,0 +1,291 @@
+# src/utils/xhr_capture.py
+"""
+Network-capture pagination: learn the request behind a "Load more" /
+"Next" control once, then page that endpoint directly over HTTP.
+
+1. capture:  the control is clicked once with page.on("response")
+             listening; the same-site xhr / fetch / document requests it
+             triggers are recorded (method, URL, body, headers)
+2. learn:    the page variable is located in one of them — a page number
+             (?page=2, paged=2 in a form / JSON body), an offset
+             (offset=12) or a /page/2/ path segment
+3. page:     the endpoint is fetched for the following pages with the
+             context's cookies (HybridFetcher session), `burst` requests
+             in flight (DOMAIN_LIMITS: parallel only where the domain
+             allows it), through the rate limiter; bodies are archived
+
+Nothing learnable (or replay mode) → capture_endpoint() returns None
+and the caller keeps clicking.
+
+    endpoint = capture_endpoint(page, next_link.click, fetcher=http, page_number=2)
+    if endpoint:
+        for n, html in endpoint.pages(start=3):
+            cards = html_elements(response_html(html), CARD_XPATH)
+            if not cards:
+                break
+"""
+
+import json
+import re
+from concurrent.futures import ThreadPoolExecutor
+from urllib.parse import parse_qsl, urlencode, urlsplit, urlunsplit
+
+from playwright.sync_api import TimeoutError as PlaywrightTimeout
+
+from src.utils.html_archive import get_html_archive, replay_enabled
+from src.utils.hybrid_fetch import HTTP_TIMEOUT
+from src.utils.rate_limit import domain_of, get_rate_limiter
+
+CAPTURE_TYPES = ("xhr", "fetch", "document")
+
+PAGE_PARAMS = ("paged", "page", "pg", "pagenum", "page_number", "pageNumber", "currentPage")
+OFFSET_PARAMS = ("offset", "start", "skip")
+PATH_PAGE = re.compile(r"/page/(\d+)(?=/|$)")
+
+# request headers worth replaying (cookies / UA come from the session)
+REPLAY_HEADERS = ("accept", "content-type", "referer", "origin", "x-requested-with")
+
+
+def response_html(text: str) -> str:
+    """
+    HTML carried by an endpoint response: the body itself, or every
+    HTML string inside a JSON body (e.g. {"html": "..."}).
+    """
+    try:
+        data = json.loads(text)
+    except ValueError:
+        return text
+
+    parts = []
+
+    def walk(value):
+        if isinstance(value, str):
+            if "<" in value and ">" in value:
+                parts.append(value)
+        elif isinstance(value, dict):
+            for v in value.values():
+                walk(v)
+        elif isinstance(value, list):
+            for v in value:
+                walk(v)
+
+    walk(data)
+    return "\n".join(parts)
+
+
+# ------------------------------------------------------------------
+# CAPTURE
+# ------------------------------------------------------------------
+
+class CapturedRequest:
+    def __init__(self, request, status: int):
+        self.method = request.method
+        self.url = request.url
+        self.body = request.post_data
+        self.resource_type = request.resource_type
+        self.status = status
+        self.headers = {
+            k: v for k, v in request.headers.items()
+            if k.lower() in REPLAY_HEADERS or k.lower().startswith("x-wp-")
+        }
+
+
+def capture_requests(page, trigger, *, timeout: int = 15_000) -> list[CapturedRequest]:
+    """
+    Run trigger() (the click) and return the same-site requests it
+    caused, xhr / fetch first.
+    """
+    site = domain_of(page.url)
+    captured = []
+
+    def on_response(response):
+        request = response.request
+        if request.resource_type in CAPTURE_TYPES and domain_of(request.url) == site:
+            captured.append(CapturedRequest(request, response.status))
+
+    page.on("response", on_response)
+    try:
+        trigger()
+        try:
+            page.wait_for_load_state("networkidle", timeout=timeout)
+        except PlaywrightTimeout:
+            pass
+    finally:
+        page.remove_listener("response", on_response)
+
+    captured.sort(key=lambda c: c.resource_type == "document")
+    return captured
+
+
+def capture_endpoint(page, trigger, *, fetcher, page_number: int, label: str = "") -> "PagedEndpoint | None":
+    """
+    Click once (trigger) while capturing; return the learned endpoint,
+    or None when no captured request has a recognisable page variable.
+    page_number: the page that click loads (2 for the first "Next").
+    """
+    if page_number < 2:
+        raise RuntimeError("capture_endpoint: the captured click must load page 2 or later")
+    if replay_enabled():
+        trigger()
+        return None
+
+    for captured in capture_requests(page, trigger):
+        if captured.status != 200:
+            continue
+        variable = _locate_page_variable(captured)
+        if variable is None:
+            continue
+        if variable[1] == "page" and variable[3] not in (page_number - 1, page_number):
+            continue  # some other counter (0- or 1-based page numbers only)
+
+        endpoint = PagedEndpoint(captured, variable, page_number=page_number, fetcher=fetcher)
+        where, kind, key, value = variable
+        print(
+            f"🛰️ {label or domain_of(captured.url)}: paging {captured.method} "
+            f"{captured.url.split('?')[0]} directly ({kind} '{key}' in {where})"
+        )
+        return endpoint
+
+    print(f"🛰️ {label or domain_of(page.url)}: no pageable request captured — clicking")
+    return None
+
+
+# ------------------------------------------------------------------
+# LEARN
+# ------------------------------------------------------------------
+
+def _body_params(captured: CapturedRequest) -> tuple[str, dict] | None:
+    if not captured.body:
+        return None
+    content_type = captured.headers.get("content-type", "").lower()
+    if "json" in content_type:
+        try:
+            data = json.loads(captured.body)
+        except ValueError:
+            return None
+        return ("json", data) if isinstance(data, dict) else None
+    return "form", dict(parse_qsl(captured.body, keep_blank_values=True))
+
+
+def _find_int(params: dict, names) -> tuple[str, int] | None:
+    lowered = {k.lower(): k for k in params}
+    for name in names:
+        key = lowered.get(name.lower())
+        if key is None:
+            continue
+        try:
+            return key, int(params[key])
+        except (TypeError, ValueError):
+            continue
+    return None
+
+
+def _locate_page_variable(captured: CapturedRequest):
+    """
+    (where, kind, key, value): where in query / form / json / path,
+    kind in page / offset.
+    """
+    sources = [("query", dict(parse_qsl(urlsplit(captured.url).query, keep_blank_values=True)))]
+    body = _body_params(captured)
+    if body:
+        sources.append(body)
+
+    for kind, names in (("page", PAGE_PARAMS), ("offset", OFFSET_PARAMS)):
+        for where, params in sources:
+            found = _find_int(params, names)
+            if found and found[1] > 0:
+                return where, kind, found[0], found[1]
+
+    m = PATH_PAGE.search(urlsplit(captured.url).path)
+    if m:
+        return "path", "page", "/page/", int(m.group(1))
+    return None
+
+
+# ------------------------------------------------------------------
+# PAGE
+# ------------------------------------------------------------------
+
+class PagedEndpoint:
+    def __init__(self, captured: CapturedRequest, variable, *, page_number: int, fetcher):
+        self.captured = captured
+        self.where, self.kind, self.key, self.value = variable
+        self.page_number = page_number
+
+        # session with the browser's current cookies (login, consent)
+        fetcher.sync_cookies()
+        self.session = fetcher.session
+        self.workers = max(1, get_rate_limiter().limiter(captured.url).limits.burst)
+
+    def _value_for(self, n: int) -> int:
+        if self.kind == "page":
+            return self.value + (n - self.page_number)
+        # offset: items loaded before the captured page, per page
+        return self.value // (self.page_number - 1) * (n - 1)
+
+    def request_for(self, n: int) -> tuple[str, str | None]:
+        """
+        (url, body) of page n.
+        """
+        value = self._value_for(n)
+        parts = urlsplit(self.captured.url)
+        url, body = self.captured.url, self.captured.body
+
+        if self.where == "path":
+            path = PATH_PAGE.sub(f"/page/{value}", parts.path, count=1)
+            url = urlunsplit(parts._replace(path=path))
+        elif self.where == "query":
+            query = dict(parse_qsl(parts.query, keep_blank_values=True))
+            query[self.key] = str(value)
+            url = urlunsplit(parts._replace(query=urlencode(query)))
+        elif self.where == "form":
+            form = dict(parse_qsl(body, keep_blank_values=True))
+            form[self.key] = str(value)
+            body = urlencode(form)
+        else:
+            data = json.loads(body)
+            data[self.key] = value
+            body = json.dumps(data)
+
+        return url, body
+
+    def fetch(self, n: int) -> tuple[int, str]:
+        url, body = self.request_for(n)
+
+        limiter = get_rate_limiter()
+        limiter.acquire(url)
+        resp = self.session.request(
+            self.captured.method,
+            url,
+            data=body.encode("utf-8") if body is not None else None,
+            headers=self.captured.headers,
+            timeout=HTTP_TIMEOUT,
+        )
+        text = resp.text
+        limiter.observe(url, status=resp.status_code, html=text)
+        # POST: the body tells pages apart (a fragment is never sent)
+        get_html_archive().put(url if body is None else f"{url}#{body}", text, status=resp.status_code)
+        return resp.status_code, text
+
+    def pages(self, start: int, *, max_pages: int | None = None):
+        """
+        Yield (page number, body) for start, start + 1, ... in order;
+        stops at the first non-200 / empty response. The caller breaks
+        out once a page has nothing new.
+        """
+        n = start
+        with ThreadPoolExecutor(max_workers=self.workers) as pool:
+            while max_pages is None or n <= max_pages:
+                last = n + self.workers - 1
+                if max_pages is not None:
+                    last = min(last, max_pages)
+                batch = list(range(n, last + 1))
+
+                futures = [pool.submit(self.fetch, k) for k in batch]
+                for k, future in zip(batch, futures):
+                    status, text = future.result()
+                    if status != 200 or not text.strip():
+                        return
+                    yield k, text
+
+                n = last + 1